@@ -22,11 +22,27 @@ def version_check_handler(cli_ctx, **kwargs):
                 check_latest(cli_ctx)
 
 
+def arm_cache_handler(cli_ctx, **kwargs):
+    from .edge.providers.orchestration.connected_cluster import clear_connected_cluster_states
+    from .edge.util.arm_cache import ARM_CACHE, configure_arm_cache
+    from .edge.util.az_client import CLIENT_REGISTRY
+
+    command: str = kwargs.get("command")
+    if command and command.startswith("iot ops"):
+        # Long lived hosts run many commands in one process, none reuses reads memoized by an earlier one.
+        ARM_CACHE.clear()
+        configure_arm_cache(cli_ctx)
+        clear_connected_cluster_states()
+        # Tokens and clients may belong to an account since switched with az login or az account set.
+        CLIENT_REGISTRY.reset_credential()
+
+
 class OpsExtensionCommandsLoader(AzCommandsLoader):
     def __init__(self, cli_ctx=None):
         super(OpsExtensionCommandsLoader, self).__init__(cli_ctx=cli_ctx)
         if cli_ctx:
             cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, version_check_handler)
+            cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, arm_cache_handler)
 
     def load_command_table(self, args):
         from azext_edge.edge.command_map import load_iotops_commands
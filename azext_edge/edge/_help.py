@@ -12,7 +12,7 @@ from knack.help_files import helps
 from azext_edge.edge.providers.edge_api import SECRETSTORE_API_V1, SECRETSYNC_API_V1
 
 from .providers.edge_api import MQ_ACTIVE_API
-from .providers.support_bundle import (
+from .providers.support.common import (
     COMPAT_ARCCONTAINERSTORAGE_APIS,
     COMPAT_CLUSTER_CONFIG_APIS,
     COMPAT_DEVICEREGISTRY_APIS,
@@ -64,6 +64,10 @@ def load_iotops_help():
             Note: logs from evicted pod will not be captured, as they are inaccessible. For details
             on why a pod was evicted, please refer to the related pod and node files.
 
+            Every bundle embeds a manifest (bundle_manifest.json) recording captured resource versions
+            and container log capture times. Use --since-bundle with a previous bundle to capture only
+            the delta, which together with the previous bundle(s) forms a chain.
+
         examples:
         - name: Basic usage with default options. This form of the command will auto detect IoT Operations APIs and build a suitable bundle
                 capturing the last 24 hours of container logs. The bundle will be produced in the current working directory.
@@ -97,6 +101,18 @@ def load_iotops_help():
         - name: Include multiple services in the support bundle with multiple --ops-service flags.
           text: >
             az iot ops support create-bundle --ops-service broker --ops-service opcua --ops-service deviceregistry
+
+        - name: Process up to 8 support collection work items in parallel.
+          text: >
+            az iot ops support create-bundle --concurrency 8
+
+        - name: Capture only what changed since a previous bundle, including new container log lines.
+          text: >
+            az iot ops support create-bundle --since-bundle ./support_bundle_20240101T000000_aio.zip
+
+        - name: Sample pod and node metrics 4 times, 30 seconds apart, to capture CPU and memory usage trends.
+          text: >
+            az iot ops support create-bundle --metric-samples 4 --metric-interval 30
     """
 
     helps[
@@ -137,6 +153,10 @@ def load_iotops_help():
         - name: Use resource name to constrain results to `asset` resources with `my-asset-` name prefix
           text: >
             az iot ops check --svc deviceregistry --resources asset --resource-name 'my-asset-*'
+
+        - name: Follow `broker` health during a rollout. Checks are re-evaluated as brokers, listeners or pods change.
+          text: >
+            az iot ops check --svc broker --watch
     """
 
     helps[
@@ -164,6 +184,18 @@ def load_iotops_help():
           text: >
             az iot ops broker stats --watch
 
+        - name: Aggregate stats of the brokers of every namespace, with a row per namespace and a total row.
+          text: >
+            az iot ops broker stats --all-namespaces --watch
+
+        - name: Show the inbound message rate of the broker per frontend host.
+          text: >
+            az iot ops broker stats --metrics aio_mq_publishes_received_per_second --by hostname
+
+        - name: Watch stats with trends over the last 120 refreshes, appending every refresh to a local CSV file.
+          text: >
+            az iot ops broker stats --watch --history 120 --stats-file ./broker_stats.csv
+
         - name: Return the raw output of the metrics endpoint with minimum processing.
           text: >
             az iot ops broker stats --raw
@@ -177,6 +209,11 @@ def load_iotops_help():
         - name: Fetch traces by trace Ids provided in space-separated hex format. Only `Otel` format is shown.
           text: >
             az iot ops broker stats --trace-ids 4e84000155a98627cdac7de46f53055d
+
+        - name: Fetch error traces of a service from the last day into a zip, with an index of the bundled traces.
+          text: >
+            az iot ops broker stats --trace-dir . --trace-service aio-broker --trace-errors
+            --trace-start 2024-07-01T00:00:00Z --trace-index
     """
 
     helps[
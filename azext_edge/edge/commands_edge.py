@@ -8,7 +8,7 @@ import json
 from pathlib import PurePath
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from azure.cli.core.azclierror import ArgumentUsageError
+from azure.cli.core.azclierror import ArgumentUsageError, InvalidArgumentValueError
 from knack.log import get_logger
 
 from .providers.base import DEFAULT_NAMESPACE, load_config_context
@@ -21,7 +21,13 @@ from .providers.orchestration.common import (
     MqServiceType,
 )
 from .providers.orchestration.resources import Instances
-from .providers.support.base import get_bundle_path
+from .providers.support.base import (
+    DEFAULT_BUNDLE_CONCURRENCY,
+    DEFAULT_LOG_CAPTURE_CONCURRENCY,
+    DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS,
+    DEFAULT_METRIC_SAMPLES,
+    get_bundle_path,
+)
 
 logger = get_logger(__name__)
 
@@ -33,7 +39,21 @@ def support_bundle(
     include_mq_traces: Optional[bool] = None,
     context_name: Optional[str] = None,
     ops_services: Optional[List[str]] = None,
+    concurrency: int = DEFAULT_BUNDLE_CONCURRENCY,
+    log_concurrency: int = DEFAULT_LOG_CAPTURE_CONCURRENCY,
+    since_bundle: Optional[str] = None,
+    metric_samples: int = DEFAULT_METRIC_SAMPLES,
+    metric_interval: int = DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS,
 ) -> Union[Dict[str, Any], None]:
+    if concurrency < 1:
+        raise InvalidArgumentValueError("--concurrency must be a positive integer.")
+    if log_concurrency < 1:
+        raise InvalidArgumentValueError("--log-concurrency must be a positive integer.")
+    if metric_samples < 1:
+        raise InvalidArgumentValueError("--metric-samples must be a positive integer.")
+    if metric_interval < 0:
+        raise InvalidArgumentValueError("--metric-interval must not be negative.")
+
     load_config_context(context_name=context_name)
     from .providers.support_bundle import build_bundle
 
@@ -43,6 +63,11 @@ def support_bundle(
         bundle_path=str(bundle_path),
         log_age_seconds=log_age_seconds,
         include_mq_traces=include_mq_traces,
+        concurrency=concurrency,
+        log_concurrency=log_concurrency,
+        since_bundle=since_bundle,
+        metric_samples=metric_samples,
+        metric_interval_seconds=metric_interval,
     )
 
 
@@ -56,9 +81,10 @@ def check(
     ops_service: Optional[str] = None,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    watch: Optional[bool] = None,
 ) -> Union[Dict[str, Any], None]:
     load_config_context(context_name=context_name)
-    from .providers.checks import run_checks
+    from .providers.checks import run_checks, watch_checks
 
     aio_deployed = META_API_V1B1.is_deployed()
     # by default - run prechecks if AIO is not deployed, otherwise use argument
@@ -84,6 +110,19 @@ def check(
     if detail_level != ResourceOutputDetailLevel.summary.value and not ops_service:
         logger.warning("Detail level (--detail-level) will only affect individual service checks with '--svc'")
 
+    if watch:
+        if as_object:
+            raise ArgumentUsageError("Check watch (--watch) cannot be used with --as-object.")
+        if not run_post:
+            raise ArgumentUsageError("Check watch (--watch) is only supported for post-deployment checks.")
+        return watch_checks(
+            ops_service=ops_service,
+            detail_level=detail_level,
+            resource_name=resource_name,
+            pre_deployment=run_pre,
+            resource_kinds=resource_kinds,
+        )
+
     return run_checks(
         ops_service=ops_service,
         detail_level=detail_level,
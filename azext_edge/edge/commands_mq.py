@@ -6,9 +6,10 @@
 
 from typing import Iterable, List, Optional
 
+from azure.cli.core.azclierror import InvalidArgumentValueError
 from knack.log import get_logger
 
-from .common import METRICS_SERVICE_API_PORT, PROTOBUF_SERVICE_API_PORT
+from .common import DEFAULT_STATS_HISTORY_SIZE, METRICS_SERVICE_API_PORT, PROTOBUF_SERVICE_API_PORT
 from .providers.base import load_config_context
 from .providers.orchestration.resources import Brokers
 
@@ -26,10 +27,27 @@ def stats(
     watch: Optional[bool] = None,
     trace_ids: Optional[List[str]] = None,
     trace_dir: Optional[str] = None,
+    all_namespaces: Optional[bool] = None,
+    metric_names: Optional[List[str]] = None,
+    group_by: Optional[List[str]] = None,
+    history_size: int = DEFAULT_STATS_HISTORY_SIZE,
+    stats_file: Optional[str] = None,
+    trace_start: Optional[str] = None,
+    trace_end: Optional[str] = None,
+    trace_services: Optional[List[str]] = None,
+    trace_spans: Optional[List[str]] = None,
+    trace_min_duration: Optional[float] = None,
+    trace_errors: Optional[bool] = None,
+    trace_index: Optional[bool] = None,
 ):
+    if trace_index and not trace_dir:
+        raise InvalidArgumentValueError("--trace-index requires --trace-dir.")
+    if history_size < 2:
+        raise InvalidArgumentValueError("--history must be at least 2 scrapes.")
+
     load_config_context(context_name=context_name)
     from .providers.edge_api import MQ_ACTIVE_API
-    from .providers.stats import get_stats, get_traces
+    from .providers.stats import build_trace_query, get_stats, get_traces
 
     MQ_ACTIVE_API.is_deployed(raise_on_404=True)
     if trace_ids or trace_dir:
@@ -38,6 +56,15 @@ def stats(
             pod_protobuf_port=pod_protobuf_port,
             trace_ids=trace_ids,
             trace_dir=trace_dir,
+            trace_query=build_trace_query(
+                start_time=trace_start,
+                end_time=trace_end,
+                service_names=trace_services,
+                span_names=trace_spans,
+                min_duration_ms=trace_min_duration,
+                errors_only=trace_errors,
+            ),
+            trace_index=bool(trace_index),
         )
 
     return get_stats(
@@ -46,6 +73,11 @@ def stats(
         pod_metrics_port=pod_metrics_port,
         refresh_in_seconds=refresh_in_seconds,
         watch=watch,
+        all_namespaces=all_namespaces,
+        metric_names=metric_names,
+        group_by=group_by,
+        history_size=history_size,
+        stats_file=stats_file,
     )
 
 
@@ -264,6 +264,7 @@ class FileType(ListableEnum):
 
 
 class BundleResourceKind(Enum):
+    pod = "Pod"
     deployment = "Deployment"
     statefulset = "Statefulset"
     service = "Service"
@@ -281,6 +282,7 @@ AIO_BROKER_RESOURCE_PREFIX = "aio-broker-"
 AIO_BROKER_DIAGNOSTICS_SERVICE = "aio-broker-diagnostics-service"
 METRICS_SERVICE_API_PORT = 9600
 PROTOBUF_SERVICE_API_PORT = 9800
+DEFAULT_STATS_HISTORY_SIZE = 60
 
 # Broker constants
 DEFAULT_BROKER = "default"
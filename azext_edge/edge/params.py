@@ -158,6 +158,39 @@ def load_iotops_arguments(self, _):
             help="Include mqtt broker traces in the support bundle. "
             "Usage may add considerable size to the produced bundle.",
         )
+        context.argument(
+            "concurrency",
+            options_list=["--concurrency"],
+            help="Maximum number of support collection work items processed in parallel. "
+            "Lower values reduce load on the cluster API server.",
+            type=int,
+        )
+        context.argument(
+            "log_concurrency",
+            options_list=["--log-concurrency"],
+            help="Maximum number of container log requests in flight at once, shared across all work items.",
+            type=int,
+        )
+        context.argument(
+            "since_bundle",
+            options_list=["--since-bundle"],
+            help="Path to a previously created support bundle. Only resources that changed and container "
+            "log lines newer than the previous capture are collected. The produced bundle is chained to "
+            "the previous one via its manifest.",
+        )
+        context.argument(
+            "metric_samples",
+            options_list=["--metric-samples"],
+            help="Number of times pod and node metrics are sampled while the bundle is collected. "
+            "More than one sample records CPU and memory usage over time.",
+            type=int,
+        )
+        context.argument(
+            "metric_interval",
+            options_list=["--metric-interval"],
+            help="Seconds between pod and node metric samples. Applicable with --metric-samples.",
+            type=int,
+        )
 
     with self.argument_context("iot ops check") as context:
         context.argument(
@@ -226,6 +259,13 @@ def load_iotops_arguments(self, _):
             "Note: Only alphanumeric characters, hyphens, '?' and '*' are allowed.",
             validator=validate_resource_name,
         ),
+        context.argument(
+            "watch",
+            options_list=["--watch"],
+            help="The operation blocks and re-evaluates post-deployment checks in place as pods and "
+            "service resources change on the cluster.",
+            arg_type=get_three_state_flag(),
+        )
 
     with self.argument_context("iot ops dataflow") as context:
         context.argument(
@@ -319,6 +359,39 @@ def load_iotops_arguments(self, _):
             help="The operation blocks and dynamically updates a stats table.",
             arg_type=get_three_state_flag(),
         )
+        context.argument(
+            "all_namespaces",
+            options_list=["--all-namespaces"],
+            help="Scrape every running diagnostics service pod on the cluster and show stats per namespace "
+            "along with cluster totals. Not applicable with trace arguments.",
+            arg_type=get_three_state_flag(),
+        )
+        context.argument(
+            "metric_names",
+            nargs="+",
+            options_list=["--metrics"],
+            help="Space-separated metric names to show the series of, instead of the key performance indicators. "
+            "A histogram or summary name covers all of its series.",
+        )
+        context.argument(
+            "group_by",
+            nargs="+",
+            options_list=["--by"],
+            help="Space-separated label names the series of --metrics are summed by.",
+        )
+        context.argument(
+            "history_size",
+            type=int,
+            options_list=["--history"],
+            help="Number of past refreshes kept to show the change per second, p50, p99 and trend of each stat. "
+            "Applicable with --watch.",
+        )
+        context.argument(
+            "stats_file",
+            options_list=["--stats-file"],
+            help="Local file every refresh is appended to for later analysis. Written as CSV when the file name "
+            "ends with '.csv', otherwise as line-delimited JSON. Applicable with --watch.",
+        )
         context.argument(
             "diag_service_pod_prefix",
             options_list=["--diag-svc-pod"],
@@ -358,6 +431,58 @@ def load_iotops_arguments(self, _):
             help="Local directory where traces will be bundled and stored at.",
             arg_group="Trace",
         )
+        context.argument(
+            "trace_start",
+            options_list=["--trace-start"],
+            help="Only keep traces whose root span started at or after this ISO 8601 date time. "
+            "UTC is assumed if no offset is provided.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_end",
+            options_list=["--trace-end"],
+            help="Only keep traces whose root span started at or before this ISO 8601 date time. "
+            "UTC is assumed if no offset is provided.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_services",
+            nargs="+",
+            options_list=["--trace-service"],
+            help="Space-separated service names. Only traces whose root span belongs to one of them are kept.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_spans",
+            nargs="+",
+            options_list=["--trace-span"],
+            help="Space-separated span names. Only traces whose root span has one of them are kept.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_min_duration",
+            type=float,
+            options_list=["--trace-min-duration"],
+            help="Only keep traces whose root span lasted at least this many milliseconds.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_errors",
+            options_list=["--trace-errors"],
+            arg_type=get_three_state_flag(),
+            help="Only keep traces with a span in error status.",
+            arg_group="Trace",
+        )
+        context.argument(
+            "trace_index",
+            options_list=["--trace-index"],
+            arg_type=get_three_state_flag(),
+            help="Write an index of the bundled traces next to the trace zip, so traces can be looked up "
+            "by id, service, span, start time, duration and error status without reading the zip. "
+            "With --trace-ids, traces found in the indexes of --trace-dir are read from their zip rather "
+            "than fetched. Applicable with --trace-dir.",
+            arg_group="Trace",
+        )
 
     for cmd_space in ["iot ops init", "iot ops create"]:
         with self.argument_context(cmd_space) as context:
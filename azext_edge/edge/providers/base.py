@@ -4,10 +4,16 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+import json
+import os
+import re
 import socket
+import threading
+import time
 from contextlib import contextmanager
-from typing import Dict, Iterator, List, Optional, Union
-from urllib.request import urlopen
+from functools import partial
+from http.client import HTTPConnection, HTTPException
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from azure.cli.core.azclierror import ResourceNotFoundError
 from knack.log import get_logger
@@ -20,8 +26,9 @@ from kubernetes.client.models import (
     V1PodList,
     V1Service,
 )
+from urllib3.exceptions import HTTPError
 
-from ..common import K8sSecretType
+from ..common import BundleResourceKind, K8sSecretType
 from ..util import is_enabled_str
 
 DEFAULT_NAMESPACE: str = "azure-iot-operations"
@@ -43,33 +50,733 @@ def load_config_context(context_name: Optional[str] = None):
     _, current_config = config.list_kube_config_contexts()
     global DEFAULT_NAMESPACE
     DEFAULT_NAMESPACE = current_config.get("namespace") or "azure-iot-operations"
+    # Objects listed from a previously loaded context must not leak into this one.
+    CLUSTER_SNAPSHOT.clear()
+    context_key = None
+    if current_config.get("name"):
+        context_key = f"{current_config['name']}@{client.Configuration.get_default_copy().host}"
+    API_DISCOVERY.use_context(context_key)
+
+
+DEFAULT_SNAPSHOT_TTL_SECONDS: int = 30
+# Page size of cluster wide list calls, bounds the size of each API server response.
+DEFAULT_LIST_PAGE_LIMIT: int = 500
+SNAPSHOT_WATCH_RETRY_SECONDS: int = 5
+# Initial receive buffer of a FrameReader reusing its buffer.
+DEFAULT_FRAME_BUFFER_SIZE: int = 64 * 1024
+
+# Resource kind to (api class, namespaced list method, all namespaces list method).
+SNAPSHOT_LISTERS: Dict[str, Tuple[str, str, str]] = {
+    BundleResourceKind.pod.value: ("CoreV1Api", "list_namespaced_pod", "list_pod_for_all_namespaces"),
+    BundleResourceKind.service.value: ("CoreV1Api", "list_namespaced_service", "list_service_for_all_namespaces"),
+    BundleResourceKind.configmap.value: (
+        "CoreV1Api",
+        "list_namespaced_config_map",
+        "list_config_map_for_all_namespaces",
+    ),
+    BundleResourceKind.pvc.value: (
+        "CoreV1Api",
+        "list_namespaced_persistent_volume_claim",
+        "list_persistent_volume_claim_for_all_namespaces",
+    ),
+    BundleResourceKind.deployment.value: (
+        "AppsV1Api",
+        "list_namespaced_deployment",
+        "list_deployment_for_all_namespaces",
+    ),
+    BundleResourceKind.replicaset.value: (
+        "AppsV1Api",
+        "list_namespaced_replica_set",
+        "list_replica_set_for_all_namespaces",
+    ),
+    BundleResourceKind.statefulset.value: (
+        "AppsV1Api",
+        "list_namespaced_stateful_set",
+        "list_stateful_set_for_all_namespaces",
+    ),
+    BundleResourceKind.daemonset.value: (
+        "AppsV1Api",
+        "list_namespaced_daemon_set",
+        "list_daemon_set_for_all_namespaces",
+    ),
+    BundleResourceKind.job.value: ("BatchV1Api", "list_namespaced_job", "list_job_for_all_namespaces"),
+    BundleResourceKind.cronjob.value: ("BatchV1Api", "list_namespaced_cron_job", "list_cron_job_for_all_namespaces"),
+}
+
+
+class _SnapshotEntry:
+    def __init__(self, result: Any, watched: bool = False):
+        self.result = result
+        self.listed_at = time.monotonic()
+        # Entries kept current by a SnapshotWatch do not expire.
+        self.watched = watched
+        self.namespace_index: Dict[str, list] = {}
+        self.name_index: Dict[Tuple[str, str], Any] = {}
+        for item in self.items:
+            metadata = _get_metadata(item)
+            self.namespace_index.setdefault(metadata.get("namespace"), []).append(item)
+            self.name_index[(metadata.get("namespace"), metadata.get("name"))] = item
+
+    @property
+    def items(self) -> list:
+        if isinstance(self.result, dict):
+            return self.result.get("items") or []
+        return self.result.items or []
+
+    @property
+    def resource_version(self) -> Optional[str]:
+        if isinstance(self.result, dict):
+            return (self.result.get("metadata") or {}).get("resourceVersion")
+        return self.result.metadata.resource_version if self.result.metadata else None
+
+    def apply_event(self, event_type: str, obj: Any) -> "_SnapshotEntry":
+        metadata = _get_metadata(obj)
+        key = (metadata.get("namespace"), metadata.get("name"))
+        items = [item for item in self.items if item is not self.name_index.get(key)]
+        if event_type != "DELETED":
+            existing = self.name_index.get(key)
+            if existing is not None:
+                items.insert(self.items.index(existing), obj)
+            else:
+                items.append(obj)
+        return _SnapshotEntry(result=self._with_items(items), watched=self.watched)
+
+    def select(
+        self,
+        namespace: Optional[str] = None,
+        matchers: Optional[List[Callable[[Any], bool]]] = None,
+        prefix: Optional[str] = None,
+    ) -> Any:
+        items = self.namespace_index.get(namespace, []) if namespace else self.items
+        items = [
+            item
+            for item in items
+            if (not prefix or _get_metadata(item).get("name", "").startswith(prefix))
+            and all(matcher(item) for matcher in matchers or [])
+        ]
+        # Callers filter and annotate what they receive, hand out a fresh list object every time.
+        return self._with_items(items)
+
+    def _with_items(self, items: list) -> Any:
+        if isinstance(self.result, dict):
+            return {**self.result, "items": items}
+        return type(self.result)(
+            api_version=self.result.api_version, kind=self.result.kind, metadata=self.result.metadata, items=items
+        )
 
 
-_namespaced_service_cache: dict = {}
+class ClusterSnapshot:
+    """
+    Shared, time bound view of cluster objects.
 
+    Objects are listed once per (kind, namespace) and prefix, name, label and field filtering is
+    served locally from that listing while it is fresh. A query with a label or field selector that
+    arrives before a full listing exists is sent to the API server and remembered under its selectors.
 
-def get_namespaced_service(name: str, namespace: str, as_dict: bool = False) -> Union[V1Service, dict, None]:
-    def retrieve_namespaced_service_from_cache(key: tuple):
-        result = _namespaced_service_cache[key]
-        if as_dict:
-            return generic.sanitize_for_serialization(obj=result)
-        return result
+    Listings are fresh for ttl_seconds, or for as long as a command holds a scope, so kinds primed at
+    the start of a command are not relisted part way through it.
 
-    target_service_key = (name, namespace)
-    if target_service_key in _namespaced_service_cache:
-        return retrieve_namespaced_service_from_cache(target_service_key)
+    Listings are kept as raw dicts, as served by the API server, without kubernetes model deserialization.
+    """
 
+    def __init__(self, ttl_seconds: int = DEFAULT_SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[tuple, _SnapshotEntry] = {}
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._scopes = 0
+
+    @contextmanager
+    def scope(self) -> Iterator["ClusterSnapshot"]:
+        """
+        Keep listings fresh until the scope exits. Scopes may nest or overlap, once the last one exits
+        listings that are not watched are dropped.
+        """
+        with self._lock:
+            self._scopes += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._scopes -= 1
+                if not self._scopes:
+                    for key in [key for key, entry in self._entries.items() if not entry.watched]:
+                        del self._entries[key]
+                    self._prune_key_locks()
+
+    def list_resources(
+        self,
+        kind: str,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+        prefix: Optional[str] = None,
+        refresh: bool = False,
+    ) -> Any:
+        if not refresh:
+            full_entry = self._get_fresh_full_entry(kind=kind, namespace=namespace)
+            matchers = _build_selector_matchers(label_selector=label_selector, field_selector=field_selector)
+            if full_entry and matchers is not None:
+                return full_entry.select(namespace=namespace, matchers=matchers, prefix=prefix)
+
+        entry = self._get_entry(
+            key=(kind, namespace, label_selector, field_selector),
+            fetch=lambda: _list_resources(
+                kind=kind, namespace=namespace, label_selector=label_selector, field_selector=field_selector
+            ),
+            refresh=refresh,
+        )
+        return entry.select(prefix=prefix)
+
+    def get_resource(self, kind: str, name: str, namespace: str, refresh: bool = False) -> Any:
+        if not refresh:
+            full_entry = self._get_fresh_full_entry(kind=kind, namespace=namespace)
+            if full_entry:
+                return full_entry.name_index.get((namespace, name))
+
+        entry = self._get_entry(
+            key=(kind, namespace, None, None),
+            fetch=lambda: _list_resources(kind=kind, namespace=namespace),
+            refresh=refresh,
+        )
+        return entry.name_index.get((namespace, name))
+
+    def prime(self, kinds: List[str], namespace: Optional[str] = None):
+        """
+        List each kind once so subsequent selector queries are answered locally.
+        """
+        for kind in kinds:
+            try:
+                self._get_entry(
+                    key=(kind, namespace, None, None),
+                    fetch=lambda kind=kind: _list_resources(kind=kind, namespace=namespace),
+                )
+            except (ApiException, HTTPError) as e:
+                logger.debug(f"Unable to list {kind} for the cluster snapshot:\n{e}")
+
+    def list_custom_objects(
+        self, group: str, version: str, plural: str, namespace: Optional[str] = None, refresh: bool = False
+    ) -> dict:
+        custom_kind = (group, version, plural)
+        if not refresh and namespace:
+            full_entry = self._get_fresh_entry((custom_kind, None, None, None))
+            if full_entry:
+                return full_entry.select(namespace=namespace)
+
+        entry = self._get_entry(
+            key=(custom_kind, namespace, None, None),
+            fetch=lambda: _list_custom_objects(group=group, version=version, plural=plural, namespace=namespace),
+            refresh=refresh,
+        )
+        return entry.select()
+
+    def list_for_watch(self, kind: Union[str, tuple]) -> Optional[str]:
+        """
+        List kind cluster wide and keep that listing until unwatch. Returns the listing resourceVersion.
+
+        Custom object kinds are (group, version, plural) tuples.
+        """
+        if isinstance(kind, tuple):
+            group, version, plural = kind
+            fetch = partial(_list_custom_objects, group=group, version=version, plural=plural)
+        else:
+            fetch = partial(_list_resources, kind=kind)
+
+        # Narrower listings would shadow the watched one.
+        self.invalidate(kind=kind)
+        entry = self._get_entry(key=(kind, None, None, None), fetch=fetch, refresh=True)
+        entry.watched = True
+        return entry.resource_version
+
+    def apply_event(self, kind: Union[str, tuple], event_type: str, obj: Any):
+        full_key = (kind, None, None, None)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == kind and key != full_key:
+                    del self._entries[key]
+            entry = self._entries.get(full_key)
+            if entry:
+                self._entries[full_key] = entry.apply_event(event_type=event_type, obj=obj)
+            self._prune_key_locks()
+
+    def unwatch(self, kind: Union[str, tuple]):
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key[0] == kind:
+                    entry.watched = False
+
+    def invalidate(self, kind: Union[str, tuple], namespace: Optional[str] = None):
+        """
+        Drop cached listings of kind. With a namespace, cluster wide listings of kind are dropped as well.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == kind and (not namespace or key[1] in (None, namespace)):
+                    del self._entries[key]
+            self._prune_key_locks()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._prune_key_locks()
+
+    def _get_fresh_full_entry(self, kind: str, namespace: Optional[str]) -> Optional[_SnapshotEntry]:
+        full_entry = self._get_fresh_entry((kind, namespace, None, None))
+        if not full_entry and namespace:
+            full_entry = self._get_fresh_entry((kind, None, None, None))
+        return full_entry
+
+    def _get_fresh_entry(self, key: tuple) -> Optional[_SnapshotEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and (entry.watched or self._scopes or time.monotonic() - entry.listed_at < self.ttl_seconds):
+            return entry
+
+    def _get_entry(self, key: tuple, fetch: Callable[[], Any], refresh: bool = False) -> _SnapshotEntry:
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            # Concurrent callers of the same key wait for a single list call.
+            with key_lock:
+                entry = None if refresh else self._get_fresh_entry(key)
+                if not entry:
+                    entry = _SnapshotEntry(fetch())
+                    with self._lock:
+                        self._entries[key] = entry
+                return entry
+        finally:
+            # A failed list call leaves no entry behind, nor its lock.
+            with self._lock:
+                if key not in self._entries and self._key_locks.get(key) is key_lock and not key_lock.locked():
+                    del self._key_locks[key]
+
+    def _prune_key_locks(self):
+        """
+        Drop the locks of keys without an entry, called with self._lock held. A lock dropped just before
+        its caller acquires it costs at most one extra list call.
+        """
+        for key in [key for key, lock in self._key_locks.items() if key not in self._entries and not lock.locked()]:
+            del self._key_locks[key]
+
+
+CLUSTER_SNAPSHOT = ClusterSnapshot()
+
+DEFAULT_API_DISCOVERY_TTL_SECONDS: int = 300
+DEFAULT_API_DISCOVERY_CONCURRENCY: int = 8
+API_DISCOVERY_FILE_NAME: str = "iotops_api_discovery.json"
+
+
+class ApiDiscovery:
+    """
+    Served API group versions of the cluster and their resources.
+
+    Served group versions come from one aggregated /apis call, resources of the group versions
+    in use are fetched on demand or in parallel via discover. The index is persisted in the
+    Azure CLI config dir keyed by kube context, so commands within ttl_seconds skip discovery.
+    A group version missing from a persisted index is rediscovered once before reporting 404.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_API_DISCOVERY_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._context_key: Optional[str] = None
+        self._served: Optional[Set[str]] = None
+        self._resources: Dict[str, V1APIResourceList] = {}
+        self._discovered_at: float = 0
+        self._verified = False
+        self._lock = threading.RLock()
+
+    def use_context(self, context_key: Optional[str]):
+        with self._lock:
+            self.clear()
+            self._context_key = context_key
+            self._load()
+
+    def clear(self):
+        with self._lock:
+            self._context_key = None
+            self._served = None
+            self._resources = {}
+            self._discovered_at = 0
+            self._verified = False
+
+    def get_api_resources(self, group: str, version: str) -> V1APIResourceList:
+        group_version = f"{group}/{version}"
+        served = self._get_served()
+        if group_version not in served and not self._verified:
+            served = self._get_served(refresh=True)
+        if group_version not in served:
+            raise ApiException(status=404, reason="Not Found")
+
+        with self._lock:
+            resources = self._resources.get(group_version)
+        if not resources:
+            resources = client.CustomObjectsApi().get_api_resources(group=group, version=version)
+            with self._lock:
+                self._resources[group_version] = resources
+            self._persist()
+        return resources
+
+    def discover(self, group_versions: Iterable[Tuple[str, str]]):
+        """
+        Fetch resources of the served group versions not yet indexed, in parallel and persisted at once.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        served = self._get_served()
+        if not self._verified and any(f"{g}/{v}" not in served for g, v in group_versions):
+            served = self._get_served(refresh=True)
+        with self._lock:
+            pending = {
+                (group, version)
+                for group, version in group_versions
+                if f"{group}/{version}" in served and f"{group}/{version}" not in self._resources
+            }
+        if not pending:
+            return
+
+        def _fetch(group_version: Tuple[str, str]) -> Tuple[str, V1APIResourceList]:
+            group, version = group_version
+            return (
+                f"{group}/{version}",
+                client.CustomObjectsApi().get_api_resources(group=group, version=version),
+            )
+
+        with ThreadPoolExecutor(max_workers=min(len(pending), DEFAULT_API_DISCOVERY_CONCURRENCY)) as executor:
+            fetched = dict(executor.map(_fetch, pending))
+        with self._lock:
+            self._resources.update(fetched)
+        self._persist()
+
+    def _get_served(self, refresh: bool = False) -> Set[str]:
+        with self._lock:
+            if refresh or self._served is None or not self._is_fresh(self._discovered_at):
+                api_groups = client.ApisApi().get_api_versions()
+                served = set()
+                for api_group in api_groups.groups or []:
+                    for group_version in api_group.versions or []:
+                        served.add(group_version.group_version)
+                self._served = served
+                self._resources = {k: v for k, v in self._resources.items() if k in served}
+                self._discovered_at = time.time()
+                self._verified = True
+                self._persist()
+            return self._served
+
+    def _is_fresh(self, discovered_at: float) -> bool:
+        return time.time() - discovered_at < self.ttl_seconds
+
+    def _get_file_path(self) -> str:
+        from azure.cli.core._environment import get_config_dir
+
+        return os.path.join(get_config_dir(), API_DISCOVERY_FILE_NAME)
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self._get_file_path(), "r", encoding="utf-8") as f:
+                content = json.load(f)
+            return content if isinstance(content, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug("Unable to read API discovery cache: %s", e)
+            return {}
+
+    def _load(self):
+        if not self._context_key:
+            return
+        indexed = self._read_file().get(self._context_key)
+        try:
+            if not indexed or not self._is_fresh(indexed["discoveredAt"]):
+                return
+            self._served = set(indexed["groupVersions"])
+            self._resources = {
+                group_version: generic.deserialize(_JsonResponse(resources), "V1APIResourceList")
+                for group_version, resources in indexed["resources"].items()
+            }
+            self._discovered_at = indexed["discoveredAt"]
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug("Ignoring API discovery cache of %s: %s", self._context_key, e)
+            self._served = None
+            self._resources = {}
+
+    def _persist(self):
+        with self._lock:
+            if not self._context_key or self._served is None:
+                return
+            indexed = {
+                "discoveredAt": self._discovered_at,
+                "groupVersions": sorted(self._served),
+                "resources": {k: generic.sanitize_for_serialization(v) for k, v in self._resources.items()},
+            }
+            content = {k: v for k, v in self._read_file().items() if self._is_fresh(v.get("discoveredAt", 0))}
+            content[self._context_key] = indexed
+            file_path = self._get_file_path()
+            try:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                # Written aside and swapped in, concurrent commands may read the file meanwhile.
+                temp_path = f"{file_path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(content, f)
+                os.replace(temp_path, file_path)
+            except OSError as e:
+                logger.debug("Unable to write API discovery cache: %s", e)
+
+
+class _JsonResponse:
+    """
+    Minimal response shape for ApiClient.deserialize.
+    """
+
+    def __init__(self, data: Any):
+        self.data = json.dumps(data)
+
+
+API_DISCOVERY = ApiDiscovery()
+
+
+def to_model(data: Any, model_type: str) -> Any:
+    """
+    Deserialize a raw dict, i.e. of the cluster snapshot, into the kubernetes model_type.
+    """
+    return generic.deserialize(_JsonResponse(data), model_type)
+
+
+class SnapshotWatch:
+    """
+    Keeps the cluster wide snapshot listing of a kind current from a Kubernetes watch stream.
+
+    on_change is called with the kind from the watch thread after every applied event.
+    """
+
+    def __init__(
+        self,
+        kind: Union[str, tuple],
+        on_change: Optional[Callable[[Union[str, tuple]], None]] = None,
+        snapshot: ClusterSnapshot = CLUSTER_SNAPSHOT,
+    ):
+        self.kind = kind
+        self.on_change = on_change
+        self.snapshot = snapshot
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._resource_version: Optional[str] = None
+
+    def start(self) -> "SnapshotWatch":
+        # List synchronously so the snapshot is complete once start returns.
+        self._resource_version = self.snapshot.list_for_watch(kind=self.kind)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._watch:
+            self._watch.stop()
+        self.snapshot.unwatch(kind=self.kind)
+
+    def _run(self):
+        from kubernetes.watch import Watch
+
+        while not self._stopped.is_set():
+            try:
+                if not self._resource_version:
+                    # The previous stream expired, objects may have changed in between.
+                    self._resource_version = self.snapshot.list_for_watch(kind=self.kind)
+                    self._notify()
+                self._watch = Watch()
+                list_func, list_args = self._get_list_func()
+                for event in self._watch.stream(list_func, *list_args, resource_version=self._resource_version):
+                    if self._stopped.is_set():
+                        return
+                    # Snapshot listings are raw dicts, apply the raw event object as well.
+                    self.snapshot.apply_event(kind=self.kind, event_type=event["type"], obj=event["raw_object"])
+                    self._notify()
+                self._resource_version = self._watch.resource_version
+            except (ApiException, HTTPError) as e:
+                logger.debug(f"Watch of {self.kind} interrupted, relisting:\n{e}")
+                self._resource_version = None
+                self._stopped.wait(SNAPSHOT_WATCH_RETRY_SECONDS)
+
+    def _get_list_func(self) -> Tuple[Callable, tuple]:
+        if isinstance(self.kind, tuple):
+            return client.CustomObjectsApi().list_cluster_custom_object, self.kind
+        api_name, _, all_namespaces_method = SNAPSHOT_LISTERS[self.kind]
+        return getattr(getattr(client, api_name)(), all_namespaces_method), ()
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change(self.kind)
+
+
+def _list_resources(
+    kind: str,
+    namespace: Optional[str] = None,
+    label_selector: Optional[str] = None,
+    field_selector: Optional[str] = None,
+) -> dict:
+    api_name, namespaced_method, all_namespaces_method = SNAPSHOT_LISTERS[kind]
+    api = getattr(client, api_name)()
+    if namespace:
+        return _list_all_pages(
+            getattr(api, namespaced_method),
+            namespace=namespace,
+            label_selector=label_selector,
+            field_selector=field_selector,
+        )
+    return _list_all_pages(
+        getattr(api, all_namespaces_method), label_selector=label_selector, field_selector=field_selector
+    )
+
+
+def _list_all_pages(list_func: Callable[..., Any], **kwargs) -> dict:
+    """
+    Follow the continue tokens of a list call, merging the raw items of all pages into the first page.
+    """
+    pages = list_pages(list_func, **kwargs)
+    result = next(pages)
+    items: list = result.get("items") or []
+    for page in pages:
+        items.extend(page.get("items") or [])
+    result["items"] = items
+    return result
+
+
+def list_pages(list_func: Callable[..., Any], limit: int = DEFAULT_LIST_PAGE_LIMIT, **kwargs) -> Iterator[dict]:
+    """
+    Yield the pages of a list call as raw JSON, following continue tokens.
+
+    Responses are not deserialized into models (_preload_content=False), items are dicts
+    as served by the API server. The continue token is removed from the yielded page metadata.
+    """
+    continue_token = None
+    while True:
+        page_kwargs = {"_continue": continue_token} if continue_token else {}
+        response = list_func(limit=limit, _preload_content=False, **page_kwargs, **kwargs)
+        page: dict = json.loads(response.data)
+        next_token = (page.get("metadata") or {}).pop("continue", None)
+        yield page
+        if not next_token or next_token == continue_token:
+            return
+        continue_token = next_token
+
+
+def list_custom_object_pages(
+    group: str, version: str, plural: str, limit: int = DEFAULT_LIST_PAGE_LIMIT
+) -> Iterator[dict]:
+    return list_pages(
+        client.CustomObjectsApi().list_cluster_custom_object, limit=limit, group=group, version=version, plural=plural
+    )
+
+
+def _list_custom_objects(group: str, version: str, plural: str, namespace: Optional[str] = None) -> dict:
+    custom_client = client.CustomObjectsApi()
+    kwargs = {"group": group, "version": version, "plural": plural}
+    if namespace:
+        return custom_client.list_namespaced_custom_object(namespace=namespace, **kwargs)
+    return custom_client.list_cluster_custom_object(**kwargs)
+
+
+def _get_metadata(item: Any) -> dict:
+    if isinstance(item, dict):
+        return item.get("metadata") or {}
+    metadata: V1ObjectMeta = item.metadata
+    return {"name": metadata.name, "namespace": metadata.namespace, "labels": metadata.labels}
+
+
+def _build_selector_matchers(
+    label_selector: Optional[str] = None, field_selector: Optional[str] = None
+) -> Optional[List[Callable[[Any], bool]]]:
+    """
+    Matchers evaluating the selectors locally, None if a selector cannot be evaluated locally.
+    """
+    matchers = []
+    for requirement in _split_selector(label_selector):
+        matcher = _build_label_matcher(requirement)
+        if not matcher:
+            return None
+        matchers.append(matcher)
+
+    for requirement in _split_selector(field_selector):
+        matcher = _build_field_matcher(requirement)
+        if not matcher:
+            return None
+        matchers.append(matcher)
+
+    return matchers
+
+
+def _split_selector(selector: Optional[str]) -> List[str]:
+    requirements = []
+    if not selector:
+        return requirements
+
+    depth = 0
+    current = ""
+    for char in selector:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            requirements.append(current.strip())
+            current = ""
+            continue
+        current += char
+    requirements.append(current.strip())
+    return [requirement for requirement in requirements if requirement]
+
+
+def _build_label_matcher(requirement: str) -> Optional[Callable[[Any], bool]]:
+    def get_labels(item: Any) -> dict:
+        return _get_metadata(item).get("labels") or {}
+
+    set_match = re.fullmatch(r"([\w./-]+)\s+(in|notin)\s+\((.*)\)", requirement)
+    if set_match:
+        key, operator, values = set_match.groups()
+        values = {value.strip() for value in values.split(",")}
+        if operator == "in":
+            return lambda item: get_labels(item).get(key) in values
+        return lambda item: get_labels(item).get(key) not in values
+
+    equality_match = re.fullmatch(r"([\w./-]+)\s*(==|!=|=)\s*([\w.-]*)", requirement)
+    if equality_match:
+        key, operator, value = equality_match.groups()
+        if operator == "!=":
+            return lambda item: get_labels(item).get(key) != value
+        return lambda item: get_labels(item).get(key) == value
+
+    exists_match = re.fullmatch(r"(!?)\s*([\w./-]+)", requirement)
+    if exists_match:
+        negate, key = exists_match.groups()
+        if negate:
+            return lambda item: key not in get_labels(item)
+        return lambda item: key in get_labels(item)
+
+
+def _build_field_matcher(requirement: str) -> Optional[Callable[[Any], bool]]:
+    # Only metadata fields are guaranteed to resolve identically locally and on the server.
+    field_match = re.fullmatch(r"metadata\.(name|namespace)\s*(==|!=|=)\s*([\w.-]*)", requirement)
+    if not field_match:
+        return None
+
+    field, operator, value = field_match.groups()
+    if operator == "!=":
+        return lambda item: _get_metadata(item).get(field) != value
+    return lambda item: _get_metadata(item).get(field) == value
+
+
+def get_namespaced_service(name: str, namespace: str, as_dict: bool = False) -> Union[V1Service, dict, None]:
     try:
-        v1 = client.CoreV1Api()
-        v1_service: V1Service = v1.read_namespaced_service(name=name, namespace=namespace)
-        _namespaced_service_cache[target_service_key] = v1_service
+        service: dict = CLUSTER_SNAPSHOT.get_resource(
+            kind=BundleResourceKind.service.value, name=name, namespace=namespace
+        )
     except ApiException as ae:
         logger.debug(str(ae))
     else:
-        return retrieve_namespaced_service_from_cache(target_service_key)
-
-
-_namespaced_pods_cache: dict = {}
+        if as_dict or not service:
+            return service
+        return to_model(service, "V1Service")
 
 
 def get_namespaced_pods_by_prefix(
@@ -78,136 +785,203 @@ def get_namespaced_pods_by_prefix(
     label_selector: Optional[str] = None,
     as_dict: bool = False,
 ) -> Union[List[V1Pod], List[dict], None]:
-    def filter_pods_by_prefix(pods: List[V1Pod], prefix: str) -> List[V1Pod]:
-        return [pod for pod in pods if pod.metadata.name.startswith(prefix)]
-
-    def filter_pods_from_cache(key: tuple):
-        cached_pods = _namespaced_pods_cache[key]
-        result = filter_pods_by_prefix(pods=cached_pods, prefix=prefix)
-        if as_dict:
-            return generic.sanitize_for_serialization(obj=result)
-        return result
-
-    target_pods_key = (namespace, label_selector)
-    if target_pods_key in _namespaced_pods_cache:
-        return filter_pods_from_cache(target_pods_key)
+    """
+    Pods as raw dicts with as_dict, shared with the cluster snapshot and not to be mutated.
+    Otherwise pods are deserialized into V1Pod models.
+    """
     try:
-        v1 = client.CoreV1Api()
-        if namespace:
-            pods_list: V1PodList = v1.list_namespaced_pod(namespace, label_selector=label_selector)
-        else:
-            pods_list: V1PodList = v1.list_pod_for_all_namespaces(label_selector=label_selector)
-        _namespaced_pods_cache[target_pods_key] = pods_list.items
+        pods_list: dict = CLUSTER_SNAPSHOT.list_resources(
+            kind=BundleResourceKind.pod.value, namespace=namespace, label_selector=label_selector, prefix=prefix
+        )
     except ApiException as ae:
         logger.debug(str(ae))
     else:
-        return filter_pods_from_cache(target_pods_key)
-
-
-_custom_object_cache: dict = {}
+        if as_dict:
+            return pods_list["items"]
+        pod_list_model: V1PodList = to_model(pods_list, "V1PodList")
+        return pod_list_model.items or []
 
 
 def get_custom_objects(
     group: str, version: str, plural: str, namespace: Optional[str] = None, use_cache: bool = True
 ) -> Union[dict, None]:
-    target_resource_key = (group, version, plural, namespace)
-    if use_cache:
-        if target_resource_key in _custom_object_cache:
-            return _custom_object_cache[target_resource_key]
-
     try:
-        custom_client = client.CustomObjectsApi()
-        kwargs = {"group": group, "version": version, "plural": plural}
-        if namespace:
-            kwargs["namespace"] = namespace
-            f = custom_client.list_namespaced_custom_object
-        else:
-            f = custom_client.list_cluster_custom_object
-        _custom_object_cache[target_resource_key] = f(**kwargs)
+        return CLUSTER_SNAPSHOT.list_custom_objects(
+            group=group, version=version, plural=plural, namespace=namespace, refresh=not use_cache
+        )
     except ApiException as ae:
         logger.debug(str(ae))
-    else:
-        return _custom_object_cache[target_resource_key]
 
 
-_cluster_resource_api_cache: dict = {}
+def discover_cluster_apis(group_versions: Iterable[Tuple[str, str]]):
+    """
+    Index the resources of group_versions in one batch ahead of get_cluster_custom_api calls.
+    """
+    try:
+        API_DISCOVERY.discover(group_versions=list(group_versions))
+    except (ApiException, HTTPError) as e:
+        logger.debug(msg=str(e))
 
 
 def get_cluster_custom_api(group: str, version: str, raise_on_404: bool = False) -> Union[V1APIResourceList, None]:
-    target_resource_api_key = (group, version)
-    if target_resource_api_key in _cluster_resource_api_cache:
-        return _cluster_resource_api_cache[target_resource_api_key]
-
     try:
-        custom_client = client.CustomObjectsApi()
-        _cluster_resource_api_cache[target_resource_api_key] = custom_client.get_api_resources(
-            group=group, version=version
-        )
+        return API_DISCOVERY.get_api_resources(group=group, version=version)
     except ApiException as ae:
         logger.debug(msg=str(ae))
         if int(ae.status) == 404 and raise_on_404:
             raise ResourceNotFoundError(f"{group}/{version} resource API is not detected on the cluster.")
-    else:
-        return _cluster_resource_api_cache[target_resource_api_key]
 
 
-class PodRequest:
-    def __init__(self, namespace: str, pod_name: str, pod_port: str):
-        self.namespace = namespace
-        self.pod_name = pod_name
-        self.pod_port = pod_port
+class _PortforwardHTTPConnection(HTTPConnection):
+    """
+    HTTP connection whose transport is a pod port stream of a PortforwardSession.
+    """
 
-    def get(self, resource_path: str):
-        with urlopen(self._build_url(resource_path=resource_path)) as response:
-            return response.read().decode("utf-8")
+    def __init__(self, session: "PortforwardSession", port: int, timeout: float):
+        super().__init__(host=f"{session.pod_name}.{session.namespace}", port=port, timeout=timeout)
+        self._session = session
 
-    def _build_url(self, resource_path: str):
-        return f"http://{self.pod_name}.{self.namespace}.kubernetes:{self.pod_port}{resource_path}"
+    def connect(self):
+        self.sock = self._session.socket(self.port)
+        self.sock.settimeout(self.timeout)
 
 
-@contextmanager
-def portforward_http(namespace: str, pod_name: str, pod_port: str, **kwargs) -> Iterator[PodRequest]:
-    from kubernetes.stream import portforward
-
-    api = client.CoreV1Api()
-
-    def kubernetes_create_connection(address, *args, **kwargs):
-        dns_name = address[0]
-        if isinstance(dns_name, bytes):
-            dns_name = dns_name.decode()
-        dns_name = dns_name.split(".")
-        if len(dns_name) != 3 or dns_name[2] != "kubernetes":
-            return socket_create_connection(address, *args, **kwargs)
-        pf = portforward(
-            api.connect_get_namespaced_pod_portforward,
-            dns_name[0],
-            dns_name[1],
-            ports=str(address[1]),
+class PortforwardSession:
+    """
+    Kubernetes portforward websocket to a pod, shared by HTTP requests and raw sockets.
+
+    The websocket forwards all ports of the session and each port carries a single stream.
+    HTTP requests against a port reuse one keep-alive connection, serialized per port. Once a
+    port stream is taken or the pod closes it, the next use opens a new websocket. No global
+    socket state is patched, sessions against different pods can be used concurrently.
+    """
+
+    def __init__(self, namespace: str, pod_name: str, ports: Iterable[Union[int, str]]):
+        self.namespace = namespace
+        self.pod_name = pod_name
+        self.ports: Tuple[int, ...] = tuple(sorted({int(port) for port in ports}))
+        self._portforward = None
+        self._taken: Set[int] = set()
+        self._connections: Dict[int, _PortforwardHTTPConnection] = {}
+        self._port_locks: Dict[int, threading.Lock] = {port: threading.Lock() for port in self.ports}
+        self._lock = threading.RLock()
+
+    def socket(self, port: Union[int, str]) -> socket.socket:
+        """
+        Takes the stream of a pod port, the caller owns closing it.
+        """
+        port = int(port)
+        if port not in self.ports:
+            raise ValueError(f"Port {port} is not forwarded by this session.")
+        with self._lock:
+            if self._portforward is None or not self._portforward.connected or port in self._taken:
+                self._open()
+            self._taken.add(port)
+            return self._portforward.socket(port)._socket
+
+    def get(self, resource_path: str, port: Optional[Union[int, str]] = None, timeout: float = 30.0) -> str:
+        from urllib.error import HTTPError as UrlHTTPError
+
+        port = int(port or self.ports[0])
+        with self._port_locks[port]:
+            # A kept-alive stream may have been closed by the pod since its last use, retry once on a new one.
+            for attempt in range(2):
+                connection = self._get_connection(port=port, timeout=timeout)
+                try:
+                    connection.request("GET", resource_path)
+                    response = connection.getresponse()
+                    body = response.read()
+                    break
+                except (OSError, HTTPException):
+                    self._close_connection(port)
+                    if attempt:
+                        raise
+            if response.will_close:
+                self._close_connection(port)
+        if response.status >= 400:
+            raise UrlHTTPError(
+                url=f"http://{connection.host}:{port}{resource_path}",
+                code=response.status,
+                msg=response.reason,
+                hdrs=response.headers,
+                fp=None,
+            )
+        return body.decode("utf-8")
+
+    def close(self):
+        with self._lock:
+            for port in list(self._connections):
+                self._close_connection(port)
+            self._release_untaken()
+            self._portforward = None
+            self._taken = set()
+
+    def _open(self):
+        from kubernetes.stream import portforward
+
+        self._release_untaken()
+        self._portforward = portforward(
+            client.CoreV1Api().connect_get_namespaced_pod_portforward,
+            self.pod_name,
+            self.namespace,
+            ports=",".join(str(port) for port in self.ports),
         )
-        return pf.socket(address[1])
+        self._taken = set()
+
+    def _release_untaken(self):
+        # The websocket is closed by its proxy thread once every port stream is closed.
+        if self._portforward is not None:
+            for port in set(self.ports) - self._taken:
+                self._portforward.socket(port).close()
+
+    def _get_connection(self, port: int, timeout: float) -> _PortforwardHTTPConnection:
+        with self._lock:
+            connection = self._connections.get(port)
+            if connection is None:
+                connection = self._connections[port] = _PortforwardHTTPConnection(
+                    session=self, port=port, timeout=timeout
+                )
+            return connection
 
-    socket_create_connection = socket.create_connection
+    def _close_connection(self, port: int):
+        with self._lock:
+            connection = self._connections.pop(port, None)
+        if connection:
+            connection.close()
+
+
+@contextmanager
+def portforward_session(
+    namespace: str, pod_name: str, ports: Iterable[Union[int, str]]
+) -> Iterator[PortforwardSession]:
+    session = PortforwardSession(namespace=namespace, pod_name=pod_name, ports=ports)
     try:
-        socket.create_connection = kubernetes_create_connection
-        pod_request = PodRequest(namespace=namespace, pod_name=pod_name, pod_port=pod_port)
-        yield pod_request
+        yield session
     finally:
-        socket.create_connection = socket_create_connection
+        session.close()
+
+
+@contextmanager
+def portforward_http(namespace: str, pod_name: str, pod_port: str, **kwargs) -> Iterator[PortforwardSession]:
+    with portforward_session(namespace=namespace, pod_name=pod_name, ports=[pod_port]) as session:
+        yield session
 
 
 @contextmanager
-def portforward_socket(namespace: str, pod_name: str, pod_port: str) -> Iterator[socket.socket]:
-    from kubernetes.stream import portforward
+def portforward_socket(
+    namespace: str, pod_name: str, pod_port: str, session: Optional[PortforwardSession] = None
+) -> Iterator[socket.socket]:
     from .edge_api import MqResourceKinds, MQ_ACTIVE_API
 
-    api = client.CoreV1Api()
-    pf = portforward(
-        api.connect_get_namespaced_pod_portforward,
-        pod_name,
-        namespace,
-        ports=str(pod_port),
-    )
-    target_socket: socket.socket = pf.socket(int(pod_port))._socket
+    if session is None:
+        with portforward_session(namespace=namespace, pod_name=pod_name, ports=[pod_port]) as session:
+            with portforward_socket(
+                namespace=namespace, pod_name=pod_name, pod_port=pod_port, session=session
+            ) as target_socket:
+                yield target_socket
+        return
+
+    target_socket: socket.socket = session.socket(pod_port)
 
     internal_tls = False
     namespaced_brokers: dict = MQ_ACTIVE_API.get_resources(MqResourceKinds.BROKER, namespace=namespace)
@@ -230,9 +1004,65 @@ def portforward_socket(namespace: str, pod_name: str, pod_port: str) -> Iterator
         target_socket = context.wrap_socket(sock=target_socket)
 
     target_socket.settimeout(10.0)
-    yield target_socket
-    target_socket.shutdown(socket.SHUT_RDWR)
-    target_socket.close()
+    try:
+        yield target_socket
+    finally:
+        try:
+            target_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        target_socket.close()
+
+
+class FrameReader:
+    """
+    Reads length-prefixed frames, a 4 byte big-endian size followed by the payload, from a socket.
+
+    Payloads are received with recv_into straight into their buffer, without intermediate bytes
+    objects, and handed out as memoryviews. With reuse_buffer one buffer, grown as needed, serves
+    all frames and a view is only valid until the next read. Plain and TLS sockets are supported.
+    """
+
+    def __init__(self, sock: socket.socket, reuse_buffer: bool = True, buffer_size: int = DEFAULT_FRAME_BUFFER_SIZE):
+        self.sock = sock
+        self.reuse_buffer = reuse_buffer
+        self._buffer = bytearray(buffer_size if reuse_buffer else 0)
+        self._header = memoryview(bytearray(4))
+
+    def read_frame(self) -> Optional[memoryview]:
+        """
+        Payload of the next frame, None if the socket was closed before a whole frame was read.
+        """
+        if not self._recv_into(self._header):
+            return None
+        size = int.from_bytes(self._header, byteorder="big")
+        if not self.reuse_buffer:
+            buffer = bytearray(size)
+        else:
+            if size > len(self._buffer):
+                self._buffer = bytearray(max(size, len(self._buffer) * 2))
+            buffer = self._buffer
+        view = memoryview(buffer)[:size]
+        if not self._recv_into(view):
+            return None
+        return view
+
+    def __iter__(self) -> Iterator[memoryview]:
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def _recv_into(self, view: memoryview) -> bool:
+        size = len(view)
+        received = 0
+        while received < size:
+            count = self.sock.recv_into(view[received:], size - received)
+            if not count:
+                return False
+            received += count
+        return True
 
 
 def create_namespaced_secret(
@@ -343,6 +1173,8 @@ def create_namespaced_custom_objects(
         raise RuntimeError(error_msg)
     else:
         return result
+    finally:
+        CLUSTER_SNAPSHOT.invalidate(kind=(group, version, plural), namespace=namespace)
 
 
 def delete_namespaced_custom_object(
@@ -357,6 +1189,7 @@ def delete_namespaced_custom_object(
             plural=plural,
             name=name,
         )
+        CLUSTER_SNAPSHOT.invalidate(kind=(group, version, plural), namespace=namespace)
     except ApiException as ae:
         error_msg = str(ae)
         logger.debug(msg=error_msg)
@@ -377,6 +1210,7 @@ def create_namespaced_configmap(
         result = v1_api.create_namespaced_config_map(
             namespace=namespace, body=client.V1ConfigMap(data=data, metadata=V1ObjectMeta(name=cm_name))
         )
+        CLUSTER_SNAPSHOT.invalidate(kind=BundleResourceKind.configmap.value, namespace=namespace)
     except ApiException as ae:
         error_msg = str(ae)
         logger.debug(msg=error_msg)
@@ -390,6 +1224,7 @@ def delete_namespaced_configmap(namespace: str, cm_name: str, raise_on_404: bool
     try:
         v1_api = client.CoreV1Api()
         v1_api.delete_namespaced_config_map(namespace=namespace, name=cm_name)
+        CLUSTER_SNAPSHOT.invalidate(kind=BundleResourceKind.configmap.value, namespace=namespace)
     except ApiException as ae:
         error_msg = str(ae)
         logger.debug(msg=error_msg)
@@ -21,6 +21,7 @@ from .base import (
 
 from .common import (
     AKRI_PREFIX,
+    DEFAULT_CHECK_CONCURRENCY,
     PADDING_SIZE,
     CoreServiceResourceKinds,
     ResourceOutputDetailLevel,
@@ -32,6 +33,7 @@ def check_akri_deployment(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     evaluate_funcs = {
         CoreServiceResourceKinds.RUNTIME_RESOURCE: evaluate_core_service_runtime,
@@ -43,6 +45,7 @@ def check_akri_deployment(
         detail_level=detail_level,
         resource_kinds=resource_kinds,
         resource_name=resource_name,
+        concurrency=concurrency,
     )
 
 
@@ -58,6 +61,7 @@ def evaluate_core_service_runtime(
         prefix=AKRI_PREFIX,
         namespace="",
         label_selector=AKRI_NAME_LABEL_V2,
+        as_dict=True,
     )
 
     if resource_name:
@@ -14,10 +14,13 @@ from .resource import (
     filter_resources_by_name,
     filter_resources_by_namespace,
     generate_target_resource_name,
+    get_resource_index,
     get_resources_by_name,
     get_resources_grouped_by_namespace,
     get_resource_metadata_property,
     process_dict_resource,
+    ResourceIndex,
+    ResourceIndexes,
     process_list_resource,
     process_resource_properties,
     validate_one_of_conditions,
@@ -36,12 +39,15 @@ __all__ = [
     "filter_resources_by_name",
     "filter_resources_by_namespace",
     "generate_target_resource_name",
+    "get_resource_index",
     "get_resources_by_name",
     "get_resources_grouped_by_namespace",
     "get_resource_metadata_property",
     "process_dict_resource",
     "process_list_resource",
     "process_resource_properties",
+    "ResourceIndex",
+    "ResourceIndexes",
     "validate_one_of_conditions",
     "process_custom_resource_status",
 ]
@@ -14,11 +14,13 @@ from rich.padding import Padding
 from ....common import CheckTaskStatus, ListableEnum
 from ....providers.edge_api import EdgeResourceApi
 from ...base import client
-from ..common import CoreServiceResourceKinds, ResourceOutputDetailLevel
+from ...command_context import ContextThreadPoolExecutor
+from ..common import DEFAULT_CHECK_CONCURRENCY, CoreServiceResourceKinds, ResourceOutputDetailLevel
 from .check_manager import CheckManager
 from .node import check_nodes
 from .resource import enumerate_ops_service_resources
 from .user_strings import UNABLE_TO_DETERMINE_VERSION_MSG
+from .watch import evaluate_with_watch
 
 logger = get_logger(__name__)
 # TODO: unit test
@@ -52,12 +54,18 @@ def check_post_deployment(
     resource_kinds: Optional[List[str]] = None,
     resource_name: str = None,
     excluded_resources: Optional[List[str]] = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     results = []
+    evaluations: List[Callable[[], dict]] = []
 
     if api_info:
-        resource_enumeration, api_resources = enumerate_ops_service_resources(
-            api_info, check_name, check_desc, as_list, excluded_resources
+        # API resources are discovered once per watch, they are not expected to change during a rollout.
+        resource_enumeration, api_resources = evaluate_with_watch(
+            key=(enumerate_ops_service_resources, api_info.as_str(), check_name, as_list),
+            evaluate_func=partial(
+                enumerate_ops_service_resources, api_info, check_name, check_desc, as_list, excluded_resources
+            ),
         )
         results = [resource_enumeration]
         lowercase_api_resources = {k.lower(): v for k, v in api_resources.items()}
@@ -77,7 +85,24 @@ def check_post_deployment(
             append_resource = True
 
         if append_resource:
-            results.append(evaluate_func(detail_level=detail_level, as_list=as_list, resource_name=resource_name))
+            evaluations.append(
+                partial(
+                    evaluate_with_watch,
+                    key=(evaluate_func, detail_level, as_list, resource_name),
+                    evaluate_func=partial(
+                        evaluate_func, detail_level=detail_level, as_list=as_list, resource_name=resource_name
+                    ),
+                    resource=resource,
+                    api_info=api_info,
+                )
+            )
+
+    if concurrency > 1 and len(evaluations) > 1:
+        # Evaluations are independent of each other, run them concurrently and keep the declared order.
+        with ContextThreadPoolExecutor(max_workers=min(len(evaluations), concurrency)) as executor:
+            results.extend(executor.map(lambda evaluate: evaluate(), evaluations))
+    else:
+        results.extend(evaluate() for evaluate in evaluations)
     return results
 
 
@@ -6,10 +6,9 @@
 
 from knack.log import get_logger
 from kubernetes.client.exceptions import ApiException
-from kubernetes.client.models import V1Node, V1NodeList
 from rich.padding import Padding
 from rich.table import Table
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from .check_manager import CheckManager
 from .user_strings import NO_NODES_MSG, UNABLE_TO_FETCH_NODES_MSG
@@ -28,7 +27,7 @@ logger = get_logger(__name__)
 
 
 def check_nodes(as_list: bool = False) -> Dict[str, Any]:
-    from ...base import client
+    from ...base import client, list_pages
     check_manager = CheckManager(check_name="evalClusterNodes", check_desc="Evaluate cluster nodes")
     padding = (0, 0, 0, 8)
     target = "cluster/nodes"
@@ -36,7 +35,8 @@ def check_nodes(as_list: bool = False) -> Dict[str, Any]:
 
     try:
         core_client = client.CoreV1Api()
-        nodes: V1NodeList = core_client.list_node()
+        # Nodes are evaluated from the raw list response, skipping model deserialization.
+        nodes: List[dict] = [node for page in list_pages(core_client.list_node) for node in page.get("items") or []]
     except ApiException as ae:
         logger.debug(str(ae))
         api_error_text = UNABLE_TO_FETCH_NODES_MSG
@@ -50,7 +50,7 @@ def check_nodes(as_list: bool = False) -> Dict[str, Any]:
             display=Padding(api_error_text, (0, 0, 0, 8)),
         )
     else:
-        if not nodes or not nodes.items:
+        if not nodes:
             target_display = Padding(NO_NODES_MSG, padding)
             check_manager.add_target_eval(
                 target_name=target, status=CheckTaskStatus.error.value, value=NO_NODES_MSG
@@ -58,7 +58,7 @@ def check_nodes(as_list: bool = False) -> Dict[str, Any]:
             check_manager.add_display(target_name=target, display=target_display)
             return check_manager.as_dict()
 
-        check_manager.add_target_eval(target_name=target, status=CheckTaskStatus.success.value, value={"len(cluster/nodes)": len(nodes.items)})
+        check_manager.add_target_eval(target_name=target, status=CheckTaskStatus.success.value, value={"len(cluster/nodes)": len(nodes)})
         table = _generate_node_table(check_manager, nodes)
 
         check_manager.add_display(target_name=target, display=Padding("Node Resources", padding))
@@ -67,7 +67,7 @@ def check_nodes(as_list: bool = False) -> Dict[str, Any]:
     return check_manager.as_dict(as_list)
 
 
-def _generate_node_table(check_manager: CheckManager, nodes: V1NodeList) -> Table:
+def _generate_node_table(check_manager: CheckManager, nodes: List[dict]) -> Table:
     from kubernetes.utils import parse_quantity
     # prep table
     table = Table(
@@ -88,9 +88,10 @@ def _generate_node_table(check_manager: CheckManager, nodes: V1NodeList) -> Tabl
         MIN_NODE_MEMORY[:-1],
         MIN_NODE_STORAGE[:-1]
     ]])
-    node: V1Node
-    for node in nodes.items:
-        node_name = node.metadata.name
+    for node in nodes:
+        node_name = node["metadata"]["name"]
+        node_status: dict = node.get("status") or {}
+        node_capacity: dict = node_status.get("capacity") or {}
 
         # check_manager target for node
         node_target = f"cluster/nodes/{node_name}"
@@ -104,22 +105,22 @@ def _generate_node_table(check_manager: CheckManager, nodes: V1NodeList) -> Tabl
             (
                 "info.architecture",
                 AIO_SUPPORTED_ARCHITECTURES,
-                node.status.node_info.architecture,
+                (node_status.get("nodeInfo") or {}).get("architecture"),
             ),
             (
                 "condition.cpu",
                 MIN_NODE_VCPU,
-                parse_quantity(node.status.capacity.get("cpu", 0)),
+                parse_quantity(node_capacity.get("cpu", 0)),
             ),
             (
                 "condition.memory",
                 MIN_NODE_MEMORY,
-                parse_quantity(node.status.capacity.get("memory", 0)),
+                parse_quantity(node_capacity.get("memory", 0)),
             ),
             (
                 "condition.ephemeral-storage",
                 MIN_NODE_STORAGE,
-                parse_quantity(node.status.capacity.get("ephemeral-storage", 0)),
+                parse_quantity(node_capacity.get("ephemeral-storage", 0)),
             ),
         ]:
             # determine strings, expected, status
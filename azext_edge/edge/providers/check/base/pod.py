@@ -8,7 +8,7 @@ from knack.log import get_logger
 from rich.padding import Padding
 from rich.table import Table
 from kubernetes.client.models import V1Pod
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 from .check_manager import CheckManager
 from .display import colorize_string
@@ -37,7 +37,7 @@ def evaluate_pod_health(
     target: str,
     namespace: str,
     padding: int,
-    pods: List[V1Pod],
+    pods: List[Union[dict, V1Pod]],
     detail_level: int = ResourceOutputDetailLevel.summary.value,
 ) -> None:
 
@@ -93,12 +93,15 @@ def evaluate_pod_health(
 def _process_pod_status(
     check_manager: CheckManager,
     target: str,
-    pod: V1Pod,
+    pod: Union[dict, V1Pod],
     namespace: str,
     detail_level: int = ResourceOutputDetailLevel.summary.value,
 ) -> PodStatusResult:
 
-    target_service_pod = f"pod/{pod.metadata.name}"
+    # Raw pods, i.e. of get_namespaced_pods_by_prefix(as_dict=True), are evaluated without a model round-trip.
+    pod_dict = pod if isinstance(pod, dict) else pod.to_dict()
+    pod_name = pod_dict["metadata"]["name"]
+    target_service_pod = f"pod/{pod_name}"
 
     conditions = [
         f"{target_service_pod}.status.phase",
@@ -110,10 +113,9 @@ def _process_pod_status(
     else:
         check_manager.set_target_conditions(target_name=target, namespace=namespace, conditions=conditions)
 
-    pod_dict = pod.to_dict()
-    pod_name = pod_dict["metadata"]["name"]
-    pod_phase = pod_dict.get("status", {}).get("phase")
-    pod_conditions: list = pod_dict.get("status", {}).get("conditions", [])
+    pod_status: dict = pod_dict.get("status") or {}
+    pod_phase = pod_status.get("phase")
+    pod_conditions: list = pod_status.get("conditions") or []
     pod_phase_deco, status = decorate_pod_phase(pod_phase)
 
     pod_eval_value = {}
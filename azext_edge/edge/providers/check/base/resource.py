@@ -4,8 +4,11 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+import threading
 from enum import Enum
+from fnmatch import fnmatch
 from itertools import groupby
+from os.path import normcase
 from knack.log import get_logger
 from kubernetes.client.models import (
     V1APIResource,
@@ -18,12 +21,16 @@ from .check_manager import CheckManager
 from .display import process_value_color
 from ..common import COLOR_STR_FORMAT, PADDING_SIZE, ResourceOutputDetailLevel
 from ...base import get_cluster_custom_api
+from ...command_context import get_command_context
 from ...edge_api import EdgeResourceApi
 from ....common import CheckTaskStatus, ResourceState
 
 # TODO: refactor
 logger = get_logger(__name__)
 
+# Characters making a resource name filter a glob rather than an exact name.
+GLOB_CHARS = frozenset("*?[")
+
 
 def decorate_resource_status(status: str) -> str:
     from ....common import ResourceState
@@ -78,8 +85,6 @@ def filter_resources_by_name(
     resources: List[dict],
     resource_name: str,
 ) -> List[dict]:
-    from fnmatch import fnmatch
-
     if not resource_name:
         return resources
 
@@ -106,13 +111,87 @@ def _get_namespace(resource):
     return get_resource_metadata_property(resource, prop_name="namespace")
 
 
+class ResourceIndex:
+    """
+    Resources of a kind indexed by namespace and by name.
+
+    Name lookups match filter_resources_by_name: exact names are answered from the index,
+    glob patterns fall back to matching the candidate resources.
+    """
+
+    def __init__(self, resources: List[dict]):
+        self.resources = resources
+        self._by_namespace: Dict[str, List[dict]] = {}
+        self._by_name: Dict[str, List[dict]] = {}
+        for resource in resources:
+            self._by_namespace.setdefault(_get_namespace(resource), []).append(resource)
+            name = get_resource_metadata_property(resource, prop_name="name")
+            if name:
+                # fnmatch normalizes case the same way.
+                self._by_name.setdefault(normcase(name), []).append(resource)
+
+    def get(self, name: str, namespace: Optional[str] = None) -> Optional[dict]:
+        resources = self.find(resource_name=name, namespace=namespace)
+        return resources[0] if resources else None
+
+    def find(self, resource_name: Optional[str] = None, namespace: Optional[str] = None) -> List[dict]:
+        candidates = self._by_namespace.get(namespace, []) if namespace else self.resources
+        if not resource_name:
+            return list(candidates)
+
+        if GLOB_CHARS.intersection(resource_name):
+            return filter_resources_by_name(candidates, resource_name)
+
+        resources = self._by_name.get(normcase(resource_name.lower()), [])
+        if namespace:
+            resources = [resource for resource in resources if _get_namespace(resource) == namespace]
+        return list(resources)
+
+
+class ResourceIndexes:
+    """
+    Indexes of a check run by resource kind, each built once from a listing across namespaces.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, str, str], ResourceIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_info: EdgeResourceApi, kind: Union[str, Enum]) -> ResourceIndex:
+        key = (api_info.group, api_info.version, kind.value if isinstance(kind, Enum) else kind)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is None:
+            index = ResourceIndex(_list_resources(api_info=api_info, kind=kind))
+            with self._lock:
+                index = self._indexes.setdefault(key, index)
+        return index
+
+
+def get_resource_index(api_info: EdgeResourceApi, kind: Union[str, Enum]) -> ResourceIndex:
+    """
+    Index of the resources of kind across namespaces, shared through the resource_indexes of the command context.
+    """
+    indexes = get_command_context().resource_indexes
+    if indexes is None:
+        return ResourceIndex(_list_resources(api_info=api_info, kind=kind))
+    return indexes.get(api_info=api_info, kind=kind)
+
+
+def _list_resources(api_info: EdgeResourceApi, kind: Union[str, Enum], namespace: Optional[str] = None) -> List[dict]:
+    return (api_info.get_resources(kind=kind, namespace=namespace) or {}).get("items", [])
+
+
 def get_resources_by_name(
     api_info: EdgeResourceApi,
     kind: Union[str, Enum],
     resource_name: str,
     namespace: str = None,
 ) -> List[dict]:
-    resources: list = api_info.get_resources(kind=kind, namespace=namespace).get("items", [])
+    if get_command_context().resource_indexes is not None:
+        return get_resource_index(api_info=api_info, kind=kind).find(resource_name=resource_name, namespace=namespace)
+
+    resources = _list_resources(api_info=api_info, kind=kind, namespace=namespace)
     resources = filter_resources_by_name(resources, resource_name)
     return resources
 
@@ -0,0 +1,95 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import threading
+from enum import Enum
+from time import sleep
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Union
+
+from ....common import BundleResourceKind
+from ....providers.command_context import get_command_context
+from ....providers.edge_api import DataflowResourceKinds, EdgeResourceApi, MqResourceKinds
+from ..common import CoreServiceResourceKinds
+
+# Snapshot kind of pods, see providers.base.SNAPSHOT_LISTERS.
+POD_INPUT: str = BundleResourceKind.pod.value
+
+# Evaluations reading pods in addition to their own resource kind.
+POD_DEPENDENT_RESOURCE_KINDS: FrozenSet[Enum] = frozenset(
+    [
+        CoreServiceResourceKinds.RUNTIME_RESOURCE,
+        MqResourceKinds.BROKER,
+        DataflowResourceKinds.DATAFLOWPROFILE,
+    ]
+)
+
+
+class CheckWatchSession:
+    """
+    Evaluation results of a check watch, reused until one of their inputs changes.
+
+    Inputs are cluster snapshot kinds: "Pod" for pods and (group, version, plural) for custom resources.
+    Changes are reported from watch threads through notify and consumed by wait_for_changes,
+    which marks them for the next evaluation pass.
+    """
+
+    def __init__(self):
+        self._results: Dict[tuple, Any] = {}
+        self._changed: Set[Union[str, tuple]] = set()
+        self._pending: Set[Union[str, tuple]] = set()
+        self._lock = threading.Lock()
+        self._pending_event = threading.Event()
+
+    def notify(self, changed_input: Union[str, tuple]):
+        with self._lock:
+            self._pending.add(changed_input)
+        self._pending_event.set()
+
+    def wait_for_changes(self, timeout: Optional[float] = None, settle_seconds: float = 0) -> Set[Union[str, tuple]]:
+        if not self._pending_event.wait(timeout=timeout):
+            return set()
+        # Let a burst of events (i.e. a rollout) settle into a single evaluation pass.
+        if settle_seconds:
+            sleep(settle_seconds)
+        with self._lock:
+            self._pending_event.clear()
+            self._changed, self._pending = self._pending, set()
+            return set(self._changed)
+
+    def evaluate(self, key: tuple, inputs: Set[Union[str, tuple]], evaluate_func: Callable[[], Any]) -> Any:
+        if key in self._results and not inputs & self._changed:
+            return self._results[key]
+        result = evaluate_func()
+        self._results[key] = result
+        return result
+
+
+def get_evaluation_inputs(resource: Enum, api_info: Optional[EdgeResourceApi] = None) -> Set[Union[str, tuple]]:
+    inputs = set()
+    if resource in POD_DEPENDENT_RESOURCE_KINDS:
+        inputs.add(POD_INPUT)
+    if api_info and resource != CoreServiceResourceKinds.RUNTIME_RESOURCE:
+        plural = api_info.get_plural(resource)
+        if plural:
+            inputs.add((api_info.group, api_info.version, plural))
+    return inputs
+
+
+def evaluate_with_watch(
+    key: tuple,
+    evaluate_func: Callable[[], Any],
+    resource: Optional[Enum] = None,
+    api_info: Optional[EdgeResourceApi] = None,
+) -> Any:
+    """
+    Evaluate, or reuse the result of the check watch of the command context if the inputs of resource did not change.
+    Without a resource the result is reused for the whole watch.
+    """
+    session = get_command_context().check_watch
+    if not session:
+        return evaluate_func()
+    inputs = get_evaluation_inputs(resource=resource, api_info=api_info) if resource else set()
+    return session.evaluate(key=key, inputs=inputs, evaluate_func=evaluate_func)
@@ -37,6 +37,9 @@ class DataSourceStageType(ListableEnum):
 
 ERROR_NO_DETAIL = "<No detail available>"
 
+# Maximum number of service checks or resource evaluations run at once.
+DEFAULT_CHECK_CONCURRENCY = 8
+
 POD_CONDITION_TEXT_MAP = {
     "Ready": "Pod Readiness",
     "Initialized": "Pod Initialized",
@@ -4,7 +4,7 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
-from typing import List
+from typing import Dict, List
 
 from knack.log import get_logger
 from rich.padding import Padding
@@ -23,6 +23,7 @@ from .base.display import basic_property_display, colorize_string
 from .base.pod import evaluate_pod_health
 from .base.resource import filter_resources_by_name
 from .common import (
+    DEFAULT_CHECK_CONCURRENCY,
     DEFAULT_PADDING,
     DEFAULT_PROPERTY_DISPLAY_COLOR,
     PADDING_SIZE,
@@ -194,7 +195,7 @@ def _process_dataflow_sourcesettings(
     target: str,
     namespace: str,
     dataflow_name: str,
-    endpoints: List[dict],
+    endpoints: Dict[str, dict],
     operation: dict,
     detail_level: int,
     padding: int,
@@ -212,9 +213,7 @@ def _process_dataflow_sourcesettings(
     endpoint_ref_status = endpoint_type_status = CheckTaskStatus.error
     endpoint_type_status_string = "invalid"
 
-    found_endpoint = next(
-        (endpoint for endpoint in endpoints if "name" in endpoint and endpoint["name"] == endpoint_ref), None
-    )
+    found_endpoint = endpoints.get(endpoint_ref)
     endpoint_type = found_endpoint["type"] if found_endpoint and "type" in found_endpoint else None
 
     if found_endpoint:
@@ -421,7 +420,7 @@ def _process_dataflow_destinationsettings(
     target: str,
     namespace: str,
     dataflow_name: str,
-    endpoints: List[dict],
+    endpoints: Dict[str, dict],
     operation: dict,
     detail_level: int,
     padding: int,
@@ -435,9 +434,7 @@ def _process_dataflow_destinationsettings(
 
     # currently we are only looking for endpoint references in the same namespace
     # duplicate names should not exist, so check the first endpoint that matches the name ref
-    endpoint_match = next(
-        (endpoint for endpoint in endpoints if "name" in endpoint and endpoint["name"] == endpoint_ref), None
-    )
+    endpoint_match = endpoints.get(endpoint_ref)
 
     endpoint_validity = "valid"
     endpoint_status = CheckTaskStatus.success
@@ -902,6 +899,7 @@ def check_dataflows_deployment(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     evaluate_funcs = {
         CoreServiceResourceKinds.RUNTIME_RESOURCE: evaluate_core_service_runtime,
@@ -919,6 +917,7 @@ def check_dataflows_deployment(
         detail_level=detail_level,
         resource_kinds=resource_kinds,
         resource_name=resource_name,
+        concurrency=concurrency,
     )
 
 
@@ -936,6 +935,7 @@ def evaluate_core_service_runtime(
         prefix=DATAFLOW_OPERATOR_PREFIX,
         namespace="",
         label_selector=DATAFLOW_NAME_LABEL,
+        as_dict=True,
     )
     if resource_name:
         operators = filter_resources_by_name(
@@ -1044,13 +1044,16 @@ def evaluate_dataflows(
             resource_name=None,
         )
 
-        endpoints = [
-            {
-                "name": endpoint.get("metadata", {}).get("name"),
-                "type": endpoint.get("spec", {}).get("endpointType"),
-            }
-            for endpoint in all_endpoints
-        ]
+        # endpoints by name for reference lookup, duplicate names should not exist so the first one wins
+        endpoints: Dict[str, dict] = {}
+        for endpoint in all_endpoints:
+            endpoints.setdefault(
+                endpoint.get("metadata", {}).get("name"),
+                {
+                    "name": endpoint.get("metadata", {}).get("name"),
+                    "type": endpoint.get("spec", {}).get("endpointType"),
+                },
+            )
 
         for dataflow in list(dataflows):
             spec = dataflow.get("spec", {})
@@ -1530,6 +1533,7 @@ def evaluate_dataflow_profiles(
                 prefix=pod_prefix,
                 namespace=namespace,
                 label_selector=DATAFLOW_NAME_LABEL,
+                as_dict=True,
             )
             # only show pods if they exist
             if profile_pods:
@@ -11,6 +11,7 @@ from .base import (
     add_display_and_eval,
     check_post_deployment,
     generate_target_resource_name,
+    get_resource_index,
     get_resources_by_name,
     process_list_resource,
     process_resource_properties,
@@ -25,6 +26,7 @@ from .common import (
     ASSET_DATAPOINT_PROPERTIES,
     ASSET_EVENT_PROPERTIES,
     ASSET_PROPERTIES,
+    DEFAULT_CHECK_CONCURRENCY,
     MAX_ASSET_DATAPOINTS,
     MAX_ASSET_EVENTS,
     PADDING_SIZE,
@@ -42,6 +44,7 @@ def check_deviceregistry_deployment(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     evaluate_funcs = {
         DeviceRegistryResourceKinds.ASSET: evaluate_assets,
@@ -57,6 +60,7 @@ def check_deviceregistry_deployment(
         as_list=as_list,
         detail_level=detail_level,
         resource_kinds=resource_kinds,
+        concurrency=concurrency,
     )
 
 
@@ -88,6 +92,12 @@ def evaluate_assets(
         )
         return check_manager.as_dict(as_list)
 
+    # asset endpoint profiles for reference lookup, listed once for all assets
+    endpoint_profiles = get_resource_index(
+        api_info=DEVICEREGISTRY_API_V1,
+        kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE,
+    )
+
     for (namespace, assets) in get_resources_grouped_by_namespace(all_assets):
         check_manager.add_target(target_name=target_assets, namespace=namespace, conditions=asset_namespace_conditions)
         check_manager.add_display(
@@ -120,11 +130,7 @@ def evaluate_assets(
 
             asset_spec = asset["spec"]
             endpoint_profile_uri = asset_spec.get("assetEndpointProfileRef", "")
-            endpoint_profile = get_resources_by_name(
-                api_info=DEVICEREGISTRY_API_V1,
-                kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE,
-                resource_name=endpoint_profile_uri
-            )
+            endpoint_profile = endpoint_profiles.find(resource_name=endpoint_profile_uri)
             spec_padding = padding + PADDING_SIZE
 
             endpoint_profile_uri_value = {"spec.assetEndpointProfileRef": endpoint_profile_uri}
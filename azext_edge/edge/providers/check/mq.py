@@ -37,6 +37,7 @@ from .common import (
     AIO_BROKER_HEALTH_MANAGER,
     AIO_BROKER_OPERATOR,
     BROKER_DIAGNOSTICS_PROPERTIES,
+    DEFAULT_CHECK_CONCURRENCY,
     ResourceOutputDetailLevel,
 )
 
@@ -51,6 +52,7 @@ def check_mq_deployment(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     evaluate_funcs = {
         MqResourceKinds.BROKER: evaluate_brokers,
@@ -67,6 +69,7 @@ def check_mq_deployment(
         detail_level=detail_level,
         resource_kinds=resource_kinds,
         resource_name=resource_name,
+        concurrency=concurrency,
     )
 
 
@@ -513,6 +516,7 @@ def evaluate_brokers(
                     prefix=prefix,
                     namespace=namespace,
                     label_selector=MQ_NAME_LABEL,
+                    as_dict=True,
                 )
 
                 if not prefixed_pods:
@@ -532,6 +536,7 @@ def evaluate_brokers(
                             prefix=prefix,
                             namespace="",
                             label_selector=MQ_NAME_LABEL,
+                            as_dict=True,
                         )
                     )
 
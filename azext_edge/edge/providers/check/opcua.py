@@ -22,6 +22,7 @@ from .base import (
 from ...common import CheckTaskStatus
 
 from .common import (
+    DEFAULT_CHECK_CONCURRENCY,
     PADDING_SIZE,
     CoreServiceResourceKinds,
     ResourceOutputDetailLevel,
@@ -40,6 +41,7 @@ def check_opcua_deployment(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
     resource_kinds: List[str] = None,
     resource_name: str = None,
+    concurrency: int = DEFAULT_CHECK_CONCURRENCY,
 ) -> List[dict]:
     evaluate_funcs = {
         CoreServiceResourceKinds.RUNTIME_RESOURCE: evaluate_core_service_runtime,
@@ -55,6 +57,7 @@ def check_opcua_deployment(
         detail_level=detail_level,
         resource_kinds=resource_kinds,
         resource_name=resource_name,
+        concurrency=concurrency,
     )
 
 
@@ -73,6 +76,7 @@ def evaluate_core_service_runtime(
                 prefix="",
                 namespace="",
                 label_selector=label_selector,
+                as_dict=True,
             )
         )
 
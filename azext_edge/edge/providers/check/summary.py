@@ -11,11 +11,12 @@ from rich.table import Table
 from rich.console import NewLine
 
 from ...common import CheckTaskStatus, OpsServiceType
+from ...providers.command_context import ContextThreadPoolExecutor
 from ...providers.edge_api import DATAFLOW_API_V1B1, DEVICEREGISTRY_API_V1, MQ_ACTIVE_API, OPCUA_API_V1
 from .akri import check_akri_deployment
 from .base import CheckManager
 from .base.display import colorize_string
-from .common import ResourceOutputDetailLevel
+from .common import DEFAULT_CHECK_CONCURRENCY, ResourceOutputDetailLevel
 from .dataflow import PADDING, check_dataflows_deployment
 from .deviceregistry import check_deviceregistry_deployment
 from .mq import check_mq_deployment
@@ -69,17 +70,25 @@ def check_summary(
         ),
     ]
 
-    check_manager = CheckManager(check_name="evalAIOSummary", check_desc="Service summary checks")
-    for check in service_checks:
-
-        # run checks for service
-        result = check.check_func(
-            detail_level=ResourceOutputDetailLevel.summary.value,
-            resource_name=resource_name,
-            as_list=as_list,
-            resource_kinds=resource_kinds,
+    # Service checks are independent, run them concurrently and merge results in the order declared above.
+    # Each runs its own evaluations serially so concurrent calls stay bounded by this pool.
+    with ContextThreadPoolExecutor(max_workers=min(len(service_checks), DEFAULT_CHECK_CONCURRENCY)) as executor:
+        service_results = list(
+            executor.map(
+                lambda check: check.check_func(
+                    detail_level=ResourceOutputDetailLevel.summary.value,
+                    resource_name=resource_name,
+                    as_list=as_list,
+                    resource_kinds=resource_kinds,
+                    concurrency=1,
+                ),
+                service_checks,
+            )
         )
 
+    check_manager = CheckManager(check_name="evalAIOSummary", check_desc="Service summary checks")
+    for check, result in zip(service_checks, service_results):
+
         # add service check results to check manager
         target = check.target
         check_manager.add_target(target_name=target)
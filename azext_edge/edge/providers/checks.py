@@ -4,27 +4,40 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Union
 
 from azure.cli.core.azclierror import ArgumentUsageError
 from azext_edge.edge.providers.edge_api.dataflow import DataflowResourceKinds
-from rich.console import Console
+from knack.log import get_logger
+from kubernetes.client.exceptions import ApiException
+from rich.console import Console, Group
+from rich.text import Text
+from urllib3.exceptions import HTTPError
 
 from ..common import ListableEnum, OpsServiceType
-from .check.base import check_pre_deployment, display_as_list
+from .base import CLUSTER_SNAPSHOT, SnapshotWatch
+from .check.base import ResourceIndexes, check_pre_deployment, display_as_list
+from .check.base.watch import POD_INPUT, CheckWatchSession, evaluate_with_watch
 from .check.common import COLOR_STR_FORMAT, ResourceOutputDetailLevel
 from .check.deviceregistry import check_deviceregistry_deployment
 from .check.mq import check_mq_deployment
 from .check.opcua import check_opcua_deployment
+from .command_context import bind_command_context, get_command_context
 from .edge_api.deviceregistry import DeviceRegistryResourceKinds
 from .edge_api.mq import MqResourceKinds
 from .check.akri import check_akri_deployment
 from .check.dataflow import check_dataflows_deployment
 from .check.summary import check_summary
+from .edge_api import DATAFLOW_API_V1B1, DEVICEREGISTRY_API_V1, MQ_ACTIVE_API, OPCUA_API_V1, EdgeResourceApi
 from .edge_api.opcua import OpcuaResourceKinds
 
+logger = get_logger(__name__)
 console = Console(width=100, highlight=False)
 
+# Seconds to collect cluster changes before re-evaluating checks in watch mode.
+DEFAULT_WATCH_SETTLE_SECONDS: float = 1.0
+
 
 def run_checks(
     detail_level: int = ResourceOutputDetailLevel.summary.value,
@@ -35,8 +48,6 @@ def run_checks(
     resource_kinds: List[str] = None,
     resource_name: str = None,
 ) -> Dict[str, Any]:
-    result = {}
-
     # check if the resource_kinds are valid for the requested service
     if resource_kinds:
         _validate_resource_kinds_under_service(ops_service, resource_kinds)
@@ -46,40 +57,174 @@ def run_checks(
 
         sleep(0.5)
 
-        color = COLOR_STR_FORMAT.format(color="bright_blue", value="{text}") if as_list else "{text}"
-        title_subject = (
-            f"{{{color.format(text=ops_service)}}} service deployment"
-            if post_deployment
-            else color.format(text="IoT Operations readiness")
+        result = _evaluate_checks(
+            detail_level=detail_level,
+            ops_service=ops_service,
+            pre_deployment=pre_deployment,
+            post_deployment=post_deployment,
+            as_list=as_list,
+            resource_kinds=resource_kinds,
+            resource_name=resource_name,
         )
-        result["title"] = f"Evaluation for {title_subject}" if ops_service else "IoT Operations Summary"
-
-        if pre_deployment:
-            check_pre_deployment(result, as_list)
-        if post_deployment:
-            result["postDeployment"] = []
-            service_check_dict = {
-                OpsServiceType.akri.value: check_akri_deployment,
-                OpsServiceType.mq.value: check_mq_deployment,
-                OpsServiceType.deviceregistry.value: check_deviceregistry_deployment,
-                OpsServiceType.opcua.value: check_opcua_deployment,
-                OpsServiceType.dataflow.value: check_dataflows_deployment,
-                None: check_summary,
-            }
-            service_result = service_check_dict[ops_service](
-                detail_level=detail_level, resource_name=resource_name, as_list=as_list, resource_kinds=resource_kinds
-            )
-            if isinstance(service_result, list):
-                for obj in service_result:
-                    result["postDeployment"].append(obj)
-            else:
-                result["postDeployment"].append(service_result)
 
         if as_list:
             return display_as_list(console=console, result=result)
         return result
 
 
+def watch_checks(
+    detail_level: int = ResourceOutputDetailLevel.summary.value,
+    ops_service: Optional[str] = None,
+    pre_deployment: bool = True,
+    resource_kinds: List[str] = None,
+    resource_name: str = None,
+    settle_seconds: float = DEFAULT_WATCH_SETTLE_SECONDS,
+) -> None:
+    """
+    Evaluate post deployment checks, then keep re-evaluating them in place as the cluster changes.
+
+    Pods and the custom resources of the evaluated service(s) are listed once and kept current
+    via watch streams. Only evaluations whose inputs changed are run again.
+    """
+    from rich.live import Live
+
+    if resource_kinds:
+        _validate_resource_kinds_under_service(ops_service, resource_kinds)
+
+    session = CheckWatchSession()
+    watches: List[SnapshotWatch] = []
+    evaluate = partial(
+        _evaluate_checks,
+        detail_level=detail_level,
+        ops_service=ops_service,
+        pre_deployment=pre_deployment,
+        post_deployment=True,
+        as_list=True,
+        resource_kinds=resource_kinds,
+        resource_name=resource_name,
+    )
+
+    try:
+        with bind_command_context(get_command_context()._replace(check_watch=session)):
+            with console.status(status="Analyzing cluster...", refresh_per_second=12.5):
+                for kind in _get_watch_kinds(ops_service=ops_service, resource_kinds=resource_kinds):
+                    try:
+                        watches.append(SnapshotWatch(kind=kind, on_change=session.notify).start())
+                    except (ApiException, HTTPError) as e:
+                        # i.e. a dropped stream or reset connection, the kind is listed when evaluated instead.
+                        logger.debug(f"Unable to watch {kind}, it will not trigger re-evaluation:\n{e}")
+                result = evaluate()
+
+            logger.warning("Re-evaluating on cluster changes. Use ctrl-c to terminate check watch.\n")
+            with Live(_render_checks(result), console=console, auto_refresh=False) as live:
+                while True:
+                    changed = session.wait_for_changes(timeout=1.0, settle_seconds=settle_seconds)
+                    if not changed:
+                        continue
+                    logger.debug(f"Re-evaluating checks for changes in {changed}.")
+                    live.update(_render_checks(evaluate()), refresh=True)
+    except KeyboardInterrupt:
+        return
+    finally:
+        for watch in watches:
+            watch.stop()
+
+
+def _evaluate_checks(
+    detail_level: int = ResourceOutputDetailLevel.summary.value,
+    ops_service: Optional[str] = None,
+    pre_deployment: bool = True,
+    post_deployment: bool = True,
+    as_list: bool = False,
+    resource_kinds: List[str] = None,
+    resource_name: str = None,
+) -> Dict[str, Any]:
+    result = {}
+    color = COLOR_STR_FORMAT.format(color="bright_blue", value="{text}") if as_list else "{text}"
+    title_subject = (
+        f"{{{color.format(text=ops_service)}}} service deployment"
+        if post_deployment
+        else color.format(text="IoT Operations readiness")
+    )
+    result["title"] = f"Evaluation for {title_subject}" if ops_service else "IoT Operations Summary"
+
+    if pre_deployment:
+        # Pre deployment requirements are evaluated once per check watch.
+        result["preDeployment"] = evaluate_with_watch(
+            key=(check_pre_deployment, as_list), evaluate_func=partial(_check_pre_deployment, as_list=as_list)
+        )
+    if post_deployment:
+        result["postDeployment"] = []
+        service_check_dict = {
+            OpsServiceType.akri.value: check_akri_deployment,
+            OpsServiceType.mq.value: check_mq_deployment,
+            OpsServiceType.deviceregistry.value: check_deviceregistry_deployment,
+            OpsServiceType.opcua.value: check_opcua_deployment,
+            OpsServiceType.dataflow.value: check_dataflows_deployment,
+            None: check_summary,
+        }
+        # Evaluators of this run list each resource kind once and look up references by name.
+        with CLUSTER_SNAPSHOT.scope(), bind_command_context(
+            get_command_context()._replace(resource_indexes=ResourceIndexes())
+        ):
+            service_result = service_check_dict[ops_service](
+                detail_level=detail_level, resource_name=resource_name, as_list=as_list, resource_kinds=resource_kinds
+            )
+        if isinstance(service_result, list):
+            for obj in service_result:
+                result["postDeployment"].append(obj)
+        else:
+            result["postDeployment"].append(service_result)
+
+    return result
+
+
+def _check_pre_deployment(as_list: bool = False) -> List[dict]:
+    result = {}
+    check_pre_deployment(result, as_list)
+    return result["preDeployment"]
+
+
+def _get_watch_kinds(ops_service: Optional[str] = None, resource_kinds: List[str] = None) -> List[Union[str, tuple]]:
+    service_api_dict: Dict[str, List[EdgeResourceApi]] = {
+        OpsServiceType.akri.value: [],
+        OpsServiceType.mq.value: [MQ_ACTIVE_API],
+        OpsServiceType.deviceregistry.value: [DEVICEREGISTRY_API_V1],
+        OpsServiceType.opcua.value: [OPCUA_API_V1],
+        OpsServiceType.dataflow.value: [DATAFLOW_API_V1B1],
+    }
+    if ops_service:
+        apis = service_api_dict[ops_service]
+    else:
+        apis = [api for service_apis in service_api_dict.values() for api in service_apis]
+
+    watch_kinds: List[Union[str, tuple]] = [POD_INPUT]
+    for api in apis:
+        for kind in sorted(api.kinds or []):
+            if resource_kinds and kind not in resource_kinds:
+                continue
+            watch_kinds.append((api.group, api.version, api.get_plural(kind)))
+    return watch_kinds
+
+
+def _render_checks(result: Dict[str, Any]) -> Group:
+    from datetime import datetime
+
+    # display_as_list prints, capture its output to refresh the live display in place.
+    render_console = Console(
+        width=console.width,
+        highlight=False,
+        force_terminal=True,
+        color_system=console.color_system,
+    )
+    with render_console.capture() as capture:
+        display_as_list(console=render_console, result=result)
+    return Group(
+        Text.from_ansi(capture.get()),
+        Text(f"Last evaluation {datetime.now().isoformat()}", style="bright_black"),
+    )
+
+
 def _validate_resource_kinds_under_service(ops_service: str, resource_kinds: List[str]) -> None:
     if ops_service == OpsServiceType.akri.value:
         raise ArgumentUsageError(f"--resources is not supported for service {ops_service}.")
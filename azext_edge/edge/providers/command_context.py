@@ -0,0 +1,58 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import TYPE_CHECKING, Callable, Iterator, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .check.base.resource import ResourceIndexes
+    from .check.base.watch import CheckWatchSession
+    from .support.base import CollectionPlan
+
+
+class CommandContext(NamedTuple):
+    """
+    State shared by the work of a single command run.
+
+    collection_plan: container logs and pod metrics of support bundle services are planned rather than fetched.
+    resource_indexes: check evaluators share one index per resource kind.
+    check_watch: check evaluations are reused until one of their inputs changes.
+    """
+
+    collection_plan: Optional["CollectionPlan"] = None
+    resource_indexes: Optional["ResourceIndexes"] = None
+    check_watch: Optional["CheckWatchSession"] = None
+
+
+# A context variable rather than a module global, overlapping command runs in one process each see their own.
+_command_context: ContextVar[Optional[CommandContext]] = ContextVar("command_context", default=None)
+
+
+@contextmanager
+def bind_command_context(context: CommandContext) -> Iterator[CommandContext]:
+    """
+    Binds context to the calling thread. Work submitted to a ContextThreadPoolExecutor carries it along.
+    """
+    token = _command_context.set(context)
+    try:
+        yield context
+    finally:
+        _command_context.reset(token)
+
+
+def get_command_context() -> CommandContext:
+    return _command_context.get() or CommandContext()
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool running each call in a copy of the context of the submitting thread.
+    """
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return super().submit(copy_context().run, fn, *args, **kwargs)
@@ -5,12 +5,14 @@
 # ----------------------------------------------------------------------------------------------
 
 from enum import Enum
-from typing import Dict, FrozenSet, Iterable, List, Union, Optional
-from kubernetes.client.models import V1APIResourceList
-from ...providers.base import get_cluster_custom_api, get_custom_objects
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Tuple, Union, Optional
 
 from azure.cli.core.azclierror import ResourceNotFoundError
 
+# API definitions are loaded with command arguments and help, the kubernetes client is imported when first used.
+if TYPE_CHECKING:
+    from kubernetes.client.models import V1APIResourceList
+
 
 class EdgeResourceApi:
     def __init__(self, group: str, version: str, moniker: str, label: Optional[str] = None):
@@ -18,7 +20,7 @@ class EdgeResourceApi:
         self.version: str = version
         self.moniker: str = moniker
         self.label: Optional[str] = label
-        self._api: V1APIResourceList = None
+        self._api: Optional["V1APIResourceList"] = None
         self._kinds: Dict[str, str] = None
 
     def as_str(self) -> str:
@@ -28,6 +30,8 @@ class EdgeResourceApi:
         return self._get_api(raise_on_404) is not None
 
     def _get_api(self, raise_on_404: bool = False):
+        from ..base import get_cluster_custom_api
+
         self._api = get_cluster_custom_api(group=self.group, version=self.version, raise_on_404=raise_on_404)
         return self._api
 
@@ -40,22 +44,29 @@ class EdgeResourceApi:
             self._get_api()
 
         if self._api:
-            self._kinds = {}
+            # Built aside and assigned at once, concurrent checks may read kinds meanwhile.
+            kinds = {}
             for resource in self._api.resources:
                 rn: str = resource.name
                 if "/" in rn:
                     rn = rn[: rn.index("/")]
-                self._kinds[resource.kind.lower()] = rn
+                kinds[resource.kind.lower()] = rn
+            self._kinds = kinds
             return frozenset(self._kinds.keys())
 
-    def get_resources(self, kind: Union[str, Enum], namespace: Optional[str] = None):
+    def get_plural(self, kind: Union[str, Enum]) -> Optional[str]:
         if isinstance(kind, Enum):
             kind = kind.value
 
         if self.kinds and kind in self.kinds:
-            return get_custom_objects(
-                group=self.group, version=self.version, plural=self._kinds[kind], namespace=namespace
-            )
+            return self._kinds[kind]
+
+    def get_resources(self, kind: Union[str, Enum], namespace: Optional[str] = None):
+        from ..base import get_custom_objects
+
+        plural = self.get_plural(kind)
+        if plural:
+            return get_custom_objects(group=self.group, version=self.version, plural=plural, namespace=namespace)
 
 
 class EdgeApiManager:
@@ -75,7 +86,10 @@ class EdgeApiManager:
         return apis_str
 
     def get_deployed(self, raise_on_404: bool = False) -> Iterable[EdgeResourceApi]:
+        from ..base import discover_cluster_apis
+
         result = []
+        discover_cluster_apis(group_versions=self.group_versions)
         for api in self.resource_apis:
             if api.is_deployed():
                 result.append(api)
@@ -88,3 +102,7 @@ class EdgeApiManager:
     @property
     def apis(self) -> FrozenSet[EdgeResourceApi]:
         return self.resource_apis
+
+    @property
+    def group_versions(self) -> List[Tuple[str, str]]:
+        return [(api.group, api.version) for api in self.resource_apis]
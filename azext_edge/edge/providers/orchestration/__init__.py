@@ -4,12 +4,24 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
-from .deletion import delete_ops_resources
-from .host import run_host_verify
-from .work import WorkManager
+from importlib import import_module
+
+# Orchestration pulls in the kubernetes and management clients. Argument loading only needs .common,
+# the public names are imported from their modules when first accessed.
+_LAZY_NAMES = {
+    "WorkManager": ".work",
+    "delete_ops_resources": ".deletion",
+    "run_host_verify": ".host",
+}
 
 __all__ = [
     "WorkManager",
     "delete_ops_resources",
     "run_host_verify",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_NAMES:
+        return getattr(import_module(_LAZY_NAMES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,11 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
-from typing import List, Optional, Union, Dict
+import threading
+from time import time
+from typing import List, Optional, Tuple, Union, Dict
 
+from ...util.arm_cache import ARM_CACHE
 from ...util.resource_graph import ResourceGraph
 
 
@@ -63,12 +66,46 @@ QUERIES = {
 }
 
 
+class ConnectedClusterState:
+    """
+    Last read connected cluster resource and extensions, refreshed_at being when the resource was read.
+    """
+
+    def __init__(self):
+        self.resource: Optional[dict] = None
+        self.extensions: Optional[List[dict]] = None
+        self.refreshed_at: Optional[float] = None
+
+
+# Shared by every ConnectedCluster of the same cluster within a command, cleared as each command starts.
+_connected_cluster_states: Dict[Tuple[str, str, str], ConnectedClusterState] = {}
+_connected_cluster_states_lock = threading.Lock()
+
+
+def get_connected_cluster_state(
+    subscription_id: str, resource_group_name: str, cluster_name: str
+) -> ConnectedClusterState:
+    key = (subscription_id.lower(), resource_group_name.lower(), cluster_name.lower())
+    with _connected_cluster_states_lock:
+        if key not in _connected_cluster_states:
+            _connected_cluster_states[key] = ConnectedClusterState()
+        return _connected_cluster_states[key]
+
+
+def clear_connected_cluster_states():
+    with _connected_cluster_states_lock:
+        _connected_cluster_states.clear()
+
+
 class ConnectedCluster:
     def __init__(self, cmd, subscription_id: str, cluster_name: str, resource_group_name: str):
         self.subscription_id = subscription_id
         self.cluster_name = cluster_name
         self.resource_group_name = resource_group_name
         self.resource_graph = ResourceGraph(cmd=cmd, subscriptions=[self.subscription_id])
+        self._state = get_connected_cluster_state(
+            subscription_id=subscription_id, resource_group_name=resource_group_name, cluster_name=cluster_name
+        )
 
         # TODO - @digimaun - temp necessary due to circular import
         from ..orchestration.resources import ConnectedClusters
@@ -81,8 +118,26 @@ class ConnectedCluster:
 
     @property
     def resource(self) -> dict:
-        # TODO: Cache
-        return self.clusters.show(resource_group_name=self.resource_group_name, cluster_name=self.cluster_name)
+        if self._state.resource is None:
+            self._state.resource = self.clusters.show(
+                resource_group_name=self.resource_group_name, cluster_name=self.cluster_name
+            )
+            self._state.refreshed_at = time()
+        return self._state.resource
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        return self._state.refreshed_at
+
+    def refresh(self):
+        """
+        Drop the cluster resource and extensions read so far, the next access reads them from ARM.
+        """
+        if self._state.resource:
+            ARM_CACHE.invalidate(self._state.resource["id"])
+        self._state.resource = None
+        self._state.extensions = None
+        self._state.refreshed_at = None
 
     @property
     def location(self) -> str:
@@ -95,9 +150,13 @@ class ConnectedCluster:
 
     @property
     def extensions(self) -> List[dict]:
-        return list(
-            self.clusters.extensions.list(resource_group_name=self.resource_group_name, cluster_name=self.cluster_name)
-        )
+        if self._state.extensions is None:
+            self._state.extensions = list(
+                self.clusters.extensions.list(
+                    resource_group_name=self.resource_group_name, cluster_name=self.cluster_name
+                )
+            )
+        return self._state.extensions
 
     def get_extensions_by_type(self, *type_names: str) -> Optional[Dict[str, dict]]:
         extensions = self.extensions
@@ -35,6 +35,7 @@ class ConnectedClusters(Queryable):
         return self.ops.get(
             resource_group_name=resource_group_name,
             cluster_name=cluster_name,
+            arm_cache=True,
         )
 
 
@@ -83,7 +83,9 @@ class Instances(Queryable):
         self.permission_manager = PermissionManager(self.default_subscription_id)
 
     def show(self, name: str, resource_group_name: str, show_tree: Optional[bool] = None) -> Optional[dict]:
-        result = self.iotops_mgmt_client.instance.get(instance_name=name, resource_group_name=resource_group_name)
+        result = self.iotops_mgmt_client.instance.get(
+            instance_name=name, resource_group_name=resource_group_name, arm_cache=True
+        )
 
         if show_tree:
             self._show_tree(result)
@@ -105,7 +107,7 @@ class Instances(Queryable):
 
     def _get_associated_cl(self, instance: dict) -> dict:
         return self.resource_client.resources.get_by_id(
-            resource_id=instance["extendedLocation"]["name"], api_version=CUSTOM_LOCATIONS_API_VERSION
+            resource_id=instance["extendedLocation"]["name"], api_version=CUSTOM_LOCATIONS_API_VERSION, arm_cache=True
         )
 
     def get_resource_map(self, instance: dict) -> IoTOperationsResourceMap:
@@ -325,6 +325,8 @@ class WorkManager:
                 self.render_display(category=WorkCategoryKey.ENABLE_IOT_OPS)
                 _ = wait_for_terminal_state(enablement_poller)
 
+                # Extensions listed before enablement are outdated.
+                self._resource_map.connected_cluster.refresh()
                 self._extension_map = self._resource_map.connected_cluster.get_extensions_by_type(
                     IOT_OPS_EXTENSION_TYPE, IOT_OPS_PLAT_EXTENSION_TYPE, SECRET_SYNC_EXTENSION_TYPE
                 )
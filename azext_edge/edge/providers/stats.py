@@ -6,27 +6,72 @@
 
 import binascii
 import json
+import os
 
-from datetime import datetime
+from datetime import datetime, timezone
+from http.client import HTTPException
 from time import sleep
-from typing import List, Optional, Tuple, Union, Dict, TYPE_CHECKING
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple, Union, Dict, TYPE_CHECKING
+from urllib.error import HTTPError
 
 from azure.cli.core.azclierror import ResourceNotFoundError
 from knack.log import get_logger
 from rich.console import Console
 
-from ..common import AIO_BROKER_DIAGNOSTICS_SERVICE, METRICS_SERVICE_API_PORT, PROTOBUF_SERVICE_API_PORT, PodState
+from ..common import (
+    AIO_BROKER_DIAGNOSTICS_SERVICE,
+    DEFAULT_STATS_HISTORY_SIZE,
+    METRICS_SERVICE_API_PORT,
+    PROTOBUF_SERVICE_API_PORT,
+    PodState,
+)
 from ..util import get_timestamp_now_utc
-from .base import get_namespaced_pods_by_prefix, portforward_http, portforward_socket, V1Pod
+from ..util.prometheus import UNTYPED, MetricTable, SeriesHistory, format_labels, parse_metrics
+from .base import (
+    FrameReader,
+    V1Pod,
+    get_namespaced_pods_by_prefix,
+    portforward_session,
+    portforward_socket,
+)
 
 logger = get_logger(__name__)
 
 console = Console(highlight=True)
 
+DEFAULT_STATS_CONCURRENCY = 8
+STATS_SPARKLINE_WIDTH = 20
+STATS_FILE_CSV_COLUMNS = ["timestamp", "namespace", "stat", "value"]
+
+DEFAULT_TRACE_CONCURRENCY = 4
+# Traces decoded ahead of the one being consumed, bounding memory on large trace sets.
+TRACE_MAX_IN_FLIGHT = 32
+TRACE_OTLP_SUFFIX = ".otlp.pb"
+TRACE_TEMPO_SUFFIX = ".tempo.json"
+TRACE_INDEX_SUFFIX = ".index.json"
+
+# Protobuf wire types and the OTLP Span and Status field numbers read by _summarize_trace_response.
+PB_WIRE_VARINT = 0
+PB_WIRE_FIXED64 = 1
+PB_WIRE_LENGTH_DELIMITED = 2
+PB_WIRE_FIXED32 = 5
+TRACE_SPAN_FIELD_TRACE_ID = 1
+TRACE_SPAN_FIELD_PARENT_SPAN_ID = 4
+TRACE_SPAN_FIELD_NAME = 5
+TRACE_SPAN_FIELD_START_TIME = 7
+TRACE_SPAN_FIELD_END_TIME = 8
+TRACE_SPAN_FIELD_STATUS = 15
+TRACE_STATUS_FIELD_CODE = 3
+# Not a wire field, the key of the status code in the scanned span fields.
+TRACE_SPAN_FIELD_STATUS_CODE = -1
+TRACE_STATUS_CODE_ERROR = 2
+
 if TYPE_CHECKING:
     # pylint: disable=no-name-in-module
     from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
     from socket import socket
+    from .base import PortforwardSession
+    from .proto.diagnostics_service_pb2 import Response
     from zipfile import ZipInfo
 
 
@@ -53,6 +98,26 @@ def _preprocess_stats(
     )
 
 
+def _preprocess_stats_all_namespaces(
+    diag_service_pod_prefix: str = AIO_BROKER_DIAGNOSTICS_SERVICE,
+) -> List[Tuple[str, str]]:
+    """
+    Namespace and name of every running diagnostics service pod on the cluster.
+    """
+    target_pods = get_namespaced_pods_by_prefix(prefix=diag_service_pod_prefix, namespace=None, as_dict=True)
+    running_pods = [
+        (pod["metadata"]["namespace"], pod["metadata"]["name"])
+        for pod in target_pods or []
+        if (pod.get("status") or {}).get("phase", "").lower() == PodState.running.value
+    ]
+    if not running_pods:
+        raise ResourceNotFoundError(
+            f"No diagnostics service pod '{diag_service_pod_prefix}' in phase "
+            f"'{PodState.running.value}' detected in any namespace."
+        )
+    return sorted(running_pods)
+
+
 def get_stats(
     namespace: Optional[str] = None,
     diag_service_pod_prefix: str = AIO_BROKER_DIAGNOSTICS_SERVICE,
@@ -61,22 +126,38 @@ def get_stats(
     raw_response_print=False,
     refresh_in_seconds: int = 10,
     watch: bool = False,
+    all_namespaces: bool = False,
+    metric_names: Optional[List[str]] = None,
+    group_by: Optional[List[str]] = None,
+    history_size: int = DEFAULT_STATS_HISTORY_SIZE,
+    stats_file: Optional[str] = None,
 ) -> Union[Dict[str, dict], str, None]:
-    namespace, diagnostic_pod = _preprocess_stats(namespace=namespace, diag_service_pod_prefix=diag_service_pod_prefix)
-
-    from rich import box
-    from rich.live import Live
-    from rich.table import Table
+    """
+    metric_names: List[str] metric family or sample names to show series of, instead of the key indicators.
+    group_by: List[str] label names the selected series are summed by.
+    history_size: int number of watch scrapes kept for rates, percentiles and trends.
+    stats_file: str local file each watch scrape is appended to, CSV or line-delimited JSON.
+    """
+    if all_namespaces:
+        return get_stats_all_namespaces(
+            diag_service_pod_prefix=diag_service_pod_prefix,
+            pod_metrics_port=pod_metrics_port,
+            raw_response_print=raw_response_print,
+            refresh_in_seconds=refresh_in_seconds,
+            watch=watch,
+            metric_names=metric_names,
+            group_by=group_by,
+            history_size=history_size,
+            stats_file=stats_file,
+        )
 
-    table = Table(box=box.MINIMAL_DOUBLE_HEAD)
-    table.add_column("Stat")
-    table.add_column("Value")
-    table.add_column("Description")
+    namespace, diagnostic_pod = _preprocess_stats(namespace=namespace, diag_service_pod_prefix=diag_service_pod_prefix)
 
-    with portforward_http(
+    # Watch refreshes reuse the session websocket and its keep-alive connection.
+    with portforward_session(
         namespace=namespace,
         pod_name=diagnostic_pod.metadata.name,
-        pod_port=pod_metrics_port,
+        ports=[pod_metrics_port],
     ) as pf:
         try:
             raw_metrics = pf.get("/metrics")
@@ -85,46 +166,345 @@ def get_stats(
             elif raw_response_print:
                 console.print(raw_metrics)
                 return
-            stats = dict(sorted(_clean_stats(raw_metrics).items()))
+            stats = _get_stats([parse_metrics(raw_metrics)], metric_names=metric_names, group_by=group_by)
             if not watch:
                 return stats
-            logger.warning(f"Refreshing every {refresh_in_seconds} seconds. Use ctrl-c to terminate stats watch.\n")
-            with Live(table, refresh_per_second=4, auto_refresh=False) as live:
-                while True:
-                    stats = dict(sorted(_clean_stats(raw_metrics).items()))
-                    table = Table(
-                        box=box.ROUNDED,
-                        caption=f"Last refresh {datetime.now().isoformat()}",
-                        highlight=True,
-                        expand=False,
-                        min_width=100,
-                    )
-                    table.add_column("Stat")
-                    table.add_column("Value", min_width=10)
-                    table.add_column("Description")
-                    for s in stats:
-                        table.add_row(
-                            stats[s]["displayName"],
-                            (
-                                "[green]Pass[/green]"
-                                if str(stats[s]["value"]) == "Pass"
-                                else "[red]Fail[/red]" if str(stats[s]["value"]) == "Fail" else str(stats[s]["value"])
-                            ),
-                            stats[s]["description"],
-                        )
-                    live.update(table)
-                    live.refresh()
-                    sleep(refresh_in_seconds)
-                    raw_metrics = pf.get("/metrics")
+            _watch_stats(
+                get_scoped_stats=lambda: {
+                    None: _get_stats([parse_metrics(pf.get("/metrics"))], metric_names=metric_names, group_by=group_by)
+                },
+                refresh_in_seconds=refresh_in_seconds,
+                scoped_stats={None: stats},
+                history_size=history_size,
+                stats_file=stats_file,
+            )
         except KeyboardInterrupt:
             return
+        except HTTPError as e:
+            logger.warning(f"Failure in stats processing\n\n{str(e)}")
+        except (OSError, HTTPException) as e:
+            # The portforward connection closed, i.e. the diagnostics pod restarted.
+            logger.debug(f"Stats connection closed: {e}")
+            return
         except Exception as e:
-            if str(e).startswith("HTTPConnectionPool"):
+            logger.warning(f"Failure in stats processing\n\n{str(e)}")
+
+
+def get_stats_all_namespaces(
+    diag_service_pod_prefix: str = AIO_BROKER_DIAGNOSTICS_SERVICE,
+    pod_metrics_port: int = METRICS_SERVICE_API_PORT,
+    raw_response_print=False,
+    refresh_in_seconds: int = 10,
+    watch: bool = False,
+    metric_names: Optional[List[str]] = None,
+    group_by: Optional[List[str]] = None,
+    history_size: int = DEFAULT_STATS_HISTORY_SIZE,
+    stats_file: Optional[str] = None,
+) -> Optional[Dict[str, dict]]:
+    """
+    Scrapes every running diagnostics service pod in parallel and aggregates the stats
+    per namespace and across the cluster.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import ExitStack
+
+    diagnostic_pods = _preprocess_stats_all_namespaces(diag_service_pod_prefix=diag_service_pod_prefix)
+
+    with ExitStack() as stack, ThreadPoolExecutor(
+        max_workers=min(len(diagnostic_pods), DEFAULT_STATS_CONCURRENCY)
+    ) as executor:
+        sessions = [
+            stack.enter_context(portforward_session(namespace=namespace, pod_name=pod_name, ports=[pod_metrics_port]))
+            for namespace, pod_name in diagnostic_pods
+        ]
+
+        def _scrape(session: "PortforwardSession") -> Optional[str]:
+            # A failing broker is reported and left out, the stats of the others still render.
+            try:
+                return session.get("/metrics")
+            except HTTPError as e:
+                logger.warning(
+                    f"Failure in stats processing of pod {session.pod_name} in namespace {session.namespace}"
+                    f"\n\n{str(e)}"
+                )
+            except (OSError, HTTPException) as e:
+                logger.warning(f"Stats connection to pod {session.pod_name} in namespace {session.namespace} closed.")
+                logger.debug(str(e))
+            except Exception as e:
+                logger.warning(f"Unable to fetch stats of pod {session.pod_name} in namespace {session.namespace}.")
+                logger.debug(str(e))
+
+        def _scrape_table(session: "PortforwardSession") -> Optional[MetricTable]:
+            raw_metrics = _scrape(session)
+            if raw_metrics is None:
+                return
+            try:
+                return parse_metrics(raw_metrics)
+            except Exception as e:
+                logger.warning(
+                    f"Failure in stats processing of pod {session.pod_name} in namespace {session.namespace}"
+                    f"\n\n{str(e)}"
+                )
+
+        def _get_scoped_stats() -> Dict[Optional[str], dict]:
+            namespaced_tables: Dict[str, List[MetricTable]] = {}
+            for session, table in zip(sessions, executor.map(_scrape_table, sessions)):
+                if table is None:
+                    continue
+                namespaced_tables.setdefault(session.namespace, []).append(table)
+            scoped_stats = {
+                namespace: _get_stats(tables, metric_names=metric_names, group_by=group_by)
+                for namespace, tables in sorted(namespaced_tables.items())
+            }
+            scoped_stats[None] = _get_stats(
+                [table for tables in namespaced_tables.values() for table in tables],
+                metric_names=metric_names,
+                group_by=group_by,
+            )
+            return scoped_stats
+
+        try:
+            if raw_response_print:
+                for session, raw_metrics in zip(sessions, executor.map(_scrape, sessions)):
+                    console.print(f"# {session.namespace}/{session.pod_name}\n{raw_metrics or ''}")
                 return
+            scoped_stats = _get_scoped_stats()
+            if not watch:
+                total = scoped_stats.pop(None)
+                return {"namespaces": scoped_stats, "total": total}
+            _watch_stats(
+                get_scoped_stats=_get_scoped_stats,
+                refresh_in_seconds=refresh_in_seconds,
+                scoped_stats=scoped_stats,
+                history_size=history_size,
+                stats_file=stats_file,
+            )
+        except KeyboardInterrupt:
+            return
+        except Exception as e:
             logger.warning(f"Failure in stats processing\n\n{str(e)}")
 
 
-def _clean_stats(raw_stats: str) -> dict:
+def _watch_stats(
+    get_scoped_stats: Callable[[], Dict[Optional[str], dict]],
+    refresh_in_seconds: int,
+    scoped_stats: Dict[Optional[str], dict],
+    history_size: int = DEFAULT_STATS_HISTORY_SIZE,
+    stats_file: Optional[str] = None,
+):
+    """
+    Live table of stats keyed by namespace, the None key holding the total or single namespace stats.
+
+    Numeric stats are kept in a history of the last history_size scrapes, from which the change per second,
+    p50, p99 and a sparkline trend are shown. With stats_file every scrape is also appended to that file.
+    """
+    from contextlib import ExitStack
+
+    from rich import box
+    from rich.live import Live
+    from rich.table import Table
+
+    history = SeriesHistory(capacity=history_size)
+    logger.warning(f"Refreshing every {refresh_in_seconds} seconds. Use ctrl-c to terminate stats watch.\n")
+    with ExitStack() as stack:
+        live = stack.enter_context(Live(Table(box=box.MINIMAL_DOUBLE_HEAD), refresh_per_second=4, auto_refresh=False))
+        recorder = stack.enter_context(StatsRecorder(file_path=stats_file)) if stats_file else None
+        while True:
+            scraped_at = datetime.now()
+            history.record(
+                {
+                    (scope, s): stats[s]["value"]
+                    for scope, stats in scoped_stats.items()
+                    for s in stats
+                    if _is_numeric(stats[s]["value"])
+                },
+                timestamp=scraped_at.timestamp(),
+            )
+            if recorder:
+                recorder.write(timestamp=scraped_at, scoped_stats=scoped_stats)
+
+            scoped = list(scoped_stats) != [None]
+            table = Table(
+                box=box.ROUNDED,
+                caption=f"Last refresh {scraped_at.isoformat()}",
+                highlight=True,
+                expand=False,
+                min_width=100,
+            )
+            table.add_column("Stat")
+            if scoped:
+                table.add_column("Namespace")
+            table.add_column("Value", min_width=10)
+            table.add_column("Δ/s")
+            table.add_column("p50")
+            table.add_column("p99")
+            table.add_column("Trend", no_wrap=True)
+            table.add_column("Description")
+            for s in sorted({s for stats in scoped_stats.values() for s in stats}):
+                for scope, stats in sorted(scoped_stats.items(), key=lambda item: (item[0] is None, item[0] or "")):
+                    if s not in stats:
+                        continue
+                    value = str(stats[s]["value"])
+                    key = (scope, s)
+                    row = [
+                        stats[s]["displayName"],
+                        (
+                            "[green]Pass[/green]"
+                            if value == "Pass"
+                            else "[red]Fail[/red]" if value == "Fail" else value
+                        ),
+                        _format_number(history.rate(key, counter=stats[s].get("type") == "counter")),
+                        _format_number(history.quantile(key, 0.5)),
+                        _format_number(history.quantile(key, 0.99)),
+                        history.sparkline(key, width=STATS_SPARKLINE_WIDTH),
+                        stats[s]["description"],
+                    ]
+                    if scoped:
+                        row.insert(1, scope if scope is not None else "[bold]Total[/bold]")
+                    table.add_row(*row)
+            live.update(table)
+            live.refresh()
+            sleep(refresh_in_seconds)
+            scoped_stats = get_scoped_stats()
+
+
+class StatsRecorder:
+    """
+    Appends watch scrapes to a local file. A file name ending with .csv gets rows of
+    timestamp, namespace, stat and value, otherwise one JSON object per scrape and namespace is written.
+    """
+
+    def __init__(self, file_path: str):
+        from ..util import normalize_dir
+
+        file_path = os.path.abspath(os.path.expanduser(file_path))
+        normalize_dir(dir_path=os.path.dirname(file_path))
+        self.file_path = file_path
+        self.is_csv = file_path.lower().endswith(".csv")
+        self._file = None
+        self._csv_writer = None
+
+    def __enter__(self) -> "StatsRecorder":
+        # pylint: disable-next=consider-using-with
+        self._file = open(self.file_path, mode="a", encoding="utf-8", newline="")
+        if self.is_csv:
+            import csv
+
+            self._csv_writer = csv.writer(self._file)
+            if not self._file.tell():
+                self._csv_writer.writerow(STATS_FILE_CSV_COLUMNS)
+        return self
+
+    def __exit__(self, *args):
+        self._file.close()
+
+    def write(self, timestamp: datetime, scoped_stats: Dict[Optional[str], dict]):
+        recorded_at = timestamp.astimezone().isoformat()
+        for scope, stats in scoped_stats.items():
+            if self.is_csv:
+                self._csv_writer.writerows([recorded_at, scope or "", s, stats[s]["value"]] for s in stats)
+            else:
+                record = {"timestamp": recorded_at, "namespace": scope, "stats": {s: stats[s]["value"] for s in stats}}
+                self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+
+def _is_numeric(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _format_number(value: Optional[float]) -> str:
+    return "" if value is None else f"{value:.5g}"
+
+
+def _get_stats(
+    tables: List[MetricTable], metric_names: Optional[List[str]] = None, group_by: Optional[List[str]] = None
+) -> Dict[str, dict]:
+    """
+    Stats of the scrapes of one or more diagnostics endpoints. These are the key indicators,
+    or with metric_names the series of the named metrics.
+    """
+    if metric_names:
+        merged_table = MetricTable()
+        for table in tables:
+            merged_table.extend(table)
+        return _select_stats(merged_table, metric_names=metric_names, group_by=group_by)
+
+    metrics = {}
+    for table in tables:
+        metrics = _merge_metrics(metrics, _reduce_metrics(table))
+    return dict(sorted(_normalize_metrics(metrics).items()))
+
+
+def _select_stats(table: MetricTable, metric_names: List[str], group_by: Optional[List[str]] = None) -> Dict[str, dict]:
+    result = {}
+    for metric_name in metric_names:
+        family = table.families.get(table.family_of(metric_name) or metric_name)
+        description = family.help if family else ""
+        if group_by:
+            series = [
+                (sample_name, tuple(zip(group_by, label_values)), value)
+                for (sample_name, label_values), value in table.sum_by(metric_name, by=group_by).items()
+            ]
+        else:
+            series = [(sample.name, sample.labels, sample.value) for sample in table.samples(name=metric_name)]
+        for sample_name, labels, value in series:
+            formatted_labels = format_labels(labels)
+            key = f"{sample_name}{{{formatted_labels}}}" if formatted_labels else sample_name
+            result[key] = {
+                "displayName": key,
+                "description": description,
+                "value": value,
+                "type": family.type if family else UNTYPED,
+            }
+    return dict(sorted(result.items()))
+
+
+def _combine_metric(key: str, current: float, value: float) -> float:
+    from ..common import MqDiagnosticPropertyIndex as keys
+
+    if key == keys.publishes_received_per_second.value or key == keys.publishes_sent_per_second.value:
+        return current + value
+    elif key == keys.publish_route_replication_correctness.value:
+        return current * value
+    elif key == keys.total_subscriptions.value or key == keys.connected_sessions.value:
+        return current + value
+    return value
+
+
+def _reduce_metrics(table: MetricTable) -> Dict[str, float]:
+    """
+    Reduces the series of a scrape to one value per sample name, with the key indicator rules.
+    """
+    result = {}
+    for sample in table.samples():
+        if sample.name not in result:
+            result[sample.name] = sample.value
+        else:
+            result[sample.name] = _combine_metric(sample.name, result[sample.name], sample.value)
+    return result
+
+
+def _merge_metrics(metrics: Dict[str, float], other: Dict[str, float]) -> Dict[str, float]:
+    """
+    Merges the parsed metrics of another diagnostics endpoint. Rates, sessions and subscriptions
+    are summed and replication correctness multiplied, latencies keep the worst endpoint.
+    """
+    from ..common import MqDiagnosticPropertyIndex as keys
+
+    latency_keys = [keys.publish_latency_mu_ms.value, keys.publish_latency_sigma_ms.value]
+    merged = dict(metrics)
+    for key, value in other.items():
+        if key not in merged:
+            merged[key] = value
+        elif key in latency_keys:
+            merged[key] = max(merged[key], value)
+        else:
+            merged[key] = _combine_metric(key, merged[key], value)
+    return merged
+
+
+def _normalize_metrics(result: Dict[str, float]) -> dict:
     from ..common import MqDiagnosticPropertyIndex as keys
 
     def _get_pass_fail(value: float) -> str:
@@ -133,38 +513,6 @@ def _clean_stats(raw_stats: str) -> dict:
         else:
             return "Fail"
 
-    result = {}
-    test = raw_stats.split("\n")
-    for line in test:
-        line = line.strip()
-        if not line:
-            continue
-        if line.startswith("#"):
-            continue
-        key = None
-        value = None
-        if "{" in line:
-            t = line.split("{")
-            key = t[0]
-            if len(t) > 1:
-                value = line.split("}")[-1]
-                value = float(value.strip())
-        else:
-            t = line.split(" ")
-            key = t[0]
-            value = float(t[1].strip())
-
-        if key not in result:
-            result[key] = value
-        else:
-            if key == keys.publishes_received_per_second.value or key == keys.publishes_sent_per_second.value:
-                result[key] = result[key] + value
-            elif key == keys.publish_route_replication_correctness.value:
-                result[key] = result[key] * value
-            elif key == keys.total_subscriptions.value or key == keys.connected_sessions.value:
-                result[key] = result[key] + value
-            else:
-                result[key] = value
     if result:
         normalized = {}
         if keys.publish_route_replication_correctness.value in result:
@@ -214,28 +562,122 @@ def _clean_stats(raw_stats: str) -> dict:
     return result
 
 
+class TraceSummary(NamedTuple):
+    trace_id: str
+    service_name: Optional[str]
+    span_name: str
+    start_time: datetime
+    duration_ms: float
+    error: bool
+
+
+class TraceQuery(NamedTuple):
+    """
+    Filters traces on the fields of their root span. Times are in UTC.
+    """
+
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    service_names: Optional[List[str]] = None
+    span_names: Optional[List[str]] = None
+    min_duration_ms: Optional[float] = None
+    errors_only: bool = False
+
+    def matches(self, summary: TraceSummary) -> bool:
+        return (
+            (not self.start_time or summary.start_time >= self.start_time)
+            and (not self.end_time or summary.start_time <= self.end_time)
+            and (not self.service_names or summary.service_name in self.service_names)
+            and (not self.span_names or summary.span_name in self.span_names)
+            and (self.min_duration_ms is None or summary.duration_ms >= self.min_duration_ms)
+            and (not self.errors_only or summary.error)
+        )
+
+
+class _ProcessedTrace(NamedTuple):
+    trace: dict
+    archive_pairs: List[Tuple["ZipInfo", Union[bytes, str]]]
+    summary: TraceSummary
+
+
+def build_trace_query(
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    service_names: Optional[List[str]] = None,
+    span_names: Optional[List[str]] = None,
+    min_duration_ms: Optional[float] = None,
+    errors_only: Optional[bool] = None,
+) -> Optional[TraceQuery]:
+    """
+    Trace query from command arguments, None when no filter is set. Times are ISO 8601, UTC if no offset is given.
+    """
+    if not any([start_time, end_time, service_names, span_names, min_duration_ms is not None, errors_only]):
+        return None
+    return TraceQuery(
+        start_time=_parse_query_time(start_time),
+        end_time=_parse_query_time(end_time),
+        service_names=service_names,
+        span_names=span_names,
+        min_duration_ms=min_duration_ms,
+        errors_only=bool(errors_only),
+    )
+
+
+def read_trace_index(
+    index_path: str, trace_ids: Optional[List[str]] = None, trace_query: Optional[TraceQuery] = None
+) -> Dict[str, dict]:
+    """
+    Entries of a trace index file, by hex trace Id, matching the trace ids and query if provided.
+    Each entry names the archive (path) and archive members of the trace, so they can be read
+    without scanning the archive.
+    """
+    with open(index_path, "r", encoding="utf-8") as f:
+        index: Dict[str, dict] = json.load(f)
+    archive_path = os.path.join(os.path.dirname(index_path), index["archive"])
+    result = {}
+    for trace_id, entry in index["traces"].items():
+        if trace_ids and trace_id not in trace_ids:
+            continue
+        if trace_query and not trace_query.matches(_get_index_entry_summary(trace_id, entry)):
+            continue
+        result[trace_id] = {**entry, "archive": archive_path}
+    return result
+
+
 def get_traces(
     namespace: Optional[str] = None,
     diag_service_pod_prefix: str = AIO_BROKER_DIAGNOSTICS_SERVICE,
     pod_protobuf_port: int = PROTOBUF_SERVICE_API_PORT,
     trace_ids: Optional[List[str]] = None,
     trace_dir: Optional[str] = None,
-) -> Union[List["TracesData"], List[Tuple["ZipInfo", str]], None]:
+    trace_query: Optional[TraceQuery] = None,
+    trace_index: bool = False,
+) -> Union[List["TracesData"], Iterator[Tuple["ZipInfo", Union[bytes, str]]], None]:
     """
     trace_ids: List[str] hex representation of trace Ids.
+    trace_query: TraceQuery only traces matching it are converted and kept.
+    trace_index: bool write an index of the traces alongside the trace zip, see read_trace_index.
+        With trace_ids, traces found in the indexes of trace_dir are read from their archives
+        and only the others are fetched.
+
+    For the support bundle the zip members of the traces are returned as an iterator,
+    fetched as they are consumed.
     """
     if not any([trace_ids, trace_dir]):
         raise ValueError("At least trace_ids or trace_dir is required.")
 
-    from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
-
-    from google.protobuf.json_format import MessageToDict
-    from rich.progress import MofNCompleteColumn, Progress
+    from zipfile import ZIP_DEFLATED, ZipFile
 
-    # pylint: disable=no-name-in-module
-    from .proto.diagnostics_service_pb2 import Request, Response, TraceRetrievalInfo
     from ..util import normalize_dir
 
+    indexed_traces: List[dict] = []
+    if trace_index and trace_dir and trace_ids and trace_ids[0] != "!support_bundle!":
+        indexed_traces, trace_ids = _read_indexed_traces(
+            trace_dir=trace_dir, trace_ids=trace_ids, trace_query=trace_query
+        )
+        if not trace_ids:
+            return indexed_traces or None
+
     namespace, diagnostic_pod = _preprocess_stats(namespace=namespace, diag_service_pod_prefix=diag_service_pod_prefix)
 
     for_support_bundle = False
@@ -247,119 +689,452 @@ def get_traces(
             for_support_bundle = True
         trace_ids = [binascii.unhexlify(t) for t in trace_ids]
 
+    processed_traces = _stream_traces(
+        namespace=namespace,
+        pod_name=diagnostic_pod.metadata.name,
+        pod_protobuf_port=pod_protobuf_port,
+        trace_ids=trace_ids,
+        archive=bool(trace_dir) or for_support_bundle,
+        show_progress=not (trace_ids or for_support_bundle),
+        trace_query=trace_query,
+    )
+    if for_support_bundle:
+        return (pair for processed in processed_traces for pair in processed.archive_pairs)
+
+    traces: List[dict] = []
+    if trace_dir:
+        normalized_dir_path = normalize_dir(dir_path=trace_dir)
+        normalized_dir_path = normalized_dir_path.joinpath(
+            f"broker_traces_{get_timestamp_now_utc(format='%Y%m%dT%H%M%S')}.zip"
+        )
+        # pylint: disable=consider-using-with
+        myzip = ZipFile(file=str(normalized_dir_path), mode="w", compression=ZIP_DEFLATED)
+
+    index_entries = {}
+    try:
+        for processed in processed_traces:
+            if trace_ids:
+                traces.append(processed.trace)
+            if trace_dir:
+                # Original OTLP and Tempo
+                for zinfo, data in processed.archive_pairs:
+                    myzip.writestr(zinfo_or_arcname=zinfo, data=data)
+                if trace_index:
+                    index_entries[processed.summary.trace_id] = _build_trace_index_entry(processed)
+    finally:
+        if trace_dir:
+            myzip.close()
+
+    if trace_dir and trace_index:
+        index_path = normalized_dir_path.with_suffix(TRACE_INDEX_SUFFIX)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump({"archive": normalized_dir_path.name, "traces": index_entries}, f, separators=(",", ":"))
+
+    traces = indexed_traces + traces
+    if traces:
+        return traces
+
+
+def _read_indexed_traces(
+    trace_dir: str, trace_ids: List[str], trace_query: Optional[TraceQuery] = None
+) -> Tuple[List[dict], List[str]]:
+    """
+    Traces of trace_ids found in the trace indexes of trace_dir, newest index first, and the trace ids
+    not found. Traces are read from the archive members named by the index, indexed traces not
+    matching the query are dropped without reading them.
+    """
+    from pathlib import Path
+    from zipfile import BadZipFile, ZipFile
+
+    from google.protobuf.json_format import MessageToDict
+
+    # pylint: disable=no-name-in-module
+    from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+    remaining = [trace_id.lower() for trace_id in trace_ids]
+    traces = []
+    for index_path in sorted(Path(trace_dir).expanduser().glob(f"*{TRACE_INDEX_SUFFIX}"), reverse=True):
+        if not remaining:
+            break
+        try:
+            entries = read_trace_index(str(index_path), trace_ids=remaining)
+            matching = {
+                trace_id: entry
+                for trace_id, entry in entries.items()
+                if not trace_query or trace_query.matches(_get_index_entry_summary(trace_id, entry))
+            }
+            if matching:
+                with ZipFile(next(iter(matching.values()))["archive"]) as myzip:
+                    members = [myzip.read(entry["otlpMember"]) for entry in matching.values()]
+        except (OSError, ValueError, KeyError, BadZipFile) as e:
+            logger.debug(f"Unable to look up traces in {index_path}:\n{e}")
+            continue
+
+        remaining = [trace_id for trace_id in remaining if trace_id not in entries]
+        for member in members if matching else []:
+            msg_dict = MessageToDict(message=TracesData.FromString(member), use_integers_for_enums=True)
+            # Normalized like fetched traces.
+            _determine_root_span(message_dict=msg_dict)
+            traces.append(msg_dict)
+    return traces, remaining
+
+
+def _stream_traces(
+    namespace: str,
+    pod_name: str,
+    pod_protobuf_port: int,
+    trace_ids: List[bytes],
+    archive: bool = False,
+    show_progress: bool = True,
+    trace_query: Optional[TraceQuery] = None,
+) -> Iterator[_ProcessedTrace]:
+    """
+    Fetches traces from the diagnostics service protobuf API.
+
+    The socket is only read to frame the responses. Decoding, conversion and serialization of the
+    traces run in a worker pool, with a bounded number in flight, and traces are yielded in order.
+    """
+    from collections import deque
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    from rich.progress import MofNCompleteColumn, Progress
+
+    # pylint: disable=no-name-in-module
+    from .proto.diagnostics_service_pb2 import Request, TraceRetrievalInfo
+
     with Progress(
         *Progress.get_default_columns(),
         MofNCompleteColumn(),
         transient=False,
-        disable=bool(trace_ids) or for_support_bundle,
-    ) as progress:
-        with portforward_socket(
-            namespace=namespace, pod_name=diagnostic_pod.metadata.name, pod_port=pod_protobuf_port
-        ) as socket:
-            request = Request(get_traces=TraceRetrievalInfo(trace_ids=trace_ids))
-            serialized_request = request.SerializeToString()
-            request_len_b = len(serialized_request).to_bytes(4, byteorder="big")
-
-            socket.sendall(request_len_b)
-            socket.sendall(serialized_request)
-
-            traces: List[dict] = []
-            if trace_dir:
-                normalized_dir_path = normalize_dir(dir_path=trace_dir)
-                normalized_dir_path = normalized_dir_path.joinpath(
-                    f"broker_traces_{get_timestamp_now_utc(format='%Y%m%dT%H%M%S')}.zip"
-                )
-                # pylint: disable=consider-using-with
-                myzip = ZipFile(file=str(normalized_dir_path), mode="w", compression=ZIP_DEFLATED)
+        disable=not show_progress,
+    ) as progress, portforward_socket(
+        namespace=namespace, pod_name=pod_name, pod_port=pod_protobuf_port
+    ) as socket, ThreadPoolExecutor(
+        max_workers=DEFAULT_TRACE_CONCURRENCY
+    ) as executor:
+        request = Request(get_traces=TraceRetrievalInfo(trace_ids=trace_ids))
+        serialized_request = request.SerializeToString()
+        request_len_b = len(serialized_request).to_bytes(4, byteorder="big")
+
+        socket.sendall(request_len_b)
+        socket.sendall(serialized_request)
+
+        pending: "deque[Future]" = deque()
+        progress_task = None
+
+        def _drain(max_pending: int) -> Iterator[_ProcessedTrace]:
+            while pending and (len(pending) > max_pending or pending[0].done()):
+                processed = pending.popleft().result()
+                if progress_task is not None:
+                    progress.update(progress_task, advance=1)
+                if processed:
+                    yield processed
+
+        for total_trace_count, response in _read_trace_frames(socket):
+            if progress_task is None and not progress.disable:
+                progress_task = progress.add_task("[deep_sky_blue4]Gathering traces...", total=total_trace_count)
+            pending.append(executor.submit(_process_trace, response, archive, trace_query))
+            yield from _drain(max_pending=TRACE_MAX_IN_FLIGHT)
+        yield from _drain(max_pending=0)
+
+
+def _read_trace_frames(socket: "socket") -> Iterator[Tuple[int, Union[memoryview, "Response"]]]:
+    """
+    Yields the expected number of traces and the payload of each response. The first response
+    is decoded for the number of traces and yielded decoded.
+    """
+    # pylint: disable=no-name-in-module
+    from .proto.diagnostics_service_pb2 import Response
+
+    # Frames are handed to workers, each is received into its own buffer rather than a reused one.
+    frame_reader = FrameReader(socket, reuse_buffer=False)
+    total_trace_count = 0
+    current_trace_count = 0
+    while not current_trace_count or current_trace_count < total_trace_count:
+        response_bytes = frame_reader.read_frame()
+
+        if response_bytes is None:
+            logger.warning("TCP socket closed. Trace processing aborted.")
+            return
+
+        current_trace_count = current_trace_count + 1
+        if not total_trace_count:
+            # Only the first response is decoded here, for the number of traces to expect.
+            first_response = Response.FromString(response_bytes)
+            total_trace_count = first_response.retrieved_trace.total_trace_count
+            if total_trace_count == 0:
+                logger.warning("No traces to fetch. Processing aborted.")
+                return
+            yield total_trace_count, first_response
+            continue
+
+        yield total_trace_count, response_bytes
 
-            progress_set = False
-            progress_task = None
-            total_trace_count = 0
-            current_trace_count = 0
-            try:
-                while True:
-                    if current_trace_count and current_trace_count >= total_trace_count:
-                        break
-                    rbytes = _fetch_bytes(socket, 4)
-                    response_size = int.from_bytes(rbytes, byteorder="big")
-                    response_bytes = _fetch_bytes(socket, response_size)
-
-                    if response_bytes == b"":
-                        logger.warning("TCP socket closed. Trace processing aborted.")
-                        return
-
-                    response = Response.FromString(response_bytes)
-                    current_trace_count = current_trace_count + 1
-
-                    if not total_trace_count:
-                        total_trace_count = response.retrieved_trace.total_trace_count
-                        if total_trace_count == 0:
-                            logger.warning("No traces to fetch. Processing aborted.")
-                            break
-
-                    if not progress.disable and not progress_set:
-                        progress_task = progress.add_task(
-                            "[deep_sky_blue4]Gathering traces...", total=response.retrieved_trace.total_trace_count
-                        )
-                        progress_set = True
-
-                    msg_dict = MessageToDict(message=response.retrieved_trace.trace, use_integers_for_enums=True)
-                    root_span, resource_name, timestamp = _determine_root_span(message_dict=msg_dict)
-
-                    if progress_set:
-                        progress.update(progress_task, advance=1)
-                    if not all([root_span, resource_name, timestamp]):
-                        logger.debug("Could not process root span. Skipping trace.")
-                        continue
 
-                    span_trace_id = root_span["traceId"]
-                    span_name = root_span["name"]
-
-                    if trace_ids:
-                        traces.append(msg_dict)
-                    if trace_dir or for_support_bundle:
-                        archive = f"{resource_name}.{span_name}.{span_trace_id}"
-                        pb_suffix = ".otlp.pb"
-                        tempo_suffix = ".tempo.json"
-
-                        datetime_tuple = tuple(timestamp.timetuple())
-                        zinfo_pb = ZipInfo(filename=f"{archive}{pb_suffix}", date_time=datetime_tuple)
-                        # Fixed in Py 3.9 https://github.com/python/cpython/issues/70373
-                        zinfo_pb.file_size = 0
-                        zinfo_pb.compress_size = 0
-
-                        zinfo_tempo = ZipInfo(filename=f"{archive}{tempo_suffix}", date_time=datetime_tuple)
-                        zinfo_tempo.file_size = 0
-                        zinfo_tempo.compress_size = 0
-
-                        otlp_format_pair = (zinfo_pb, response.retrieved_trace.trace.SerializeToString())
-                        tempo_format_pair = (
-                            zinfo_tempo,
-                            json.dumps(_convert_otlp_to_tempo(msg_dict), sort_keys=True),
-                        )
-
-                        if for_support_bundle:
-                            traces.append(otlp_format_pair)
-                            traces.append(tempo_format_pair)
-                            continue
-
-                        # Original OTLP
-                        myzip.writestr(
-                            zinfo_or_arcname=otlp_format_pair[0],
-                            data=otlp_format_pair[1],
-                        )
-                        # Tempo
-                        myzip.writestr(
-                            zinfo_or_arcname=tempo_format_pair[0],
-                            data=tempo_format_pair[1],
-                        )
-
-                if traces:
-                    return traces
-
-            finally:
-                if trace_dir:
-                    myzip.close()
+def _process_trace(
+    response: Union[bytes, memoryview, "Response"], archive: bool = False, trace_query: Optional[TraceQuery] = None
+) -> Optional[_ProcessedTrace]:
+    from zipfile import ZIP_DEFLATED, ZipInfo
+
+    from google.protobuf.json_format import MessageToDict
+
+    # pylint: disable=no-name-in-module
+    from .proto.diagnostics_service_pb2 import Response
+
+    summary = None
+    if trace_query and not isinstance(response, Response):
+        # Traces not matching the query are skipped from the root span fields alone, before the full parse.
+        try:
+            summary = _summarize_trace_response(response)
+        except ValueError as e:
+            logger.debug(f"Unable to scan trace response, parsing in full: {e}")
+        else:
+            if not summary:
+                logger.debug("Could not process root span. Skipping trace.")
+                return None
+            if not trace_query.matches(summary):
+                return None
+
+    if not isinstance(response, Response):
+        response = Response.FromString(response)
+    trace = response.retrieved_trace.trace
+    summary = summary or _summarize_trace(trace)
+    if not summary:
+        logger.debug("Could not process root span. Skipping trace.")
+        return None
+    if trace_query and not trace_query.matches(summary):
+        return None
+
+    msg_dict = MessageToDict(message=trace, use_integers_for_enums=True)
+    root_span, resource_name, timestamp = _determine_root_span(message_dict=msg_dict)
+    if not all([root_span, resource_name, timestamp]):
+        logger.debug("Could not process root span. Skipping trace.")
+        return None
+
+    archive_pairs = []
+    if archive:
+        archive_name = f"{resource_name}.{root_span['name']}.{root_span['traceId']}"
+        datetime_tuple = tuple(timestamp.timetuple())
+        for suffix, data in [
+            (TRACE_OTLP_SUFFIX, trace.SerializeToString()),
+            (TRACE_TEMPO_SUFFIX, json.dumps(_convert_otlp_to_tempo(msg_dict), sort_keys=True)),
+        ]:
+            zinfo = ZipInfo(filename=f"{archive_name}{suffix}", date_time=datetime_tuple)
+            zinfo.compress_type = ZIP_DEFLATED
+            # Fixed in Py 3.9 https://github.com/python/cpython/issues/70373
+            zinfo.file_size = 0
+            zinfo.compress_size = 0
+            archive_pairs.append((zinfo, data))
+
+    return _ProcessedTrace(trace=msg_dict, archive_pairs=archive_pairs, summary=summary)
+
+
+def _summarize_trace(trace: "TracesData") -> Optional[TraceSummary]:
+    """
+    Root span fields of a trace, read from the protobuf message. Like _determine_root_span
+    the last span without a parent is the root. A trace errored if any of its spans did.
+    """
+    from opentelemetry.proto.trace.v1.trace_pb2 import Status
+
+    root_span = None
+    service_name = None
+    error = False
+    for resource_span in trace.resource_spans:
+        for scope_span in resource_span.scope_spans:
+            for span in scope_span.spans:
+                if span.status.code == Status.STATUS_CODE_ERROR:
+                    error = True
+                if not span.parent_span_id:
+                    root_span = span
+                    service_name = next(
+                        (
+                            attribute.value.string_value or "unknown"
+                            for attribute in resource_span.resource.attributes
+                            if attribute.key == "service.name"
+                        ),
+                        None,
+                    )
+    if root_span is None:
+        return None
+    return TraceSummary(
+        trace_id=root_span.trace_id.hex(),
+        service_name=service_name,
+        span_name=root_span.name,
+        start_time=datetime.fromtimestamp(root_span.start_time_unix_nano / 1e9, tz=timezone.utc),
+        duration_ms=max(root_span.end_time_unix_nano - root_span.start_time_unix_nano, 0) / 1e6,
+        error=error,
+    )
+
+
+def _summarize_trace_response(response: Union[bytes, memoryview]) -> Optional[TraceSummary]:
+    """
+    Root span fields of a serialized trace response, like _summarize_trace, read from the protobuf
+    wire format. Only the span fields of the summary are decoded, everything else is skipped over.
+    Raises ValueError on malformed input.
+    """
+    root_span = None
+    service_name = None
+    error = False
+    for response_field, _, wrapper in _iter_pb_fields(memoryview(response)):
+        if response_field != 1 or not isinstance(wrapper, memoryview):
+            continue
+        for wrapper_field, _, traces_data in _iter_pb_fields(wrapper):
+            if wrapper_field != 1 or not isinstance(traces_data, memoryview):
+                continue
+            for traces_field, _, resource_span in _iter_pb_fields(traces_data):
+                if traces_field != 1 or not isinstance(resource_span, memoryview):
+                    continue
+                resource_service_name, resource_root_span, resource_error = _scan_resource_span(resource_span)
+                error = error or resource_error
+                if resource_root_span is not None:
+                    root_span = resource_root_span
+                    service_name = resource_service_name
+    if root_span is None:
+        return None
+    return TraceSummary(
+        trace_id=root_span[TRACE_SPAN_FIELD_TRACE_ID].hex(),
+        service_name=service_name,
+        span_name=root_span[TRACE_SPAN_FIELD_NAME].decode("utf-8"),
+        start_time=datetime.fromtimestamp(root_span[TRACE_SPAN_FIELD_START_TIME] / 1e9, tz=timezone.utc),
+        duration_ms=max(root_span[TRACE_SPAN_FIELD_END_TIME] - root_span[TRACE_SPAN_FIELD_START_TIME], 0) / 1e6,
+        error=error,
+    )
+
+
+def _scan_resource_span(resource_span: memoryview) -> Tuple[Optional[str], Optional[Dict[int, Any]], bool]:
+    """
+    Service name, last root span fields and whether any span errored, of a serialized ResourceSpans.
+    """
+    service_name = None
+    root_span = None
+    error = False
+    for field, _, value in _iter_pb_fields(resource_span):
+        if not isinstance(value, memoryview):
+            continue
+        if field == 1 and service_name is None:
+            # Resource, the first service.name attribute names the service.
+            for resource_field, _, attribute in _iter_pb_fields(value):
+                if resource_field != 1 or not isinstance(attribute, memoryview):
+                    continue
+                key, string_value = b"", b""
+                for attribute_field, _, attribute_value in _iter_pb_fields(attribute):
+                    if attribute_field == 1 and isinstance(attribute_value, memoryview):
+                        key = bytes(attribute_value)
+                    elif attribute_field == 2 and isinstance(attribute_value, memoryview):
+                        string_value = b""
+                        for any_field, _, any_value in _iter_pb_fields(attribute_value):
+                            if any_field == 1 and isinstance(any_value, memoryview):
+                                string_value = bytes(any_value)
+                if key == b"service.name":
+                    service_name = string_value.decode("utf-8") or "unknown"
+                    break
+        elif field == 2:
+            # ScopeSpans
+            for scope_field, _, span in _iter_pb_fields(value):
+                if scope_field != 2 or not isinstance(span, memoryview):
+                    continue
+                span_fields = _scan_span(span)
+                if span_fields[TRACE_SPAN_FIELD_STATUS_CODE] == TRACE_STATUS_CODE_ERROR:
+                    error = True
+                if not span_fields[TRACE_SPAN_FIELD_PARENT_SPAN_ID]:
+                    root_span = span_fields
+    return service_name, root_span, error
+
+
+def _scan_span(span: memoryview) -> Dict[int, Any]:
+    span_fields = {
+        TRACE_SPAN_FIELD_TRACE_ID: b"",
+        TRACE_SPAN_FIELD_PARENT_SPAN_ID: b"",
+        TRACE_SPAN_FIELD_NAME: b"",
+        TRACE_SPAN_FIELD_START_TIME: 0,
+        TRACE_SPAN_FIELD_END_TIME: 0,
+        TRACE_SPAN_FIELD_STATUS_CODE: 0,
+    }
+    for field, _, value in _iter_pb_fields(span):
+        if field == TRACE_SPAN_FIELD_STATUS:
+            if isinstance(value, memoryview):
+                for status_field, _, status_value in _iter_pb_fields(value):
+                    if status_field == TRACE_STATUS_FIELD_CODE and isinstance(status_value, int):
+                        span_fields[TRACE_SPAN_FIELD_STATUS_CODE] = status_value
+        elif field in span_fields:
+            span_fields[field] = bytes(value) if isinstance(value, memoryview) else value
+    return span_fields
+
+
+def _iter_pb_fields(data: memoryview) -> Iterator[Tuple[int, int, Union[int, memoryview]]]:
+    """
+    Field number, wire type and value of each field of a serialized protobuf message. Numeric values
+    are ints, length-delimited values are views of data, nothing is copied.
+    """
+    position = 0
+    end = len(data)
+    while position < end:
+        key, position = _read_pb_varint(data, position)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == PB_WIRE_VARINT:
+            value, position = _read_pb_varint(data, position)
+        elif wire_type == PB_WIRE_FIXED64:
+            value, position = int.from_bytes(data[position : position + 8], "little"), position + 8
+        elif wire_type == PB_WIRE_LENGTH_DELIMITED:
+            size, position = _read_pb_varint(data, position)
+            value, position = data[position : position + size], position + size
+        elif wire_type == PB_WIRE_FIXED32:
+            value, position = int.from_bytes(data[position : position + 4], "little"), position + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}.")
+        if position > end:
+            raise ValueError("Truncated protobuf message.")
+        yield field, wire_type, value
+
+
+def _read_pb_varint(data: memoryview, position: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    end = len(data)
+    while position < end:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+    raise ValueError("Truncated protobuf varint.")
+
+
+def _build_trace_index_entry(processed: _ProcessedTrace) -> dict:
+    members = [zinfo.filename for zinfo, _ in processed.archive_pairs]
+    return {
+        "otlpMember": next((m for m in members if m.endswith(TRACE_OTLP_SUFFIX)), None),
+        "tempoMember": next((m for m in members if m.endswith(TRACE_TEMPO_SUFFIX)), None),
+        "serviceName": processed.summary.service_name,
+        "spanName": processed.summary.span_name,
+        "startTime": processed.summary.start_time.isoformat(),
+        "durationMs": processed.summary.duration_ms,
+        "error": processed.summary.error,
+    }
+
+
+def _get_index_entry_summary(trace_id: str, entry: dict) -> TraceSummary:
+    return TraceSummary(
+        trace_id=trace_id,
+        service_name=entry["serviceName"],
+        span_name=entry["spanName"],
+        start_time=datetime.fromisoformat(entry["startTime"]),
+        duration_ms=entry["durationMs"],
+        error=entry["error"],
+    )
+
+
+def _parse_query_time(value: Optional[str]) -> Optional[datetime]:
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError as e:
+        raise InvalidArgumentValueError(f"'{value}' is not an ISO 8601 date time.") from e
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 
 def _determine_root_span(message_dict: dict) -> Tuple[str, str, Union[datetime, None]]:
@@ -400,33 +1175,21 @@ def _determine_root_span(message_dict: dict) -> Tuple[str, str, Union[datetime,
 
 def _convert_otlp_to_tempo(message_dict: dict) -> dict:
     """
-    Convert OTLP payload to Grafana Tempo.
+    Convert OTLP payload to Grafana Tempo. Only the renamed containers are built anew,
+    spans and attributes are shared with the OTLP payload.
     """
-    from copy import deepcopy
-
-    new_dict = deepcopy(message_dict)
-
-    new_dict["batches"] = new_dict.pop("resourceSpans")
-    for batch in new_dict.get("batches", []):
-        batch["instrumentationLibrarySpans"] = batch.pop("scopeSpans", [])
-        for inst_lib_span in batch.get("instrumentationLibrarySpans", []):
-            inst_lib_span["instrumentationLibrary"] = inst_lib_span.pop("scope", {})
-
-    return new_dict
-
-
-def _fetch_bytes(socket: "socket", size: int) -> bytes:
-    result_bytes = socket.recv(size)
-    if result_bytes == b"":
-        return result_bytes
-
-    result_bytes_len = len(result_bytes)
-    while result_bytes_len < size:
-        remaining_bytes_size = size - result_bytes_len
-        interm_bytes = socket.recv(remaining_bytes_size)
-        if interm_bytes == b"":
-            break
-        result_bytes += interm_bytes
-        result_bytes_len += len(interm_bytes)
-
-    return result_bytes
+    tempo_dict = {key: value for key, value in message_dict.items() if key != "resourceSpans"}
+    tempo_dict["batches"] = [
+        {
+            **{key: value for key, value in batch.items() if key != "scopeSpans"},
+            "instrumentationLibrarySpans": [
+                {
+                    **{key: value for key, value in scope_span.items() if key != "scope"},
+                    "instrumentationLibrary": scope_span.get("scope", {}),
+                }
+                for scope_span in batch.get("scopeSpans", [])
+            ],
+        }
+        for batch in message_dict["resourceSpans"]
+    ]
+    return tempo_dict
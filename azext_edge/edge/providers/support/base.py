@@ -4,50 +4,209 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import suppress
 from pathlib import PurePath
-from typing import List, Dict, Optional, Iterable, Tuple, TypeVar, Union
+from queue import Empty, Full, Queue
+from tempfile import SpooledTemporaryFile
+from threading import Event, Lock
+from typing import IO, Any, Callable, Deque, List, Dict, NamedTuple, Optional, Iterable, Iterator, Tuple, TypeVar, Union
 from functools import partial
+from itertools import chain
 
+import yaml
 from azext_edge.edge.common import BundleResourceKind, PodState
 from knack.log import get_logger
 from kubernetes.client.exceptions import ApiException
-from kubernetes.client.models import (
-    V1Container,
-    V1ObjectMeta,
-    V1PodSpec,
-    V1PodList,
-    V1ServiceList,
-    V1DeploymentList,
-    V1StatefulSetList,
-    V1ReplicaSetList,
-    V1DaemonSetList,
-    V1PersistentVolumeClaimList,
-    V1JobList,
-    V1CronJobList,
-)
+from urllib3 import HTTPResponse
+from urllib3.exceptions import HTTPError
 
 from ..edge_api import EdgeResourceApi
-from ..base import client, get_custom_objects
+from ..base import CLUSTER_SNAPSHOT, client, list_custom_object_pages, list_pages
+from ..command_context import get_command_context
+from .manifest import BundleManifest, get_capture_timestamp
 from ...util import get_timestamp_now_utc
 
 logger = get_logger(__name__)
-generic = client.ApiClient()
+
+K = TypeVar("K")
 
 DAY_IN_SECONDS: int = 60 * 60 * 24
 POD_STATUS_FAILED_EVICTED: str = "evicted"
-
-K8sRuntimeResources = TypeVar(
-    "K8sRuntimeResources",
-    V1ServiceList,
-    V1PodList,
-    V1DeploymentList,
-    V1StatefulSetList,
-    V1ReplicaSetList,
-    V1DaemonSetList,
-    V1PersistentVolumeClaimList,
-    V1JobList,
-    V1CronJobList,
-)
+DEFAULT_BUNDLE_CONCURRENCY: int = 4
+DEFAULT_LOG_CAPTURE_CONCURRENCY: int = 8
+# Entries a work item produces ahead of them being written, see iter_entries_in_order.
+DEFAULT_BUFFERED_ENTRIES: int = 16
+# (connect, read) timeout in seconds applied to every container log request.
+LOG_REQUEST_TIMEOUT: Tuple[int, int] = (10, 120)
+# Container logs are streamed in chunks and spill to disk beyond the in-memory spool size.
+LOG_STREAM_CHUNK_BYTES: int = 64 * 1024
+LOG_SPOOL_MAX_MEMORY_BYTES: int = 1024 * 1024
+# Pod and node metrics are listed per namespace from metrics.k8s.io, sampled once unless requested otherwise.
+METRICS_GROUP: str = "metrics.k8s.io"
+METRICS_VERSION: str = "v1beta1"
+NODE_METRICS_ZINFO: str = "nodes.metric.yaml"
+# Key of the pod and node metrics among the targets of CollectionPlan.fetch.
+METRICS_TARGET: str = "metrics"
+DEFAULT_METRIC_SAMPLES: int = 1
+DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS: int = 15
+# Runtime resource kinds listed repeatedly with different selectors across services.
+SNAPSHOT_PRIMED_KINDS: List[str] = [
+    BundleResourceKind.pod.value,
+    BundleResourceKind.deployment.value,
+    BundleResourceKind.replicaset.value,
+    BundleResourceKind.service.value,
+    BundleResourceKind.daemonset.value,
+    BundleResourceKind.statefulset.value,
+]
+
+
+class LogTarget(NamedTuple):
+    namespace: str
+    pod_name: str
+    container_name: str
+    previous: bool
+
+
+class CollectionPlan:
+    """
+    Container log and pod metric targets of all bundle services, resolved before any is fetched.
+
+    Services select pods with overlapping selectors, each resolves to the same targets.
+    A target is fetched once and written under the directory of every service that selected it.
+    Pod metrics are listed per namespace together with node metrics, rather than requested per pod.
+
+    Targets are planned by process_v1_pods callers while the plan is the collection_plan of the command context.
+    """
+
+    def __init__(
+        self,
+        metric_samples: int = DEFAULT_METRIC_SAMPLES,
+        metric_interval_seconds: float = DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS,
+    ):
+        self.metric_samples = metric_samples
+        self.metric_interval_seconds = metric_interval_seconds
+        self.log_targets: Dict[LogTarget, Tuple[List[str], int]] = {}
+        self.metric_targets: Dict[Tuple[str, str], List[str]] = {}
+        self.planned_requests = 0
+        self._lock = Lock()
+
+    def add_log_target(self, target: LogTarget, directory_path: str, since_seconds: int):
+        with self._lock:
+            self.planned_requests += 1
+            directory_paths, planned_since_seconds = self.log_targets.get(target, ([], since_seconds))
+            if directory_path not in directory_paths:
+                directory_paths.append(directory_path)
+            self.log_targets[target] = (directory_paths, max(since_seconds, planned_since_seconds))
+
+    def add_metric_target(self, namespace: str, pod_name: str, directory_path: str):
+        with self._lock:
+            # Selected alone, a pod's metrics take a request per sample.
+            self.planned_requests += self.metric_samples
+            directory_paths = self.metric_targets.setdefault((namespace, pod_name), [])
+            if directory_path not in directory_paths:
+                directory_paths.append(directory_path)
+
+    @property
+    def metric_namespaces(self) -> List[str]:
+        return sorted({namespace for namespace, _ in self.metric_targets})
+
+    @property
+    def request_count(self) -> int:
+        metric_requests = (len(self.metric_namespaces) + 1) * self.metric_samples if self.metric_targets else 0
+        return len(self.log_targets) + metric_requests
+
+    @property
+    def saved_requests(self) -> int:
+        return self.planned_requests - self.request_count
+
+    @property
+    def target_count(self) -> int:
+        """
+        Work items of fetch, a container log target each and one for all metrics.
+        """
+        return len(self.log_targets) + (1 if self.metric_targets else 0)
+
+    def fetch(
+        self, concurrency: int = DEFAULT_LOG_CAPTURE_CONCURRENCY, manifest: Optional[BundleManifest] = None
+    ) -> Iterator[Tuple[Union[LogTarget, str], Iterator[dict]]]:
+        """
+        Fetches every target once and yields each with its entries in target order, as they complete.
+        At most concurrency container log requests are in flight and a bounded number of completed targets
+        wait to be consumed, see iter_entries_in_order. Pod and node metrics are sampled while container
+        logs are captured and yielded last as the METRICS_TARGET. With a manifest, logs are requested
+        from the previous capture on.
+        """
+        v1_api = client.CoreV1Api()
+        work: List[Tuple[Union[LogTarget, str], Callable[[], Union[dict, List[dict], None]]]] = [
+            (
+                target,
+                partial(
+                    _capture_planned_target,
+                    capture=partial(
+                        _capture_pod_container_log,
+                        container_name=target.container_name,
+                        pod_name=target.pod_name,
+                        pod_namespace=target.namespace,
+                        v1_api=v1_api,
+                        capture_previous=target.previous,
+                        since_seconds=since_seconds,
+                        manifest=manifest,
+                    ),
+                    directory_paths=directory_paths,
+                    manifest=manifest,
+                    get_zinfo=partial(
+                        _get_pod_container_log_zinfo,
+                        container_name=target.container_name,
+                        pod_name=target.pod_name,
+                        pod_namespace=target.namespace,
+                        capture_previous=target.previous,
+                    ),
+                ),
+            )
+            for target, (directory_paths, since_seconds) in sorted(self.log_targets.items())
+        ]
+        with ThreadPoolExecutor(max_workers=1) as sampler, ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if self.metric_targets:
+                work.append((METRICS_TARGET, sampler.submit(self._sample_metrics).result))
+            yield from iter_entries_in_order(work, executor=executor, max_pending=2 * concurrency)
+
+    def _sample_metrics(self) -> List[dict]:
+        pod_samples: Dict[Tuple[str, str], List[dict]] = {}
+        node_samples: List[dict] = []
+        for sample in range(self.metric_samples):
+            if sample:
+                time.sleep(self.metric_interval_seconds)
+            for namespace in self.metric_namespaces:
+                for pod_name, metric in list_pod_metrics(namespace=namespace).items():
+                    if (namespace, pod_name) in self.metric_targets:
+                        pod_samples.setdefault((namespace, pod_name), []).append(metric)
+            node_samples.extend(list_node_metrics())
+
+        entries = []
+        if node_samples:
+            entries.append(
+                {"data": _as_metrics_list(node_samples, kind="NodeMetricsList"), "zinfo": NODE_METRICS_ZINFO}
+            )
+        for (namespace, pod_name), directory_paths in sorted(self.metric_targets.items()):
+            samples = pod_samples.get((namespace, pod_name))
+            if not samples:
+                continue
+            # A single sample keeps the PodMetrics shape, repeated samples are kept in order as a list.
+            data = samples[0] if len(samples) == 1 else _as_metrics_list(samples, kind="PodMetricsList")
+            for directory_path in directory_paths:
+                entries.append({"data": data, "zinfo": f"{namespace}/{directory_path}/pod.{pod_name}.metric.yaml"})
+        return entries
+
+    def as_dict(self) -> dict:
+        return {
+            "plannedRequests": self.planned_requests,
+            "metricSamples": self.metric_samples,
+            "requests": self.request_count,
+            "savedRequests": self.saved_requests,
+        }
 
 
 def process_crd(
@@ -58,31 +217,23 @@ def process_crd(
     directory_path: str,
     file_prefix: Optional[str] = None,
     namespace: Optional[str] = None,
-) -> List[dict]:
-    result: dict = get_custom_objects(
-        group=group,
-        version=version,
-        plural=plural,
-        use_cache=False,
-    )
+) -> Iterator[dict]:
     if not file_prefix:
         file_prefix = kind
 
-    processed = []
-    namespaces = []
-    for r in result.get("items", []):
-        if not namespace:
-            namespace = r["metadata"]["namespace"]
-        namespaces.append(namespace)
-        name = r["metadata"]["name"]
-        processed.append(
-            {
-                "data": r,
-                "zinfo": f"{namespace}/{directory_path}/{file_prefix}.{version}.{name}.yaml",
-            }
-        )
-
-    return processed
+    try:
+        # Each page is handed to the bundle writer before the next one is requested.
+        for page in list_custom_object_pages(group=group, version=version, plural=plural):
+            for r in page.get("items", []):
+                if not namespace:
+                    namespace = r["metadata"]["namespace"]
+                name = r["metadata"]["name"]
+                yield {
+                    "data": r,
+                    "zinfo": f"{namespace}/{directory_path}/{file_prefix}.{version}.{name}.yaml",
+                }
+    except ApiException as ae:
+        logger.debug(str(ae))
 
 
 def process_v1_pods(
@@ -96,67 +247,76 @@ def process_v1_pods(
     exclude_prefixes: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    from kubernetes.client.models import V1Pod
-
     v1_api = client.CoreV1Api()
-    custom_api = client.CustomObjectsApi()
 
     processed = []
+    # Pod metrics are listed once per namespace and joined to the pods by name.
+    pod_metrics: Dict[str, Dict[str, dict]] = {}
+    log_work: List[Callable[[], Optional[dict]]] = []
     if not prefix_names:
         prefix_names = []
 
-    if namespace:
-        pods: V1PodList = v1_api.list_namespaced_pod(namespace=namespace, label_selector=label_selector)
-    else:
-        pods: V1PodList = v1_api.list_pod_for_all_namespaces(label_selector=label_selector)
+    pods: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.pod.value, namespace=namespace, label_selector=label_selector
+    )
 
     if exclude_prefixes:
         pods = exclude_resources_with_prefix(pods, exclude_prefixes)
 
-    pod_logger_info = f"Detected {len(pods.items)} pods"
+    plan = get_command_context().collection_plan
+    pod_logger_info = f"Detected {len(pods['items'])} pods"
     if label_selector:
         pod_logger_info = f"{pod_logger_info} with label '{label_selector}'."
     logger.info(pod_logger_info)
-    for pod in pods.items:
-        p: V1Pod = pod
-        pod_metadata: V1ObjectMeta = p.metadata
-        pod_namespace: str = pod_metadata.namespace
-        pod_name: str = pod_metadata.name
+    for pod in pods["items"]:
+        pod_metadata: dict = pod["metadata"]
+        pod_namespace: str = pod_metadata["namespace"]
+        pod_name: str = pod_metadata["name"]
 
         if prefix_names:
             matched_prefix = [pod_name.startswith(prefix) for prefix in prefix_names]
             if not any(matched_prefix):
                 continue
 
-        # TODO: Workaround
-        p.api_version = pods.api_version
-        p.kind = "Pod"
         processed.append(
             {
-                "data": generic.sanitize_for_serialization(obj=p),
+                "data": _annotate_list_item(pod, resources=pods, kind=BundleResourceKind.pod.value),
                 "zinfo": f"{pod_namespace}/{directory_path}/pod.{pod_name}.yaml",
             }
         )
-        pod_spec: V1PodSpec = p.spec
-        pod_containers: List[V1Container] = pod_spec.containers
+        pod_spec: dict = pod.get("spec") or {}
+        pod_containers: List[dict] = list(pod_spec.get("containers") or [])
 
         if pod_prefix_for_init_container_logs:
             # check if pod name starts with any prefix in pod_prefix_for_init_container_logs
             if any(pod_name.startswith(prefix) for prefix in pod_prefix_for_init_container_logs):
-                init_pod_containers: List[V1Container] = pod_spec.init_containers
+                init_pod_containers: List[dict] = pod_spec.get("initContainers") or []
                 pod_containers.extend(init_pod_containers)
 
         # exclude evicted pods from log capture since they are not accessible
-        pod_status = pod.status
+        pod_status: dict = pod.get("status")
         if (
             pod_status
-            and pod_status.phase == PodState.failed.value
-            and str(pod_status.reason).lower() == POD_STATUS_FAILED_EVICTED
+            and pod_status.get("phase") == PodState.failed.value
+            and str(pod_status.get("reason")).lower() == POD_STATUS_FAILED_EVICTED
         ):
             logger.info(f"Pod {pod_name} in namespace {pod_namespace} is evicted. Skipping log capture.")
+        elif plan:
+            for container in pod_containers:
+                for capture_previous in [False, True] if capture_previous_logs else [False]:
+                    plan.add_log_target(
+                        target=LogTarget(
+                            namespace=pod_namespace,
+                            pod_name=pod_name,
+                            container_name=container["name"],
+                            previous=capture_previous,
+                        ),
+                        directory_path=directory_path,
+                        since_seconds=since_seconds,
+                    )
         else:
-            processed.extend(
-                _capture_pod_container_logs(
+            log_work.extend(
+                _assemble_pod_container_log_work(
                     directory_path=directory_path,
                     pod_containers=pod_containers,
                     pod_name=pod_name,
@@ -168,11 +328,12 @@ def process_v1_pods(
             )
 
         if include_metrics:
-            try:
-                logger.debug(f"Fetching runtime metrics for {pod_name}")
-                metric: dict = custom_api.get_namespaced_custom_object(
-                    "metrics.k8s.io", "v1beta1", pod_namespace, "pods", pod_name
-                )
+            if plan:
+                plan.add_metric_target(namespace=pod_namespace, pod_name=pod_name, directory_path=directory_path)
+            else:
+                if pod_namespace not in pod_metrics:
+                    pod_metrics[pod_namespace] = list_pod_metrics(namespace=pod_namespace)
+                metric = pod_metrics[pod_namespace].get(pod_name)
                 if metric:
                     processed.append(
                         {
@@ -180,9 +341,8 @@ def process_v1_pods(
                             "zinfo": f"{pod_namespace}/{directory_path}/pod.{pod_name}.metric.yaml",
                         }
                     )
-            except ApiException as e:
-                logger.debug(e.body)
 
+    processed.extend(_run_log_capture(log_work))
     return processed
 
 
@@ -194,16 +354,12 @@ def process_deployments(
     exclude_prefixes: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    v1_apps = client.AppsV1Api()
-
-    if namespace:
-        deployments: V1DeploymentList = v1_apps.list_namespaced_deployment(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
-        )
-    else:
-        deployments: V1DeploymentList = v1_apps.list_deployment_for_all_namespaces(
-            label_selector=label_selector, field_selector=field_selector
-        )
+    deployments: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.deployment.value,
+        namespace=namespace,
+        label_selector=label_selector,
+        field_selector=field_selector,
+    )
 
     return _process_kubernetes_resources(
         directory_path=directory_path,
@@ -220,9 +376,8 @@ def process_statefulset(
     field_selector: Optional[str] = None,
     label_selector: Optional[str] = None,
 ) -> Union[Tuple[List[dict], dict], List[dict]]:
-    v1_apps = client.AppsV1Api()
-    statefulsets: V1StatefulSetList = v1_apps.list_stateful_set_for_all_namespaces(
-        label_selector=label_selector, field_selector=field_selector
+    statefulsets: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.statefulset.value, label_selector=label_selector, field_selector=field_selector
     )
     namespace_pods_work = {}
 
@@ -232,8 +387,8 @@ def process_statefulset(
         kind=BundleResourceKind.statefulset.value,
     )
 
-    for statefulset in statefulsets.items:
-        statefulset_namespace: str = statefulset.metadata.namespace
+    for statefulset in statefulsets["items"]:
+        statefulset_namespace: str = statefulset["metadata"]["namespace"]
 
         if statefulset_namespace not in namespace_pods_work:
             namespace_pods_work[statefulset_namespace] = True
@@ -252,16 +407,12 @@ def process_services(
     exclude_prefixes: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    v1_api = client.CoreV1Api()
-
-    if namespace:
-        services: V1ServiceList = v1_api.list_namespaced_service(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
-        )
-    else:
-        services: V1ServiceList = v1_api.list_service_for_all_namespaces(
-            label_selector=label_selector, field_selector=field_selector
-        )
+    services: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.service.value,
+        namespace=namespace,
+        label_selector=label_selector,
+        field_selector=field_selector,
+    )
 
     return _process_kubernetes_resources(
         directory_path=directory_path,
@@ -279,14 +430,9 @@ def process_replicasets(
     exclude_prefixes: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    v1_apps = client.AppsV1Api()
-
-    if namespace:
-        replicasets: V1ReplicaSetList = v1_apps.list_namespaced_replica_set(
-            namespace=namespace, label_selector=label_selector
-        )
-    else:
-        replicasets: V1ReplicaSetList = v1_apps.list_replica_set_for_all_namespaces(label_selector=label_selector)
+    replicasets: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.replicaset.value, namespace=namespace, label_selector=label_selector
+    )
 
     return _process_kubernetes_resources(
         directory_path=directory_path,
@@ -304,16 +450,12 @@ def process_daemonsets(
     prefix_names: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    v1_apps = client.AppsV1Api()
-
-    if namespace:
-        daemonsets: V1DaemonSetList = v1_apps.list_namespaced_daemon_set(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
-        )
-    else:
-        daemonsets: V1DaemonSetList = v1_apps.list_daemon_set_for_all_namespaces(
-            label_selector=label_selector, field_selector=field_selector
-        )
+    daemonsets: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.daemonset.value,
+        namespace=namespace,
+        label_selector=label_selector,
+        field_selector=field_selector,
+    )
 
     return _process_kubernetes_resources(
         directory_path=directory_path,
@@ -329,9 +471,8 @@ def process_config_maps(
     label_selector: Optional[str] = None,
     prefix_names: Optional[List[str]] = None,
 ) -> List[dict]:
-    v1_api = client.CoreV1Api()
-    config_maps = v1_api.list_config_map_for_all_namespaces(
-        label_selector=label_selector, field_selector=field_selector
+    config_maps = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.configmap.value, label_selector=label_selector, field_selector=field_selector
     )
 
     return _process_kubernetes_resources(
@@ -342,11 +483,8 @@ def process_config_maps(
     )
 
 
-def process_nodes() -> Dict[str, Union[dict, str]]:
-    return {
-        "data": generic.sanitize_for_serialization(obj=client.CoreV1Api().list_node()),
-        "zinfo": "nodes.yaml",
-    }
+def process_nodes() -> Iterator[dict]:
+    return _process_list_pages(list_func=client.CoreV1Api().list_node, file_name="nodes")
 
 
 def get_mq_namespaces() -> List[str]:
@@ -360,32 +498,48 @@ def get_mq_namespaces() -> List[str]:
     return namespaces
 
 
-def process_events() -> List[dict]:
-    event_content = []
+def process_events() -> Iterator[dict]:
+    return _process_list_pages(list_func=client.CoreV1Api().list_event_for_all_namespaces, file_name="events")
 
-    core_v1_api = client.CoreV1Api()
-    event_content.append(
-        {
-            "data": generic.sanitize_for_serialization(obj=core_v1_api.list_event_for_all_namespaces()),
-            "zinfo": "events.yaml",
-        }
-    )
 
-    return event_content
+def _process_list_pages(list_func: Callable[..., Any], file_name: str) -> Iterator[dict]:
+    """
+    Raw JSON pages of a cluster wide list streamed into <file_name>.yaml, the same document as the whole
+    list serialized at once. Each page is serialized before the next one is requested.
+    """
+    data = SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_MEMORY_BYTES)
+    try:
+        pages = list_pages(list_func)
+        first_page: dict = next(pages)
+        list_fields = {key: value for key, value in first_page.items() if key != "items"}
+        (list_fields.get("metadata") or {}).pop("remainingItemCount", None)
 
+        # Keys are serialized sorted, fields sorting before items are written first.
+        _write_yaml(data, {key: value for key, value in list_fields.items() if key < "items"})
+        has_items = False
+        for page in chain([first_page], pages):
+            for item in page.get("items") or []:
+                if not has_items:
+                    data.write(b"items:\n")
+                    has_items = True
+                # A top level sequence is indented as the items sequence of the list.
+                _write_yaml(data, [item])
+        if not has_items:
+            data.write(b"items: []\n")
+        _write_yaml(data, {key: value for key, value in list_fields.items() if key > "items"})
+    except Exception:
+        data.close()
+        raise
+    yield {"data": data, "zinfo": f"{file_name}.yaml"}
 
-def process_storage_classes() -> List[dict]:
-    storage_class_content = []
 
-    storage_v1_api = client.StorageV1Api()
-    storage_class_content.append(
-        {
-            "data": generic.sanitize_for_serialization(obj=storage_v1_api.list_storage_class()),
-            "zinfo": "storage-classes.yaml",
-        }
-    )
+def _write_yaml(stream: IO[bytes], data: Union[dict, list]):
+    if data:
+        stream.write(yaml.safe_dump(data, indent=2).encode("utf-8"))
 
-    return storage_class_content
+
+def process_storage_classes() -> Iterator[dict]:
+    return _process_list_pages(list_func=client.StorageV1Api().list_storage_class, file_name="storage-classes")
 
 
 def process_persistent_volume_claims(
@@ -395,16 +549,12 @@ def process_persistent_volume_claims(
     prefix_names: Optional[List[str]] = None,
     namespace: Optional[str] = None,
 ) -> List[dict]:
-    v1_api = client.CoreV1Api()
-
-    if namespace:
-        pvcs: V1PersistentVolumeClaimList = v1_api.list_namespaced_persistent_volume_claim(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
-        )
-    else:
-        pvcs: V1PersistentVolumeClaimList = v1_api.list_persistent_volume_claim_for_all_namespaces(
-            label_selector=label_selector, field_selector=field_selector
-        )
+    pvcs: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.pvc.value,
+        namespace=namespace,
+        label_selector=label_selector,
+        field_selector=field_selector,
+    )
 
     return _process_kubernetes_resources(
         directory_path=directory_path,
@@ -421,9 +571,8 @@ def process_jobs(
     prefix_names: Optional[List[str]] = None,
     exclude_prefixes: Optional[List[str]] = None,
 ) -> List[dict]:
-    batch_v1_api = client.BatchV1Api()
-    jobs: V1JobList = batch_v1_api.list_job_for_all_namespaces(
-        label_selector=label_selector, field_selector=field_selector
+    jobs: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.job.value, label_selector=label_selector, field_selector=field_selector
     )
 
     return _process_kubernetes_resources(
@@ -441,9 +590,8 @@ def process_cron_jobs(
     label_selector: Optional[str] = None,
     prefix_names: Optional[List[str]] = None,
 ) -> List[dict]:
-    batch_v1_api = client.BatchV1Api()
-    cron_jobs: V1CronJobList = batch_v1_api.list_cron_job_for_all_namespaces(
-        label_selector=label_selector, field_selector=field_selector
+    cron_jobs: dict = CLUSTER_SNAPSHOT.list_resources(
+        kind=BundleResourceKind.cronjob.value, label_selector=label_selector, field_selector=field_selector
     )
 
     return _process_kubernetes_resources(
@@ -496,17 +644,122 @@ def default_bundle_name(system_name: str) -> str:
     return f"support_bundle_{timestamp}_{system_name}.zip"
 
 
-def _capture_pod_container_logs(
+class _WorkError(NamedTuple):
+    error: Exception
+
+
+_WORK_DONE = object()
+
+
+def iter_entries_in_order(
+    work: Iterable[Tuple[K, Callable[[], Union[dict, Iterable[dict], None]]]],
+    executor: Executor,
+    max_pending: int,
+    max_buffered: int = DEFAULT_BUFFERED_ENTRIES,
+) -> Iterator[Tuple[K, Iterator[dict]]]:
+    """
+    Runs keyed work items on executor and yields the key and entries of each in submission order,
+    entries as they are produced. Bundle content, including which of the entries sharing an archive path
+    comes first, therefore does not depend on thread timing.
+
+    At most max_pending work items run or wait ahead of the one being consumed and each buffers at most
+    max_buffered entries. The exception of a work item is raised while consuming its entries. Entries
+    left unconsumed are discarded and their data closed.
+    """
+    cancelled = Event()
+    pending: Deque[Tuple[K, Queue]] = deque()
+    work_iter = iter(work)
+
+    def _put(buffer: Queue, item: Any) -> bool:
+        while not cancelled.is_set():
+            with suppress(Full):
+                buffer.put(item, timeout=0.1)
+                return True
+        return False
+
+    def _produce(func: Callable[[], Union[dict, Iterable[dict], None]], buffer: Queue):
+        try:
+            entries = func()
+            for entry in [entries] if isinstance(entries, dict) else entries or []:
+                if entry and not _put(buffer, entry):
+                    _close_entry_data(entry)
+                    return
+        except Exception as e:
+            _put(buffer, _WorkError(e))
+        finally:
+            _put(buffer, _WORK_DONE)
+
+    def _consume(buffer: Queue) -> Iterator[dict]:
+        while True:
+            item = buffer.get()
+            if item is _WORK_DONE:
+                return
+            if isinstance(item, _WorkError):
+                raise item.error
+            yield item
+
+    def _submit_next() -> bool:
+        key, func = next(work_iter, (None, None))
+        if func is None:
+            return False
+        buffer = Queue(maxsize=max_buffered)
+        # The executor runs work items first in, first out, so the item being consumed is always running.
+        executor.submit(_produce, func, buffer)
+        pending.append((key, buffer))
+        return True
+
+    try:
+        while len(pending) < max_pending and _submit_next():
+            pass
+        while pending:
+            key, buffer = pending[0]
+            entries = _consume(buffer)
+            yield key, entries
+            # Entries the consumer did not read are discarded rather than left blocking their producer.
+            with suppress(Exception):
+                for entry in entries:
+                    _close_entry_data(entry)
+            pending.popleft()
+            _submit_next()
+    finally:
+        cancelled.set()
+        for _, buffer in pending:
+            with suppress(Empty):
+                while True:
+                    item = buffer.get_nowait()
+                    if isinstance(item, dict):
+                        _close_entry_data(item)
+
+
+def _close_entry_data(entry: dict):
+    data = entry.get("data")
+    if hasattr(data, "close"):
+        data.close()
+
+
+def _run_log_capture(
+    log_work: List[Callable[[], Optional[dict]]], concurrency: int = DEFAULT_LOG_CAPTURE_CONCURRENCY
+) -> List[dict]:
+    if not log_work:
+        return []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda work: work(), log_work))
+
+    # map preserves submission order, keeping bundle content deterministic
+    return [result for result in results if result]
+
+
+def _assemble_pod_container_log_work(
     directory_path: str,
-    pod_containers: List[V1Container],
+    pod_containers: List[dict],
     pod_name: str,
     pod_namespace: str,
     v1_api: client.CoreV1Api,
     capture_previous_logs: bool = True,
     since_seconds: int = DAY_IN_SECONDS,
-) -> List[dict]:
-
-    processed = []
+) -> List[Callable[[], Optional[dict]]]:
+    log_work = []
     capture_previous_log_runs = [False]
 
     if capture_previous_logs:
@@ -514,33 +767,144 @@ def _capture_pod_container_logs(
 
     for container in pod_containers:
         for capture_previous in capture_previous_log_runs:
-            try:
-                logger_debug_previous = "previous run " if capture_previous else ""
-                logger.debug(f"Reading {logger_debug_previous}log from pod {pod_name} container {container.name}")
-                log: str = v1_api.read_namespaced_pod_log(
-                    name=pod_name,
-                    namespace=pod_namespace,
+            log_work.append(
+                partial(
+                    _capture_pod_container_log,
+                    directory_path=directory_path,
+                    container_name=container["name"],
+                    pod_name=pod_name,
+                    pod_namespace=pod_namespace,
+                    v1_api=v1_api,
+                    capture_previous=capture_previous,
                     since_seconds=since_seconds,
-                    container=container.name,
-                    previous=capture_previous,
-                )
-                zinfo_previous_segment = "previous." if capture_previous else ""
-                zinfo = f"{pod_namespace}/{directory_path}/pod.{pod_name}.{container.name}.{zinfo_previous_segment}log"
-                processed.append(
-                    {
-                        "data": log,
-                        "zinfo": zinfo,
-                    }
                 )
-            except ApiException as e:
-                logger.debug(e.body)
+            )
+
+    return log_work
+
+
+def _capture_planned_target(
+    capture: Callable[..., Optional[dict]],
+    directory_paths: List[str],
+    manifest: Optional[BundleManifest] = None,
+    get_zinfo: Optional[Callable[[str], str]] = None,
+) -> Optional[dict]:
+    """
+    Captures a target under its first directory, the other directories are "aliases" of the entry
+    written with the same data. When the capture fails, the previous captures of the aliases are kept.
+    """
+    entry = capture(directory_path=directory_paths[0])
+    if not entry and manifest and get_zinfo:
+        for directory_path in directory_paths[1:]:
+            manifest.keep_previous_log(get_zinfo(directory_path))
+    if entry and len(directory_paths) > 1:
+        first_prefix = f"/{directory_paths[0]}/"
+        entry["aliases"] = [
+            entry["zinfo"].replace(first_prefix, f"/{directory_path}/", 1) for directory_path in directory_paths[1:]
+        ]
+    return entry
+
+
+def list_pod_metrics(namespace: str) -> Dict[str, dict]:
+    """
+    Metrics of the pods of a namespace by pod name, from a single metrics.k8s.io list.
+    """
+    custom_api = client.CustomObjectsApi()
+    return {
+        metric["metadata"]["name"]: metric
+        for metric in _list_metrics(
+            partial(custom_api.list_namespaced_custom_object, namespace=namespace, plural="pods"), kind="PodMetrics"
+        )
+    }
+
+
+def list_node_metrics() -> List[dict]:
+    custom_api = client.CustomObjectsApi()
+    return _list_metrics(partial(custom_api.list_cluster_custom_object, plural="nodes"), kind="NodeMetrics")
 
-    return processed
+
+def _list_metrics(list_func: Callable[..., Any], kind: str) -> List[dict]:
+    metrics = []
+    try:
+        for page in list_pages(list_func, group=METRICS_GROUP, version=METRICS_VERSION):
+            metrics.extend(_annotate_list_item(item, resources=page, kind=kind) for item in page.get("items") or [])
+    except ApiException as e:
+        # i.e. metrics-server is not deployed
+        logger.debug(e.body)
+    return metrics
+
+
+def _as_metrics_list(samples: List[dict], kind: str) -> dict:
+    return {"apiVersion": f"{METRICS_GROUP}/{METRICS_VERSION}", "kind": kind, "items": samples}
+
+
+def _capture_pod_container_log(
+    directory_path: str,
+    container_name: str,
+    pod_name: str,
+    pod_namespace: str,
+    v1_api: client.CoreV1Api,
+    capture_previous: bool = False,
+    since_seconds: int = DAY_IN_SECONDS,
+    manifest: Optional[BundleManifest] = None,
+) -> Optional[dict]:
+    zinfo = _get_pod_container_log_zinfo(
+        directory_path=directory_path,
+        container_name=container_name,
+        pod_name=pod_name,
+        pod_namespace=pod_namespace,
+        capture_previous=capture_previous,
+    )
+    # Captured before the request so the next delta bundle does not miss lines.
+    captured_at = get_capture_timestamp()
+    if manifest:
+        since_seconds = manifest.get_log_since_seconds(zinfo=zinfo, since_seconds=since_seconds)
+
+    log = SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_MEMORY_BYTES)
+    try:
+        logger_debug_previous = "previous run " if capture_previous else ""
+        logger.debug(f"Reading {logger_debug_previous}log from pod {pod_name} container {container_name}")
+        response: HTTPResponse = v1_api.read_namespaced_pod_log(
+            name=pod_name,
+            namespace=pod_namespace,
+            since_seconds=since_seconds,
+            container=container_name,
+            previous=capture_previous,
+            _request_timeout=LOG_REQUEST_TIMEOUT,
+            _preload_content=False,
+        )
+        try:
+            for chunk in response.stream(LOG_STREAM_CHUNK_BYTES):
+                log.write(chunk)
+        finally:
+            response.release_conn()
+        log.seek(0)
+        return {
+            "data": log,
+            "zinfo": zinfo,
+            "capturedAt": captured_at,
+        }
+    except ApiException as e:
+        log.close()
+        logger.debug(e.body)
+    except HTTPError as e:
+        log.close()
+        # A hung or unreachable kubelet should not stall the whole bundle.
+        logger.debug(f"Unable to read log from pod {pod_name} container {container_name}:\n{e}")
+    if manifest:
+        manifest.keep_previous_log(zinfo)
+
+
+def _get_pod_container_log_zinfo(
+    directory_path: str, container_name: str, pod_name: str, pod_namespace: str, capture_previous: bool = False
+) -> str:
+    zinfo_previous_segment = "previous." if capture_previous else ""
+    return f"{pod_namespace}/{directory_path}/pod.{pod_name}.{container_name}.{zinfo_previous_segment}log"
 
 
 def _process_kubernetes_resources(
     directory_path: str,
-    resources: K8sRuntimeResources,
+    resources: dict,
     kind: str,
     prefix_names: Optional[List[str]] = None,
     exclude_prefixes: Optional[List[str]] = None,
@@ -553,14 +917,11 @@ def _process_kubernetes_resources(
     if exclude_prefixes:
         resources = exclude_resources_with_prefix(resources, exclude_prefixes)
 
-    logger.info(f"Detected {len(resources.items)} {kind}s.")
-    for resource in resources.items:
-        r = resource
-        r.api_version = resources.api_version
-        r.kind = kind
-        resource_metadata = r.metadata
-        resource_namespace = resource_metadata.namespace
-        resource_name = resource_metadata.name
+    logger.info(f"Detected {len(resources['items'])} {kind}s.")
+    for resource in resources["items"]:
+        resource_metadata: dict = resource["metadata"]
+        resource_namespace = resource_metadata.get("namespace")
+        resource_name = resource_metadata["name"]
 
         if prefix_names:
             matched_prefix = [resource_name.startswith(prefix) for prefix in prefix_names]
@@ -575,7 +936,7 @@ def _process_kubernetes_resources(
 
         processed.append(
             {
-                "data": generic.sanitize_for_serialization(obj=r),
+                "data": _annotate_list_item(resource, resources=resources, kind=kind),
                 "zinfo": f"{resource_namespace}/{directory_path}/{resource_type}.{resource_name}.yaml",
             }
         )
@@ -583,8 +944,18 @@ def _process_kubernetes_resources(
     return processed
 
 
-def exclude_resources_with_prefix(resources: K8sRuntimeResources, exclude_prefixes: List[str]) -> K8sRuntimeResources:
-    for prefix in exclude_prefixes:
-        resources.items = [resource for resource in resources.items if not resource.metadata.name.startswith(prefix)]
+def _annotate_list_item(item: dict, resources: dict, kind: str) -> dict:
+    # List items omit apiVersion and kind. Items are shared through the cluster snapshot, annotate a shallow copy.
+    annotated = {**item, "kind": kind}
+    if resources.get("apiVersion"):
+        annotated["apiVersion"] = resources["apiVersion"]
+    return annotated
+
 
-    return resources
+def exclude_resources_with_prefix(resources: dict, exclude_prefixes: List[str]) -> dict:
+    items = [
+        resource
+        for resource in resources["items"]
+        if not any(resource["metadata"]["name"].startswith(prefix) for prefix in exclude_prefixes)
+    ]
+    return {**resources, "items": items}
@@ -4,6 +4,29 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+from ..edge_api import (
+    ARCCONTAINERSTORAGE_API_V1,
+    CLUSTER_CONFIG_API_V1,
+    DATAFLOW_API_V1B1,
+    DEVICEREGISTRY_API_V1,
+    META_API_V1B1,
+    MQTT_BROKER_API_V1B1,
+    OPCUA_API_V1,
+    SECRETSTORE_API_V1,
+    SECRETSYNC_API_V1,
+    EdgeApiManager,
+)
+
 # resource label formats
 COMPONENT_LABEL_FORMAT = "app.kubernetes.io/component in ({label})"
 NAME_LABEL_FORMAT = "app.kubernetes.io/name in ({label})"
+
+# API versions a support bundle is compatible with, per service.
+COMPAT_CLUSTER_CONFIG_APIS = EdgeApiManager(resource_apis=[CLUSTER_CONFIG_API_V1])
+COMPAT_MQTT_BROKER_APIS = EdgeApiManager(resource_apis=[MQTT_BROKER_API_V1B1])
+COMPAT_OPCUA_APIS = EdgeApiManager(resource_apis=[OPCUA_API_V1])
+COMPAT_DEVICEREGISTRY_APIS = EdgeApiManager(resource_apis=[DEVICEREGISTRY_API_V1])
+COMPAT_DATAFLOW_APIS = EdgeApiManager(resource_apis=[DATAFLOW_API_V1B1])
+COMPAT_META_APIS = EdgeApiManager(resource_apis=[META_API_V1B1])
+COMPAT_ARCCONTAINERSTORAGE_APIS = EdgeApiManager(resource_apis=[ARCCONTAINERSTORAGE_API_V1])
+COMPAT_SECRETSTORE_APIS = EdgeApiManager(resource_apis=[SECRETSYNC_API_V1, SECRETSTORE_API_V1])
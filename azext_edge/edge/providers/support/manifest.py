@@ -0,0 +1,126 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import json
+import threading
+from datetime import datetime, timezone
+from math import ceil
+from os.path import isfile
+from typing import Dict, List, Optional
+from zipfile import BadZipFile, ZipFile
+
+from azure.cli.core.azclierror import FileOperationError
+
+MANIFEST_ZINFO: str = "bundle_manifest.json"
+MANIFEST_VERSION: int = 1
+TIMESTAMP_FORMAT: str = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+class BundleManifest:
+    """
+    Records what a support bundle captured so a later bundle can collect only the delta.
+
+    Resources are tracked by archive path and resourceVersion, container logs by archive path
+    and the time the capture request was issued. Each record lists the chain of bundles holding
+    its content, so a delta bundle together with its predecessors has the complete picture.
+    """
+
+    def __init__(self, bundle_name: str, previous: Optional[dict] = None):
+        self.bundle_name = bundle_name
+        self.created_at = _utc_now()
+        self.previous = previous or {}
+        self.resources: Dict[str, dict] = {}
+        self.logs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bundle(cls, bundle_name: str, previous_bundle_path: str) -> "BundleManifest":
+        if not isfile(previous_bundle_path):
+            raise FileOperationError(f"{previous_bundle_path} does not exist.")
+        try:
+            with ZipFile(file=previous_bundle_path, mode="r") as previous_zip:
+                previous = json.loads(previous_zip.read(MANIFEST_ZINFO))
+        except (BadZipFile, KeyError, ValueError):
+            raise FileOperationError(f"{previous_bundle_path} does not contain a readable support bundle manifest.")
+
+        return cls(bundle_name=bundle_name, previous=previous)
+
+    @property
+    def previous_bundle(self) -> Optional[str]:
+        return self.previous.get("bundle")
+
+    def is_resource_unchanged(self, zinfo: str, resource_version: Optional[str]) -> bool:
+        previous_record = self.previous.get("resources", {}).get(zinfo)
+        if not resource_version or not previous_record:
+            return False
+        if previous_record["resourceVersion"] != resource_version:
+            return False
+
+        with self._lock:
+            self.resources[zinfo] = previous_record
+        return True
+
+    def record_resource(self, zinfo: str, resource_version: Optional[str]):
+        if not resource_version:
+            return
+        with self._lock:
+            self.resources[zinfo] = {"resourceVersion": resource_version, "bundles": [self.bundle_name]}
+
+    def get_log_since_seconds(self, zinfo: str, since_seconds: int) -> int:
+        """
+        Seconds of log history needed to cover everything after the previous capture of zinfo.
+        """
+        previous_record = self.previous.get("logs", {}).get(zinfo)
+        if not previous_record:
+            return since_seconds
+
+        elapsed = (_utc_now() - _parse_timestamp(previous_record["capturedAt"])).total_seconds()
+        return max(1, min(since_seconds, ceil(elapsed)))
+
+    def record_log(self, zinfo: str, captured_at: str, written: bool):
+        bundles: List[str] = list(self.previous.get("logs", {}).get(zinfo, {}).get("bundles", []))
+        if written:
+            bundles.append(self.bundle_name)
+        with self._lock:
+            self.logs[zinfo] = {"capturedAt": captured_at, "bundles": bundles}
+
+    def keep_previous_log(self, zinfo: str):
+        """
+        Carries the previous capture of zinfo forward when this capture failed, so the next
+        delta bundle resumes from the last successful capture rather than the full log window.
+        """
+        previous_record = self.previous.get("logs", {}).get(zinfo)
+        if not previous_record:
+            return
+        with self._lock:
+            self.logs.setdefault(zinfo, previous_record)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "version": MANIFEST_VERSION,
+                "bundle": self.bundle_name,
+                "previousBundle": self.previous_bundle,
+                "createdAt": _format_timestamp(self.created_at),
+                "resources": dict(sorted(self.resources.items())),
+                "logs": dict(sorted(self.logs.items())),
+            }
+
+
+def get_capture_timestamp() -> str:
+    return _format_timestamp(_utc_now())
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _format_timestamp(timestamp: datetime) -> str:
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
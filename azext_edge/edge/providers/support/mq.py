@@ -4,6 +4,7 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Iterable, Optional
 from zipfile import ZipInfo
@@ -28,6 +29,7 @@ logger = get_logger(__name__)
 
 MQ_NAME_LABEL = NAME_LABEL_FORMAT.format(label=MQ_ACTIVE_API.label)
 MQ_DIRECTORY_PATH = MQ_ACTIVE_API.moniker
+DIAGNOSTIC_METRICS_CONCURRENCY = 4
 
 
 def fetch_diagnostic_metrics(namespace: str):
@@ -43,32 +45,27 @@ def fetch_diagnostic_metrics(namespace: str):
 
 
 def fetch_diagnostic_traces():
-    namespaces = get_mq_namespaces()
-    result = []
-    for namespace in namespaces:
+    # Traces are streamed into the bundle as they are fetched, rather than collected first.
+    for namespace in get_mq_namespaces():
         try:
             traces = get_traces(namespace=namespace, trace_ids=["!support_bundle!"])
-            if traces:
-                for trace in traces:
-                    zinfo = ZipInfo(
-                        filename=f"{namespace}/{MQ_DIRECTORY_PATH}/traces/{trace[0].filename}",
-                        date_time=trace[0].date_time,
-                    )
-                    # Fixed in Py 3.9 https://github.com/python/cpython/issues/70373
-                    zinfo.file_size = 0
-                    zinfo.compress_size = 0
-                    result.append(
-                        {
-                            "data": trace[1],
-                            "zinfo": zinfo,
-                        }
-                    )
+            for trace in traces or []:
+                zinfo = ZipInfo(
+                    filename=f"{namespace}/{MQ_DIRECTORY_PATH}/traces/{trace[0].filename}",
+                    date_time=trace[0].date_time,
+                )
+                zinfo.compress_type = trace[0].compress_type
+                # Fixed in Py 3.9 https://github.com/python/cpython/issues/70373
+                zinfo.file_size = 0
+                zinfo.compress_size = 0
+                yield {
+                    "data": trace[1],
+                    "zinfo": zinfo,
+                }
 
         except Exception:
             logger.debug(f"Unable to process diagnostics pod traces against namespace {namespace}.")
 
-    return result
-
 
 def fetch_statefulsets():
     processed, namespaces = process_statefulset(
@@ -77,10 +74,10 @@ def fetch_statefulsets():
         return_namespaces=True,
     )
 
-    for namespace in namespaces:
-        metrics = fetch_diagnostic_metrics(namespace)
-        if metrics:
-            processed.append(metrics)
+    # Portforward sessions are independent, so diagnostic pods are queried concurrently.
+    if namespaces:
+        with ThreadPoolExecutor(max_workers=min(len(namespaces), DIAGNOSTIC_METRICS_CONCURRENCY)) as executor:
+            processed.extend(metrics for metrics in executor.map(fetch_diagnostic_metrics, namespaces) if metrics)
 
     return processed
 
@@ -4,39 +4,59 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
-from typing import List, Optional
-from zipfile import ZipFile, ZIP_DEFLATED
+import json
+import threading
+import time
+from io import SEEK_END
+from os.path import basename
+from shutil import copyfileobj
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
 
 import yaml
 from knack.log import get_logger
 from rich.console import Console, NewLine
 
 from ..common import OpsServiceType
-from ..providers.edge_api import (
-    CLUSTER_CONFIG_API_V1,
-    MQTT_BROKER_API_V1B1,
-    OPCUA_API_V1,
-    DEVICEREGISTRY_API_V1,
-    DATAFLOW_API_V1B1,
-    META_API_V1B1,
-    ARCCONTAINERSTORAGE_API_V1,
-    SECRETSYNC_API_V1,
-    SECRETSTORE_API_V1,
-    EdgeApiManager,
+from ..providers.edge_api import EdgeApiManager
+from .base import CLUSTER_SNAPSHOT, discover_cluster_apis
+from .command_context import CommandContext, ContextThreadPoolExecutor, bind_command_context
+from .support.base import (
+    DEFAULT_BUNDLE_CONCURRENCY,
+    DEFAULT_LOG_CAPTURE_CONCURRENCY,
+    DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS,
+    DEFAULT_METRIC_SAMPLES,
+    SNAPSHOT_PRIMED_KINDS,
+    CollectionPlan,
+    iter_entries_in_order,
 )
+from .support.common import (
+    COMPAT_ARCCONTAINERSTORAGE_APIS,
+    COMPAT_CLUSTER_CONFIG_APIS,
+    COMPAT_DATAFLOW_APIS,
+    COMPAT_DEVICEREGISTRY_APIS,
+    COMPAT_META_APIS,
+    COMPAT_MQTT_BROKER_APIS,
+    COMPAT_OPCUA_APIS,
+    COMPAT_SECRETSTORE_APIS,
+)
+from .support.manifest import MANIFEST_ZINFO, BundleManifest
+
+if TYPE_CHECKING:
+    from rich.live import Live
+    from rich.progress import Progress, TaskID
 
 logger = get_logger(__name__)
 
 console = Console()
 
-COMPAT_CLUSTER_CONFIG_APIS = EdgeApiManager(resource_apis=[CLUSTER_CONFIG_API_V1])
-COMPAT_MQTT_BROKER_APIS = EdgeApiManager(resource_apis=[MQTT_BROKER_API_V1B1])
-COMPAT_OPCUA_APIS = EdgeApiManager(resource_apis=[OPCUA_API_V1])
-COMPAT_DEVICEREGISTRY_APIS = EdgeApiManager(resource_apis=[DEVICEREGISTRY_API_V1])
-COMPAT_DATAFLOW_APIS = EdgeApiManager(resource_apis=[DATAFLOW_API_V1B1])
-COMPAT_META_APIS = EdgeApiManager(resource_apis=[META_API_V1B1])
-COMPAT_ARCCONTAINERSTORAGE_APIS = EdgeApiManager(resource_apis=[ARCCONTAINERSTORAGE_API_V1])
-COMPAT_SECRETSTORE_APIS = EdgeApiManager(resource_apis=[SECRETSYNC_API_V1, SECRETSTORE_API_V1])
+
+def _get_group_versions(api_managers: List[Optional[EdgeApiManager]]) -> List[Tuple[str, str]]:
+    group_versions = []
+    for api_manager in api_managers:
+        if api_manager:
+            group_versions.extend(api_manager.group_versions)
+    return group_versions
 
 
 def build_bundle(
@@ -44,7 +64,14 @@ def build_bundle(
     log_age_seconds: Optional[int] = None,
     ops_services: Optional[List[str]] = None,
     include_mq_traces: Optional[bool] = None,
+    concurrency: int = DEFAULT_BUNDLE_CONCURRENCY,
+    log_concurrency: int = DEFAULT_LOG_CAPTURE_CONCURRENCY,
+    since_bundle: Optional[str] = None,
+    metric_samples: int = DEFAULT_METRIC_SAMPLES,
+    metric_interval_seconds: int = DEFAULT_METRIC_SAMPLE_INTERVAL_SECONDS,
 ):
+    from functools import partial
+
     from rich.live import Live
     from rich.progress import Progress
     from rich.table import Table
@@ -62,6 +89,12 @@ def build_bundle(
     from .support.arccontainerstorage import prepare_bundle as prepare_arccontainerstorage_bundle
     from .support.secretstore import prepare_bundle as prepare_secretstore_bundle
 
+    bundle_name = basename(bundle_path)
+    if since_bundle:
+        manifest = BundleManifest.from_bundle(bundle_name=bundle_name, previous_bundle_path=since_bundle)
+    else:
+        manifest = BundleManifest(bundle_name=bundle_name)
+
     def collect_default_works(
         pending_work: dict,
         log_age_seconds: Optional[int] = None,
@@ -117,6 +150,13 @@ def build_bundle(
         # remove duplicates
         parsed_ops_services = list(set(ops_services))
 
+    # Discover the APIs of all selected services in one batch rather than per service.
+    discover_cluster_apis(
+        group_versions=_get_group_versions(
+            [COMPAT_META_APIS] + [api_map[ops_service]["apis"] for ops_service in parsed_ops_services]
+        )
+    )
+
     for ops_service in parsed_ops_services:
         # assign key and value to service_moniker and api_info
         service_moniker = [k for k, _ in api_map.items() if k == ops_service][0]
@@ -155,72 +195,242 @@ def build_bundle(
     for service in pending_work:
         total_work_count = total_work_count + len(pending_work[service])
 
-    bundle = {service: {} for service, _ in pending_work.items()}
+    # Container logs and pod metrics are planned by all services first, then each is fetched once.
+    plan = CollectionPlan(metric_samples=metric_samples, metric_interval_seconds=metric_interval_seconds)
 
     grid = Table.grid(expand=False)
-    with Live(grid, console=console, transient=True) as live:
+    # Listings are kept for the whole bundle rather than expiring part way through it.
+    with CLUSTER_SNAPSHOT.scope(), Live(grid, console=console, transient=True) as live, ZipFile(
+        file=bundle_path, mode="w", compression=ZIP_DEFLATED
+    ) as myzip:
+        # Services select runtime resources by label, list each kind once and select locally.
+        CLUSTER_SNAPSHOT.prime(kinds=SNAPSHOT_PRIMED_KINDS)
+        writer = BundleWriter(myzip=myzip, manifest=manifest)
         uber_progress = Progress()
         uber_task = uber_progress.add_task(
             "[green]Building support bundle",
             total=total_work_count,
         )
 
-        def visually_process(description: str, support_segment: dict, ops_service: str):
-            namespace_task = uber_progress.add_task(f"[cyan]{description}", total=len(support_segment))
-            for element in support_segment:
-                header = f"Fetching [medium_purple4]{element}[/medium_purple4] data..."
-                grid = Table.grid(expand=False)
-                grid.add_column()
-
-                grid.add_row(NewLine(1))
-                grid.add_row(header)
-                grid.add_row(NewLine(1))
-                grid.add_row(uber_progress)
-                live.update(grid, refresh=True)
-
+        def render_progress(header: str):
+            grid = Table.grid(expand=False)
+            grid.add_column()
+
+            grid.add_row(NewLine(1))
+            grid.add_row(header)
+            grid.add_row(NewLine(1))
+            grid.add_row(uber_progress)
+            live.update(grid, refresh=True)
+
+        def prepare_element(ops_service: str, element: str) -> Iterator[dict]:
+            return writer.prepare(pending_work[ops_service][element]())
+
+        with bind_command_context(CommandContext(collection_plan=plan)), ContextThreadPoolExecutor(
+            max_workers=concurrency
+        ) as executor:
+            work = []
+            for service in pending_work:
+                if not pending_work[service]:
+                    continue
+                service_task = uber_progress.add_task(
+                    f"[cyan]Processing {service}", total=len(pending_work[service])
+                )
+                for element in pending_work[service]:
+                    work.append(((service, element, service_task), partial(prepare_element, service, element)))
+
+            render_progress(f"Fetching data with [medium_purple4]{concurrency}[/medium_purple4] worker(s)...")
+            # Workers fetch and serialize, this thread writes each work item in submission order as it is produced.
+            for (service, element, service_task), entries in iter_entries_in_order(
+                work, executor=executor, max_pending=2 * concurrency
+            ):
                 try:
                     # Produce as much support collateral as possible.
-                    bundle[ops_service][element] = support_segment[element]()
+                    writer.write(entries)
                 except Exception as e:
                     # @digimaun - bdb.BdbQuit?
-                    logger.debug(f"Unable to process {ops_service} {element}:\n{e}")
-                finally:
-                    if not uber_progress.finished:
-                        uber_progress.update(namespace_task, advance=1)
-                        uber_progress.update(uber_task, advance=1)
-
-        for service in pending_work:
-            if pending_work[service]:
-                visually_process(
-                    description=f"Processing {service}",
-                    support_segment=pending_work[service],
-                    ops_service=service,
-                )
+                    logger.debug(f"Unable to process {service} {element}:\n{e}")
+                if not uber_progress.finished:
+                    uber_progress.update(service_task, advance=1)
+                    uber_progress.update(uber_task, advance=1)
+                render_progress(f"Fetched [medium_purple4]{element}[/medium_purple4] data...")
+
+        target_task = uber_progress.add_task("[cyan]Fetching pod logs and metrics", total=plan.target_count)
+        uber_progress.update(uber_task, total=total_work_count + plan.target_count)
+
+        render_progress(
+            f"Fetching [medium_purple4]{plan.request_count}[/medium_purple4] pod logs and metrics "
+            f"with [medium_purple4]{log_concurrency}[/medium_purple4] worker(s)..."
+        )
+        _write_planned_targets(
+            writer=writer,
+            plan=plan,
+            concurrency=log_concurrency,
+            manifest=manifest,
+            on_target=partial(_advance_tasks, live=live, progress=uber_progress, task_ids=[target_task, uber_task]),
+        )
+
+        writer.write_manifest()
+
+    logger.info(
+        f"Fetched {plan.request_count} pod logs and metrics, "
+        f"{plan.saved_requests} requests saved by overlapping selectors."
+    )
+    result = {"bundlePath": bundle_path, "collection": plan.as_dict()}
+    if manifest.previous_bundle:
+        result["previousBundle"] = manifest.previous_bundle
+    return result
 
-    write_zip(file_path=bundle_path, bundle=bundle)
-    return {"bundlePath": bundle_path}
-
-
-def write_zip(bundle: dict, file_path: str):
-    with ZipFile(file=file_path, mode="w", compression=ZIP_DEFLATED) as myzip:
-        todo: List[dict] = []
-        for ops_service in bundle:
-            for element in bundle[ops_service]:
-                if isinstance(bundle[ops_service][element], list):
-                    todo.extend(bundle[ops_service][element])
-                else:
-                    todo.append(bundle[ops_service][element])
-
-        added_path = {}
-        for t in todo:
-            if t:
-                data = t.get("data")
-                zinfo = t.get("zinfo")
-                if data and zinfo not in added_path:
-                    if isinstance(data, dict):
-                        data = yaml.safe_dump(t["data"], indent=2)
-                    myzip.writestr(zinfo_or_arcname=zinfo, data=data)
-                    added_path[zinfo] = True
+
+def _advance_tasks(live: "Live", progress: "Progress", task_ids: List["TaskID"]):
+    for task_id in task_ids:
+        progress.update(task_id, advance=1)
+    live.refresh()
+
+
+def _write_planned_targets(
+    writer: "BundleWriter",
+    plan: CollectionPlan,
+    concurrency: int,
+    manifest: Optional[BundleManifest] = None,
+    on_target: Optional[Callable[[], None]] = None,
+):
+    """
+    Writes each planned target as it is fetched, a failed target does not lose the others.
+    """
+    try:
+        for target, entries in plan.fetch(concurrency=concurrency, manifest=manifest):
+            try:
+                writer.write(entries)
+            except Exception as e:
+                logger.debug(f"Unable to process {target}:\n{e}")
+            if on_target:
+                on_target()
+    except Exception as e:
+        logger.debug(f"Unable to process pod logs and metrics:\n{e}")
+
+
+class BundleWriter:
+    """
+    Thread-safe writer of support bundle entries into an open zip archive.
+
+    An entry is a dict of "data" and "zinfo", written alone or from any iterable of entries. Data may be
+    a dict (serialized as yaml), str/bytes or a readable binary file object which is streamed into the archive.
+    The data of an entry with "aliases" is also written under each of those archive paths.
+    The first entry written to a given archive path wins, entries are written in work item order
+    (see iter_entries_in_order) so duplicates resolve the same way on every run.
+
+    With a manifest, resources whose resourceVersion matches the previous bundle are skipped
+    and container log captures (entries with "capturedAt") are recorded.
+    """
+
+    def __init__(self, myzip: ZipFile, manifest: Optional[BundleManifest] = None):
+        self.myzip = myzip
+        self.manifest = manifest
+        self.added_path = set()
+        self._lock = threading.Lock()
+
+    def prepare(self, entries: Union[dict, Iterable[dict], None]) -> Iterator[dict]:
+        """
+        Serializes the dict data of entries as they are produced, from any thread ahead of writing them.
+        Resources unchanged since the previous bundle are dropped.
+        """
+        if isinstance(entries, dict):
+            entries = [entries]
+        for entry in entries or []:
+            entry = self._prepare_entry(entry)
+            if entry:
+                yield entry
+
+    def write(self, entries: Union[dict, Iterable[dict], None]):
+        if not entries:
+            return
+        # Iterators (i.e. paginated lists) are written entry by entry as they are produced.
+        if isinstance(entries, dict):
+            entries = [entries]
+
+        for entry in entries:
+            try:
+                if entry:
+                    self._write_entry(entry)
+            finally:
+                data = entry.get("data") if entry else None
+                if hasattr(data, "close"):
+                    data.close()
+
+    def write_manifest(self):
+        if self.manifest:
+            self.myzip.writestr(zinfo_or_arcname=MANIFEST_ZINFO, data=json.dumps(self.manifest.as_dict(), indent=2))
+
+    def _prepare_entry(self, entry: Optional[dict]) -> Optional[dict]:
+        data = entry.get("data") if entry else None
+        if not isinstance(data, dict):
+            return entry
+
+        resource_version = data.get("metadata", {}).get("resourceVersion")
+        if self.manifest and self.manifest.is_resource_unchanged(
+            zinfo=_get_entry_path(entry), resource_version=resource_version
+        ):
+            return None
+        return {**entry, "data": yaml.safe_dump(data, indent=2), "resourceVersion": resource_version}
+
+    def _write_entry(self, entry: dict):
+        entry = self._prepare_entry(entry)
+        if not entry:
+            return
+        data: Union[str, bytes, IO[bytes], None] = entry.get("data")
+        zinfo: Union[str, ZipInfo] = entry.get("zinfo")
+        captured_at = entry.get("capturedAt")
+
+        # Aliases are further archive paths written with the same data, i.e. a log shared by services.
+        for zinfo in [zinfo] + entry.get("aliases", []):
+            path = zinfo.filename if isinstance(zinfo, ZipInfo) else zinfo
+            written = False
+            try:
+                written = self._write_data(
+                    data=data, zinfo=zinfo, path=path, resource_version=entry.get("resourceVersion")
+                )
+            finally:
+                if self.manifest and captured_at:
+                    self.manifest.record_log(zinfo=path, captured_at=captured_at, written=written)
+
+    def _write_data(
+        self,
+        data: Union[str, bytes, IO[bytes], None],
+        zinfo: Union[str, ZipInfo],
+        path: str,
+        resource_version: Optional[str] = None,
+    ) -> bool:
+        if not data:
+            return False
+
+        with self._lock:
+            if path in self.added_path:
+                return False
+
+            if hasattr(data, "read"):
+                data.seek(0, SEEK_END)
+                data_size = data.tell()
+                if not data_size:
+                    return False
+                data.seek(0)
+                stream_zinfo = ZipInfo(filename=path, date_time=time.localtime(time.time())[:6])
+                stream_zinfo.compress_type = self.myzip.compression
+                stream_zinfo.external_attr = 0o600 << 16
+                stream_zinfo.file_size = data_size
+                with self.myzip.open(stream_zinfo, mode="w") as member:
+                    copyfileobj(data, member)
+            else:
+                self.myzip.writestr(zinfo_or_arcname=zinfo, data=data)
+            self.added_path.add(path)
+
+        if self.manifest:
+            self.manifest.record_resource(zinfo=path, resource_version=resource_version)
+        return True
+
+
+def _get_entry_path(entry: dict) -> str:
+    zinfo: Union[str, ZipInfo] = entry["zinfo"]
+    return zinfo.filename if isinstance(zinfo, ZipInfo) else zinfo
 
 
 def str_presenter(dumper, data):
@@ -0,0 +1,279 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlparse
+
+from azure.core.pipeline import PipelineRequest, PipelineResponse
+from azure.core.pipeline.policies import HTTPPolicy
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+ARM_CACHE_FILE_NAME = "iotops_arm_cache.json"
+# Persisted entries older than this are dropped rather than revalidated.
+ARM_CACHE_MAX_AGE_SECONDS = 3600
+CONFIG_ROOT_LABEL = "iotops"
+CONFIG_ARM_CACHE_TTL_LABEL = "arm_cache_ttl"
+
+# Pipeline option marking a GET whose response may be served from the ARM cache.
+ARM_CACHE_OPTION = "arm_cache"
+ARM_WRITE_METHODS = frozenset(["PUT", "PATCH", "POST", "DELETE"])
+
+
+class ArmCache:
+    """
+    Responses of ARM resource reads and ARG queries, kept for the running command.
+
+    Reads marked with the arm_cache pipeline option are memoized keyed by
+    (subscription, resource id, api-version). With ttl_seconds set, see configure_arm_cache,
+    responses are also persisted in the Azure CLI config dir: fresh ones are served as is and
+    stale ones revalidated with If-None-Match. Any write sent through an ArmCachePolicy
+    drops all ARG queries and the cached reads of the written resource's parents and of everything
+    in its resource group, or subscription for writes outside a resource group. Deployments change
+    resources other than the one written, so scoping to the resource alone is not enough.
+    """
+
+    def __init__(self, ttl_seconds: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self._responses: Dict[str, dict] = {}
+        self._queries: Dict[tuple, str] = {}
+        self._lock = threading.RLock()
+
+    def clear(self):
+        with self._lock:
+            self._responses = {}
+            self._queries = {}
+
+    def get_response(self, key: str) -> Tuple[Optional[dict], bool]:
+        """
+        Returns the cached response of key, if any, and whether it can be served without revalidation.
+        """
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry:
+                return entry, True
+            if not self.ttl_seconds:
+                return None, False
+            entry = self._read_file().get(key)
+        if not entry:
+            return None, False
+        if time.time() - entry["storedAt"] < self.ttl_seconds:
+            with self._lock:
+                self._responses[key] = entry
+            return entry, True
+        return entry, False
+
+    def set_response(self, key: str, body: str, content_type: Optional[str], etag: Optional[str]):
+        entry = {"body": body, "contentType": content_type, "etag": etag, "storedAt": time.time()}
+        with self._lock:
+            self._responses[key] = entry
+            if self.ttl_seconds:
+                self._update_file(set_entries={key: entry})
+
+    def invalidate(self, resource_path: str):
+        resource_path = resource_path.lower().rstrip("/")
+        scope_path = _get_scope_path(resource_path)
+
+        def _is_related(key: str) -> bool:
+            cached_path = _get_key_path(key)
+            return _is_under(cached_path, scope_path) or _is_under(resource_path, cached_path)
+
+        with self._lock:
+            self._queries = {}
+            self._responses = {k: v for k, v in self._responses.items() if not _is_related(k)}
+            if self.ttl_seconds:
+                self._update_file(remove=_is_related)
+
+    def get_query(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            result = self._queries.get(key)
+        # Stored serialized, callers get their own copy to mutate.
+        return json.loads(result) if result is not None else None
+
+    def set_query(self, key: tuple, result: dict):
+        serialized = json.dumps(result)
+        with self._lock:
+            self._queries[key] = serialized
+
+    def _get_file_path(self) -> str:
+        from azure.cli.core._environment import get_config_dir
+
+        return os.path.join(get_config_dir(), ARM_CACHE_FILE_NAME)
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self._get_file_path(), "r", encoding="utf-8") as f:
+                content = json.load(f)
+            return content if isinstance(content, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug("Unable to read ARM cache: %s", e)
+            return {}
+
+    def _update_file(self, set_entries: Optional[Dict[str, dict]] = None, remove: Optional[Any] = None):
+        now = time.time()
+        content = {
+            k: v
+            for k, v in self._read_file().items()
+            if isinstance(v, dict)
+            and now - v.get("storedAt", 0) < ARM_CACHE_MAX_AGE_SECONDS
+            and not (remove and remove(k))
+        }
+        content.update(set_entries or {})
+        file_path = self._get_file_path()
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Written aside and swapped in, concurrent commands may read the file meanwhile.
+            temp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(content, f)
+            os.replace(temp_path, file_path)
+        except OSError as e:
+            logger.debug("Unable to write ARM cache: %s", e)
+
+
+ARM_CACHE = ArmCache()
+
+
+def configure_arm_cache(cli_ctx):
+    """
+    Persist ARM reads across commands for 'az config set iotops.arm_cache_ttl=<seconds>'.
+    """
+    try:
+        ARM_CACHE.ttl_seconds = cli_ctx.config.getint(CONFIG_ROOT_LABEL, CONFIG_ARM_CACHE_TTL_LABEL, fallback=0)
+    except ValueError:
+        logger.debug("Ignoring invalid %s.%s config.", CONFIG_ROOT_LABEL, CONFIG_ARM_CACHE_TTL_LABEL)
+        ARM_CACHE.ttl_seconds = 0
+
+
+class ArmCachePolicy(HTTPPolicy):
+    """
+    Serves reads marked with the arm_cache option from ARM_CACHE and invalidates it on writes.
+    """
+
+    def send(self, request: PipelineRequest) -> PipelineResponse:
+        use_cache = request.context.options.pop(ARM_CACHE_OPTION, False)
+        http_request = request.http_request
+        method = http_request.method.upper()
+
+        if method in ARM_WRITE_METHODS:
+            ARM_CACHE.invalidate(urlparse(http_request.url).path)
+            return self.next.send(request)
+
+        if not use_cache or method != "GET":
+            return self.next.send(request)
+
+        key = get_cache_key(http_request.url)
+        entry, fresh = ARM_CACHE.get_response(key)
+        if entry and fresh:
+            return PipelineResponse(http_request, CachedHttpResponse(http_request, entry), request.context)
+        if entry and entry.get("etag"):
+            http_request.headers["If-None-Match"] = entry["etag"]
+
+        response = self.next.send(request)
+        http_response = response.http_response
+        if http_response.status_code == 304 and entry:
+            ARM_CACHE.set_response(key, body=entry["body"], content_type=entry["contentType"], etag=entry["etag"])
+            return PipelineResponse(http_request, CachedHttpResponse(http_request, entry), response.context)
+        if http_response.status_code == 200:
+            ARM_CACHE.set_response(
+                key,
+                body=http_response.text(),
+                content_type=http_response.headers.get("Content-Type"),
+                etag=http_response.headers.get("ETag"),
+            )
+        return response
+
+
+class CachedHttpResponse:
+    """
+    Minimal HTTP response replaying a cached ARM response body.
+    """
+
+    def __init__(self, request: Any, entry: dict):
+        self.request = request
+        self.status_code = 200
+        self.reason = "OK"
+        self.headers = {"Content-Type": entry.get("contentType") or "application/json"}
+        if entry.get("etag"):
+            self.headers["ETag"] = entry["etag"]
+        self.content_type = self.headers["Content-Type"]
+        self.content = entry["body"].encode("utf-8")
+        self.is_closed = True
+        self.is_stream_consumed = True
+
+    def read(self) -> bytes:
+        return self.content
+
+    def text(self, encoding: Optional[str] = None) -> str:
+        return self.content.decode(encoding or "utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def get_cache_key(url: str) -> str:
+    parsed_url = urlparse(url)
+    path = parsed_url.path.lower().rstrip("/")
+    params = sorted((k.lower(), v) for k, v in parse_qsl(parsed_url.query))
+    api_version = "".join(v for k, v in params if k == "api-version")
+    other_params = "&".join(f"{k}={v}" for k, v in params if k != "api-version")
+    return "|".join([_get_subscription(path), path, api_version, other_params])
+
+
+def get_default_per_call_policies() -> List[HTTPPolicy]:
+    return [ArmCachePolicy()]
+
+
+def ensure_arm_cache_policy(policies: Union[HTTPPolicy, List[HTTPPolicy], None]) -> List[HTTPPolicy]:
+    """
+    Per call policies with an ArmCachePolicy, which consumes the arm_cache option before it reaches the transport.
+    """
+    if policies is None:
+        return get_default_per_call_policies()
+    policies = list(policies) if isinstance(policies, (list, tuple)) else [policies]
+    if not any(isinstance(policy, ArmCachePolicy) for policy in policies):
+        policies.append(ArmCachePolicy())
+    return policies
+
+
+def _get_key_path(key: str) -> str:
+    return key.split("|")[1]
+
+
+def _get_scope_path(path: str) -> str:
+    """
+    The resource group, or subscription, path containing path.
+    """
+    parts = path.split("/")
+    if len(parts) > 4 and parts[1] == "subscriptions" and parts[3] == "resourcegroups":
+        return "/".join(parts[:5])
+    if len(parts) > 2 and parts[1] == "subscriptions":
+        return "/".join(parts[:3])
+    return ""
+
+
+def _is_under(path: str, parent_path: str) -> bool:
+    return path == parent_path or path.startswith(f"{parent_path}/")
+
+
+def _get_subscription(path: str) -> str:
+    parts = path.split("/")
+    if len(parts) > 2 and parts[1] == "subscriptions":
+        return parts[2]
+    return ""
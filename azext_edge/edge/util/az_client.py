@@ -5,13 +5,16 @@
 # ----------------------------------------------------------------------------------------------
 
 import sys
+import threading
+import time
 from time import sleep
-from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Tuple, Type, TypeVar
 
 from azure.cli.core.azclierror import ValidationError
 from knack.log import get_logger
 
 from ...constants import USER_AGENT
+from .arm_cache import ensure_arm_cache_policy
 from .common import ensure_azure_namespace_path
 
 if sys.version_info >= (3, 9):
@@ -23,18 +26,26 @@ JSON = MutableMapping[str, Any]  # pylint: disable=unsubscriptable-object
 ensure_azure_namespace_path()
 
 from azure.core.pipeline.policies import HttpLoggingPolicy, UserAgentPolicy
-from azure.identity import AzureCliCredential
-
-AZURE_CLI_CREDENTIAL = AzureCliCredential()
 
 POLL_RETRIES = 240
 POLL_WAIT_SEC = 15
+POLL_INITIAL_WAIT_SEC = 0.5
+POLL_BACKOFF_FACTOR = 2
+# Seconds between LRO status requests of registry clients when the service sets no Retry-After, 30 by default.
+LRO_POLLING_INTERVAL_SEC = 2
+# Cached tokens are renewed this many seconds before they expire.
+TOKEN_REFRESH_MARGIN_SEC = 300
+# Client kwargs that are part of the registry key, clients built with any other kwargs are not shared.
+POOLED_CLIENT_KWARGS = frozenset(["api_version"])
 
 logger = get_logger(__name__)
 
 
 if TYPE_CHECKING:
+    from azure.core.credentials import AccessToken
+    from azure.core.pipeline.transport import RequestsTransport
     from azure.core.polling import LROPoller
+    from azure.identity import AzureCliCredential
 
     from ..vendor.clients.authzmgmt import AuthorizationManagementClient
     from ..vendor.clients.clusterconfigmgmt import KubernetesConfigurationClient
@@ -49,77 +60,159 @@ if TYPE_CHECKING:
     from ..vendor.clients.secretsyncmgmt import MicrosoftSecretSyncController
 
 
-# TODO @digimaun - simplify client init pattern. Consider multi-profile vs static API client.
+ClientType = TypeVar("ClientType")
+
+
+class CachedTokenCredential:
+    """
+    Shares access tokens between management clients. Each client pipeline otherwise
+    acquires its own token, which for the Azure CLI credential is an az subprocess.
+    """
+
+    def __init__(self, credential: "AzureCliCredential"):
+        self.credential = credential
+        self._tokens: Dict[Tuple[str, ...], "AccessToken"] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> "AccessToken":
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self.credential.get_token(*scopes, **kwargs)
+        with self._lock:
+            token = self._tokens.get(scopes)
+            if not token or token.expires_on - time.time() < TOKEN_REFRESH_MARGIN_SEC:
+                token = self._tokens[scopes] = self.credential.get_token(*scopes, **kwargs)
+            return token
+
+    def close(self):
+        self.credential.close()
+
+    def __enter__(self) -> "CachedTokenCredential":
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class ClientRegistry:
+    """
+    Per-process registry of management clients by client type, subscription and API version.
+
+    Clients share one HTTP session, so connections are kept alive across clients and commands,
+    and one credential, so a token is acquired once per scope. The credential and clients are
+    reset as each command starts, see reset_credential, the session is kept.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[type, str, Optional[str]], Any] = {}
+        self._credential: Optional[CachedTokenCredential] = None
+        self._session_transport: Optional["RequestsTransport"] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def credential(self) -> CachedTokenCredential:
+        with self._lock:
+            if not self._credential:
+                from azure.identity import AzureCliCredential
+
+                self._credential = CachedTokenCredential(AzureCliCredential())
+            return self._credential
+
+    def get_transport(self) -> "RequestsTransport":
+        """
+        Transport over the shared session. Closing a client does not close the session.
+        """
+        from azure.core.pipeline.transport import RequestsTransport
+
+        with self._lock:
+            if not self._session_transport:
+                # Owns the session, configured like the session of any client transport.
+                self._session_transport = RequestsTransport()
+                self._session_transport.open()
+            return RequestsTransport(session=self._session_transport.session, session_owner=False)
+
+    def get_client(self, client_type: Type[ClientType], subscription_id: str, **kwargs) -> ClientType:
+        pooled = POOLED_CLIENT_KWARGS.issuperset(kwargs)
+        key = (client_type, subscription_id, kwargs.get("api_version"))
+        with self._lock:
+            if pooled and key in self._clients:
+                return self._clients[key]
+
+            if "http_logging_policy" not in kwargs:
+                kwargs["http_logging_policy"] = get_default_logging_policy()
+            kwargs["per_call_policies"] = ensure_arm_cache_policy(kwargs.get("per_call_policies"))
+            kwargs.setdefault("polling_interval", LRO_POLLING_INTERVAL_SEC)
+            if "transport" not in kwargs:
+                kwargs["transport"] = self.get_transport()
+
+            client = client_type(
+                credential=self.credential,
+                subscription_id=subscription_id,
+                user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
+                **kwargs,
+            )
+            if pooled:
+                self._clients[key] = client
+            return client
+
+    def reset_credential(self):
+        """
+        Drop the credential, its cached tokens and the clients using it, keeping the shared session.
+
+        Between commands of a long lived host the account, tenant or subscription may have changed.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._credential = None
+
+    def clear(self):
+        with self._lock:
+            self.reset_credential()
+            if self._session_transport:
+                self._session_transport.close()
+                self._session_transport = None
+
+
+CLIENT_REGISTRY = ClientRegistry()
+
+
+def get_azure_cli_credential() -> CachedTokenCredential:
+    """
+    Credential shared by all management clients, created on first use rather than when the module is imported.
+    """
+    return CLIENT_REGISTRY.credential
 
 
 def get_ssc_mgmt_client(subscription_id: str, **kwargs) -> "MicrosoftSecretSyncController":
     from ..vendor.clients.secretsyncmgmt import MicrosoftSecretSyncController
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return MicrosoftSecretSyncController(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(MicrosoftSecretSyncController, subscription_id=subscription_id, **kwargs)
 
 
 def get_msi_mgmt_client(subscription_id: str, **kwargs) -> "ManagedServiceIdentityClient":
     from ..vendor.clients.msimgmt import ManagedServiceIdentityClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return ManagedServiceIdentityClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(ManagedServiceIdentityClient, subscription_id=subscription_id, **kwargs)
 
 
 def get_clusterconfig_mgmt_client(subscription_id: str, **kwargs) -> "KubernetesConfigurationClient":
     from ..vendor.clients.clusterconfigmgmt import KubernetesConfigurationClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return KubernetesConfigurationClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(KubernetesConfigurationClient, subscription_id=subscription_id, **kwargs)
 
 
 def get_connectedk8s_mgmt_client(subscription_id: str, **kwargs) -> "ConnectedKubernetesClient":
     from ..vendor.clients.connectedclustermgmt import ConnectedKubernetesClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return ConnectedKubernetesClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(ConnectedKubernetesClient, subscription_id=subscription_id, **kwargs)
 
 
 def get_storage_mgmt_client(subscription_id: str, **kwargs) -> "StorageManagementClient":
     from ..vendor.clients.storagemgmt import StorageManagementClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return StorageManagementClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(StorageManagementClient, subscription_id=subscription_id, **kwargs)
 
 
 REGISTRY_API_VERSION = "2024-09-01-preview"
@@ -130,80 +223,55 @@ def get_registry_mgmt_client(subscription_id: str, **kwargs) -> "MicrosoftDevice
         MicrosoftDeviceRegistryManagementService,
     )
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return MicrosoftDeviceRegistryManagementService(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
+    return CLIENT_REGISTRY.get_client(
+        MicrosoftDeviceRegistryManagementService, subscription_id=subscription_id, **kwargs
     )
 
 
 def get_iotops_mgmt_client(subscription_id: str, **kwargs) -> "MicrosoftIoTOperationsManagementService":
     from ..vendor.clients.iotopsmgmt import MicrosoftIoTOperationsManagementService
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return MicrosoftIoTOperationsManagementService(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
+    return CLIENT_REGISTRY.get_client(
+        MicrosoftIoTOperationsManagementService, subscription_id=subscription_id, **kwargs
     )
 
 
 def get_resource_client(subscription_id: str, **kwargs) -> "ResourceManagementClient":
     from ..vendor.clients.resourcesmgmt import ResourceManagementClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return ResourceManagementClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(ResourceManagementClient, subscription_id=subscription_id, **kwargs)
 
 
 def get_authz_client(subscription_id: str, **kwargs) -> "AuthorizationManagementClient":
     from ..vendor.clients.authzmgmt import AuthorizationManagementClient
 
-    if "http_logging_policy" not in kwargs:
-        kwargs["http_logging_policy"] = get_default_logging_policy()
-
-    return AuthorizationManagementClient(
-        credential=AZURE_CLI_CREDENTIAL,
-        subscription_id=subscription_id,
-        user_agent_policy=UserAgentPolicy(user_agent=USER_AGENT),
-        **kwargs,
-    )
+    return CLIENT_REGISTRY.get_client(AuthorizationManagementClient, subscription_id=subscription_id, **kwargs)
 
 
 def wait_for_terminal_state(poller: "LROPoller", wait_sec: int = POLL_WAIT_SEC, **_) -> JSON:
-    # resource client does not handle sigint well
-    counter = 0
-    while counter < POLL_RETRIES:
-        sleep(wait_sec)
-        counter = counter + 1
-        if poller.done():
-            break
+    wait_for_terminal_states(poller, retries=POLL_RETRIES, wait_sec=wait_sec)
     return poller.result()
 
 
 def wait_for_terminal_states(
     *pollers: "LROPoller", retries: int = POLL_RETRIES, wait_sec: int = POLL_WAIT_SEC, **_
 ) -> Tuple["LROPoller"]:
-    counter = 0
-    while counter < retries:
-        sleep(wait_sec)
-        counter = counter + 1
-        batch_done = all(poller.done() for poller in pollers)
-        if batch_done:
-            break
+    """
+    Waits on pollers until all are done, or until retries * wait_sec seconds have been waited.
+
+    Checks start POLL_INITIAL_WAIT_SEC apart and back off exponentially, capped at wait_sec and at
+    LRO_POLLING_INTERVAL_SEC. Checks are local, the status requests are made by the poller threads.
+    """
+    # resource client does not handle sigint well, so wait in short sleeps rather than on the poller threads.
+    pending = list(pollers)
+    max_interval = min(LRO_POLLING_INTERVAL_SEC, wait_sec)
+    interval = min(POLL_INITIAL_WAIT_SEC, max_interval)
+    waited = 0.0
+    while pending and waited < retries * wait_sec:
+        sleep(interval)
+        waited += interval
+        pending = [poller for poller in pending if not poller.done()]
+        interval = min(interval * POLL_BACKOFF_FACTOR, max_interval)
 
     return pollers
 
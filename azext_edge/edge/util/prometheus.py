@@ -0,0 +1,306 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import math
+import re
+import time
+from array import array
+from io import StringIO
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_PATTERN = re.compile(
+    r"^([a-zA-Z_:][a-zA-Z0-9_:]*)"
+    r"(?:\s*\{((?:[^\"}]|\"(?:[^\"\\]|\\.)*\")*)\})?"
+    r"\s+(\S+)(?:\s+(-?\d+))?\s*$"
+)
+LABEL_PATTERN = re.compile(r"\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\"((?:[^\"\\]|\\.)*)\"\s*,?")
+LABEL_ESCAPE_PATTERN = re.compile(r"\\(.)")
+LABEL_ESCAPES = {"n": "\n", "\\": "\\", '"': '"'}
+
+# Sample name suffixes of the series a metric family type is exposed as.
+FAMILY_SUFFIXES = {
+    "counter": ("_total", "_created"),
+    "histogram": ("_bucket", "_sum", "_count", "_created"),
+    "gaugehistogram": ("_bucket", "_gsum", "_gcount"),
+    "summary": ("_sum", "_count", "_created"),
+}
+UNTYPED = "untyped"
+
+DEFAULT_HISTORY_CAPACITY = 60
+SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    type: str = UNTYPED
+    help: str = ""
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Dict[str, str]
+    value: float
+    family: str
+
+
+class MetricTable:
+    """
+    Columnar table of the samples of Prometheus text format scrapes.
+
+    Each sample is a row of sample name id, label set id and value. Names and label sets
+    are interned, so series repeated across scrapes share their strings.
+    """
+
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+        self.name_ids = array("I")
+        self.label_ids = array("I")
+        self.values = array("d")
+        self._names: List[str] = []
+        self._name_index: Dict[str, int] = {}
+        self._sample_families: List[str] = []
+        self._label_sets: List[LabelSet] = []
+        self._label_index: Dict[Union[str, LabelSet], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def add(self, name: str, labels: Union[str, LabelSet], value: float):
+        """
+        Adds a sample, labels either as the raw text between braces or as a label set.
+        """
+        name_id = self._name_index.get(name)
+        if name_id is None:
+            name_id = self._name_index[name] = len(self._names)
+            self._names.append(name)
+            self._sample_families.append(self._get_family_name(name))
+        label_id = self._label_index.get(labels)
+        if label_id is None:
+            label_set = labels if isinstance(labels, tuple) else _parse_labels(labels)
+            label_id = self._label_index.get(label_set)
+            if label_id is None:
+                label_id = self._label_index[label_set] = len(self._label_sets)
+                self._label_sets.append(label_set)
+            self._label_index[labels] = label_id
+        self.name_ids.append(name_id)
+        self.label_ids.append(label_id)
+        self.values.append(value)
+
+    def extend(self, other: "MetricTable"):
+        for family in other.families.values():
+            self.families.setdefault(family.name, family)
+        for name_id, label_id, value in zip(other.name_ids, other.label_ids, other.values):
+            self.add(other._names[name_id], other._label_sets[label_id], value)
+
+    def family_of(self, name: str) -> Optional[str]:
+        name_id = self._name_index.get(name)
+        return self._sample_families[name_id] if name_id is not None else None
+
+    def samples(self, name: Optional[str] = None, labels: Optional[Dict[str, str]] = None) -> Iterator[Sample]:
+        """
+        Samples in scrape order. A name matches either a sample name or a metric family name,
+        the latter covering e.g. the _bucket, _sum and _count series of a histogram.
+        """
+        name_ids = None
+        if name is not None:
+            name_ids = {
+                name_id
+                for name_id, sample_name in enumerate(self._names)
+                if sample_name == name or self._sample_families[name_id] == name
+            }
+            if not name_ids:
+                return
+        label_items = set(labels.items()) if labels else None
+        for name_id, label_id, value in zip(self.name_ids, self.label_ids, self.values):
+            if name_ids is not None and name_id not in name_ids:
+                continue
+            label_set = self._label_sets[label_id]
+            if label_items and not label_items.issubset(label_set):
+                continue
+            yield Sample(
+                name=self._names[name_id],
+                labels=dict(label_set),
+                value=value,
+                family=self._sample_families[name_id],
+            )
+
+    def sum_by(self, name: str, by: Optional[Iterable[str]] = None) -> Dict[Tuple[str, Tuple[str, ...]], float]:
+        """
+        Sums the samples of name per sample name and values of the by labels, like 'sum by' in PromQL.
+        """
+        by = list(by or [])
+        result: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+        for sample in self.samples(name=name):
+            key = (sample.name, tuple(sample.labels.get(label, "") for label in by))
+            result[key] = result.get(key, 0.0) + sample.value
+        return result
+
+    def _get_family_name(self, name: str) -> str:
+        if name in self.families:
+            return name
+        for family_type, suffixes in FAMILY_SUFFIXES.items():
+            for suffix in suffixes:
+                if name.endswith(suffix):
+                    family = self.families.get(name[: -len(suffix)])
+                    if family and family.type == family_type:
+                        return family.name
+        return name
+
+
+class SeriesHistory:
+    """
+    Bounded ring buffer of past scrapes, one array of values per series.
+
+    Scrapes share a ring of timestamps. The slot of a scrape a series is missing from holds NaN,
+    so the values of all series stay aligned without per-scrape dicts.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY):
+        if capacity < 2:
+            raise ValueError("History capacity must be at least 2 scrapes.")
+        self.capacity = capacity
+        self.timestamps = array("d", [math.nan] * capacity)
+        self.series: Dict[Hashable, array] = {}
+        self._cursor = -1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, values: Dict[Hashable, float], timestamp: Optional[float] = None):
+        self._cursor = (self._cursor + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.timestamps[self._cursor] = timestamp if timestamp is not None else time.time()
+        for key, column in self.series.items():
+            column[self._cursor] = values.get(key, math.nan)
+        for key in values.keys() - self.series.keys():
+            column = self.series[key] = array("d", [math.nan] * self.capacity)
+            column[self._cursor] = values[key]
+
+    def window(self, key: Hashable) -> List[Tuple[float, float]]:
+        """
+        Timestamps and values of a series in the window, oldest first.
+        """
+        column = self.series.get(key)
+        if column is None:
+            return []
+        result = []
+        for offset in range(self._count - 1, -1, -1):
+            index = (self._cursor - offset) % self.capacity
+            value = column[index]
+            if not math.isnan(value):
+                result.append((self.timestamps[index], value))
+        return result
+
+    def delta(self, key: Hashable, counter: bool = False) -> Optional[float]:
+        """
+        Change between the last two scrapes of a series. A counter going down was reset,
+        its delta is then the value counted since.
+        """
+        window = self.window(key)[-2:]
+        if len(window) < 2:
+            return None
+        previous, last = window[0][1], window[1][1]
+        if counter and last < previous:
+            return last
+        return last - previous
+
+    def rate(self, key: Hashable, counter: bool = False) -> Optional[float]:
+        window = self.window(key)[-2:]
+        delta = self.delta(key, counter=counter)
+        if delta is None:
+            return None
+        elapsed = window[1][0] - window[0][0]
+        return delta / elapsed if elapsed > 0 else None
+
+    def quantile(self, key: Hashable, q: float) -> Optional[float]:
+        values = sorted(value for _, value in self.window(key))
+        if not values:
+            return None
+        position = (len(values) - 1) * q
+        lower = math.floor(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    def sparkline(self, key: Hashable, width: Optional[int] = None) -> str:
+        values = [value for _, value in self.window(key)]
+        if width:
+            values = values[-width:]
+        values = [value for value in values if not math.isinf(value)]
+        if not values:
+            return ""
+        low, high = min(values), max(values)
+        top = len(SPARKLINE_CHARS) - 1
+        if high == low:
+            return SPARKLINE_CHARS[0] * len(values)
+        return "".join(SPARKLINE_CHARS[round((value - low) / (high - low) * top)] for value in values)
+
+
+def parse_metrics(content: Union[str, Iterable[str]], table: Optional[MetricTable] = None) -> MetricTable:
+    """
+    Parses Prometheus text exposition format in a single pass over its lines.
+
+    HELP and TYPE metadata is kept per metric family, and the series of histograms and summaries
+    are attributed to their family. Malformed lines are skipped.
+    """
+    if isinstance(content, str):
+        content = StringIO(content)
+    table = table if table is not None else MetricTable()
+    families = table.families
+    for line in content:
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == "#":
+            parts = line.split(None, 3)
+            if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                family = families.get(parts[2]) or MetricFamily(name=parts[2])
+                text = parts[3] if len(parts) > 3 else ""
+                if parts[1] == "HELP":
+                    family = family._replace(help=_unescape(text) if "\\" in text else text)
+                else:
+                    family = family._replace(type=text.lower() or UNTYPED)
+                families[family.name] = family
+            continue
+        match = SAMPLE_PATTERN.match(line)
+        if not match:
+            logger.debug("Skipping malformed metrics line: %s", line[:100])
+            continue
+        name, labels, value, _ = match.groups()
+        try:
+            table.add(name=name, labels=labels or "", value=float(value))
+        except ValueError:
+            logger.debug("Skipping metrics line with invalid value: %s", line[:100])
+    return table
+
+
+def format_labels(labels: Union[Dict[str, str], LabelSet]) -> str:
+    items = labels.items() if isinstance(labels, dict) else labels
+    return ",".join(f'{key}="{value}"' for key, value in items)
+
+
+def _parse_labels(labels: str) -> LabelSet:
+    if not labels:
+        return ()
+    return tuple(
+        sorted(
+            (key, _unescape(value) if "\\" in value else value) for key, value in LABEL_PATTERN.findall(labels)
+        )
+    )
+
+
+def _unescape(value: str) -> str:
+    return LABEL_ESCAPE_PATTERN.sub(lambda match: LABEL_ESCAPES.get(match.group(1), match.group(0)), value)
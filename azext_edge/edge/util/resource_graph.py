@@ -9,6 +9,8 @@ from typing import List, Optional, TYPE_CHECKING
 
 from azure.cli.core.util import send_raw_request
 
+from .arm_cache import ARM_CACHE
+
 GRAPH_API_VERSION = "2022-10-01"
 GRAPH_RESOURCE_PATH = f"/providers/Microsoft.ResourceGraph/resources?api-version={GRAPH_API_VERSION}"
 
@@ -33,8 +35,14 @@ class ResourceGraph:
 
         Returns:
           A dict including a 'data' property that has the accumulated resources.
+          Identical queries within a command are answered from ARM_CACHE until the next write.
         """
-        return self._process_resource_query(query=query, page_size=page_size)
+        key = (tuple(self.subscriptions), query, page_size)
+        result = ARM_CACHE.get_query(key)
+        if result is None:
+            result = self._process_resource_query(query=query, page_size=page_size)
+            ARM_CACHE.set_query(key, result)
+        return result
 
     def _process_resource_query(self, query: str, page_size: Optional[int] = None) -> List[dict]:
         result = {"data": []}
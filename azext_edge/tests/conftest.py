@@ -10,6 +10,25 @@ import sys
 import responses
 
 
+@pytest.fixture(autouse=True)
+def reset_arm_cache():
+    from azext_edge.edge.util.arm_cache import ARM_CACHE
+
+    ARM_CACHE.clear()
+    yield
+    ARM_CACHE.clear()
+    ARM_CACHE.ttl_seconds = 0
+
+
+@pytest.fixture(autouse=True)
+def reset_client_registry():
+    from azext_edge.edge.util.az_client import CLIENT_REGISTRY
+
+    CLIENT_REGISTRY.clear()
+    yield
+    CLIENT_REGISTRY.clear()
+
+
 # Sets current working directory to the directory of the executing file
 @pytest.fixture
 def set_cwd(request):
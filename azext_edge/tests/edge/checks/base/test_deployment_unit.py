@@ -0,0 +1,55 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import threading
+import time
+
+from azext_edge.edge.providers.check.base import check_post_deployment
+from azext_edge.edge.providers.check.common import CoreServiceResourceKinds
+from azext_edge.edge.providers.edge_api import DATAFLOW_API_V1B1, DataflowResourceKinds
+
+
+def test_check_post_deployment_concurrent(mocker):
+    mocker.patch(
+        "azext_edge.edge.providers.check.base.deployment.enumerate_ops_service_resources",
+        return_value=(
+            {"name": "enumerate"},
+            {"Dataflow": [{}], "DataflowEndpoint": [{}], "DataflowProfile": [{}]},
+        ),
+    )
+    resources = [
+        CoreServiceResourceKinds.RUNTIME_RESOURCE,
+        DataflowResourceKinds.DATAFLOWPROFILE,
+        DataflowResourceKinds.DATAFLOW,
+        DataflowResourceKinds.DATAFLOWENDPOINT,
+    ]
+    # Each evaluation waits for all others to start, which only completes if they run concurrently.
+    barrier = threading.Barrier(len(resources), timeout=5)
+
+    def _evaluate(name: str, delay: float):
+        def _run(detail_level, as_list, resource_name):
+            barrier.wait()
+            time.sleep(delay)
+            return {"name": name, "detailLevel": detail_level, "resourceName": resource_name}
+
+        return _run
+
+    evaluate_funcs = {
+        resource: _evaluate(resource.value, delay=(len(resources) - index) * 0.05)
+        for index, resource in enumerate(resources)
+    }
+
+    results = check_post_deployment(
+        evaluate_funcs=evaluate_funcs,
+        api_info=DATAFLOW_API_V1B1,
+        detail_level=1,
+        resource_name="mock-*",
+    )
+
+    # Results keep the declared order, not the completion order.
+    assert results == [{"name": "enumerate"}] + [
+        {"name": resource.value, "detailLevel": 1, "resourceName": "mock-*"} for resource in resources
+    ]
@@ -6,7 +6,6 @@
 
 import pytest
 
-from kubernetes.client.models import V1Node, V1NodeList, V1NodeStatus, V1ObjectMeta
 from kubernetes.utils import parse_quantity
 
 from azext_edge.edge.providers.check.common import (
@@ -16,25 +15,20 @@ from ....generators import generate_random_string
 
 
 @pytest.fixture
-def mocked_node_client(mocked_client, mocker, request):
+def mocked_node_client(mocked_client, request):
     params = getattr(request, "param", [])
 
     nodes = []
     for node_params in params:
         arch = node_params.pop("architecture", generate_random_string(size=5))
-        # Too annoying to make a valid one
-        node_info = mocker.Mock(architecture=arch)
-        node = V1Node(
-            metadata=V1ObjectMeta(name=generate_random_string()),
-            status=V1NodeStatus(
-                capacity=node_params,
-                node_info=node_info
-            )
-        )
+        node = {
+            "metadata": {"name": generate_random_string()},
+            "status": {"capacity": node_params, "nodeInfo": {"architecture": arch}},
+        }
         nodes.append(node)
 
-    # patched_client = mocker.patch("azext_edge.edge.providers.base.client")
-    mocked_client.CoreV1Api().list_node.return_value = V1NodeList(items=nodes)
+    # Served as the raw list response.
+    mocked_client.CoreV1Api().list_node.return_value = {"items": nodes}
     yield mocked_client
 
 
@@ -99,7 +93,7 @@ def test_check_nodes(mocked_node_client):
     assert result
     assert result["name"] == "evalClusterNodes"
 
-    nodes = mocked_node_client.CoreV1Api().list_node.return_value.items
+    nodes = mocked_node_client.CoreV1Api().list_node.return_value["items"]
     evaluation = result["targets"]["cluster/nodes"]["_all_"]["evaluations"]
     if not nodes:
         assert result["status"] == "error"
@@ -125,17 +119,17 @@ def test_check_nodes(mocked_node_client):
 
     for i in range(len(nodes)):
         node = nodes[i]
-        name = node.metadata.name
+        name = node["metadata"]["name"]
         # first row is to show expected
         i = i + 1
         assert name in unpacked_cols[0][i]
-        arch = node.status.node_info.architecture
+        arch = node["status"]["nodeInfo"]["architecture"]
         assert arch in unpacked_cols[1][i]
-        cpu = node.status.capacity.get("cpu", 0)
+        cpu = node["status"]["capacity"].get("cpu", 0)
         assert str(cpu) in unpacked_cols[2][i]
-        memory = node.status.capacity.get("memory", 0)
+        memory = node["status"]["capacity"].get("memory", 0)
         assert "%.2f" % (parse_quantity(memory) / DISPLAY_BYTES_PER_GIGABYTE) in unpacked_cols[3][i]
-        storage = node.status.capacity.get("ephemeral-storage", 0)
+        storage = node["status"]["capacity"].get("ephemeral-storage", 0)
         assert "%.2f" % (parse_quantity(storage) / DISPLAY_BYTES_PER_GIGABYTE) in unpacked_cols[4][i]
 
         assert f"cluster/nodes/{name}" in result["targets"]
@@ -960,3 +960,75 @@ def test_process_custom_resource_status(
 
     # Verify the expected calls to add_target_eval
     assert mocked_check_manager.add_target_eval.call_args_list == expected_eval_calls
+
+
+@pytest.mark.parametrize(
+    "resource_name, namespace, expected_names",
+    [
+        (None, None, [("ns1", "asset1"), ("ns1", "asset2"), ("ns2", "asset1"), ("ns2", "other")]),
+        (None, "ns2", [("ns2", "asset1"), ("ns2", "other")]),
+        ("asset1", None, [("ns1", "asset1"), ("ns2", "asset1")]),
+        ("ASSET1", "ns2", [("ns2", "asset1")]),
+        ("asset*", "ns1", [("ns1", "asset1"), ("ns1", "asset2")]),
+        ("*r", None, [("ns2", "other")]),
+        ("asset3", None, []),
+        ("asset1", "ns3", []),
+    ],
+)
+def test_resource_index_find(resource_name, namespace, expected_names):
+    from azext_edge.edge.providers.check.base import ResourceIndex
+
+    resources = [
+        {"metadata": {"name": "asset1", "namespace": "ns1"}},
+        {"metadata": {"name": "asset2", "namespace": "ns1"}},
+        {"metadata": {"name": "asset1", "namespace": "ns2"}},
+        {"metadata": {"name": "other", "namespace": "ns2"}},
+    ]
+    index = ResourceIndex(resources)
+    result = index.find(resource_name=resource_name, namespace=namespace)
+    assert [(r["metadata"]["namespace"], r["metadata"]["name"]) for r in result] == expected_names
+
+    # Exact and glob lookups agree with filter_resources_by_name.
+    candidates = [r for r in resources if not namespace or r["metadata"]["namespace"] == namespace]
+    assert result == filter_resources_by_name(candidates, resource_name)
+    if resource_name:
+        assert index.get(name=resource_name, namespace=namespace) == (result[0] if result else None)
+
+
+def test_get_resources_by_name_indexed(mocker):
+    from azext_edge.edge.providers.check.base import ResourceIndexes
+    from azext_edge.edge.providers.command_context import CommandContext, bind_command_context
+
+    resources = [
+        {"metadata": {"name": "profile1", "namespace": "ns1"}},
+        {"metadata": {"name": "profile2", "namespace": "ns2"}},
+    ]
+    get_resources_patch = mocker.patch(
+        "azext_edge.edge.providers.edge_api.base.EdgeResourceApi.get_resources",
+        return_value={"items": resources},
+    )
+
+    with bind_command_context(CommandContext(resource_indexes=ResourceIndexes())):
+        for _ in range(3):
+            assert get_resources_by_name(
+                api_info=DEVICEREGISTRY_API_V1,
+                kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE,
+                resource_name="profile2",
+            ) == [resources[1]]
+        assert get_resources_by_name(
+            api_info=DEVICEREGISTRY_API_V1,
+            kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE,
+            resource_name=None,
+            namespace="ns1",
+        ) == [resources[0]]
+
+    # One listing across namespaces serves every lookup of the run.
+    get_resources_patch.assert_called_once_with(kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE, namespace=None)
+
+    get_resources_by_name(
+        api_info=DEVICEREGISTRY_API_V1,
+        kind=DeviceRegistryResourceKinds.ASSETENDPOINTPROFILE,
+        resource_name="profile1",
+        namespace="ns1",
+    )
+    assert get_resources_patch.call_count == 2
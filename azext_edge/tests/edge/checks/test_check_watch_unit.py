@@ -0,0 +1,167 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import pytest
+from azure.cli.core.azclierror import ArgumentUsageError
+from kubernetes.client.exceptions import ApiException
+from urllib3.exceptions import HTTPError, ProtocolError
+
+from azext_edge.edge.commands_edge import check
+from azext_edge.edge.providers.check.base import check_post_deployment
+from azext_edge.edge.providers.check.base.watch import (
+    POD_INPUT,
+    CheckWatchSession,
+    get_evaluation_inputs,
+)
+from azext_edge.edge.providers.check.common import CoreServiceResourceKinds
+from azext_edge.edge.providers.checks import watch_checks
+from azext_edge.edge.providers.command_context import CommandContext, bind_command_context
+from azext_edge.edge.providers.edge_api import MQ_ACTIVE_API, MqResourceKinds
+
+BROKER_INPUT = (MQ_ACTIVE_API.group, MQ_ACTIVE_API.version, "brokers")
+LISTENER_INPUT = (MQ_ACTIVE_API.group, MQ_ACTIVE_API.version, "brokerlisteners")
+
+
+@pytest.fixture
+def mocked_mq_plurals(mocker):
+    plurals = {
+        MqResourceKinds.BROKER.value: "brokers",
+        MqResourceKinds.BROKER_LISTENER.value: "brokerlisteners",
+    }
+    patched = mocker.patch.object(
+        MQ_ACTIVE_API, "get_plural", side_effect=lambda kind: plurals.get(getattr(kind, "value", kind))
+    )
+    mocker.patch.object(type(MQ_ACTIVE_API), "kinds", new=frozenset(plurals.keys()))
+    yield patched
+
+
+def test_check_watch_session_reuse():
+    session = CheckWatchSession()
+    calls = []
+
+    def evaluate():
+        calls.append(True)
+        return len(calls)
+
+    assert session.evaluate(key=("broker",), inputs={BROKER_INPUT}, evaluate_func=evaluate) == 1
+    assert session.evaluate(key=("broker",), inputs={BROKER_INPUT}, evaluate_func=evaluate) == 1
+
+    session.notify(POD_INPUT)
+    assert session.wait_for_changes(timeout=0) == {POD_INPUT}
+    assert session.evaluate(key=("broker",), inputs={BROKER_INPUT}, evaluate_func=evaluate) == 1
+
+    session.notify(BROKER_INPUT)
+    session.wait_for_changes(timeout=0)
+    assert session.evaluate(key=("broker",), inputs={BROKER_INPUT}, evaluate_func=evaluate) == 2
+
+    # Nothing pending.
+    assert session.wait_for_changes(timeout=0) == set()
+
+
+def test_get_evaluation_inputs(mocked_mq_plurals):
+    assert get_evaluation_inputs(CoreServiceResourceKinds.RUNTIME_RESOURCE, MQ_ACTIVE_API) == {POD_INPUT}
+    assert get_evaluation_inputs(MqResourceKinds.BROKER, MQ_ACTIVE_API) == {POD_INPUT, BROKER_INPUT}
+    assert get_evaluation_inputs(MqResourceKinds.BROKER_LISTENER, MQ_ACTIVE_API) == {LISTENER_INPUT}
+
+
+def test_check_post_deployment_watch(mocker, mocked_mq_plurals):
+    mocked_enumerate = mocker.patch(
+        "azext_edge.edge.providers.check.base.deployment.enumerate_ops_service_resources",
+        return_value=({"name": "enumerate"}, {"Broker": [{}], "BrokerListener": [{}]}),
+    )
+    evaluate_funcs = {
+        CoreServiceResourceKinds.RUNTIME_RESOURCE: mocker.Mock(return_value={"name": "runtime"}),
+        MqResourceKinds.BROKER: mocker.Mock(return_value={"name": "broker"}),
+        MqResourceKinds.BROKER_LISTENER: mocker.Mock(return_value={"name": "listener"}),
+    }
+
+    def run():
+        return check_post_deployment(evaluate_funcs=evaluate_funcs, api_info=MQ_ACTIVE_API, as_list=True)
+
+    def call_counts():
+        return [evaluate_func.call_count for evaluate_func in evaluate_funcs.values()]
+
+    session = CheckWatchSession()
+    with bind_command_context(CommandContext(check_watch=session)):
+        expected = run()
+        assert call_counts() == [1, 1, 1]
+
+        session.notify(LISTENER_INPUT)
+        session.wait_for_changes(timeout=0)
+        assert run() == expected
+        assert call_counts() == [1, 1, 2]
+
+        session.notify(POD_INPUT)
+        session.wait_for_changes(timeout=0)
+        assert run() == expected
+        assert call_counts() == [2, 2, 2]
+
+    mocked_enumerate.assert_called_once()
+
+    # Without an active watch everything is evaluated.
+    run()
+    assert call_counts() == [3, 3, 3]
+    assert mocked_enumerate.call_count == 2
+
+
+def test_watch_checks(mocker, mocked_mq_plurals):
+    mocked_snapshot_watch = mocker.patch("azext_edge.edge.providers.checks.SnapshotWatch")
+    mocked_snapshot_watch.return_value.start.return_value = mocked_snapshot_watch.return_value
+    mocked_live = mocker.patch("rich.live.Live")
+    mocked_check_mq = mocker.patch("azext_edge.edge.providers.checks.check_mq_deployment", return_value=[])
+    mocked_pre = mocker.patch("azext_edge.edge.providers.checks._check_pre_deployment", return_value=[])
+    mocker.patch.object(
+        CheckWatchSession, "wait_for_changes", side_effect=[set(), {POD_INPUT}, {BROKER_INPUT}, KeyboardInterrupt]
+    )
+
+    assert watch_checks(ops_service="broker", resource_kinds=["broker"], settle_seconds=0) is None
+
+    watched_kinds = [call.kwargs["kind"] for call in mocked_snapshot_watch.call_args_list]
+    assert watched_kinds == [POD_INPUT, BROKER_INPUT]
+    assert mocked_snapshot_watch.return_value.stop.call_count == 2
+    # Initial evaluation and one per change batch.
+    assert mocked_check_mq.call_count == 3
+    mocked_pre.assert_called_once()
+    assert mocked_live.return_value.__enter__.return_value.update.call_count == 2
+
+
+@pytest.mark.parametrize("error", [ProtocolError("Connection broken"), HTTPError("reset"), ApiException(status=500)])
+def test_watch_checks_watch_failure(mocker, mocked_mq_plurals, error):
+    watch = mocker.Mock()
+    watch.start.return_value = watch
+    failing_watch = mocker.Mock()
+    failing_watch.start.side_effect = error
+    mocked_snapshot_watch = mocker.patch(
+        "azext_edge.edge.providers.checks.SnapshotWatch", side_effect=[failing_watch, watch]
+    )
+    mocker.patch("rich.live.Live")
+    mocked_check_mq = mocker.patch("azext_edge.edge.providers.checks.check_mq_deployment", return_value=[])
+    mocker.patch("azext_edge.edge.providers.checks._check_pre_deployment", return_value=[])
+    mocker.patch.object(CheckWatchSession, "wait_for_changes", side_effect=[{BROKER_INPUT}, KeyboardInterrupt])
+
+    # The kind failing to watch does not end the watch, the others still trigger re-evaluation.
+    assert watch_checks(ops_service="broker", resource_kinds=["broker"], settle_seconds=0) is None
+    assert mocked_snapshot_watch.call_count == 2
+    assert mocked_check_mq.call_count == 2
+    watch.stop.assert_called_once()
+    failing_watch.stop.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "check_kwargs, error",
+    [
+        ({"as_object": True}, "--as-object"),
+        ({"pre_deployment_checks": True}, "post-deployment"),
+    ],
+)
+def test_check_watch_invalid_args(mocker, mocked_config, check_kwargs, error):
+    mocker.patch("azext_edge.edge.commands_edge.META_API_V1B1.is_deployed", return_value=True)
+    mocked_watch = mocker.patch("azext_edge.edge.providers.checks.watch_checks")
+
+    with pytest.raises(ArgumentUsageError) as e:
+        check(cmd=None, watch=True, **check_kwargs)
+    assert error in e.value.error_msg
+    mocked_watch.assert_not_called()
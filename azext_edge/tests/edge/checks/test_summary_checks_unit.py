@@ -306,3 +306,43 @@ def test_summary_input_errors(
             resource_kinds=resource_kinds,
             resource_name=resource_name,
         )
+
+
+def test_summary_checks_concurrent(mocker):
+    import threading
+
+    # Every service check waits for all others to start, which only completes if they run concurrently.
+    services = ["akri", "mq", "deviceregistry", "opcua", "dataflow"]
+    barrier = threading.Barrier(len(services), timeout=5)
+
+    def _check_post_deployment(service: str, delay: float):
+        def _run(*args, **kwargs):
+            import time
+
+            # Evaluations of a service check run serially under the summary pool.
+            assert kwargs["concurrency"] == 1
+            barrier.wait()
+            # Finish in reverse order, the summary must keep the declared order regardless.
+            time.sleep(delay)
+            return [{"name": service, "status": "success", "description": service}]
+
+        return _run
+
+    for index, service in enumerate(services):
+        mocker.patch(
+            f"azext_edge.edge.providers.check.{service}.check_post_deployment",
+            side_effect=_check_post_deployment(service, delay=(len(services) - index) * 0.05),
+        )
+
+    result = run_checks(pre_deployment=False, post_deployment=True, as_list=False)
+
+    targets = result["postDeployment"][0]["targets"]
+    assert list(targets) == [
+        "Akri",
+        MQ_ACTIVE_API.as_str(),
+        DEVICEREGISTRY_API_V1.as_str(),
+        OPCUA_API_V1.as_str(),
+        DATAFLOW_API_V1B1.as_str(),
+    ]
+    for target, service in zip(targets, services):
+        assert targets[target]["_all_"]["evaluations"][0]["value"] == {service: "success"}
@@ -8,18 +8,90 @@ import pytest
 from copy import deepcopy
 from knack.log import get_logger
 from azure.cli.core.azclierror import CLIInternalError
-from ..helpers import run
+from functools import partial
+
+from ..helpers import as_raw_list, run
 
 logger = get_logger(__name__)
 
 
+def _get_raw_list_methods():
+    from azext_edge.edge.providers.base import SNAPSHOT_LISTERS
+
+    methods = [
+        ("CoreV1Api", "list_node"),
+        ("CoreV1Api", "list_event_for_all_namespaces"),
+        ("StorageV1Api", "list_storage_class"),
+    ]
+    for api_name, namespaced_method, all_namespaces_method in SNAPSHOT_LISTERS.values():
+        methods.extend([(api_name, namespaced_method), (api_name, all_namespaces_method)])
+    return methods
+
+
+RAW_LIST_METHODS = _get_raw_list_methods()
+
+
 #  Unit testing
+@pytest.fixture(autouse=True)
+def reset_cluster_snapshot():
+    from azext_edge.edge.providers.base import CLUSTER_SNAPSHOT
+
+    CLUSTER_SNAPSHOT.clear()
+    yield
+    CLUSTER_SNAPSHOT.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_connected_cluster_states():
+    from azext_edge.edge.providers.orchestration.connected_cluster import clear_connected_cluster_states
+
+    clear_connected_cluster_states()
+    yield
+    clear_connected_cluster_states()
+
+
+@pytest.fixture(autouse=True)
+def reset_api_discovery(monkeypatch, tmp_path):
+    from azext_edge.edge.providers.base import API_DISCOVERY
+
+    # Keep the persisted discovery index out of the real Azure CLI config dir.
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    API_DISCOVERY.clear()
+    yield
+    API_DISCOVERY.clear()
+
+
 @pytest.fixture
 def mocked_client(mocker):
+    from kubernetes.client.models import V1APIGroup, V1APIGroupList, V1GroupVersionForDiscovery
+
+    from azext_edge.edge.providers import edge_api
+
     patched = mocker.patch("azext_edge.edge.providers.base.client", autospec=True)
+    # Aggregated discovery serves every known resource API, their resources are up to the test.
+    patched.ApisApi().get_api_versions.return_value = V1APIGroupList(
+        groups=[
+            V1APIGroup(
+                name=api.group,
+                versions=[V1GroupVersionForDiscovery(group_version=api.as_str(), version=api.version)],
+            )
+            for api in vars(edge_api).values()
+            if isinstance(api, edge_api.EdgeResourceApi)
+        ]
+    )
+    patched.ApisApi.reset_mock()
+    # Lists are read as raw JSON, serve return_value (empty unless set by the test) accordingly.
+    for api_name, list_method in RAW_LIST_METHODS:
+        list_func = getattr(getattr(patched, api_name)(), list_method)
+        list_func.return_value = {"items": []}
+        list_func.side_effect = as_raw_list(partial(_get_return_value, list_func))
     yield patched
 
 
+def _get_return_value(list_func, *args, **kwargs):
+    return list_func.return_value
+
+
 @pytest.fixture
 def mocked_config(request, mocker):
     patched = mocker.patch("azext_edge.edge.providers.base.config", autospec=True)
@@ -29,8 +101,8 @@ def mocked_config(request, mocker):
 
 
 @pytest.fixture
-def mocked_urlopen(mocker):
-    patched = mocker.patch("azext_edge.edge.providers.base.urlopen", autospec=True)
+def mocked_portforward_get(mocker):
+    patched = mocker.patch("azext_edge.edge.providers.base.PortforwardSession.get", autospec=True)
     yield patched
 
 
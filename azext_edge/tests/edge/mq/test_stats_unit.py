@@ -5,18 +5,26 @@
 # ----------------------------------------------------------------------------------------------
 
 import binascii
+import json
+from base64 import b64decode
 from copy import deepcopy
-from unittest.mock import MagicMock
-from zipfile import ZIP_DEFLATED, ZipInfo
+from datetime import datetime, timezone
+from http.client import RemoteDisconnected
+from io import BytesIO
+from urllib.error import HTTPError
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 import pytest
-from azure.cli.core.azclierror import ResourceNotFoundError
+from azure.cli.core.azclierror import InvalidArgumentValueError, ResourceNotFoundError
+from google.protobuf import json_format
 from google.protobuf.json_format import ParseDict
 from kubernetes.client.models import V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
 from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
 
 from azext_edge.edge.commands_mq import stats
 from azext_edge.edge.common import AIO_BROKER_DIAGNOSTICS_SERVICE, METRICS_SERVICE_API_PORT
+from azext_edge.edge.providers.stats import TraceQuery
+from azext_edge.edge.util.prometheus import SeriesHistory
 
 # pylint: disable=no-name-in-module
 from azext_edge.edge.providers.proto.diagnostics_service_pb2 import (
@@ -30,7 +38,7 @@ from ...generators import generate_random_string
 from .traces_data import TEST_TRACE, TEST_TRACE_PARTIAL
 
 
-def test_get_stats(mocker, mocked_cmd, mocked_client, mocked_config, mocked_urlopen, stub_raw_stats):
+def test_get_stats(mocker, mocked_cmd, mocked_client, mocked_config, mocked_portforward_get, stub_raw_stats):
     pods = [
         V1Pod(
             metadata=V1ObjectMeta(name=AIO_BROKER_DIAGNOSTICS_SERVICE, namespace="namespace"),
@@ -40,23 +48,183 @@ def test_get_stats(mocker, mocked_cmd, mocked_client, mocked_config, mocked_urlo
     pod_list = V1PodList(items=pods)
     mocked_client.CoreV1Api().list_namespaced_pod.return_value = pod_list
 
-    attrs = {"read.return_value": stub_raw_stats.read()}
-    response = MagicMock(**attrs)
-    # pylint: disable-next=unnecessary-dunder-call
-    mocked_urlopen.return_value.__enter__.return_value = response
+    mocked_portforward_get.return_value = stub_raw_stats.read().decode("utf-8")
 
     namespace = generate_random_string()
     context_name = generate_random_string()
     result = stats(cmd=mocked_cmd, namespace=namespace, context_name=context_name)
     min_stats_assert(result)
-    mocked_urlopen.assert_called_with(
-        f"http://{AIO_BROKER_DIAGNOSTICS_SERVICE}.{namespace}.kubernetes:{METRICS_SERVICE_API_PORT}/metrics"
+    session = mocked_portforward_get.call_args.args[0]
+    assert (session.namespace, session.pod_name, session.ports) == (
+        namespace,
+        AIO_BROKER_DIAGNOSTICS_SERVICE,
+        (METRICS_SERVICE_API_PORT,),
     )
+    mocked_portforward_get.assert_called_with(session, "/metrics")
 
     console_mock = mocker.patch("azext_edge.edge.providers.stats.console", autospec=True)
     stats(cmd=mocked_cmd, namespace=namespace, context_name=context_name, raw_response_print=True)
     console_mock.print.assert_called_once()
 
+    result = stats(
+        cmd=mocked_cmd,
+        namespace=namespace,
+        context_name=context_name,
+        metric_names=["aio_mq_publishes_received_per_second"],
+        group_by=["pod_type"],
+    )
+    assert list(result) == [
+        'aio_mq_publishes_received_per_second{pod_type="BE"}',
+        'aio_mq_publishes_received_per_second{pod_type="FE"}',
+    ]
+    assert isinstance(result['aio_mq_publishes_received_per_second{pod_type="FE"}']["value"], float)
+
+
+def test_get_stats_connection_closed(mocker, mocked_cmd, mocked_client, mocked_config, mocked_portforward_get):
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(name=AIO_BROKER_DIAGNOSTICS_SERVICE, namespace="namespace"),
+            status=V1PodStatus(phase=POD_STATE_RUNNING),
+        )
+    ]
+    mocked_client.CoreV1Api().list_namespaced_pod.return_value = V1PodList(items=pods)
+    mocked_logger = mocker.patch("azext_edge.edge.providers.stats.logger", autospec=True)
+
+    # A closed portforward connection ends stats quietly.
+    mocked_portforward_get.side_effect = ConnectionResetError("connection reset by peer")
+    assert stats(cmd=mocked_cmd, namespace=generate_random_string()) is None
+    mocked_logger.warning.assert_not_called()
+
+    # Error responses of the diagnostics service are reported.
+    mocked_portforward_get.side_effect = HTTPError(url="/metrics", code=503, msg="unavailable", hdrs=None, fp=None)
+    assert stats(cmd=mocked_cmd, namespace=generate_random_string()) is None
+    mocked_logger.warning.assert_called_once()
+
+
+def test_get_stats_all_namespaces(mocked_cmd, mocked_client, mocked_config, mocked_portforward_get):
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(name=f"{AIO_BROKER_DIAGNOSTICS_SERVICE}-{index}", namespace=namespace),
+            status=V1PodStatus(phase=phase),
+        )
+        for index, (namespace, phase) in enumerate(
+            [
+                ("tenant-a", POD_STATE_RUNNING),
+                ("tenant-a", POD_STATE_RUNNING),
+                ("tenant-b", POD_STATE_RUNNING),
+                ("tenant-c", "Pending"),
+            ]
+        )
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = V1PodList(items=pods)
+    raw_metrics = {
+        f"{AIO_BROKER_DIAGNOSTICS_SERVICE}-0": (1, 2.0, 10, 1, 3.5),
+        f"{AIO_BROKER_DIAGNOSTICS_SERVICE}-1": (2, 4.0, 20, 1, 1.5),
+        f"{AIO_BROKER_DIAGNOSTICS_SERVICE}-2": (4, 8.0, 40, 0, 2.5),
+    }
+
+    def _get(session, resource_path):
+        sessions, received_rate, subscriptions, correctness, latency = raw_metrics[session.pod_name]
+        return "\n".join(
+            [
+                "# TYPE aio_mq_connected_sessions gauge",
+                f"aio_mq_connected_sessions {sessions}",
+                f'aio_mq_publishes_received_per_second{{pod="{session.pod_name}"}} {received_rate}',
+                f"aio_mq_total_subscriptions {subscriptions}",
+                f'aio_mq_publish_route_replication_correctness{{route="r"}} {correctness}',
+                f"aio_mq_publish_latency_mu_ms {latency}",
+            ]
+        )
+
+    mocked_portforward_get.side_effect = _get
+    result = stats(cmd=mocked_cmd, all_namespaces=True)
+
+    assert list(result["namespaces"]) == ["tenant-a", "tenant-b"]
+    tenant_a, tenant_b, total = result["namespaces"]["tenant-a"], result["namespaces"]["tenant-b"], result["total"]
+    assert tenant_a["connected_sessions"]["value"] == 3
+    assert tenant_a["publishes_received_per_second"]["value"] == 6.0
+    assert tenant_a["publish_route_replication_correctness"]["value"] == "Pass"
+    assert tenant_a["publish_latency_mu_ms"]["value"] == 3.5
+    assert tenant_b["total_subscriptions"]["value"] == 40
+    assert total["connected_sessions"]["value"] == 7
+    assert total["publishes_received_per_second"]["value"] == 14.0
+    assert total["total_subscriptions"]["value"] == 70
+    assert total["publish_route_replication_correctness"]["value"] == "Fail"
+    assert total["publish_latency_mu_ms"]["value"] == 3.5
+    assert mocked_portforward_get.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        HTTPError(url="http://localhost/metrics", code=500, msg="error", hdrs=None, fp=None),
+        ConnectionResetError("closed"),
+        RemoteDisconnected("closed"),
+        ValueError("error"),
+    ],
+)
+def test_get_stats_all_namespaces_failure(
+    mocker, mocked_cmd, mocked_client, mocked_config, mocked_portforward_get, error
+):
+    mocked_logger = mocker.patch("azext_edge.edge.providers.stats.logger")
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(name=f"{AIO_BROKER_DIAGNOSTICS_SERVICE}-{namespace}", namespace=namespace),
+            status=V1PodStatus(phase=POD_STATE_RUNNING),
+        )
+        for namespace in ["tenant-a", "tenant-b"]
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = V1PodList(items=pods)
+
+    def _get(session, resource_path):
+        if session.namespace == "tenant-b":
+            raise error
+        return "aio_mq_connected_sessions 3"
+
+    mocked_portforward_get.side_effect = _get
+    result = stats(cmd=mocked_cmd, all_namespaces=True)
+
+    assert list(result["namespaces"]) == ["tenant-a"]
+    assert result["namespaces"]["tenant-a"]["connected_sessions"]["value"] == 3
+    assert result["total"]["connected_sessions"]["value"] == 3
+    mocked_logger.warning.assert_called_once()
+    assert "tenant-b" in mocked_logger.warning.call_args[0][0]
+
+
+@pytest.mark.parametrize("file_name", ["stats.csv", "stats.ndjson"])
+def test_get_stats_watch(mocker, mocked_cmd, mocked_client, mocked_config, mocked_portforward_get, tmp_path, file_name):
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(name=AIO_BROKER_DIAGNOSTICS_SERVICE, namespace="namespace"),
+            status=V1PodStatus(phase=POD_STATE_RUNNING),
+        )
+    ]
+    mocked_client.CoreV1Api().list_namespaced_pod.return_value = V1PodList(items=pods)
+    mocked_portforward_get.side_effect = [
+        f"aio_mq_connected_sessions {sessions}\naio_mq_publish_route_replication_correctness 1"
+        for sessions in [1, 3, 8]
+    ]
+    mocker.patch("azext_edge.edge.providers.stats.sleep", side_effect=[None, None, KeyboardInterrupt])
+    history_record = mocker.spy(SeriesHistory, "record")
+    stats_file = tmp_path.joinpath("watch", file_name)
+
+    stats(cmd=mocked_cmd, namespace="namespace", watch=True, history_size=2, stats_file=str(stats_file))
+
+    recorded = [call.args[1] for call in history_record.call_args_list]
+    assert recorded == [{(None, "connected_sessions"): sessions} for sessions in [1.0, 3.0, 8.0]]
+    lines = stats_file.read_text(encoding="utf-8").splitlines()
+    if file_name.endswith(".csv"):
+        assert lines[0] == "timestamp,namespace,stat,value"
+        assert [line.split(",", 2)[2] for line in lines[1:3]] == [
+            "connected_sessions,1.0",
+            "publish_route_replication_correctness,Pass",
+        ]
+        assert len(lines) == 7
+    else:
+        records = [json.loads(line) for line in lines]
+        assert [record["stats"]["connected_sessions"] for record in records] == [1.0, 3.0, 8.0]
+        assert records[0]["namespace"] is None
+
 
 @pytest.mark.parametrize(
     "trace_ids,trace_dir,recv_side_effect",
@@ -183,10 +351,16 @@ def test_get_traces(
     request_len_b = len(serialized_request).to_bytes(4, byteorder="big")
 
     portforward_socket_mock = mocker.patch("azext_edge.edge.providers.stats.portforward_socket")
-    portforward_socket_mock().__enter__().recv.side_effect = recv_side_effect
+    # Responses are framed with their actual size, and served to recv_into.
+    stream = BytesIO(b"".join(len(r).to_bytes(4, byteorder="big") + r for r in recv_side_effect[1::2]))
+    portforward_socket_mock().__enter__().recv_into.side_effect = lambda view, size: stream.readinto(view[:size])
     result = stats(
         cmd=mocked_cmd, namespace=namespace, context_name=context_name, trace_ids=trace_ids, trace_dir=trace_dir
     )
+    if for_support_bundle:
+        # Zip members are streamed as they are consumed.
+        assert not isinstance(result, list)
+        result = list(result)
 
     request_bytes_length = portforward_socket_mock().__enter__().sendall.call_args_list[0].args[0]
     assert request_bytes_length == request_len_b
@@ -217,6 +391,232 @@ def test_get_traces(
     # pylint: enable=unnecessary-dunder-call
 
 
+def _generate_error_trace() -> dict:
+    trace_data = deepcopy(TEST_TRACE.data)
+    for resource_span in trace_data["resourceSpans"]:
+        for scope_span in resource_span["scopeSpans"]:
+            for span in scope_span["spans"]:
+                span["traceId"] = "AAAAAAAAAAAAAAAAAAAAAQ=="
+    trace_data["resourceSpans"][3]["scopeSpans"][0]["spans"][0]["status"] = {"code": 2}
+    trace_data["resourceSpans"][-1]["resource"]["attributes"][0]["value"]["stringValue"] = "aio-broker-frontend-0"
+    return trace_data
+
+
+def test_get_traces_query_index(mocker, mocked_cmd, mocked_client, mocked_config, tmp_path):
+    from azext_edge.edge.providers.stats import TRACE_INDEX_SUFFIX, read_trace_index
+
+    mocked_client.CoreV1Api().list_namespaced_pod.return_value = V1PodList(
+        items=[
+            V1Pod(
+                metadata=V1ObjectMeta(name=AIO_BROKER_DIAGNOSTICS_SERVICE, namespace="namespace"),
+                status=V1PodStatus(phase=POD_STATE_RUNNING),
+            )
+        ]
+    )
+    responses = [
+        Response(
+            retrieved_trace=RetrievedTraceWrapper(
+                trace=ParseDict(trace_data, TracesData()), current_trace_count=i + 1, total_trace_count=2
+            )
+        ).SerializeToString()
+        for i, trace_data in enumerate([TEST_TRACE.data, _generate_error_trace()])
+    ]
+    portforward_socket_mock = mocker.patch("azext_edge.edge.providers.stats.portforward_socket")
+
+    def _serve():
+        stream = BytesIO(b"".join(len(r).to_bytes(4, byteorder="big") + r for r in responses))
+        portforward_socket_mock().__enter__().recv_into.side_effect = lambda view, size: stream.readinto(view[:size])
+
+    error_trace_id = "00000000000000000000000000000001"
+    # Traces not matching the query are neither converted nor archived.
+    to_dict_spy = mocker.spy(json_format, "MessageToDict")
+    from_string_spy = mocker.spy(Response, "FromString")
+    _serve()
+    stats(
+        cmd=mocked_cmd,
+        namespace=generate_random_string(),
+        trace_dir=str(tmp_path),
+        trace_errors=True,
+        trace_services=["aio-broker-frontend-0"],
+        trace_start="2023-11-30T00:00:00Z",
+        trace_end="2023-12-01T00:00:00",
+        trace_index=True,
+    )
+    assert to_dict_spy.call_count == 1
+    # Each response is decoded once, including the first one read for the number of traces.
+    assert from_string_spy.call_count == len(responses)
+    zip_path = next(tmp_path.glob("broker_traces_*.zip"))
+    with ZipFile(zip_path) as myzip:
+        names = myzip.namelist()
+    assert len(names) == 2
+    assert all(name.startswith(f"aio-broker-frontend-0.publish.{error_trace_id}") for name in names)
+
+    index_path = zip_path.with_suffix(TRACE_INDEX_SUFFIX)
+    index = read_trace_index(str(index_path))
+    assert list(index) == [error_trace_id]
+    assert index[error_trace_id]["error"] is True
+    assert index[error_trace_id]["spanName"] == "publish"
+    assert sorted([index[error_trace_id]["otlpMember"], index[error_trace_id]["tempoMember"]]) == sorted(names)
+
+    # Index lookups filter on the same fields.
+    assert read_trace_index(str(index_path), trace_ids=["847969664d5e616ae956fc6aaaae6560"]) == {}
+    assert read_trace_index(str(index_path), trace_query=TraceQuery(min_duration_ms=1.0)) == {}
+    assert list(read_trace_index(str(index_path), trace_query=TraceQuery(span_names=["publish"]))) == [error_trace_id]
+    assert index[error_trace_id]["archive"] == str(zip_path)
+
+    # Indexed traces are read from the archive, without contacting the diagnostics service.
+    portforward_socket_mock.reset_mock()
+    indexed = stats(
+        cmd=mocked_cmd,
+        namespace=generate_random_string(),
+        trace_ids=[error_trace_id.upper()],
+        trace_dir=str(tmp_path),
+        trace_index=True,
+    )
+    portforward_socket_mock.assert_not_called()
+    assert len(indexed) == 1
+    assert indexed[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"] == error_trace_id
+    # Indexed traces not matching the query are dropped rather than fetched.
+    assert (
+        stats(
+            cmd=mocked_cmd,
+            namespace=generate_random_string(),
+            trace_ids=[error_trace_id],
+            trace_dir=str(tmp_path),
+            trace_index=True,
+            trace_errors=True,
+            trace_min_duration=1.0,
+        )
+        is None
+    )
+    portforward_socket_mock.assert_not_called()
+
+    with pytest.raises(InvalidArgumentValueError):
+        stats(cmd=mocked_cmd, trace_ids=[error_trace_id], trace_index=True)
+
+    # No trace started after the window.
+    for path in tmp_path.iterdir():
+        path.unlink()
+    _serve()
+    stats(cmd=mocked_cmd, namespace=generate_random_string(), trace_dir=str(tmp_path), trace_start="2024-01-01")
+    with ZipFile(next(tmp_path.glob("broker_traces_*.zip"))) as myzip:
+        assert myzip.namelist() == []
+    assert not list(tmp_path.glob(f"*{TRACE_INDEX_SUFFIX}"))
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({}, None),
+        ({"errors_only": False}, None),
+        ({"min_duration_ms": 0}, TraceQuery(min_duration_ms=0)),
+        (
+            {"start_time": "2024-01-01T08:00:00+02:00", "end_time": "2024-01-01"},
+            TraceQuery(
+                start_time=datetime(2024, 1, 1, 6, tzinfo=timezone.utc),
+                end_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            ),
+        ),
+        ({"service_names": ["a"], "errors_only": True}, TraceQuery(service_names=["a"], errors_only=True)),
+    ],
+)
+def test_build_trace_query(kwargs, expected):
+    from azext_edge.edge.providers.stats import build_trace_query
+
+    assert build_trace_query(**kwargs) == expected
+
+
+def test_build_trace_query_error():
+    from azext_edge.edge.providers.stats import build_trace_query
+
+    with pytest.raises(InvalidArgumentValueError):
+        build_trace_query(start_time="yesterday")
+
+
+@pytest.mark.parametrize("history_size", [-1, 0, 1])
+@pytest.mark.parametrize("all_namespaces", [None, True])
+def test_stats_history_size_error(mocker, mocked_cmd, history_size, all_namespaces):
+    mocked_load_config = mocker.patch("azext_edge.edge.commands_mq.load_config_context")
+
+    with pytest.raises(InvalidArgumentValueError):
+        stats(cmd=mocked_cmd, history_size=history_size, all_namespaces=all_namespaces, watch=True)
+    mocked_load_config.assert_not_called()
+
+
+def test__summarize_trace():
+    from azext_edge.edge.providers.stats import _summarize_trace
+
+    summary = _summarize_trace(ParseDict(TEST_TRACE.data, TracesData()))
+    root_span = TEST_TRACE.data["resourceSpans"][-1]["scopeSpans"][0]["spans"][0]
+    assert summary.trace_id == b64decode(root_span["traceId"]).hex()
+    assert summary.service_name == TEST_TRACE.resource_name
+    assert summary.span_name == TEST_TRACE.root_span["name"]
+    assert summary.start_time.replace(tzinfo=None) == TEST_TRACE.timestamp
+    assert not summary.error
+
+    summary = _summarize_trace(ParseDict(_generate_error_trace(), TracesData()))
+    assert summary.error
+    assert summary.service_name == "aio-broker-frontend-0"
+    assert _summarize_trace(ParseDict(TEST_TRACE_PARTIAL.data, TracesData())) is None
+
+
+@pytest.mark.parametrize(
+    "trace_data", [TEST_TRACE.data, _generate_error_trace(), TEST_TRACE_PARTIAL.data], ids=["ok", "error", "partial"]
+)
+def test__summarize_trace_response(trace_data: dict):
+    from azext_edge.edge.providers.stats import _summarize_trace, _summarize_trace_response
+
+    trace = ParseDict(trace_data, TracesData())
+    response_bytes = Response(
+        retrieved_trace=RetrievedTraceWrapper(trace=trace, current_trace_count=1, total_trace_count=1)
+    ).SerializeToString()
+    # The wire format scan reads the same root span fields as the decoded message.
+    assert _summarize_trace_response(response_bytes) == _summarize_trace(trace)
+    assert _summarize_trace_response(memoryview(bytearray(response_bytes))) == _summarize_trace(trace)
+
+    with pytest.raises(ValueError):
+        _summarize_trace_response(response_bytes[:-1])
+
+
+def test__process_trace_query_skips_parse(mocker):
+    from azext_edge.edge.providers.stats import _process_trace
+
+    response_bytes = Response(
+        retrieved_trace=RetrievedTraceWrapper(
+            trace=ParseDict(TEST_TRACE.data, TracesData()), current_trace_count=1, total_trace_count=1
+        )
+    ).SerializeToString()
+    spy_from_string = mocker.spy(Response, "FromString")
+
+    # Traces not matching the query are not decoded.
+    assert _process_trace(response_bytes, trace_query=TraceQuery(span_names=[generate_random_string()])) is None
+    spy_from_string.assert_not_called()
+
+    processed = _process_trace(response_bytes, trace_query=TraceQuery(span_names=[TEST_TRACE.root_span["name"]]))
+    assert processed.summary.span_name == TEST_TRACE.root_span["name"]
+    spy_from_string.assert_called_once()
+
+
+def test__convert_otlp_to_tempo():
+    from azext_edge.edge.providers.stats import _convert_otlp_to_tempo
+
+    message_dict = deepcopy(TEST_TRACE.data)
+    original = deepcopy(message_dict)
+    tempo_dict = _convert_otlp_to_tempo(message_dict)
+
+    # The OTLP payload is left as is.
+    assert message_dict == original
+    assert "resourceSpans" not in tempo_dict
+    assert len(tempo_dict["batches"]) == len(original["resourceSpans"])
+    for batch, resource_span in zip(tempo_dict["batches"], original["resourceSpans"]):
+        assert "scopeSpans" not in batch
+        assert batch["resource"] == resource_span["resource"]
+        for inst_lib_span, scope_span in zip(batch["instrumentationLibrarySpans"], resource_span["scopeSpans"]):
+            assert "scope" not in inst_lib_span
+            assert inst_lib_span["instrumentationLibrary"] == scope_span.get("scope", {})
+            assert inst_lib_span["spans"] == scope_span["spans"]
+
+
 def min_stats_assert(stats_map: dict):
     _assert_stats_kpi(stats_map, "connected_sessions")
     _assert_stats_kpi(stats_map, "publish_latency_mu_ms")
@@ -236,67 +636,6 @@ def _assert_stats_kpi(stats_map: dict, kpi: str, value_pass_fail: bool = False):
         stats_map[kpi]["value"] in ["Pass", "Fail"]
 
 
-@pytest.mark.parametrize(
-    "total_bytes,fetch_bytes",
-    [
-        pytest.param(10, 10),
-        pytest.param(10, 5),
-        pytest.param(10, 1),
-        pytest.param(10, 3),
-        pytest.param(10, 0),
-        pytest.param(10, -1),  # -1 is a special value to exercise partial fetching of bytes
-    ],
-)
-def test__fetch_bytes(mocker, total_bytes: int, fetch_bytes: int):
-    import math
-    import secrets
-
-    from azext_edge.edge.providers.stats import _fetch_bytes
-
-    if fetch_bytes > 0:
-        total_fetches = math.ceil(total_bytes / fetch_bytes)
-    elif fetch_bytes == 0:
-        total_fetches = 1
-    elif fetch_bytes == -1:
-        total_fetches = 2
-    else:
-        raise RuntimeError("Unsupported scenario.")
-
-    socket_mock = mocker.MagicMock()
-
-    handle_fetch_count = 0
-
-    def handle_fetch(*args, **kwargs):
-        nonlocal handle_fetch_count
-        if args[0] >= fetch_bytes:
-            if fetch_bytes == -1:
-                if handle_fetch_count > 0:
-                    return_bytes = 0
-                else:
-                    return_bytes = 1
-            else:
-                return_bytes = fetch_bytes
-        else:
-            return_bytes = args[0]
-
-        handle_fetch_count = handle_fetch_count + 1
-        return secrets.token_bytes(return_bytes)
-
-    socket_mock.recv.side_effect = handle_fetch
-    result = _fetch_bytes(socket_mock, size=total_bytes)
-    assert socket_mock.recv.call_count == total_fetches
-
-    if fetch_bytes == 0:
-        assert result == b""
-        return
-
-    if fetch_bytes == -1:
-        assert len(result) == 1
-        return
-
-    assert len(result) == total_bytes
-
-
 def test___determine_root_span():
     from azext_edge.edge.providers.stats import _determine_root_span
 
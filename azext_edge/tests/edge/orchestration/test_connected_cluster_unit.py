@@ -181,3 +181,89 @@ def test_connected_cluster_attr(
         and "connectivityStatus" in expected_resource_state["properties"]
         and expected_resource_state["properties"]["connectivityStatus"].lower() == "connected"
     )
+
+
+def test_connected_cluster_memoized(
+    mocker,
+    mocked_cmd: Mock,
+    mocked_resource_graph: Mock,
+    mocked_connected_clusters: Mock,
+):
+    from azext_edge.edge.providers.orchestration.connected_cluster import (
+        ConnectedCluster,
+    )
+
+    sub = get_zeroed_subscription()
+    cluster_name = generate_random_string()
+    rg_name = generate_random_string()
+    expected_resource_state = get_connected_cluster_payload()
+    expected_extensions = [{"name": generate_random_string(), "properties": {"extensionType": "a"}}]
+
+    clusters = mocked_connected_clusters(mocked_cmd)
+    clusters.show.return_value = expected_resource_state
+    clusters.extensions = mocker.Mock()
+    clusters.extensions.list.return_value = iter(expected_extensions)
+    connected_cluster = ConnectedCluster(
+        cmd=mocked_cmd, subscription_id=sub, cluster_name=cluster_name, resource_group_name=rg_name
+    )
+    assert connected_cluster.refreshed_at is None
+
+    assert connected_cluster.connected
+    assert connected_cluster.location == expected_resource_state["location"]
+    assert connected_cluster.resource_id == expected_resource_state["id"]
+    assert connected_cluster.extensions == expected_extensions
+    assert connected_cluster.get_extensions_by_type("a") == {"a": expected_extensions[0]}
+    assert connected_cluster.refreshed_at
+    clusters.show.assert_called_once()
+    clusters.extensions.list.assert_called_once()
+
+    # Other lookups of the same cluster within the command share the snapshot.
+    other_connected_cluster = ConnectedCluster(
+        cmd=mocked_cmd, subscription_id=sub, cluster_name=cluster_name.upper(), resource_group_name=rg_name
+    )
+    assert other_connected_cluster.resource == expected_resource_state
+    assert other_connected_cluster.refreshed_at == connected_cluster.refreshed_at
+    clusters.show.assert_called_once()
+
+    other_connected_cluster.refresh()
+    assert connected_cluster.refreshed_at is None
+    clusters.extensions.list.return_value = iter([])
+    assert connected_cluster.extensions == []
+    assert connected_cluster.resource == expected_resource_state
+    assert clusters.show.call_count == 2
+    assert clusters.extensions.list.call_count == 2
+
+
+def test_connected_cluster_state_per_command(
+    mocker, mocked_cmd: Mock, mocked_resource_graph: Mock, mocked_connected_clusters: Mock
+):
+    from argparse import Namespace
+
+    from azext_edge import arm_cache_handler
+    from azext_edge.edge.providers.orchestration.connected_cluster import ConnectedCluster
+
+    mocker.patch("azext_edge.edge.util.arm_cache.configure_arm_cache")
+    sub = get_zeroed_subscription()
+    cluster_name = generate_random_string()
+    rg_name = generate_random_string()
+    clusters = mocked_connected_clusters(mocked_cmd)
+    clusters.show.return_value = get_connected_cluster_payload()
+
+    def _run_command(command: str) -> ConnectedCluster:
+        arm_cache_handler(Namespace(), command=command)
+        connected_cluster = ConnectedCluster(
+            cmd=mocked_cmd, subscription_id=sub, cluster_name=cluster_name, resource_group_name=rg_name
+        )
+        assert connected_cluster.resource
+        return connected_cluster
+
+    _run_command("iot ops show")
+    clusters.show.assert_called_once()
+
+    # A following command in the same process reads the cluster again.
+    assert _run_command("iot ops check").refreshed_at
+    assert clusters.show.call_count == 2
+
+    # Other extensions' commands leave the state as is.
+    _run_command("storage account list")
+    assert clusters.show.call_count == 2
@@ -0,0 +1,154 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import json
+from os import environ
+from os.path import join
+from typing import List
+
+import pytest
+from azure.cli.core.azclierror import ResourceNotFoundError
+from kubernetes.client.models import (
+    V1APIGroup,
+    V1APIGroupList,
+    V1APIResource,
+    V1APIResourceList,
+    V1GroupVersionForDiscovery,
+)
+
+from azext_edge.edge.providers.base import (
+    API_DISCOVERY,
+    API_DISCOVERY_FILE_NAME,
+    ApiDiscovery,
+    get_cluster_custom_api,
+)
+from azext_edge.edge.providers.edge_api import EdgeApiManager, EdgeResourceApi
+
+SERVED_GROUP_VERSIONS = ["mqttbroker.iotoperations.azure.com/v1beta1", "deviceregistry.microsoft.com/v1"]
+
+
+def _generate_group_list(group_versions: List[str]) -> V1APIGroupList:
+    groups = []
+    for group_version in group_versions:
+        group, version = group_version.split("/")
+        groups.append(
+            V1APIGroup(
+                name=group,
+                versions=[V1GroupVersionForDiscovery(group_version=group_version, version=version)],
+            )
+        )
+    return V1APIGroupList(groups=groups)
+
+
+def _generate_resource_list(group: str, version: str) -> V1APIResourceList:
+    return V1APIResourceList(
+        group_version=f"{group}/{version}",
+        resources=[
+            V1APIResource(kind="Broker", name="brokers", namespaced=True, singular_name="broker", verbs=["get"])
+        ],
+    )
+
+
+@pytest.fixture
+def mocked_discovery(mocked_client):
+    mocked_client.ApisApi().get_api_versions.return_value = _generate_group_list(SERVED_GROUP_VERSIONS)
+    mocked_client.CustomObjectsApi().get_api_resources.side_effect = _generate_resource_list
+    mocked_client.ApisApi.reset_mock()
+    mocked_client.CustomObjectsApi.reset_mock()
+    yield mocked_client
+
+
+def test_get_cluster_custom_api(mocked_discovery):
+    result = get_cluster_custom_api(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+    assert result.group_version == "mqttbroker.iotoperations.azure.com/v1beta1"
+    assert result.resources[0].kind == "Broker"
+
+    # Served group versions and resources are indexed once.
+    get_cluster_custom_api(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+    mocked_discovery.CustomObjectsApi().get_api_resources.assert_called_once_with(
+        group="mqttbroker.iotoperations.azure.com", version="v1beta1"
+    )
+
+    # Missing group versions are answered from the index.
+    assert get_cluster_custom_api(group="dataflow.iotoperations.azure.com", version="v1beta1") is None
+    with pytest.raises(ResourceNotFoundError):
+        get_cluster_custom_api(group="dataflow.iotoperations.azure.com", version="v1beta1", raise_on_404=True)
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+    assert mocked_discovery.CustomObjectsApi().get_api_resources.call_count == 1
+
+
+def test_get_deployed_discovers_in_batch(mocked_discovery):
+    apis = [
+        EdgeResourceApi(group="mqttbroker.iotoperations.azure.com", version="v1beta1", moniker="broker"),
+        EdgeResourceApi(group="deviceregistry.microsoft.com", version="v1", moniker="deviceregistry"),
+        EdgeResourceApi(group="dataflow.iotoperations.azure.com", version="v1beta1", moniker="dataflow"),
+    ]
+    deployed = EdgeApiManager(resource_apis=apis).get_deployed()
+
+    assert {api.moniker for api in deployed} == {"broker", "deviceregistry"}
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+    assert mocked_discovery.CustomObjectsApi().get_api_resources.call_count == 2
+
+
+def test_api_discovery_persisted(mocked_discovery):
+    API_DISCOVERY.use_context("ctx@https://cluster")
+    get_cluster_custom_api(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+
+    with open(join(environ["AZURE_CONFIG_DIR"], API_DISCOVERY_FILE_NAME), encoding="utf-8") as f:
+        content = json.load(f)
+    assert content["ctx@https://cluster"]["groupVersions"] == sorted(SERVED_GROUP_VERSIONS)
+    assert "mqttbroker.iotoperations.azure.com/v1beta1" in content["ctx@https://cluster"]["resources"]
+
+    # A following command on the same context skips discovery.
+    next_discovery = ApiDiscovery()
+    next_discovery.use_context("ctx@https://cluster")
+    mocked_discovery.ApisApi.reset_mock()
+    mocked_discovery.CustomObjectsApi.reset_mock()
+    result = next_discovery.get_api_resources(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+    assert result.resources[0].name == "brokers"
+    mocked_discovery.ApisApi().get_api_versions.assert_not_called()
+    mocked_discovery.CustomObjectsApi().get_api_resources.assert_not_called()
+
+    # Group versions missing from a persisted index are rediscovered once.
+    mocked_discovery.ApisApi().get_api_versions.return_value = _generate_group_list(
+        SERVED_GROUP_VERSIONS + ["dataflow.iotoperations.azure.com/v1beta1"]
+    )
+    mocked_discovery.ApisApi.reset_mock()
+    next_discovery.get_api_resources(group="dataflow.iotoperations.azure.com", version="v1beta1")
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+
+    # Other contexts discover on their own.
+    other_discovery = ApiDiscovery()
+    other_discovery.use_context("other@https://cluster")
+    mocked_discovery.ApisApi.reset_mock()
+    other_discovery.get_api_resources(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+
+
+def test_api_discovery_expired(mocked_discovery, mocker):
+    API_DISCOVERY.use_context("ctx@https://cluster")
+    API_DISCOVERY.get_api_resources(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+
+    mocked_time = mocker.patch("azext_edge.edge.providers.base.time.time")
+    mocked_time.return_value = API_DISCOVERY._discovered_at + API_DISCOVERY.ttl_seconds + 1
+    mocked_discovery.ApisApi.reset_mock()
+    mocked_discovery.CustomObjectsApi.reset_mock()
+
+    next_discovery = ApiDiscovery()
+    next_discovery.use_context("ctx@https://cluster")
+    next_discovery.get_api_resources(group="mqttbroker.iotoperations.azure.com", version="v1beta1")
+    mocked_discovery.ApisApi().get_api_versions.assert_called_once()
+    mocked_discovery.CustomObjectsApi().get_api_resources.assert_called_once()
+
+
+def test_api_discovery_corrupt_file(mocked_discovery):
+    with open(join(environ["AZURE_CONFIG_DIR"], API_DISCOVERY_FILE_NAME), "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    API_DISCOVERY.use_context("ctx@https://cluster")
+    result = get_cluster_custom_api(group="deviceregistry.microsoft.com", version="v1")
+    assert result.group_version == "deviceregistry.microsoft.com/v1"
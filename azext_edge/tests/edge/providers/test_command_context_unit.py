@@ -0,0 +1,40 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import threading
+
+from azext_edge.edge.providers.command_context import (
+    CommandContext,
+    ContextThreadPoolExecutor,
+    bind_command_context,
+    get_command_context,
+)
+
+
+def test_command_context():
+    assert get_command_context() == CommandContext()
+
+    plan = object()
+    seen = {}
+
+    def _other_run():
+        seen["other"] = get_command_context()
+
+    with bind_command_context(CommandContext(collection_plan=plan)) as context:
+        assert get_command_context() is context
+        # Work submitted to the context pool sees the bound context, other threads do not.
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            assert executor.submit(get_command_context).result() is context
+        thread = threading.Thread(target=_other_run)
+        thread.start()
+        thread.join()
+        assert seen["other"] == CommandContext()
+
+        with bind_command_context(context._replace(check_watch=plan)):
+            assert get_command_context() == CommandContext(collection_plan=plan, check_watch=plan)
+        assert get_command_context() is context
+
+    assert get_command_context() == CommandContext()
@@ -0,0 +1,216 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import logging
+import socket
+import ssl
+import threading
+from io import BytesIO
+from time import perf_counter
+from typing import List
+
+import pytest
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans, Span, TracesData
+
+from azext_edge.edge.providers.base import FrameReader
+
+# pylint: disable=no-name-in-module
+from azext_edge.edge.providers.proto.diagnostics_service_pb2 import Response, RetrievedTraceWrapper
+from azext_edge.edge.util import generate_self_signed_cert
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_ROUNDS = 3
+# Typical TLS record sized reads, as delivered by the portforward socket.
+SERVE_CHUNK_SIZE = 16 * 1024
+
+
+def _frame(payload: bytes) -> bytes:
+    return len(payload).to_bytes(4, byteorder="big") + payload
+
+
+def _generate_trace_response(span_count: int, index: int = 0) -> bytes:
+    spans = [
+        Span(trace_id=index.to_bytes(16, "big"), span_id=i.to_bytes(8, "big"), name=f"publish-{i}" * 4)
+        for i in range(span_count)
+    ]
+    trace = TracesData(resource_spans=[ResourceSpans(scope_spans=[ScopeSpans(spans=spans)])])
+    return Response(
+        retrieved_trace=RetrievedTraceWrapper(trace=trace, current_trace_count=index + 1, total_trace_count=1)
+    ).SerializeToString()
+
+
+def _serve(payloads: List[bytes]) -> socket.socket:
+    local, remote = socket.socketpair()
+
+    def _send():
+        with remote:
+            for payload in payloads:
+                data = _frame(payload)
+                for offset in range(0, len(data), SERVE_CHUNK_SIZE):
+                    remote.sendall(data[offset : offset + SERVE_CHUNK_SIZE])
+
+    threading.Thread(target=_send, daemon=True).start()
+    return local
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+@pytest.mark.parametrize("reuse_buffer", [True, False])
+def test_frame_reader(mocker, chunk_size: int, reuse_buffer: bool):
+    payloads = [b"a" * 10, b"", b"b" * 100, b"c" * 5]
+    stream = BytesIO(b"".join(_frame(payload) for payload in payloads) + b"\x00\x00")
+    sock = mocker.MagicMock()
+    sock.recv_into.side_effect = lambda view, size: stream.readinto(view[: min(size, chunk_size)])
+
+    reader = FrameReader(sock, reuse_buffer=reuse_buffer, buffer_size=16)
+    frames = [reader.read_frame() for _ in payloads]
+    if reuse_buffer:
+        # Views share the reused buffer, only the last read is intact.
+        assert bytes(frames[-1]) == payloads[-1]
+    else:
+        assert [bytes(frame) for frame in frames] == payloads
+    # The socket closed within a frame.
+    assert reader.read_frame() is None
+
+
+def test_frame_reader_iter():
+    payloads = [_generate_trace_response(span_count=10, index=i) for i in range(3)]
+    with _serve(payloads) as sock:
+        responses = [Response.FromString(frame) for frame in FrameReader(sock)]
+    assert [response.SerializeToString() for response in responses] == payloads
+
+
+def test_read_trace_frames_empty_frame(mocker):
+    from azext_edge.edge.providers.stats import _read_trace_frames
+
+    first, last = [
+        Response(retrieved_trace=RetrievedTraceWrapper(current_trace_count=i + 1, total_trace_count=3))
+        for i in [0, 2]
+    ]
+    # A zero-length payload mid stream is an empty response, not a closed socket.
+    payloads = [first.SerializeToString(), b"", last.SerializeToString()]
+    stream = BytesIO(b"".join(_frame(payload) for payload in payloads))
+    sock = mocker.MagicMock()
+    sock.recv_into.side_effect = lambda view, size: stream.readinto(view[:size])
+    mocked_logger = mocker.patch("azext_edge.edge.providers.stats.logger")
+
+    frames = list(_read_trace_frames(sock))
+    assert [total for total, _ in frames] == [3, 3, 3]
+    assert frames[0][1] == first
+    assert bytes(frames[1][1]) == b""
+    assert bytes(frames[2][1]) == payloads[2]
+    mocked_logger.warning.assert_not_called()
+
+
+def test_frame_reader_tls(tmp_path):
+    cert, key = generate_self_signed_cert()
+    cert_path, key_path = tmp_path.joinpath("cert.pem"), tmp_path.joinpath("key.pem")
+    cert_path.write_bytes(cert)
+    key_path.write_bytes(key)
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(certfile=str(cert_path), keyfile=str(key_path))
+    client_context = ssl.create_default_context()
+    client_context.check_hostname = False
+    client_context.verify_mode = ssl.CERT_NONE
+
+    payloads = [_generate_trace_response(span_count=2000, index=i) for i in range(2)]
+    local, remote = socket.socketpair()
+
+    def _send():
+        with server_context.wrap_socket(remote, server_side=True) as tls_remote:
+            for payload in payloads:
+                tls_remote.sendall(_frame(payload))
+
+    threading.Thread(target=_send, daemon=True).start()
+    with client_context.wrap_socket(local) as tls_local:
+        reader = FrameReader(tls_local)
+        assert [bytes(reader.read_frame()) for _ in payloads] == payloads
+
+
+@pytest.mark.benchmark
+def test_frame_reader_benchmark():
+    payloads = [_generate_trace_response(span_count=40000, index=i) for i in range(4)]
+
+    def _legacy_fetch_bytes(sock: socket.socket, size: int) -> bytes:
+        # Previous reader, concatenating the results of recv.
+        result_bytes = sock.recv(size)
+        if result_bytes == b"":
+            return result_bytes
+        while len(result_bytes) < size:
+            interm_bytes = sock.recv(size - len(result_bytes))
+            if interm_bytes == b"":
+                break
+            result_bytes += interm_bytes
+        return result_bytes
+
+    def _read_legacy(sock: socket.socket) -> List[Response]:
+        responses = []
+        for _ in payloads:
+            size = int.from_bytes(_legacy_fetch_bytes(sock, 4), byteorder="big")
+            responses.append(Response.FromString(_legacy_fetch_bytes(sock, size)))
+        return responses
+
+    def _read_frames(sock: socket.socket) -> List[Response]:
+        reader = FrameReader(sock)
+        return [Response.FromString(reader.read_frame()) for _ in payloads]
+
+    def _get_best_seconds(read) -> float:
+        best = None
+        for _ in range(BENCHMARK_ROUNDS):
+            with _serve(payloads) as sock:
+                start = perf_counter()
+                read(sock)
+                elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    # Timings are reported, not asserted, they depend on the machine running the tests.
+    legacy_seconds = _get_best_seconds(_read_legacy)
+    frame_seconds = _get_best_seconds(_read_frames)
+    logger.info(
+        "%d responses of %dKiB: recv concatenation %.1fms, recv_into frames %.1fms",
+        len(payloads),
+        len(payloads[0]) // 1024,
+        legacy_seconds * 1000,
+        frame_seconds * 1000,
+    )
+
+    # Both readers decode the same responses.
+    with _serve(payloads) as sock:
+        legacy_responses = _read_legacy(sock)
+    with _serve(payloads) as sock:
+        frame_responses = _read_frames(sock)
+    assert frame_responses == legacy_responses
+    assert [response.SerializeToString() for response in frame_responses] == payloads
+
+
+@pytest.mark.benchmark
+def test_summarize_trace_response_benchmark():
+    from azext_edge.edge.providers.stats import _summarize_trace, _summarize_trace_response
+
+    payloads = [_generate_trace_response(span_count=span_count) for span_count in [10, 1000]]
+
+    def _get_best_seconds(summarize, payload: bytes) -> float:
+        best = None
+        for _ in range(BENCHMARK_ROUNDS):
+            start = perf_counter()
+            summarize(payload)
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _summarize_parsed(payload: bytes):
+        return _summarize_trace(Response.FromString(payload).retrieved_trace.trace)
+
+    # Timings are reported, not asserted, they depend on the machine and protobuf runtime running the tests.
+    for payload in payloads:
+        logger.info(
+            "Response of %dKiB: full parse summary %.3fms, wire scan summary %.3fms",
+            len(payload) // 1024,
+            _get_best_seconds(_summarize_parsed, payload) * 1000,
+            _get_best_seconds(_summarize_trace_response, payload) * 1000,
+        )
+        assert _summarize_trace_response(payload) == _summarize_parsed(payload)
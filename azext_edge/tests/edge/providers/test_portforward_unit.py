@@ -0,0 +1,114 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import socket
+import threading
+from typing import Dict, List
+
+import pytest
+
+from azext_edge.edge.providers.base import portforward_session, portforward_socket
+
+METRICS_PORT = 9600
+PROTOBUF_PORT = 9800
+
+
+class FakePortforward:
+    """
+    Stands in for a kubernetes portforward websocket, pod ports are served over socketpairs.
+    """
+
+    def __init__(self, ports: str, responses_per_stream: int):
+        self.connected = True
+        self.sockets: Dict[int, socket.socket] = {}
+        self.requests: List[bytes] = []
+        for port in ports.split(","):
+            local, remote = socket.socketpair()
+            self.sockets[int(port)] = local
+            if int(port) == METRICS_PORT:
+                threading.Thread(target=self._serve_http, args=(remote, responses_per_stream), daemon=True).start()
+
+    def _serve_http(self, remote: socket.socket, responses: int):
+        with remote, remote.makefile("rb") as reader:
+            for index in range(responses):
+                request = reader.readline()
+                if not request:
+                    return
+                while reader.readline() not in (b"\r\n", b""):
+                    pass
+                self.requests.append(request)
+                body = f"metric {index}".encode()
+                connection = b"Connection: close\r\n" if index == responses - 1 else b""
+                headers = b"HTTP/1.1 200 OK\r\nContent-Length: " + str(len(body)).encode() + b"\r\n" + connection
+                remote.sendall(headers + b"\r\n" + body)
+
+    def socket(self, port: int):
+        return _PortSocket(self.sockets[port])
+
+
+class _PortSocket:
+    def __init__(self, sock: socket.socket):
+        self._socket = sock
+
+    def close(self):
+        self._socket.close()
+
+
+@pytest.fixture
+def mocked_portforward(mocker, mocked_client):
+    portforwards: List[FakePortforward] = []
+
+    def _portforward(api_method, pod_name, namespace, ports):
+        portforwards.append(FakePortforward(ports=ports, responses_per_stream=2))
+        return portforwards[-1]
+
+    mocker.patch("kubernetes.stream.portforward", side_effect=_portforward)
+    yield portforwards
+
+
+def test_portforward_session_multiplexes(mocked_portforward):
+    create_connection = socket.create_connection
+    with portforward_session(namespace="ns", pod_name="diag", ports=[METRICS_PORT, PROTOBUF_PORT]) as session:
+        assert session.get("/metrics") == "metric 0"
+        assert session.get("/metrics") == "metric 1"
+        # Requests are kept alive on the one websocket until the pod closes the stream.
+        assert len(mocked_portforward) == 1
+        assert mocked_portforward[0].requests == [b"GET /metrics HTTP/1.1\r\n"] * 2
+
+        # The protobuf port of the same websocket is still available.
+        with portforward_socket(namespace="ns", pod_name="diag", pod_port=PROTOBUF_PORT, session=session) as sock:
+            assert sock is mocked_portforward[0].sockets[PROTOBUF_PORT]
+        assert len(mocked_portforward) == 1
+
+        # Closed streams are served by a new websocket.
+        assert session.get("/metrics") == "metric 0"
+        assert len(mocked_portforward) == 2
+        assert mocked_portforward[0].sockets[PROTOBUF_PORT].fileno() == -1
+
+    # The global socket module is left untouched.
+    assert socket.create_connection is create_connection
+    assert all(sock.fileno() == -1 for sock in mocked_portforward[1].sockets.values())
+
+
+def test_portforward_session_concurrent(mocked_portforward):
+    results = {}
+
+    def _get(pod_name: str):
+        with portforward_session(namespace="ns", pod_name=pod_name, ports=[METRICS_PORT]) as session:
+            results[pod_name] = [session.get("/metrics"), session.get("/metrics")]
+
+    threads = [threading.Thread(target=_get, args=(f"diag-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {f"diag-{i}": ["metric 0", "metric 1"] for i in range(4)}
+    assert len(mocked_portforward) == 4
+
+    with portforward_session(namespace="ns", pod_name="diag", ports=[METRICS_PORT]) as session:
+        with pytest.raises(ValueError):
+            session.socket(PROTOBUF_PORT)
@@ -0,0 +1,104 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import logging
+from time import perf_counter
+from typing import Callable
+
+import pytest
+from kubernetes.client import ApiClient
+
+from azext_edge.edge.common import BundleResourceKind
+from azext_edge.edge.providers.base import CLUSTER_SNAPSHOT, _JsonResponse, to_model
+
+from ...helpers import mock_list_page_response
+
+logger = logging.getLogger(__name__)
+
+POD_COUNT = 1000
+BENCHMARK_ROUNDS = 3
+
+
+def _generate_raw_pod(index: int) -> dict:
+    return {
+        "metadata": {
+            "name": f"aio-broker-frontend-{index}",
+            "namespace": "azure-iot-operations",
+            "labels": {"app.kubernetes.io/name": "microsoft-iotoperations-mqttbroker", "tier": "frontend"},
+            "resourceVersion": str(index),
+            "creationTimestamp": "2024-01-01T00:00:00Z",
+        },
+        "spec": {
+            "containers": [
+                {
+                    "name": container,
+                    "image": f"mcr.microsoft.com/azureiotoperations/{container}:1.0.0",
+                    "ports": [{"containerPort": 1883, "protocol": "TCP"}],
+                    "env": [{"name": "LOG_LEVEL", "value": "info"}],
+                    "resources": {"limits": {"cpu": "1", "memory": "1Gi"}},
+                }
+                for container in ["frontend", "fluent-bit"]
+            ],
+        },
+        "status": {
+            "phase": "Running",
+            "conditions": [
+                {"type": condition, "status": "True", "lastTransitionTime": "2024-01-01T00:00:00Z"}
+                for condition in ["Initialized", "Ready", "ContainersReady", "PodScheduled"]
+            ],
+        },
+    }
+
+
+def _get_best_seconds(func: Callable[[], None]) -> float:
+    best = None
+    for _ in range(BENCHMARK_ROUNDS):
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@pytest.mark.benchmark
+def test_raw_pod_list_benchmark(mocked_client):
+    pod_list = {
+        "apiVersion": "v1",
+        "kind": "PodList",
+        "metadata": {},
+        "items": [_generate_raw_pod(i) for i in range(POD_COUNT)],
+    }
+    generic = ApiClient()
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    list_pods.side_effect = lambda **kwargs: mock_list_page_response(pod_list)
+
+    def _model_round_trip():
+        # Previous path: V1PodList models, serialized back per pod and converted to dicts for evaluation.
+        pods = generic.deserialize(_JsonResponse(pod_list), "V1PodList")
+        for pod in pods.items:
+            generic.sanitize_for_serialization(pod)
+            pod.to_dict()
+
+    def _raw():
+        CLUSTER_SNAPSHOT.clear()
+        pods = CLUSTER_SNAPSHOT.list_resources(kind=BundleResourceKind.pod.value)
+        assert len(pods["items"]) == POD_COUNT
+
+    # Timings are reported, not asserted, they depend on the machine running the tests.
+    model_seconds = _get_best_seconds(_model_round_trip)
+    raw_seconds = _get_best_seconds(_raw)
+    logger.info(
+        "Per %d pods: model round-trip %.1fms, raw dicts %.1fms (%.1fx)",
+        POD_COUNT,
+        model_seconds * 1000,
+        raw_seconds * 1000,
+        model_seconds / raw_seconds,
+    )
+
+    # Both paths see the same pods.
+    raw_pods = CLUSTER_SNAPSHOT.list_resources(kind=BundleResourceKind.pod.value)
+    assert raw_pods["items"] == pod_list["items"]
+    assert to_model(raw_pods, "V1PodList") == generic.deserialize(_JsonResponse(pod_list), "V1PodList")
@@ -0,0 +1,332 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+from typing import Dict, List, Optional
+
+import pytest
+from kubernetes.client import ApiClient
+from kubernetes.client.models import V1ListMeta, V1ObjectMeta, V1Pod, V1PodList, V1Service, V1ServiceList
+
+from azext_edge.edge.common import BundleResourceKind
+from azext_edge.edge.providers.base import (
+    CLUSTER_SNAPSHOT,
+    DEFAULT_LIST_PAGE_LIMIT,
+    ClusterSnapshot,
+    SnapshotWatch,
+    get_custom_objects,
+    get_namespaced_pods_by_prefix,
+    get_namespaced_service,
+    list_pages,
+)
+
+from ...helpers import as_raw_list
+
+POD_KIND = BundleResourceKind.pod.value
+RAW_LIST_KWARGS = {"limit": DEFAULT_LIST_PAGE_LIMIT, "_preload_content": False}
+
+
+def _generate_pod(name: str, namespace: str, labels: Optional[Dict[str, str]] = None) -> V1Pod:
+    return V1Pod(metadata=V1ObjectMeta(name=name, namespace=namespace, labels=labels))
+
+
+@pytest.fixture
+def mocked_pods(mocked_client) -> List[V1Pod]:
+    pods = [
+        _generate_pod("aio-broker-frontend-0", "ns1", {"app.kubernetes.io/name": "mqttbroker", "tier": "frontend"}),
+        _generate_pod("aio-broker-backend-0", "ns1", {"app.kubernetes.io/name": "mqttbroker"}),
+        _generate_pod("aio-opc-supervisor-0", "ns1", {"app": "aio-opc-supervisor"}),
+        _generate_pod("aio-broker-frontend-0", "ns2", {"app.kubernetes.io/name": "mqttbroker"}),
+    ]
+
+    def _handle_list(*args, **kwargs):
+        return V1PodList(items=pods)
+
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.side_effect = as_raw_list(_handle_list)
+    mocked_client.CoreV1Api().list_namespaced_pod.side_effect = as_raw_list(
+        lambda namespace, **kwargs: V1PodList(items=[pod for pod in pods if pod.metadata.namespace == namespace])
+    )
+    yield pods
+
+
+@pytest.mark.parametrize(
+    "label_selector, field_selector, namespace, prefix, expected_pods",
+    [
+        (None, None, None, None, [("ns1", "aio-broker-frontend-0"), ("ns1", "aio-broker-backend-0"),
+                                  ("ns1", "aio-opc-supervisor-0"), ("ns2", "aio-broker-frontend-0")]),
+        (None, None, "ns2", None, [("ns2", "aio-broker-frontend-0")]),
+        (None, None, "ns1", "aio-broker-", [("ns1", "aio-broker-frontend-0"), ("ns1", "aio-broker-backend-0")]),
+        ("app.kubernetes.io/name in (mqttbroker, other)", None, "ns1", None,
+         [("ns1", "aio-broker-frontend-0"), ("ns1", "aio-broker-backend-0")]),
+        ("app.kubernetes.io/name notin (mqttbroker)", None, "ns1", None, [("ns1", "aio-opc-supervisor-0")]),
+        ("app.kubernetes.io/name=mqttbroker,tier==frontend", None, None, None, [("ns1", "aio-broker-frontend-0")]),
+        ("tier!=frontend", None, "ns1", None, [("ns1", "aio-broker-backend-0"), ("ns1", "aio-opc-supervisor-0")]),
+        ("app", None, None, None, [("ns1", "aio-opc-supervisor-0")]),
+        ("!app.kubernetes.io/name", None, None, None, [("ns1", "aio-opc-supervisor-0")]),
+        (None, "metadata.name==aio-broker-frontend-0", None, None,
+         [("ns1", "aio-broker-frontend-0"), ("ns2", "aio-broker-frontend-0")]),
+        (None, "metadata.namespace!=ns1", None, None, [("ns2", "aio-broker-frontend-0")]),
+    ],
+)
+def test_snapshot_local_selection(
+    mocked_client,
+    mocked_pods,
+    label_selector: Optional[str],
+    field_selector: Optional[str],
+    namespace: Optional[str],
+    prefix: Optional[str],
+    expected_pods: List[tuple],
+):
+    snapshot = ClusterSnapshot()
+    snapshot.prime(kinds=[POD_KIND])
+    result: dict = snapshot.list_resources(
+        kind=POD_KIND,
+        namespace=namespace,
+        label_selector=label_selector,
+        field_selector=field_selector,
+        prefix=prefix,
+    )
+
+    # Listings are raw dicts.
+    assert [(pod["metadata"]["namespace"], pod["metadata"]["name"]) for pod in result["items"]] == expected_pods
+    # One cluster wide list serves every query.
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.assert_called_once_with(
+        **RAW_LIST_KWARGS, label_selector=None, field_selector=None
+    )
+    mocked_client.CoreV1Api().list_namespaced_pod.assert_not_called()
+
+
+def test_snapshot_selector_fallback(mocked_client, mocked_pods):
+    snapshot = ClusterSnapshot()
+    label_selector = "app.kubernetes.io/name in (mqttbroker)"
+    list_namespaced_pod = mocked_client.CoreV1Api().list_namespaced_pod
+
+    # Without a full listing, selectors are sent to the API server and the result is remembered.
+    for _ in range(2):
+        snapshot.list_resources(kind=POD_KIND, namespace="ns1", label_selector=label_selector)
+    list_namespaced_pod.assert_called_once_with(
+        **RAW_LIST_KWARGS, namespace="ns1", label_selector=label_selector, field_selector=None
+    )
+
+    # Field selectors which cannot be evaluated locally always go to the API server.
+    snapshot.prime(kinds=[POD_KIND], namespace="ns1")
+    snapshot.list_resources(kind=POD_KIND, namespace="ns1", field_selector="status.phase=Running")
+    list_namespaced_pod.assert_called_with(
+        **RAW_LIST_KWARGS, namespace="ns1", label_selector=None, field_selector="status.phase=Running"
+    )
+    assert list_namespaced_pod.call_count == 3
+
+
+def test_snapshot_ttl_refresh_invalidate(mocker, mocked_client, mocked_pods):
+    mocked_monotonic = mocker.patch("azext_edge.edge.providers.base.time.monotonic", return_value=100.0)
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    snapshot = ClusterSnapshot(ttl_seconds=30)
+
+    snapshot.list_resources(kind=POD_KIND)
+    mocked_monotonic.return_value = 129.0
+    snapshot.list_resources(kind=POD_KIND)
+    assert list_pods.call_count == 1
+
+    mocked_monotonic.return_value = 130.0
+    snapshot.list_resources(kind=POD_KIND)
+    assert list_pods.call_count == 2
+
+    snapshot.list_resources(kind=POD_KIND, refresh=True)
+    assert list_pods.call_count == 3
+
+    snapshot.invalidate(kind=POD_KIND, namespace="ns1")
+    snapshot.list_resources(kind=POD_KIND)
+    assert list_pods.call_count == 4
+
+    snapshot.clear()
+    snapshot.list_resources(kind=POD_KIND)
+    assert list_pods.call_count == 5
+
+
+def test_snapshot_scope(mocker, mocked_client, mocked_pods):
+    mocked_monotonic = mocker.patch("azext_edge.edge.providers.base.time.monotonic", return_value=100.0)
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    snapshot = ClusterSnapshot(ttl_seconds=30)
+
+    with snapshot.scope():
+        snapshot.list_resources(kind=POD_KIND)
+        # Listings do not expire while a command holds a scope, even across nested scopes.
+        with snapshot.scope():
+            mocked_monotonic.return_value = 1000.0
+            snapshot.list_resources(kind=POD_KIND)
+        snapshot.list_resources(kind=POD_KIND, namespace="ns1")
+        assert list_pods.call_count == 1
+
+    # Leaving the last scope drops listings and the locks of their keys.
+    assert not snapshot._entries
+    assert not snapshot._key_locks
+    snapshot.list_resources(kind=POD_KIND)
+    assert list_pods.call_count == 2
+
+
+def test_snapshot_key_locks_released(mocked_client, mocked_pods):
+    from kubernetes.client.exceptions import ApiException
+
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    snapshot = ClusterSnapshot()
+    snapshot.list_resources(kind=POD_KIND)
+    assert len(snapshot._key_locks) == 1
+
+    list_pods.side_effect = ApiException(status=500)
+    with pytest.raises(ApiException):
+        snapshot.list_resources(kind=POD_KIND, label_selector="tier=frontend", refresh=True)
+    assert len(snapshot._key_locks) == 1
+
+    snapshot.invalidate(kind=POD_KIND)
+    assert not snapshot._key_locks
+
+
+def test_snapshot_returns_copies(mocked_client, mocked_pods):
+    snapshot = ClusterSnapshot()
+    first: dict = snapshot.list_resources(kind=POD_KIND)
+    first["items"].clear()
+
+    second: dict = snapshot.list_resources(kind=POD_KIND)
+    assert len(second["items"]) == len(mocked_pods)
+
+
+def test_snapshot_concurrent_single_list(mocked_client, mocked_pods):
+    from concurrent.futures import ThreadPoolExecutor
+
+    snapshot = ClusterSnapshot()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: snapshot.list_resources(kind=POD_KIND), range(32)))
+
+    assert all(len(result["items"]) == len(mocked_pods) for result in results)
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.assert_called_once()
+
+
+def test_get_namespaced_pods_by_prefix(mocked_client, mocked_pods):
+    CLUSTER_SNAPSHOT.prime(kinds=[POD_KIND])
+
+    # Without as_dict pods are deserialized into models.
+    pods = get_namespaced_pods_by_prefix(prefix="aio-broker-", namespace="ns1", label_selector="tier=frontend")
+    assert isinstance(pods[0], V1Pod)
+    assert [pod.metadata.name for pod in pods] == ["aio-broker-frontend-0"]
+
+    pods = get_namespaced_pods_by_prefix(prefix="aio-opc-", namespace="ns1", as_dict=True)
+    assert pods == [
+        {"metadata": {"labels": {"app": "aio-opc-supervisor"}, "name": "aio-opc-supervisor-0", "namespace": "ns1"}}
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.assert_called_once()
+
+
+def test_get_namespaced_service(mocked_client):
+    services = [V1Service(metadata=V1ObjectMeta(name=name, namespace="ns1")) for name in ["svc-a", "svc-b"]]
+    list_service = mocked_client.CoreV1Api().list_namespaced_service
+    list_service.return_value = V1ServiceList(items=services)
+
+    assert get_namespaced_service(name="svc-a", namespace="ns1") == services[0]
+    assert get_namespaced_service(name="svc-b", namespace="ns1", as_dict=True) == {
+        "metadata": {"name": "svc-b", "namespace": "ns1"}
+    }
+    assert get_namespaced_service(name="svc-c", namespace="ns1") is None
+    list_service.assert_called_once_with(**RAW_LIST_KWARGS, namespace="ns1", label_selector=None, field_selector=None)
+
+
+def test_get_custom_objects(mocked_client):
+    objects = {
+        "items": [
+            {"metadata": {"name": "broker", "namespace": "ns1"}},
+            {"metadata": {"name": "broker", "namespace": "ns2"}},
+        ]
+    }
+    custom_api = mocked_client.CustomObjectsApi()
+    custom_api.list_cluster_custom_object.return_value = objects
+    kwargs = {"group": "mqttbroker.iotoperations.azure.com", "version": "v1beta1", "plural": "brokers"}
+
+    assert get_custom_objects(**kwargs) == objects
+    # A fresh cluster wide listing serves namespaced requests.
+    assert get_custom_objects(namespace="ns2", **kwargs) == {"items": [objects["items"][1]]}
+    custom_api.list_cluster_custom_object.assert_called_once_with(**kwargs)
+    custom_api.list_namespaced_custom_object.assert_not_called()
+
+    get_custom_objects(use_cache=False, **kwargs)
+    assert custom_api.list_cluster_custom_object.call_count == 2
+
+
+def test_snapshot_watch(mocker, mocked_client, mocked_pods):
+    import threading
+
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    list_pods.side_effect = as_raw_list(
+        lambda **kwargs: V1PodList(items=list(mocked_pods), metadata=V1ListMeta(resource_version="10"))
+    )
+    events = [
+        {"type": event_type, "object": pod, "raw_object": ApiClient().sanitize_for_serialization(pod)}
+        for event_type, pod in [
+            ("MODIFIED", _generate_pod("aio-broker-backend-0", "ns1", {"tier": "backend"})),
+            ("DELETED", _generate_pod("aio-opc-supervisor-0", "ns1")),
+            ("ADDED", _generate_pod("aio-broker-backend-1", "ns1")),
+        ]
+    ]
+    mocked_watch = mocker.patch("kubernetes.watch.Watch")
+    streamed = threading.Event()
+
+    def _stream(*args, **kwargs):
+        yield from events
+        streamed.set()
+        # Block like a live watch stream until the test stops it.
+        threading.Event().wait(1)
+
+    mocked_watch.return_value.stream.side_effect = _stream
+    mocker.patch("azext_edge.edge.providers.base.time.monotonic", return_value=0.0)
+    changes = []
+
+    watch = SnapshotWatch(kind=POD_KIND, on_change=changes.append).start()
+    assert streamed.wait(5)
+    watch.stop()
+
+    mocked_watch.return_value.stream.assert_called_with(list_pods, resource_version="10")
+    assert changes == [POD_KIND] * 3
+
+    # Still served locally from the watched listing, with events applied in place.
+    pods = get_namespaced_pods_by_prefix(prefix="aio-broker-", namespace="ns1")
+    assert [(pod.metadata.name, pod.metadata.labels) for pod in pods] == [
+        ("aio-broker-frontend-0", {"app.kubernetes.io/name": "mqttbroker", "tier": "frontend"}),
+        ("aio-broker-backend-0", {"tier": "backend"}),
+        ("aio-broker-backend-1", None),
+    ]
+    assert get_namespaced_pods_by_prefix(prefix="aio-opc-", namespace="ns1") == []
+    list_pods.assert_called_once()
+
+
+def test_list_paginated(mocked_client):
+    pods = [_generate_pod(f"pod-{i}", "ns1") for i in range(5)]
+    page_size = 2
+
+    def _page_token(start: int) -> Optional[str]:
+        return str(start + page_size) if start + page_size < len(pods) else None
+
+    def _handle_list(limit: int, _continue: Optional[str] = None, **kwargs):
+        start = int(_continue or 0)
+        return V1PodList(
+            items=pods[start:start + page_size],
+            metadata=V1ListMeta(resource_version="10", _continue=_page_token(start)),
+        )
+
+    list_pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces
+    list_pods.side_effect = as_raw_list(_handle_list)
+
+    # Snapshot listings follow continue tokens into a single list.
+    result = CLUSTER_SNAPSHOT.list_resources(kind=POD_KIND)
+    assert [pod["metadata"]["name"] for pod in result["items"]] == [pod.metadata.name for pod in pods]
+    assert list_pods.call_count == 3
+    list_pods.assert_called_with(**RAW_LIST_KWARGS, _continue="4", label_selector=None, field_selector=None)
+
+    # Raw pages are yielded one at a time without the continue token.
+    list_pods.reset_mock()
+    pages = list_pages(list_pods)
+    first_page = next(pages)
+    assert [item["metadata"]["name"] for item in first_page["items"]] == ["pod-0", "pod-1"]
+    assert "continue" not in first_page["metadata"]
+    list_pods.assert_called_once_with(**RAW_LIST_KWARGS)
+    assert [len(page["items"]) for page in pages] == [2, 1]
+    assert list_pods.call_count == 3
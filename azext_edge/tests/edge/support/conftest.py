@@ -4,11 +4,15 @@
 # Licensed under the MIT License. See License file in the project root for license information.
 # ----------------------------------------------------------------------------------------------
 
+from contextlib import nullcontext
 from functools import partial
-from typing import List
+from io import BytesIO
+from typing import Dict, List, Optional
 
+from azext_edge.edge.providers.base import CLUSTER_SNAPSHOT
 from azext_edge.edge.providers.support.arcagents import ARC_AGENTS
 from ...generators import generate_random_string
+from ...helpers import as_raw_list
 
 import pytest
 
@@ -44,15 +48,47 @@ def add_pod_to_mocked_pods(
     pods_list = V1PodList(items=pod_list)
     mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = pods_list
     mocked_client.CoreV1Api().list_namespaced_pod.return_value = pods_list
-    mocked_client.CoreV1Api().read_namespaced_pod_log.return_value = mock_log
+    mocked_client.CoreV1Api().read_namespaced_pod_log.side_effect = mock_pod_log_response(mock_log)
+
+
+def mock_pod_log_response(mock_log: str):
+    """
+    Side effect for read_namespaced_pod_log(_preload_content=False) returning a fresh streamable response.
+    """
+    from urllib3 import HTTPResponse
+
+    def _handle_read_log(*args, **kwargs):
+        return HTTPResponse(body=BytesIO(mock_log.encode()), preload_content=False)
+
+    return _handle_read_log
+
+
+class StreamedZipMember(BytesIO):
+    def __init__(self, arcname: str, streamed_members: Dict[str, bytes]):
+        super().__init__()
+        self.arcname = arcname
+        self.streamed_members = streamed_members
+
+    def close(self):
+        if not self.closed:
+            self.streamed_members[self.arcname] = self.getvalue()
+        super().close()
 
 
 @pytest.fixture
 def mocked_client(mocker, mocked_client):
-    patched = mocker.patch("azext_edge.edge.providers.support.base.client", autospec=True)
+    # Support listings go through the cluster snapshot in providers.base, share a single client mock.
+    patched = mocker.patch("azext_edge.edge.providers.support.base.client", new=mocked_client)
     yield patched
 
 
+@pytest.fixture(autouse=True)
+def mocked_snapshot_ttl(mocker):
+    # Mocked resources carry no labels, always ask the (mocked) API server with the requested selectors.
+    mocker.patch.object(CLUSTER_SNAPSHOT, "ttl_seconds", 0)
+    mocker.patch.object(CLUSTER_SNAPSHOT, "scope", nullcontext)
+
+
 @pytest.fixture
 def mocked_root_logger(mocker, mocked_client):
     patched = mocker.patch("azext_edge.edge.providers.support_bundle.logger", autospec=True)
@@ -68,6 +104,14 @@ def mocked_os_makedirs(mocker):
 @pytest.fixture
 def mocked_zipfile(mocker):
     patched = mocker.patch("azext_edge.edge.providers.support_bundle.ZipFile", autospec=True)
+    # archive path -> content of members streamed via ZipFile.open
+    streamed_members = {}
+
+    def _handle_open(name, mode="r", **kwargs):
+        return StreamedZipMember(arcname=getattr(name, "filename", name), streamed_members=streamed_members)
+
+    patched.return_value.__enter__.return_value.open.side_effect = _handle_open
+    patched.streamed_members = streamed_members
     yield patched
 
 
@@ -144,7 +188,7 @@ def mocked_cluster_resources(request, mocker):
                 f"{kwargs['resource_api'].as_str()} resource API is not detected on the cluster."
             )
 
-    patched = mocker.patch("azext_edge.edge.providers.edge_api.base.get_cluster_custom_api", autospec=True)
+    patched = mocker.patch("azext_edge.edge.providers.base.get_cluster_custom_api", autospec=True)
     _handle_call = partial(_handle_resource_call, context=resource_map)
     patched.side_effect = _handle_call
 
@@ -185,24 +229,20 @@ def mocked_list_pods(mocked_client):
 
     pods_list = V1PodList(items=pods)
     mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = pods_list
-    mocked_client.CoreV1Api().read_namespaced_pod_log.return_value = mock_log
+    mocked_client.CoreV1Api().read_namespaced_pod_log.side_effect = mock_pod_log_response(mock_log)
 
     yield expected_pod_map
 
 
 @pytest.fixture
-def mocked_get_custom_objects(mocker):
-    patched = mocker.patch("azext_edge.edge.providers.support.base.get_custom_objects", autospec=True)
-
-    def _handle_list_custom_object(*args, **kwargs):
-        result = {}
-        items = []
+def mocked_list_custom_object_pages(mocker):
+    patched = mocker.patch("azext_edge.edge.providers.support.base.list_custom_object_pages", autospec=True)
 
-        items.append({"kind": kwargs["plural"][:-1], "metadata": {"namespace": "mock_namespace", "name": "mock_name"}})
-        result["items"] = items
-        return result
+    def _handle_list_custom_object_pages(*args, **kwargs):
+        items = [{"kind": kwargs["plural"][:-1], "metadata": {"namespace": "mock_namespace", "name": "mock_name"}}]
+        return iter([{"items": items}])
 
-    patched.side_effect = _handle_list_custom_object
+    patched.side_effect = _handle_list_custom_object_pages
     yield patched
 
 
@@ -215,21 +255,43 @@ def mocked_assemble_crd_work(mocker):
 
 @pytest.fixture
 def mocked_namespaced_custom_objects(mocked_client):
-    def _handle_namespaced_custom_object(*args, **kwargs):
-        custom_object = {
-            "kind": "PodMetrics",
-            "apiVersion": "metrics.k8s.io/v1beta1",
-            "metadata": {
-                "name": "mock_custom_object",
-                "namespace": "namespace",
-                "creationTimestamp": "0000-00-00T00:00:00Z",
-            },
-            "timestamp": "0000-00-00T00:00:00Z",
-        }
-
-        return custom_object
-
-    mocked_client.CustomObjectsApi().get_namespaced_custom_object.side_effect = _handle_namespaced_custom_object
+    from unittest.mock import DEFAULT
+
+    from ...helpers import mock_list_page_response
+
+    def _mock_metric(name: str, namespace: Optional[str] = None) -> dict:
+        metadata = {"name": name, "creationTimestamp": "0000-00-00T00:00:00Z"}
+        if namespace:
+            metadata["namespace"] = namespace
+        return {"metadata": metadata, "timestamp": "0000-00-00T00:00:00Z", "window": "30s"}
+
+    def _handle_list_namespaced_custom_object(*args, **kwargs):
+        pods = mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value.items
+        items = [
+            _mock_metric(pod.metadata.name, kwargs["namespace"])
+            for pod in pods
+            if pod.metadata.namespace == kwargs["namespace"]
+        ]
+        return mock_list_page_response(
+            {"kind": "PodMetricsList", "apiVersion": "metrics.k8s.io/v1beta1", "metadata": {}, "items": items}
+        )
+
+    def _handle_list_cluster_custom_object(*args, **kwargs):
+        if kwargs.get("group") != "metrics.k8s.io":
+            return DEFAULT
+        return mock_list_page_response(
+            {
+                "kind": "NodeMetricsList",
+                "apiVersion": "metrics.k8s.io/v1beta1",
+                "metadata": {},
+                "items": [_mock_metric("mock_node")],
+            }
+        )
+
+    mocked_client.CustomObjectsApi().list_namespaced_custom_object.side_effect = (
+        _handle_list_namespaced_custom_object
+    )
+    mocked_client.CustomObjectsApi().list_cluster_custom_object.side_effect = _handle_list_cluster_custom_object
 
     yield mocked_client
 
@@ -244,7 +306,7 @@ def mocked_list_cron_jobs(mocked_client):
 
         return cron_job_list
 
-    mocked_client.BatchV1Api().list_cron_job_for_all_namespaces.side_effect = _handle_list_cron_jobs
+    mocked_client.BatchV1Api().list_cron_job_for_all_namespaces.side_effect = as_raw_list(_handle_list_cron_jobs)
 
     yield mocked_client
 
@@ -262,7 +324,7 @@ def mocked_list_jobs(mocked_client):
 
         return job_list
 
-    mocked_client.BatchV1Api().list_job_for_all_namespaces.side_effect = _handle_list_jobs
+    mocked_client.BatchV1Api().list_job_for_all_namespaces.side_effect = as_raw_list(_handle_list_jobs)
 
     yield mocked_client
 
@@ -286,8 +348,8 @@ def mocked_list_deployments(mocked_client):
 
         return deployment_list
 
-    mocked_client.AppsV1Api().list_deployment_for_all_namespaces.side_effect = _handle_list_deployments
-    mocked_client.AppsV1Api().list_namespaced_deployment.side_effect = _handle_list_deployments
+    mocked_client.AppsV1Api().list_deployment_for_all_namespaces.side_effect = as_raw_list(_handle_list_deployments)
+    mocked_client.AppsV1Api().list_namespaced_deployment.side_effect = as_raw_list(_handle_list_deployments)
 
     yield mocked_client
 
@@ -305,8 +367,8 @@ def mocked_list_replicasets(mocked_client):
 
         return replicaset_list
 
-    mocked_client.AppsV1Api().list_replica_set_for_all_namespaces.side_effect = _handle_list_replicasets
-    mocked_client.AppsV1Api().list_namespaced_replica_set.side_effect = _handle_list_replicasets
+    mocked_client.AppsV1Api().list_replica_set_for_all_namespaces.side_effect = as_raw_list(_handle_list_replicasets)
+    mocked_client.AppsV1Api().list_namespaced_replica_set.side_effect = as_raw_list(_handle_list_replicasets)
 
     yield mocked_client
 
@@ -321,7 +383,7 @@ def mocked_list_statefulsets(mocked_client):
 
         return statefulset_list
 
-    mocked_client.AppsV1Api().list_stateful_set_for_all_namespaces.side_effect = _handle_list_statefulsets
+    mocked_client.AppsV1Api().list_stateful_set_for_all_namespaces.side_effect = as_raw_list(_handle_list_statefulsets)
 
     yield mocked_client
 
@@ -339,8 +401,8 @@ def mocked_list_services(mocked_client):
 
         return service_list
 
-    mocked_client.CoreV1Api().list_service_for_all_namespaces.side_effect = _handle_list_services
-    mocked_client.CoreV1Api().list_namespaced_service.side_effect = _handle_list_services
+    mocked_client.CoreV1Api().list_service_for_all_namespaces.side_effect = as_raw_list(_handle_list_services)
+    mocked_client.CoreV1Api().list_namespaced_service.side_effect = as_raw_list(_handle_list_services)
 
     yield mocked_client
 
@@ -355,7 +417,7 @@ def mocked_list_nodes(mocked_client):
 
         return node_list
 
-    mocked_client.CoreV1Api().list_node.side_effect = _handle_list_nodes
+    mocked_client.CoreV1Api().list_node.side_effect = as_raw_list(_handle_list_nodes)
 
     yield mocked_client
 
@@ -372,7 +434,7 @@ def mocked_list_cluster_events(mocked_client):
 
         return event_list
 
-    mocked_client.CoreV1Api().list_event_for_all_namespaces.side_effect = _handle_list_cluster_events
+    mocked_client.CoreV1Api().list_event_for_all_namespaces.side_effect = as_raw_list(_handle_list_cluster_events)
 
     yield mocked_client
 
@@ -389,7 +451,7 @@ def mocked_list_storage_classes(mocked_client):
 
         return storage_class_list
 
-    mocked_client.StorageV1Api().list_storage_class.side_effect = _handle_list_storage_classes
+    mocked_client.StorageV1Api().list_storage_class.side_effect = as_raw_list(_handle_list_storage_classes)
 
     yield mocked_client
 
@@ -407,8 +469,8 @@ def mocked_list_daemonsets(mocked_client):
 
         return daemonset_list
 
-    mocked_client.AppsV1Api().list_daemon_set_for_all_namespaces.side_effect = _handle_list_daemonsets
-    mocked_client.AppsV1Api().list_namespaced_daemon_set.side_effect = _handle_list_daemonsets
+    mocked_client.AppsV1Api().list_daemon_set_for_all_namespaces.side_effect = as_raw_list(_handle_list_daemonsets)
+    mocked_client.AppsV1Api().list_namespaced_daemon_set.side_effect = as_raw_list(_handle_list_daemonsets)
 
     yield mocked_client
 
@@ -426,10 +488,10 @@ def mocked_list_persistent_volume_claims(mocked_client):
 
         return pvc_list
 
-    mocked_client.CoreV1Api().list_persistent_volume_claim_for_all_namespaces.side_effect = (
+    mocked_client.CoreV1Api().list_persistent_volume_claim_for_all_namespaces.side_effect = as_raw_list(
         _handle_list_persistent_volume_claims
     )
-    mocked_client.CoreV1Api().list_namespaced_persistent_volume_claim.side_effect = (
+    mocked_client.CoreV1Api().list_namespaced_persistent_volume_claim.side_effect = as_raw_list(
         _handle_list_persistent_volume_claims
     )
 
@@ -446,7 +508,7 @@ def mocked_list_config_maps(mocked_client):
 
         return config_map_list
 
-    mocked_client.CoreV1Api().list_config_map_for_all_namespaces.side_effect = _handle_list_config_maps
+    mocked_client.CoreV1Api().list_config_map_for_all_namespaces.side_effect = as_raw_list(_handle_list_config_maps)
 
     yield mocked_client
 
@@ -485,7 +547,7 @@ def mocked_get_arc_services(mocked_client):
 
         return service_list
 
-    mocked_client.CoreV1Api().list_service_for_all_namespaces.side_effect = _handle_list_arc_services
+    mocked_client.CoreV1Api().list_service_for_all_namespaces.side_effect = as_raw_list(_handle_list_arc_services)
 
     yield mocked_client
 
@@ -6,6 +6,7 @@
 
 import copy
 import random
+from functools import partial
 from os.path import abspath, expanduser, join
 from typing import List, Optional, Union
 from zipfile import ZipInfo
@@ -15,6 +16,7 @@ import pytest
 
 from azext_edge.edge.commands_edge import support_bundle
 from azext_edge.edge.common import OpsServiceType
+from azext_edge.edge.providers.base import DEFAULT_LIST_PAGE_LIMIT
 from azext_edge.edge.providers.edge_api import (
     ARCCONTAINERSTORAGE_API_V1,
     CLUSTER_CONFIG_API_V1,
@@ -28,7 +30,8 @@ from azext_edge.edge.providers.edge_api import (
 from azext_edge.edge.providers.edge_api.meta import META_API_V1B1
 from azext_edge.edge.providers.support.arcagents import ARC_AGENTS, MONIKER
 from azext_edge.edge.providers.support.arccontainerstorage import STORAGE_NAMESPACE
-from azext_edge.edge.providers.support.base import get_bundle_path
+from azext_edge.edge.providers.support.base import LOG_REQUEST_TIMEOUT, NODE_METRICS_ZINFO, get_bundle_path
+from azext_edge.edge.providers.support.manifest import MANIFEST_ZINFO
 from azext_edge.edge.providers.support.billing import (
     AIO_BILLING_USAGE_NAME_LABEL,
     ARC_BILLING_EXTENSION_COMP_LABEL,
@@ -49,11 +52,17 @@ from azext_edge.edge.providers.support.common import (
 )
 from azext_edge.edge.providers.support.schemaregistry import SCHEMAS_DIRECTORY_PATH, SCHEMAS_NAME_LABEL
 from azext_edge.edge.providers.support_bundle import COMPAT_MQTT_BROKER_APIS
-from azext_edge.tests.edge.support.conftest import add_pod_to_mocked_pods
+from azext_edge.tests.edge.support.conftest import (
+    add_pod_to_mocked_pods,
+    mock_pod_log_response,
+)
 
 from ...generators import generate_random_string
+from ...helpers import mock_list_page_response
 
 a_bundle_dir = f"support_test_{generate_random_string()}"
+# List calls are paginated and read as raw JSON.
+RAW_LIST_KWARGS = {"limit": DEFAULT_LIST_PAGE_LIMIT, "_preload_content": False}
 # @TODO: test refactor
 
 
@@ -75,7 +84,7 @@ def test_create_bundle(
     mocked_config,
     mocked_os_makedirs,
     mocked_zipfile,
-    mocked_get_custom_objects,
+    mocked_list_custom_object_pages,
     mocked_list_cron_jobs,
     mocked_list_jobs,
     mocked_list_deployments,
@@ -107,6 +116,12 @@ def test_create_bundle(
 
     assert "bundlePath" in result
     assert a_bundle_dir in result["bundlePath"]
+    # Every mocked pod matches each selector, overlapping selectors resolve to the same targets.
+    assert result["collection"]["savedRequests"] > 0
+    assert (
+        result["collection"]["plannedRequests"]
+        == result["collection"]["requests"] + result["collection"]["savedRequests"]
+    )
 
     expected_resources: List[EdgeResourceApi] = mocked_cluster_resources["param"]
 
@@ -117,7 +132,7 @@ def test_create_bundle(
             target_file_prefix = None
 
             assert_get_custom_resources(
-                mocked_get_custom_objects,
+                mocked_list_custom_object_pages,
                 mocked_zipfile,
                 api,
                 kind,
@@ -412,7 +427,7 @@ def test_create_bundle_crd_work(
     mocked_config,
     mocked_os_makedirs,
     mocked_zipfile,
-    mocked_get_custom_objects,
+    mocked_list_custom_object_pages,
     mocked_list_pods,
     mocked_list_replicasets,
     mocked_list_statefulsets,
@@ -440,15 +455,560 @@ def test_create_bundle_crd_work(
         mocked_assemble_crd_work.assert_called_once()
 
 
+@pytest.mark.parametrize("concurrency", [1, 4, 16])
+def test_create_bundle_concurrency(
+    mocker,
+    mocked_client,
+    mocked_config,
+    mocked_cluster_resources,
+    mocked_os_makedirs,
+    mocked_zipfile,
+    concurrency: int,
+):
+    import time
+
+    # support module -> bundle service key
+    support_modules = [
+        "arcagents",
+        "akri",
+        "arccontainerstorage",
+        "billing",
+        "dataflow",
+        "deviceregistry",
+        "meta",
+        "mq",
+        "opcua",
+        "schemaregistry",
+        "secretstore",
+        "shared",
+    ]
+
+    def _work(zinfo: str, raise_error: bool = False):
+        # finish out of submission order
+        time.sleep(random.uniform(0, 0.01))
+        if raise_error:
+            raise RuntimeError(zinfo)
+        return {"data": zinfo, "zinfo": zinfo}
+
+    expected_elements = {}
+    for module in support_modules:
+        elements = {
+            f"{module}_{i}": partial(_work, zinfo=f"{module}/{i}.yaml", raise_error=(i == 2)) for i in range(5)
+        }
+        expected_elements[module] = list(elements.keys())
+        mocker.patch(f"azext_edge.edge.providers.support.{module}.prepare_bundle", return_value=elements)
+
+    support_bundle(None, bundle_dir=a_bundle_dir, concurrency=concurrency)
+
+    # pylint: disable-next=unnecessary-dunder-call
+    writestr_calls = mocked_zipfile(file="").__enter__().writestr.call_args_list
+    written = [c.kwargs["zinfo_or_arcname"] for c in writestr_calls]
+    expected_written = [MANIFEST_ZINFO]
+    for module in support_modules:
+        for i in range(len(expected_elements[module])):
+            # failures are isolated to the element
+            if i != 2:
+                expected_written.append(f"{module}/{i}.yaml")
+    # each archive path is written exactly once regardless of completion order
+    assert sorted(written) == sorted(expected_written)
+
+
+@pytest.mark.parametrize(
+    "concurrency_kwargs",
+    [{"concurrency": 0}, {"log_concurrency": 0}, {"metric_samples": 0}, {"metric_interval": -1}],
+)
+def test_create_bundle_invalid_concurrency(mocked_config, concurrency_kwargs: dict):
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+
+    with pytest.raises(InvalidArgumentValueError):
+        support_bundle(None, bundle_dir=a_bundle_dir, **concurrency_kwargs)
+
+
+def test_process_v1_pods_log_capture(mocked_client):
+    from kubernetes.client.models import V1Container, V1ObjectMeta, V1Pod, V1PodList, V1PodSpec, V1PodStatus
+    from urllib3.exceptions import ReadTimeoutError
+
+    from azext_edge.edge.providers.support.base import process_v1_pods
+
+    namespace = generate_random_string()
+    hung_pod = "pod-1"
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(namespace=namespace, name=f"pod-{i}"),
+            spec=V1PodSpec(containers=[V1Container(name="c0"), V1Container(name="c1")]),
+            status=V1PodStatus(phase="Running"),
+        )
+        for i in range(3)
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = V1PodList(items=pods)
+
+    def _read_log(name: str, container: str, previous: bool, **kwargs):
+        assert kwargs["_request_timeout"] == LOG_REQUEST_TIMEOUT
+        assert kwargs["_preload_content"] is False
+        if name == hung_pod and container == "c0":
+            raise ReadTimeoutError(pool=None, url=None, message="timed out")
+        return mock_pod_log_response(f"{name}.{container}.{previous}")()
+
+    mocked_client.CoreV1Api().read_namespaced_pod_log.side_effect = _read_log
+
+    result = process_v1_pods(directory_path="test", since_seconds=60)
+
+    assert mocked_client.CoreV1Api().read_namespaced_pod_log.call_count == 12
+    log_entries = [r for r in result if r["zinfo"].endswith(".log")]
+    expected_logs = [
+        f"pod-{i}.{container}.{previous}"
+        for i in range(3)
+        for container in ["c0", "c1"]
+        for previous in [False, True]
+        if not (f"pod-{i}" == hung_pod and container == "c0")
+    ]
+    # a hung container does not stall or drop the others, and order follows the pod listing
+    assert [entry["data"].read().decode() for entry in log_entries] == expected_logs
+
+
+def test_collection_plan(mocked_client, mocked_namespaced_custom_objects, mocker, tmp_path):
+    from zipfile import ZipFile
+
+    from kubernetes.client.models import V1Container, V1ObjectMeta, V1Pod, V1PodList, V1PodSpec, V1PodStatus
+
+    from azext_edge.edge.providers.support.base import METRICS_TARGET, CollectionPlan, LogTarget, process_v1_pods
+    from azext_edge.edge.providers.support_bundle import BundleWriter, _write_planned_targets
+    from azext_edge.edge.providers.command_context import CommandContext, bind_command_context
+    from azext_edge.edge.providers.support.opcua import fetch_pods
+
+    namespace = generate_random_string()
+    pods = [
+        V1Pod(
+            metadata=V1ObjectMeta(namespace=namespace, name=f"pod-{i}"),
+            spec=V1PodSpec(containers=[V1Container(name="c0"), V1Container(name="c1")]),
+            status=V1PodStatus(phase="Running"),
+        )
+        for i in range(2)
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = V1PodList(items=pods)
+    mocked_client.CoreV1Api().read_namespaced_pod_log.side_effect = (
+        lambda name, container, previous, **kwargs: mock_pod_log_response(f"{name}.{container}.{previous}")()
+    )
+
+    plan = CollectionPlan()
+    with bind_command_context(CommandContext(collection_plan=plan)):
+        # Every pod matches each of the overlapping opcua selectors.
+        result = fetch_pods(since_seconds=60)
+        result.extend(process_v1_pods(directory_path="other", since_seconds=120, capture_previous_logs=False))
+
+    # Nothing is fetched while planning.
+    assert all(entry["data"]["kind"] == "Pod" for entry in result)
+    mocked_client.CoreV1Api().read_namespaced_pod_log.assert_not_called()
+    mocked_client.CustomObjectsApi().get_namespaced_custom_object.assert_not_called()
+    # 4 selectors x 2 pods x (2 containers x 2 log runs + metrics), and 2 pods x 2 containers of the other service.
+    # Pod metrics take one list for the namespace and one for nodes.
+    assert plan.as_dict() == {"plannedRequests": 44, "metricSamples": 1, "requests": 10, "savedRequests": 34}
+
+    assert plan.target_count == 9
+
+    fetched = [(target, list(entries)) for target, entries in plan.fetch()]
+    assert mocked_client.CoreV1Api().read_namespaced_pod_log.call_count == 8
+    mocked_client.CustomObjectsApi().get_namespaced_custom_object.assert_not_called()
+    assert mocked_client.CustomObjectsApi().list_namespaced_custom_object.call_count == 1
+    # Logs are requested for the widest window, and written under each service selecting the pod.
+    mocked_client.CoreV1Api().read_namespaced_pod_log.assert_any_call(
+        name="pod-0",
+        namespace=namespace,
+        since_seconds=120,
+        container="c0",
+        previous=False,
+        _request_timeout=LOG_REQUEST_TIMEOUT,
+        _preload_content=False,
+    )
+    # Targets are yielded in order, a log entry each with metrics last.
+    assert [target for target, _ in fetched] == sorted(plan.log_targets) + [METRICS_TARGET]
+    assert all(isinstance(target, LogTarget) and len(entries) == 1 for target, entries in fetched[:-1])
+    assert [entry["zinfo"] for entry in fetched[-1][1]] == [NODE_METRICS_ZINFO] + [
+        f"{namespace}/opcua/pod.pod-{i}.metric.yaml" for i in range(2)
+    ]
+    for _, entries in fetched:
+        for entry in entries:
+            if hasattr(entry["data"], "close"):
+                entry["data"].close()
+
+    # Each target is written as it is fetched, logs shared by services once per service directory.
+    on_target = mocker.Mock()
+    bundle_path = tmp_path / "bundle.zip"
+    with ZipFile(bundle_path, mode="w") as myzip:
+        _write_planned_targets(writer=BundleWriter(myzip=myzip), plan=plan, concurrency=2, on_target=on_target)
+    assert on_target.call_count == plan.target_count
+    with ZipFile(bundle_path) as myzip:
+        logs = {name: myzip.read(name).decode() for name in myzip.namelist() if name.endswith(".log")}
+        metrics = [name for name in myzip.namelist() if name.endswith(".metric.yaml")]
+    assert len(logs) == 12
+    assert logs[f"{namespace}/opcua/pod.pod-1.c1.previous.log"] == "pod-1.c1.True"
+    assert logs[f"{namespace}/opcua/pod.pod-1.c1.log"] == "pod-1.c1.False"
+    assert logs[f"{namespace}/other/pod.pod-1.c1.log"] == "pod-1.c1.False"
+    assert len(metrics) == 3
+
+    # A failed target is logged and skipped, the others are still written.
+    writer = mocker.Mock(write=mocker.Mock(side_effect=[ValueError("failed")] + [None] * 8))
+    on_target.reset_mock()
+    _write_planned_targets(writer=writer, plan=plan, concurrency=2, on_target=on_target)
+    assert writer.write.call_count == on_target.call_count == plan.target_count
+
+
+def test_collection_plan_metric_samples(mocked_client, mocked_namespaced_custom_objects, mocker):
+    from kubernetes.client.models import V1ObjectMeta, V1Pod, V1PodList, V1PodSpec
+
+    from azext_edge.edge.providers.support.base import CollectionPlan, process_v1_pods
+    from azext_edge.edge.providers.command_context import CommandContext, bind_command_context
+
+    namespaces = [generate_random_string(), generate_random_string()]
+    pods = [
+        V1Pod(metadata=V1ObjectMeta(namespace=namespace, name=f"pod-{i}"), spec=V1PodSpec(containers=[]))
+        for namespace in namespaces
+        for i in range(3)
+    ]
+    mocked_client.CoreV1Api().list_pod_for_all_namespaces.return_value = V1PodList(items=pods)
+    mocked_sleep = mocker.patch("azext_edge.edge.providers.support.base.time.sleep")
+
+    plan = CollectionPlan(metric_samples=3, metric_interval_seconds=5)
+    with bind_command_context(CommandContext(collection_plan=plan)):
+        process_v1_pods(directory_path="test", include_metrics=True)
+    assert plan.as_dict() == {"plannedRequests": 18, "metricSamples": 3, "requests": 9, "savedRequests": 9}
+
+    entries = {entry["zinfo"]: entry["data"] for _, target_entries in plan.fetch() for entry in target_entries}
+    assert mocked_client.CustomObjectsApi().list_namespaced_custom_object.call_count == 6
+    assert mocked_sleep.call_count == 2
+    mocked_sleep.assert_called_with(5)
+    assert len(entries) == 7
+    assert entries[NODE_METRICS_ZINFO]["kind"] == "NodeMetricsList"
+    assert len(entries[NODE_METRICS_ZINFO]["items"]) == 3
+    # Repeated samples of a pod are kept in order.
+    pod_metrics = entries[f"{namespaces[0]}/test/pod.pod-0.metric.yaml"]
+    assert pod_metrics["kind"] == "PodMetricsList"
+    assert [item["kind"] for item in pod_metrics["items"]] == ["PodMetrics"] * 3
+    assert {item["metadata"]["name"] for item in pod_metrics["items"]} == {"pod-0"}
+
+
+def test_bundle_writer(tmp_path):
+    from tempfile import SpooledTemporaryFile
+    from zipfile import ZipFile
+
+    from azext_edge.edge.providers.support_bundle import BundleWriter
+
+    streamed_log = SpooledTemporaryFile(max_size=8)
+    streamed_log.write(b"a streamed log that spills past the in-memory spool size")
+    trace_zinfo = ZipInfo(filename="namespace/broker/traces/trace.json", date_time=(2024, 1, 1, 0, 0, 0))
+
+    bundle_path = str(tmp_path / "bundle.zip")
+    with ZipFile(file=bundle_path, mode="w") as myzip:
+        writer = BundleWriter(myzip)
+        writer.write({"data": {"kind": "Pod"}, "zinfo": "namespace/pod.yaml"})
+        writer.write(
+            [
+                {"data": streamed_log, "zinfo": "namespace/pod.container.log"},
+                {"data": b"{}", "zinfo": trace_zinfo},
+                # first writer wins
+                {"data": {"kind": "Duplicate"}, "zinfo": "namespace/pod.yaml"},
+                # empty content is skipped
+                {"data": SpooledTemporaryFile(), "zinfo": "namespace/empty.log"},
+                {"data": "", "zinfo": "namespace/empty.txt"},
+                None,
+            ]
+        )
+        writer.write(None)
+
+    assert streamed_log.closed
+    with ZipFile(file=bundle_path, mode="r") as myzip:
+        assert myzip.namelist() == [
+            "namespace/pod.yaml",
+            "namespace/pod.container.log",
+            "namespace/broker/traces/trace.json",
+        ]
+        assert myzip.read("namespace/pod.yaml").decode() == "kind: Pod\n"
+        assert myzip.read("namespace/pod.container.log") == b"a streamed log that spills past the in-memory spool size"
+        assert myzip.getinfo("namespace/broker/traces/trace.json").date_time == (2024, 1, 1, 0, 0, 0)
+
+
+def test_iter_entries_in_order():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from tempfile import SpooledTemporaryFile
+
+    from azext_edge.edge.providers.support.base import iter_entries_in_order
+
+    first_done = threading.Event()
+    unread = SpooledTemporaryFile()
+
+    def _slow_first():
+        # Later work items complete first, yet the first is still consumed first.
+        assert first_done.wait(timeout=10)
+        return [{"data": "slow", "zinfo": "dup.yaml"}]
+
+    def _fast(name: str):
+        def _work():
+            if name == "last":
+                first_done.set()
+            return {"data": name, "zinfo": "dup.yaml"}
+
+        return _work
+
+    def _failing():
+        yield {"data": "partial", "zinfo": "failing.yaml"}
+        raise ValueError("unable to list")
+
+    def _unread():
+        return [{"data": "read", "zinfo": "unread.0"}, {"data": unread, "zinfo": "unread.1"}]
+
+    work = [
+        ("first", _slow_first),
+        ("failing", _failing),
+        ("none", lambda: None),
+        ("unread", _unread),
+        ("last", _fast("last")),
+    ]
+    consumed = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for key, entries in iter_entries_in_order(work, executor=executor, max_pending=8, max_buffered=1):
+            if key == "failing":
+                with pytest.raises(ValueError):
+                    for entry in entries:
+                        consumed.append((key, entry["data"]))
+                continue
+            if key == "unread":
+                consumed.append((key, next(entries)["data"]))
+                continue
+            consumed.extend((key, entry["data"]) for entry in entries)
+
+    assert consumed == [
+        ("first", "slow"),
+        ("failing", "partial"),
+        ("unread", "read"),
+        ("last", "last"),
+    ]
+    # Entries left unread are closed.
+    assert unread.closed
+
+
+def test_process_events_paged(mocked_client, tmp_path):
+    from zipfile import ZipFile
+
+    from azext_edge.edge.providers.support.base import process_events
+    from azext_edge.edge.providers.support_bundle import BundleWriter
+
+    import yaml
+
+    events = [
+        {"metadata": {"name": "event-0", "namespace": "ns"}, "message": "first line\nsecond line"},
+        {"metadata": {"name": "event-1"}, "message": "long " * 40},
+        {"metadata": {"name": "event-2"}, "involvedObject": {"kind": "Pod", "fieldPath": "spec.containers{c}"}},
+    ]
+    pages = {
+        None: {
+            "apiVersion": "v1",
+            "kind": "EventList",
+            "metadata": {"continue": "p2", "resourceVersion": "10", "remainingItemCount": 2},
+            "items": events[:1],
+        },
+        "p2": {"apiVersion": "v1", "kind": "EventList", "metadata": {"continue": "p3"}, "items": events[1:]},
+        "p3": {"apiVersion": "v1", "kind": "EventList", "metadata": {}, "items": []},
+    }
+    mocked_client.CoreV1Api().list_event_for_all_namespaces.side_effect = (
+        lambda _continue=None, **kwargs: mock_list_page_response(pages[_continue])
+    )
+
+    bundle_path = str(tmp_path / "bundle.zip")
+    with ZipFile(file=bundle_path, mode="w") as myzip:
+        BundleWriter(myzip).write(process_events())
+
+    mocked_client.CoreV1Api().list_event_for_all_namespaces.assert_called_with(
+        **RAW_LIST_KWARGS, _continue="p3"
+    )
+    # Pages are streamed into a single member, as if the whole list was serialized at once.
+    expected_list = {"apiVersion": "v1", "kind": "EventList", "metadata": {"resourceVersion": "10"}, "items": events}
+    with ZipFile(file=bundle_path, mode="r") as myzip:
+        assert myzip.namelist() == ["events.yaml"]
+        assert myzip.read("events.yaml").decode() == yaml.safe_dump(expected_list, indent=2)
+
+    pages = {None: {"metadata": {}, "items": []}}
+    with ZipFile(file=bundle_path, mode="w") as myzip:
+        BundleWriter(myzip).write(process_events())
+    with ZipFile(file=bundle_path, mode="r") as myzip:
+        assert myzip.read("events.yaml").decode() == "items: []\nmetadata: {}\n"
+
+
+def test_bundle_manifest_delta(tmp_path):
+    import json
+    from tempfile import SpooledTemporaryFile
+    from zipfile import ZipFile
+
+    from azext_edge.edge.providers.support.manifest import BundleManifest, get_capture_timestamp
+    from azext_edge.edge.providers.support_bundle import BundleWriter
+
+    def _log(content: bytes) -> SpooledTemporaryFile:
+        log = SpooledTemporaryFile()
+        log.write(content)
+        return log
+
+    def _pod(name: str, resource_version: str) -> dict:
+        return {"kind": "Pod", "metadata": {"name": name, "resourceVersion": resource_version}}
+
+    first_path = str(tmp_path / "first.zip")
+    with ZipFile(file=first_path, mode="w") as myzip:
+        writer = BundleWriter(myzip=myzip, manifest=BundleManifest(bundle_name="first.zip"))
+        writer.write(
+            [
+                {"data": _pod("a", "1"), "zinfo": "ns/pod.a.yaml"},
+                {"data": _pod("b", "1"), "zinfo": "ns/pod.b.yaml"},
+                {"data": _log(b"line 1\n"), "zinfo": "ns/pod.a.c.log", "capturedAt": get_capture_timestamp()},
+            ]
+        )
+        writer.write_manifest()
+
+    second_path = str(tmp_path / "second.zip")
+    manifest = BundleManifest.from_bundle(bundle_name="second.zip", previous_bundle_path=first_path)
+    assert manifest.previous_bundle == "first.zip"
+    # only the time since the previous capture is requested, bounded by the log age
+    assert 1 <= manifest.get_log_since_seconds(zinfo="ns/pod.a.c.log", since_seconds=3600) <= 5
+    assert manifest.get_log_since_seconds(zinfo="ns/pod.new.c.log", since_seconds=3600) == 3600
+
+    with ZipFile(file=second_path, mode="w") as myzip:
+        writer = BundleWriter(myzip=myzip, manifest=manifest)
+        writer.write(
+            [
+                {"data": _pod("a", "1"), "zinfo": "ns/pod.a.yaml"},
+                {"data": _pod("b", "2"), "zinfo": "ns/pod.b.yaml"},
+                # no new log lines
+                {"data": _log(b""), "zinfo": "ns/pod.a.c.log", "capturedAt": get_capture_timestamp()},
+            ]
+        )
+        writer.write_manifest()
+
+    with ZipFile(file=second_path, mode="r") as myzip:
+        assert myzip.namelist() == ["ns/pod.b.yaml", MANIFEST_ZINFO]
+        second_manifest = json.loads(myzip.read(MANIFEST_ZINFO))
+
+    assert second_manifest["bundle"] == "second.zip"
+    assert second_manifest["previousBundle"] == "first.zip"
+    assert second_manifest["resources"] == {
+        "ns/pod.a.yaml": {"resourceVersion": "1", "bundles": ["first.zip"]},
+        "ns/pod.b.yaml": {"resourceVersion": "2", "bundles": ["second.zip"]},
+    }
+    assert second_manifest["logs"]["ns/pod.a.c.log"]["bundles"] == ["first.zip"]
+
+
+def test_bundle_manifest_delta_failed_log(mocker, tmp_path):
+    import json
+    from tempfile import SpooledTemporaryFile
+    from zipfile import ZipFile
+
+    from kubernetes.client.exceptions import ApiException
+
+    from azext_edge.edge.providers.support.base import (
+        _capture_planned_target,
+        _capture_pod_container_log,
+        _get_pod_container_log_zinfo,
+    )
+    from azext_edge.edge.providers.support.manifest import BundleManifest
+    from azext_edge.edge.providers.support_bundle import BundleWriter
+
+    first_captured_at = "2024-01-01T00:00:00.000000Z"
+    zinfos = {
+        container_name: [
+            _get_pod_container_log_zinfo(
+                directory_path=directory_path, container_name=container_name, pod_name="a", pod_namespace="ns"
+            )
+            for directory_path in ["broker", "alias"]
+        ]
+        for container_name in ["ok", "failing"]
+    }
+
+    first_path = str(tmp_path / "first.zip")
+    with ZipFile(file=first_path, mode="w") as myzip:
+        writer = BundleWriter(myzip=myzip, manifest=BundleManifest(bundle_name="first.zip"))
+        for container_zinfos in zinfos.values():
+            log = SpooledTemporaryFile()
+            log.write(b"line 1\n")
+            writer.write(
+                [
+                    {
+                        "data": log,
+                        "zinfo": container_zinfos[0],
+                        "aliases": container_zinfos[1:],
+                        "capturedAt": first_captured_at,
+                    }
+                ]
+            )
+        writer.write_manifest()
+
+    def _read_log(name: str, container: str, **_):
+        if container == "failing":
+            raise ApiException(status=500)
+        response = mocker.Mock()
+        response.stream.return_value = iter([b"line 2\n"])
+        return response
+
+    v1_api = mocker.Mock()
+    v1_api.read_namespaced_pod_log.side_effect = _read_log
+    manifest = BundleManifest.from_bundle(bundle_name="second.zip", previous_bundle_path=first_path)
+    second_path = str(tmp_path / "second.zip")
+    with ZipFile(file=second_path, mode="w") as myzip:
+        writer = BundleWriter(myzip=myzip, manifest=manifest)
+        for container_name in zinfos:
+            entry = _capture_planned_target(
+                capture=partial(
+                    _capture_pod_container_log,
+                    container_name=container_name,
+                    pod_name="a",
+                    pod_namespace="ns",
+                    v1_api=v1_api,
+                    manifest=manifest,
+                ),
+                directory_paths=["broker", "alias"],
+                manifest=manifest,
+                get_zinfo=partial(
+                    _get_pod_container_log_zinfo, container_name=container_name, pod_name="a", pod_namespace="ns"
+                ),
+            )
+            if entry:
+                writer.write([entry])
+        writer.write_manifest()
+
+    with ZipFile(file=second_path, mode="r") as myzip:
+        assert myzip.namelist() == zinfos["ok"] + [MANIFEST_ZINFO]
+        second_manifest = json.loads(myzip.read(MANIFEST_ZINFO))
+
+    for zinfo in zinfos["ok"]:
+        assert second_manifest["logs"][zinfo]["bundles"] == ["first.zip", "second.zip"]
+        assert second_manifest["logs"][zinfo]["capturedAt"] != first_captured_at
+    # The failed capture keeps the previous record, the next delta resumes from the first bundle.
+    for zinfo in zinfos["failing"]:
+        assert second_manifest["logs"][zinfo] == {"capturedAt": first_captured_at, "bundles": ["first.zip"]}
+
+
+def test_bundle_manifest_invalid_previous(tmp_path):
+    from zipfile import ZipFile
+
+    from azure.cli.core.azclierror import FileOperationError
+
+    from azext_edge.edge.providers.support.manifest import BundleManifest
+
+    with pytest.raises(FileOperationError):
+        BundleManifest.from_bundle(bundle_name="next.zip", previous_bundle_path=str(tmp_path / "missing.zip"))
+
+    no_manifest_path = str(tmp_path / "no_manifest.zip")
+    with ZipFile(file=no_manifest_path, mode="w") as myzip:
+        myzip.writestr("ns/pod.yaml", "kind: Pod")
+    with pytest.raises(FileOperationError):
+        BundleManifest.from_bundle(bundle_name="next.zip", previous_bundle_path=no_manifest_path)
+
+
 def assert_get_custom_resources(
-    mocked_get_custom_objects,
+    mocked_list_custom_object_pages,
     mocked_zipfile,
     api: EdgeResourceApi,
     kind: str,
     file_prefix: str = None,
     sub_group: Optional[str] = None,
 ):
-    mocked_get_custom_objects.assert_any_call(group=api.group, version=api.version, plural=f"{kind}s", use_cache=False)
+    mocked_list_custom_object_pages.assert_any_call(group=api.group, version=api.version, plural=f"{kind}s")
     if not file_prefix:
         file_prefix = kind
 
@@ -468,7 +1028,7 @@ def assert_list_cron_jobs(
     directory_path: str,
 ):
     mocked_client.BatchV1Api().list_cron_job_for_all_namespaces.assert_any_call(
-        label_selector=label_selector, field_selector=None
+        **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=None
     )
 
     assert_zipfile_write(
@@ -494,18 +1054,18 @@ def assert_list_deployments(
         mocked_client.AppsV1Api().list_deployment_for_all_namespaces.assert_has_calls(
             [
                 # Specific for `aio-broker-operator` (no app label)
-                call(label_selector=None, field_selector=field_selector),
-                call(label_selector=MQ_NAME_LABEL, field_selector=None),
+                call(**RAW_LIST_KWARGS, label_selector=None, field_selector=field_selector),
+                call(**RAW_LIST_KWARGS, label_selector=MQ_NAME_LABEL, field_selector=None),
             ]
         )
     else:
         if namespace:
             mocked_client.AppsV1Api().list_namespaced_deployment.assert_any_call(
-                namespace=namespace, label_selector=label_selector, field_selector=field_selector
+                **RAW_LIST_KWARGS, namespace=namespace, label_selector=label_selector, field_selector=field_selector
             )
         else:
             mocked_client.AppsV1Api().list_deployment_for_all_namespaces.assert_any_call(
-                label_selector=label_selector, field_selector=field_selector
+                **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
             )
 
     mock_names = mock_names or ["mock_deployment"]
@@ -525,7 +1085,7 @@ def assert_list_jobs(
     mock_names: Optional[List[str]] = None,
 ):
     mocked_client.BatchV1Api().list_job_for_all_namespaces.assert_any_call(
-        label_selector=label_selector, field_selector=None
+        **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=None
     )
 
     mock_names = mock_names or ["mock_job"]
@@ -547,10 +1107,12 @@ def assert_list_pods(
 ):
     if "namespace" in kwargs:
         mocked_client.CoreV1Api().list_namespaced_pod.assert_any_call(
-            namespace=kwargs["namespace"], label_selector=label_selector
+            **RAW_LIST_KWARGS, namespace=kwargs["namespace"], label_selector=label_selector, field_selector=None
         )
     else:
-        mocked_client.CoreV1Api().list_pod_for_all_namespaces.assert_any_call(label_selector=label_selector)
+        mocked_client.CoreV1Api().list_pod_for_all_namespaces.assert_any_call(
+            **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=None
+        )
 
     for namespace in mocked_list_pods:
         for pod_name in mocked_list_pods[namespace]:
@@ -564,19 +1126,21 @@ def assert_list_pods(
                 pods_with_container[namespace][pod_name].pop("mock-init-container")
 
             if "include_metrics" in kwargs and kwargs["include_metrics"]:
-                mocked_client.CustomObjectsApi().get_namespaced_custom_object.assert_any_call(
+                # Pod metrics are listed per namespace rather than requested per pod.
+                mocked_client.CustomObjectsApi().get_namespaced_custom_object.assert_not_called()
+                mocked_client.CustomObjectsApi().list_namespaced_custom_object.assert_any_call(
+                    **RAW_LIST_KWARGS,
                     group="metrics.k8s.io",
                     version="v1beta1",
                     namespace=namespace,
                     plural="pods",
-                    name=pod_name,
                 )
                 assert_zipfile_write(
                     mocked_zipfile,
                     zinfo=f"{namespace}/{directory_path}/pod.{pod_name}.metric.yaml",
                     data="apiVersion: metrics.k8s.io/v1beta1\nkind: PodMetrics\nmetadata:\n  "
-                    "creationTimestamp: '0000-00-00T00:00:00Z'\n  name: mock_custom_object\n  "
-                    "namespace: namespace\ntimestamp: '0000-00-00T00:00:00Z'\n",
+                    f"creationTimestamp: '0000-00-00T00:00:00Z'\n  name: {pod_name}\n  "
+                    f"namespace: {namespace}\ntimestamp: '0000-00-00T00:00:00Z'\nwindow: 30s\n",
                 )
 
             if pod_name not in kwargs.get("prefix_names", []):
@@ -611,6 +1175,8 @@ def assert_list_pods(
                                 since_seconds=kwargs["since_seconds"],
                                 container=container_name,
                                 previous=previous_logs,
+                                _request_timeout=LOG_REQUEST_TIMEOUT,
+                                _preload_content=False,
                             )
                             assert_zipfile_write(
                                 mocked_zipfile,
@@ -633,10 +1199,12 @@ def assert_list_replica_sets(
 ):
     if namespace:
         mocked_client.AppsV1Api().list_namespaced_replica_set.assert_any_call(
-            namespace=namespace, label_selector=label_selector
+            **RAW_LIST_KWARGS, namespace=namespace, label_selector=label_selector, field_selector=None
         )
     else:
-        mocked_client.AppsV1Api().list_replica_set_for_all_namespaces.assert_any_call(label_selector=label_selector)
+        mocked_client.AppsV1Api().list_replica_set_for_all_namespaces.assert_any_call(
+            **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=None
+        )
 
     mock_names = mock_names or ["mock_replicaset"]
     for name in mock_names:
@@ -658,11 +1226,11 @@ def assert_list_persistent_volume_claims(
 ):
     if namespace:
         mocked_client.CoreV1Api().list_namespaced_persistent_volume_claim.assert_any_call(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, namespace=namespace, label_selector=label_selector, field_selector=field_selector
         )
     else:
         mocked_client.CoreV1Api().list_persistent_volume_claim_for_all_namespaces.assert_any_call(
-            label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
         )
 
     mock_names = mock_names or ["mock_pvc"]
@@ -682,7 +1250,7 @@ def assert_list_stateful_sets(
     field_selector: Optional[str] = None,
 ):
     mocked_client.AppsV1Api().list_stateful_set_for_all_namespaces.assert_any_call(
-        label_selector=label_selector, field_selector=field_selector
+        **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
     )
 
     assert_zipfile_write(
@@ -704,11 +1272,11 @@ def assert_list_services(
 
     if namespace:
         mocked_client.CoreV1Api().list_namespaced_service.assert_any_call(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, namespace=namespace, label_selector=label_selector, field_selector=field_selector
         )
     else:
         mocked_client.CoreV1Api().list_service_for_all_namespaces.assert_any_call(
-            label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
         )
 
     mock_names = mock_names or ["mock_service"]
@@ -729,7 +1297,7 @@ def assert_list_config_maps(
     mock_names: Optional[List[str]] = None,
 ):
     mocked_client.CoreV1Api().list_config_map_for_all_namespaces.assert_any_call(
-        label_selector=label_selector, field_selector=field_selector
+        **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
     )
     mock_names = mock_names or ["mock_config_map"]
     for name in mock_names:
@@ -751,11 +1319,11 @@ def assert_list_daemon_sets(
 ):
     if namespace:
         mocked_client.AppsV1Api().list_namespaced_daemon_set.assert_any_call(
-            namespace=namespace, label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, namespace=namespace, label_selector=label_selector, field_selector=field_selector
         )
     else:
         mocked_client.AppsV1Api().list_daemon_set_for_all_namespaces.assert_any_call(
-            label_selector=label_selector, field_selector=field_selector
+            **RAW_LIST_KWARGS, label_selector=label_selector, field_selector=field_selector
         )
 
     mock_names = mock_names or ["mock_daemonset"]
@@ -788,15 +1356,15 @@ def assert_meta_kpis(mocked_client, mocked_zipfile, mocked_list_pods):
 
 
 def assert_shared_kpis(mocked_client, mocked_zipfile):
-    mocked_client.CoreV1Api().list_node.assert_called_once()
+    mocked_client.CoreV1Api().list_node.assert_called_once_with(**RAW_LIST_KWARGS)
     assert_zipfile_write(mocked_zipfile, zinfo="nodes.yaml", data="items:\n- metadata:\n    name: mock_node\n")
-    mocked_client.CoreV1Api().list_event_for_all_namespaces.assert_called_once()
+    mocked_client.CoreV1Api().list_event_for_all_namespaces.assert_called_once_with(**RAW_LIST_KWARGS)
     assert_zipfile_write(
         mocked_zipfile,
         zinfo="events.yaml",
         data="items:\n- action: mock_action\n  involvedObject: mock_object\n  metadata:\n    name: mock_event\n",
     )
-    mocked_client.StorageV1Api().list_storage_class.assert_called_once()
+    mocked_client.StorageV1Api().list_storage_class.assert_called_once_with(**RAW_LIST_KWARGS)
     assert_zipfile_write(
         mocked_zipfile,
         zinfo="storage-classes.yaml",
@@ -812,6 +1380,10 @@ def assert_shared_kpis(mocked_client, mocked_zipfile):
 # TODO: base test class?
 def assert_zipfile_write(mocked_zipfile, zinfo: Union[str, ZipInfo], data: str):
     # pylint: disable=unnecessary-dunder-call
+    if isinstance(zinfo, str) and zinfo in mocked_zipfile.streamed_members:
+        assert mocked_zipfile.streamed_members[zinfo].decode() == data
+        return
+
     if isinstance(zinfo, str):
         mocked_zipfile(file="").__enter__().writestr.assert_any_call(
             zinfo_or_arcname=zinfo,
@@ -862,7 +1434,7 @@ def test_create_bundle_mq_traces(
     mocked_config,
     mocked_os_makedirs,
     mocked_zipfile,
-    mocked_get_custom_objects,
+    mocked_list_custom_object_pages,
     mocked_list_pods,
     mocked_list_replicasets,
     mocked_list_statefulsets,
@@ -906,7 +1478,7 @@ def test_create_bundle_arc_agents(
     mocked_config,
     mocked_os_makedirs,
     mocked_zipfile,
-    mocked_get_custom_objects,
+    mocked_list_custom_object_pages,
     mocked_list_deployments,
     mocked_list_pods,
     mocked_list_replicasets,
@@ -0,0 +1,82 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import json
+import logging
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+# Imported by the Azure CLI before the extension command loader is.
+PRELOADED_MODULES = ["azure.cli.core", "azure.cli.core.commands.parameters", "knack"]
+# Imported to build the command table, arguments and help of every invocation, including --help.
+LOADER_MODULES = ["azext_edge", "azext_edge.edge.command_map", "azext_edge.edge.params", "azext_edge.edge._help"]
+# Imported when a command executes.
+DEFERRED_MODULES = [
+    "kubernetes",
+    "rich",
+    "yaml",
+    "cryptography",
+    "azure.identity",
+    "azext_edge.edge.providers.base",
+    "azext_edge.edge.providers.support_bundle",
+    "azext_edge.edge.providers.orchestration.work",
+    "azext_edge.edge.util.az_client",
+    "azext_edge.edge.vendor",
+]
+# Reported against, not asserted. Loader import regressions are gated by test_loader_import_deferred.
+IMPORT_TIME_BUDGET_MS = 150
+BENCHMARK_ROUNDS = 3
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _import_loader() -> Tuple[Dict[str, int], List[str]]:
+    """
+    Cumulative microseconds of each top level loader import, with the modules loaded at the end.
+    """
+    code = (
+        f"import sys, json; import {', '.join(PRELOADED_MODULES)}; import {', '.join(LOADER_MODULES)}; "
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        # Nested imports are indented, their time is included in the cumulative time of the top level import.
+        if match and not match.group(3) and match.group(4).startswith("azext_edge"):
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative, json.loads(completed.stdout)
+
+
+def test_loader_import_deferred():
+    cumulative, modules = _import_loader()
+    assert cumulative
+
+    loaded_deferred = [
+        module for module in modules if any(module == d or module.startswith(f"{d}.") for d in DEFERRED_MODULES)
+    ]
+    assert loaded_deferred == []
+
+
+@pytest.mark.benchmark
+def test_loader_import_budget():
+    best_ms = None
+    for _ in range(BENCHMARK_ROUNDS):
+        cumulative, _ = _import_loader()
+        elapsed_ms = sum(cumulative.values()) / 1000
+        best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+
+    # Timings are reported, not asserted, they depend on the machine running the tests.
+    logger.info("Command loader imports: %.1fms (budget %dms)", best_ms, IMPORT_TIME_BUDGET_MS)
+    if best_ms >= IMPORT_TIME_BUDGET_MS:
+        logger.warning("Command loader imports exceed the %dms budget.", IMPORT_TIME_BUDGET_MS)
@@ -132,6 +132,29 @@ def get_kubectl_workload_items(
     return filter_resources(kubectl_items=kubectl_items, prefixes=prefixes, resource_match=resource_match)
 
 
+def mock_list_page_response(page: Union[dict, Any]):
+    """
+    Response of a list call with _preload_content=False carrying page, a dict or kubernetes model, as raw JSON.
+    """
+    from kubernetes.client import ApiClient
+    from urllib3 import HTTPResponse
+
+    return HTTPResponse(body=json.dumps(ApiClient().sanitize_for_serialization(page)).encode())
+
+
+def as_raw_list(handler):
+    """
+    Wrap a list side effect returning kubernetes models to answer _preload_content=False calls with raw JSON.
+    """
+    def _handle_list(*args, **kwargs):
+        result = handler(*args, **kwargs)
+        if kwargs.get("_preload_content") is False:
+            return mock_list_page_response(result)
+        return result
+
+    return _handle_list
+
+
 def remove_file_or_folder(file_path):
     if os.path.isfile(file_path):
         try:
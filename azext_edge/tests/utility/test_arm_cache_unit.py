@@ -0,0 +1,222 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import json
+
+import pytest
+import responses
+
+from azext_edge.edge.util.arm_cache import ARM_CACHE, get_cache_key
+from azext_edge.edge.util.az_client import get_resource_client
+
+from ..generators import generate_random_string, get_zeroed_subscription
+
+BASE_URL = "https://management.azure.com"
+RG_API_VERSION = "2024-03-01"
+
+
+def _get_rg_endpoint(resource_group_name: str) -> str:
+    return (
+        f"{BASE_URL}/subscriptions/{get_zeroed_subscription()}/resourcegroups/{resource_group_name}"
+        f"?api-version={RG_API_VERSION}"
+    )
+
+
+@pytest.fixture
+def config_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    yield tmp_path
+
+
+def test_get_cache_key():
+    key = get_cache_key(
+        f"{BASE_URL}/subscriptions/{get_zeroed_subscription()}/resourceGroups/MyRG?api-version={RG_API_VERSION}"
+    )
+    subscription_id = get_zeroed_subscription()
+    resource_path = f"/subscriptions/{subscription_id}/resourcegroups/myrg"
+    assert key == "|".join([subscription_id, resource_path, RG_API_VERSION, ""])
+    assert get_cache_key(f"{BASE_URL}/subscriptions/sub/resourceGroups/rg?$expand=x&api-version=1").endswith(
+        "|1|$expand=x"
+    )
+
+
+def test_arm_cache_memo(mocked_azcli_cred_get_token, mocked_responses: responses):
+    resource_group_name = generate_random_string()
+    endpoint = _get_rg_endpoint(resource_group_name)
+    mocked_responses.add(method=responses.GET, url=endpoint, json={"name": resource_group_name, "location": "a"})
+    client = get_resource_client(subscription_id=get_zeroed_subscription())
+
+    first = client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True)
+    first["location"] = "mutated"
+    second = client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True)
+    assert second == {"name": resource_group_name, "location": "a"}
+    assert len(mocked_responses.calls) == 1
+
+    # Reads not marked for the cache always go through.
+    client.resource_groups.get(resource_group_name=resource_group_name)
+    assert len(mocked_responses.calls) == 2
+
+    # Writes invalidate the resource.
+    mocked_responses.add(method=responses.PUT, url=endpoint, json={"name": resource_group_name, "location": "b"})
+    mocked_responses.add(method=responses.GET, url=endpoint, json={"name": resource_group_name, "location": "b"})
+    client.resource_groups.create_or_update(resource_group_name=resource_group_name, parameters={"location": "b"})
+    third = client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True)
+    assert third["location"] == "b"
+    assert len(mocked_responses.calls) == 4
+
+
+def test_arm_cache_deployment_write(mocked_azcli_cred_get_token, mocked_responses: responses):
+    resource_group_name = generate_random_string()
+    rg_path = f"subscriptions/{get_zeroed_subscription()}/resourceGroups/{resource_group_name}"
+    instance_id = f"{rg_path}/providers/Microsoft.IoTOperations/instances/{generate_random_string()}"
+    instance_endpoint = f"{BASE_URL}/{instance_id}?api-version={RG_API_VERSION}"
+    other_rg_id = (
+        f"subscriptions/{get_zeroed_subscription()}/resourceGroups/{resource_group_name}2"
+        f"/providers/Microsoft.IoTOperations/instances/{generate_random_string()}"
+    )
+    other_rg_endpoint = f"{BASE_URL}/{other_rg_id}?api-version={RG_API_VERSION}"
+    mocked_responses.add(method=responses.GET, url=instance_endpoint, json={"properties": {"version": "1"}})
+    mocked_responses.add(method=responses.GET, url=other_rg_endpoint, json={"name": "other"})
+    client = get_resource_client(subscription_id=get_zeroed_subscription())
+    assert client.resources.get_by_id(resource_id=instance_id, api_version=RG_API_VERSION, arm_cache=True) == {
+        "properties": {"version": "1"}
+    }
+    client.resources.get_by_id(resource_id=other_rg_id, api_version=RG_API_VERSION, arm_cache=True)
+    assert len(mocked_responses.calls) == 2
+
+    # The deployment path has no prefix relation to the instance it upgrades.
+    deployment_name = generate_random_string()
+    mocked_responses.add(
+        method=responses.PUT,
+        url=f"{BASE_URL}/{rg_path}/providers/Microsoft.Resources/deployments/{deployment_name}",
+        json={"name": deployment_name, "properties": {"provisioningState": "Succeeded"}},
+    )
+    client.deployments.begin_create_or_update(
+        resource_group_name=resource_group_name,
+        deployment_name=deployment_name,
+        parameters={"properties": {"mode": "Incremental"}},
+        polling=False,
+    )
+    mocked_responses.replace(
+        method_or_response=responses.GET, url=instance_endpoint, json={"properties": {"version": "2"}}
+    )
+    assert client.resources.get_by_id(resource_id=instance_id, api_version=RG_API_VERSION, arm_cache=True) == {
+        "properties": {"version": "2"}
+    }
+    assert len(mocked_responses.calls) == 4
+
+    # Reads in other resource groups are kept.
+    client.resources.get_by_id(resource_id=other_rg_id, api_version=RG_API_VERSION, arm_cache=True)
+    assert len(mocked_responses.calls) == 4
+
+
+def test_arm_cache_invalidate_persisted(config_dir):
+    ARM_CACHE.ttl_seconds = 60
+    rg_path = f"{BASE_URL}/subscriptions/{get_zeroed_subscription()}/resourceGroups/rg"
+    instance_key = get_cache_key(f"{rg_path}/providers/Microsoft.IoTOperations/instances/a?api-version=1")
+    other_key = get_cache_key(
+        f"{BASE_URL}/subscriptions/{get_zeroed_subscription()}/resourceGroups/rg2/providers/x/y/z?api-version=1"
+    )
+    ARM_CACHE.set_response(instance_key, body="{}", content_type=None, etag=None)
+    ARM_CACHE.set_response(other_key, body="{}", content_type=None, etag=None)
+
+    ARM_CACHE.invalidate(
+        f"/subscriptions/{get_zeroed_subscription()}/resourceGroups/rg/providers/Microsoft.Resources/deployments/d"
+    )
+    with open(config_dir.joinpath("iotops_arm_cache.json"), encoding="utf-8") as f:
+        assert list(json.load(f)) == [other_key]
+    ARM_CACHE.clear()
+    assert ARM_CACHE.get_response(instance_key) == (None, False)
+    assert ARM_CACHE.get_response(other_key)[1] is True
+
+
+def test_arm_cache_per_command(mocker, mocked_azcli_cred_get_token, mocked_responses: responses):
+    from azext_edge import arm_cache_handler
+
+    resource_group_name = generate_random_string()
+    mocked_responses.add(
+        method=responses.GET, url=_get_rg_endpoint(resource_group_name), json={"name": resource_group_name}
+    )
+    client = get_resource_client(subscription_id=get_zeroed_subscription())
+    cli_ctx = mocker.Mock()
+    cli_ctx.config.getint.return_value = 0
+
+    for command in ["iot ops show", "iot ops check"]:
+        arm_cache_handler(cli_ctx, command=command)
+        for _ in range(2):
+            client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True)
+    # Each command reads once, the second does not reuse the memo of the first.
+    assert len(mocked_responses.calls) == 2
+
+
+def test_arm_cache_custom_policies(mocked_azcli_cred_get_token, mocked_responses: responses):
+    from azure.core.pipeline.policies import HeadersPolicy
+
+    resource_group_name = generate_random_string()
+    mocked_responses.add(
+        method=responses.GET, url=_get_rg_endpoint(resource_group_name), json={"name": resource_group_name}
+    )
+    # Custom per call policies still consume the arm_cache option rather than passing it to the transport.
+    client = get_resource_client(subscription_id=get_zeroed_subscription(), per_call_policies=[HeadersPolicy()])
+    for _ in range(2):
+        assert client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True) == {
+            "name": resource_group_name
+        }
+    assert len(mocked_responses.calls) == 1
+
+
+def test_arm_cache_persisted(mocked_azcli_cred_get_token, mocked_responses: responses, config_dir, mocker):
+    resource_group_name = generate_random_string()
+    endpoint = _get_rg_endpoint(resource_group_name)
+    ARM_CACHE.ttl_seconds = 60
+    mocked_responses.add(
+        method=responses.GET,
+        url=endpoint,
+        json={"name": resource_group_name},
+        headers={"ETag": '"etag0"'},
+    )
+    client = get_resource_client(subscription_id=get_zeroed_subscription())
+    client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True)
+
+    with open(config_dir.joinpath("iotops_arm_cache.json"), encoding="utf-8") as f:
+        persisted = json.load(f)
+    assert list(persisted.values())[0]["etag"] == '"etag0"'
+
+    # A following command within the TTL is served from disk.
+    ARM_CACHE.clear()
+    assert client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True) == {
+        "name": resource_group_name
+    }
+    assert len(mocked_responses.calls) == 1
+
+    # Past the TTL the entry is revalidated.
+    ARM_CACHE.clear()
+    mocked_time = mocker.patch("azext_edge.edge.util.arm_cache.time.time")
+    mocked_time.return_value = list(persisted.values())[0]["storedAt"] + 61
+    mocked_responses.replace(method_or_response=responses.GET, url=endpoint, status=304)
+    assert client.resource_groups.get(resource_group_name=resource_group_name, arm_cache=True) == {
+        "name": resource_group_name
+    }
+    assert len(mocked_responses.calls) == 2
+    assert mocked_responses.calls[1].request.headers["If-None-Match"] == '"etag0"'
+
+
+def test_resource_graph_memo(mocker, mocked_cmd):
+    mocked_send_raw_request = mocker.patch("azext_edge.edge.util.resource_graph.send_raw_request")
+    mocked_send_raw_request.return_value.json.return_value = {"data": [{"id": "a"}]}
+
+    from azext_edge.edge.util.resource_graph import ResourceGraph
+
+    resource_graph = ResourceGraph(cmd=mocked_cmd, subscriptions=[get_zeroed_subscription()])
+    query = generate_random_string()
+    result = resource_graph.query_resources(query=query)
+    result["data"].append({"id": "b"})
+    assert resource_graph.query_resources(query=query) == {"data": [{"id": "a"}]}
+    assert mocked_send_raw_request.call_count == 1
+
+    ARM_CACHE.invalidate("/subscriptions/sub/resourceGroups/rg")
+    resource_graph.query_resources(query=query)
+    assert mocked_send_raw_request.call_count == 2
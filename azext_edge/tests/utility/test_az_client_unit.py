@@ -10,6 +10,13 @@ from ..generators import generate_random_string
 AZ_CLIENT_PATH = "azext_edge.edge.util.az_client"
 
 
+def _mock_poller(mocker, done_after: int):
+    poller = mocker.Mock()
+    poller.done.side_effect = lambda: poller.done.call_count > done_after
+    poller.result.return_value = generate_random_string()
+    return poller
+
+
 @pytest.mark.parametrize("done", [True, False])
 def test_wait_for_terminal_state(mocker, done):
     # could be fixture with param
@@ -21,11 +28,43 @@ def test_wait_for_terminal_state(mocker, done):
     poller.done.return_value = done
     poller.result.return_value = generate_random_string()
 
-    from azext_edge.edge.util.az_client import wait_for_terminal_state
+    from azext_edge.edge.util.az_client import (
+        LRO_POLLING_INTERVAL_SEC,
+        POLL_INITIAL_WAIT_SEC,
+        POLL_WAIT_SEC,
+        wait_for_terminal_state,
+    )
 
     result = wait_for_terminal_state(poller)
     assert result == poller.result.return_value
-    assert sleep_patch.call_count == (1 if done else poll_num)
+    intervals = [call.args[0] for call in sleep_patch.call_args_list]
+    assert intervals[0] == POLL_INITIAL_WAIT_SEC
+    if done:
+        assert len(intervals) == 1
+        return
+    # Backs off exponentially up to the LRO polling interval, until the retries worth of waiting.
+    assert intervals[:3] == [POLL_INITIAL_WAIT_SEC * 2**i for i in range(3)]
+    assert max(intervals) == LRO_POLLING_INTERVAL_SEC
+    assert sum(intervals) >= poll_num * POLL_WAIT_SEC
+    assert sum(intervals[:-1]) < poll_num * POLL_WAIT_SEC
+
+
+def test_wait_for_terminal_states(mocker):
+    sleep_patch = mocker.patch(f"{AZ_CLIENT_PATH}.sleep")
+
+    from azext_edge.edge.util.az_client import POLL_INITIAL_WAIT_SEC, wait_for_terminal_states
+
+    # Intervals are capped at the wait.
+    fast_poller = _mock_poller(mocker, done_after=1)
+    slow_poller = _mock_poller(mocker, done_after=6)
+    result = wait_for_terminal_states(fast_poller, slow_poller, wait_sec=1)
+
+    assert result == (fast_poller, slow_poller)
+    intervals = [call.args[0] for call in sleep_patch.call_args_list]
+    assert intervals == [POLL_INITIAL_WAIT_SEC] + [1] * 6
+    # Done pollers are not checked again.
+    assert fast_poller.done.call_count == 2
+    assert slow_poller.done.call_count == 7
 
 
 def test_get_tenant_id(mocker):
@@ -38,3 +77,107 @@ def test_get_tenant_id(mocker):
     result = get_tenant_id()
     assert result == tenant_id
     profile_patch.assert_called_once()
+
+
+def test_client_registry(mocked_azcli_cred_get_token):
+    from azext_edge.edge.util.az_client import (
+        CLIENT_REGISTRY,
+        LRO_POLLING_INTERVAL_SEC,
+        get_iotops_mgmt_client,
+        get_registry_mgmt_client,
+        get_resource_client,
+    )
+
+    subscription_id = generate_random_string()
+    client = get_resource_client(subscription_id=subscription_id)
+    assert get_resource_client(subscription_id=subscription_id) is client
+    assert get_resource_client(subscription_id=generate_random_string()) is not client
+    versioned_client = get_registry_mgmt_client(subscription_id=subscription_id, api_version="2024-09-01-preview")
+    assert versioned_client is not get_registry_mgmt_client(subscription_id=subscription_id)
+    assert versioned_client is get_registry_mgmt_client(
+        subscription_id=subscription_id, api_version="2024-09-01-preview"
+    )
+    iotops_client = get_iotops_mgmt_client(subscription_id=subscription_id)
+    assert len(CLIENT_REGISTRY) == 5
+
+    # Clients built with other kwargs are not shared.
+    unpooled_client = get_resource_client(subscription_id=subscription_id, polling_interval=1)
+    assert unpooled_client is not client
+    assert len(CLIENT_REGISTRY) == 5
+    # Long running operations are polled every LRO_POLLING_INTERVAL_SEC unless set otherwise.
+    assert client._config.polling_interval == LRO_POLLING_INTERVAL_SEC
+    assert unpooled_client._config.polling_interval == 1
+
+    # All clients share the session and credential.
+    sessions = {
+        id(c._client._pipeline._transport.session)
+        for c in [client, versioned_client, iotops_client, unpooled_client]
+    }
+    assert len(sessions) == 1
+    credentials = {id(c._config.credential) for c in [client, versioned_client, iotops_client, unpooled_client]}
+    assert credentials == {id(CLIENT_REGISTRY.credential)}
+
+    # Closing a client keeps the shared session open.
+    session = client._client._pipeline._transport.session
+    client.close()
+    assert session.adapters
+
+    CLIENT_REGISTRY.clear()
+    assert len(CLIENT_REGISTRY) == 0
+    assert get_resource_client(subscription_id=subscription_id) is not client
+
+
+def test_client_registry_account_switch(mocker, mocked_azcli_cred_get_token):
+    from azext_edge import arm_cache_handler
+    from azext_edge.edge.util.az_client import CLIENT_REGISTRY, get_resource_client
+
+    mocker.patch("azext_edge.edge.util.arm_cache.configure_arm_cache")
+    subscription_id = generate_random_string()
+    scope = "https://management.azure.com/.default"
+    mocked_azcli_cred_get_token.reset_mock()
+
+    arm_cache_handler(mocker.Mock(), command="iot ops show")
+    client = get_resource_client(subscription_id=subscription_id)
+    session = client._client._pipeline._transport.session
+    client._config.credential.get_token(scope)
+    client._config.credential.get_token(scope)
+    assert mocked_azcli_cred_get_token.call_count == 1
+
+    # After az login or az account set, the next command acquires a token of the new account.
+    arm_cache_handler(mocker.Mock(), command="iot ops show")
+    switched_client = get_resource_client(subscription_id=subscription_id)
+    assert switched_client is not client
+    assert switched_client._config.credential is not client._config.credential
+    switched_client._config.credential.get_token(scope)
+    assert mocked_azcli_cred_get_token.call_count == 2
+    # Connections are still kept alive across commands.
+    assert switched_client._client._pipeline._transport.session is session
+    assert len(CLIENT_REGISTRY) == 1
+
+
+def test_cached_token_credential(mocker):
+    from azure.core.credentials import AccessToken
+
+    from azext_edge.edge.util.az_client import TOKEN_REFRESH_MARGIN_SEC, CachedTokenCredential
+
+    now = 1000000
+    mocker.patch(f"{AZ_CLIENT_PATH}.time.time", return_value=now)
+    inner = mocker.Mock()
+    inner.get_token.side_effect = lambda *scopes, **kwargs: AccessToken(
+        generate_random_string(), now + TOKEN_REFRESH_MARGIN_SEC + 60
+    )
+    credential = CachedTokenCredential(inner)
+
+    scope = "https://management.azure.com/.default"
+    token = credential.get_token(scope)
+    assert credential.get_token(scope) is token
+    assert inner.get_token.call_count == 1
+
+    assert credential.get_token("https://storage.azure.com/.default") is not token
+    assert credential.get_token(scope, claims=generate_random_string()) is not token
+    assert inner.get_token.call_count == 3
+
+    # Tokens close to expiry are renewed.
+    mocker.patch(f"{AZ_CLIENT_PATH}.time.time", return_value=now + 120)
+    assert credential.get_token(scope) is not token
+    assert inner.get_token.call_count == 4
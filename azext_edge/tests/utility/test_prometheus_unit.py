@@ -0,0 +1,145 @@
+# coding=utf-8
+# ----------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License file in the project root for license information.
+# ----------------------------------------------------------------------------------------------
+
+import math
+from time import perf_counter
+
+import pytest
+
+from azext_edge.edge.util.prometheus import MetricTable, SeriesHistory, format_labels, parse_metrics
+
+EXPOSITION = """
+# HELP http_requests_total The total number of HTTP requests.
+# TYPE http_requests_total counter
+http_requests_total{method="post",code="200"} 1027 1395066363000
+http_requests_total{method="post",code="400"}    3 1395066363000
+http_requests_total{code="200",method="get"} 12
+
+# A plain comment
+msdos_file_access_time_seconds{path="C:\\\\DIR\\\\FILE.TXT",error="Cannot find file:\\n\\"FILE.TXT\\""} 1.458255915e9
+metric_without_timestamp_and_labels 12.47
+something_weird{problem="division by zero"} +Inf -3982045
+label_with_brace{value="a}b,c=\\"d\\""} NaN
+
+# HELP http_request_duration_seconds A histogram of the request duration.
+# TYPE http_request_duration_seconds histogram
+http_request_duration_seconds_bucket{le="0.05"} 24054
+http_request_duration_seconds_bucket{le="+Inf"} 144320
+http_request_duration_seconds_sum 53423
+http_request_duration_seconds_count 144320
+# TYPE rpc_duration_seconds summary
+rpc_duration_seconds{quantile="0.5"} 4773
+rpc_duration_seconds_sum 1.7560473e+07
+rpc_duration_seconds_count 2693
+not a sample line
+"""
+
+
+def test_parse_metrics():
+    table = parse_metrics(EXPOSITION)
+    assert len(table) == 14
+
+    assert table.families["http_requests_total"].type == "counter"
+    assert table.families["http_requests_total"].help == "The total number of HTTP requests."
+    requests = list(table.samples(name="http_requests_total"))
+    assert [sample.value for sample in requests] == [1027, 3, 12]
+    assert requests[0].labels == {"method": "post", "code": "200"}
+    assert list(table.samples(name="http_requests_total", labels={"method": "get"}))[0].value == 12
+
+    escaped = list(table.samples(name="msdos_file_access_time_seconds"))[0]
+    assert escaped.labels == {"path": "C:\\DIR\\FILE.TXT", "error": 'Cannot find file:\n"FILE.TXT"'}
+    assert list(table.samples(name="label_with_brace"))[0].labels == {"value": 'a}b,c="d"'}
+    assert math.isinf(list(table.samples(name="something_weird"))[0].value)
+    assert math.isnan(list(table.samples(name="label_with_brace"))[0].value)
+    assert table.families.get("metric_without_timestamp_and_labels") is None
+    assert list(table.samples(name="metric_without_timestamp_and_labels"))[0].family == (
+        "metric_without_timestamp_and_labels"
+    )
+
+    # Histogram and summary series belong to their family.
+    histogram = list(table.samples(name="http_request_duration_seconds"))
+    assert [sample.name for sample in histogram] == [
+        "http_request_duration_seconds_bucket",
+        "http_request_duration_seconds_bucket",
+        "http_request_duration_seconds_sum",
+        "http_request_duration_seconds_count",
+    ]
+    assert table.family_of("rpc_duration_seconds_count") == "rpc_duration_seconds"
+    assert len(list(table.samples(name="rpc_duration_seconds"))) == 3
+    assert len(list(table.samples(name="http_request_duration_seconds_sum"))) == 1
+    assert list(table.samples(name="unknown")) == []
+
+    assert table.sum_by("http_requests_total", by=["method"]) == {
+        ("http_requests_total", ("post",)): 1030,
+        ("http_requests_total", ("get",)): 12,
+    }
+    assert table.sum_by("http_requests_total") == {("http_requests_total", ()): 1042}
+    assert format_labels({"a": "1", "b": "2"}) == 'a="1",b="2"'
+
+
+def test_metric_table_extend():
+    first = parse_metrics(EXPOSITION)
+    second = parse_metrics(EXPOSITION.splitlines())
+    merged = MetricTable()
+    merged.extend(first)
+    merged.extend(second)
+    assert len(merged) == 28
+    assert merged.families == first.families
+    assert merged.sum_by("http_requests_total", by=["code"])[("http_requests_total", ("200",))] == 2078
+    # Label sets are interned across scrapes.
+    assert len(merged._label_sets) == len(first._label_sets)
+
+
+def test_parse_metrics_linear():
+    def _generate(series: int) -> str:
+        lines = ["# HELP aio_mq_connected_sessions Sessions.", "# TYPE aio_mq_connected_sessions gauge"]
+        lines.extend(
+            f'aio_mq_connected_sessions{{hostname="frontend-{index % 50}",instance="{index}",pod_type="FE"}} {index}'
+            for index in range(series)
+        )
+        return "\n".join(lines)
+
+    def _time(content: str) -> float:
+        start = perf_counter()
+        table = parse_metrics(content)
+        elapsed = perf_counter() - start
+        assert len(table) == content.count("\n") - 1
+        return elapsed
+
+    small, large = _generate(10000), _generate(80000)
+    assert len(large) > 5 * 1024 * 1024
+    # Eight times the series should stay well under quadratic growth.
+    assert _time(large) < _time(small) * 8 * 4
+
+
+def test_series_history():
+    history = SeriesHistory(capacity=4)
+    for timestamp, values in enumerate(
+        [{"a": 1.0, "b": 10.0}, {"a": 3.0}, {"a": 6.0, "b": 4.0}, {"a": 10.0, "c": 1.0}, {"a": 2.0, "b": 5.0}]
+    ):
+        history.record(values, timestamp=timestamp * 2.0)
+
+    # The oldest scrape was dropped, missing values are skipped.
+    assert len(history) == 4
+    assert history.window("a") == [(2.0, 3.0), (4.0, 6.0), (6.0, 10.0), (8.0, 2.0)]
+    assert history.window("b") == [(4.0, 4.0), (8.0, 5.0)]
+    assert history.window("c") == [(6.0, 1.0)]
+    assert history.window("unknown") == []
+
+    assert history.delta("a") == -8.0
+    assert history.delta("a", counter=True) == 2.0
+    assert history.rate("a") == -4.0
+    assert history.rate("b") == 0.25
+    assert history.rate("c") is None
+    assert history.quantile("a", 0.5) == 4.5
+    assert history.quantile("a", 0.99) == pytest.approx(9.88)
+    assert history.quantile("c", 0.99) == 1.0
+    assert history.sparkline("a") == "▂▅█▁"
+    assert history.sparkline("a", width=2) == "█▁"
+    assert history.sparkline("c") == "▁"
+
+    with pytest.raises(ValueError):
+        SeriesHistory(capacity=1)